@@ -0,0 +1,12 @@
+"""
+Offline benchmark suite for IMGWTools.
+
+Measures parser throughput (rows/s), cache import (rows/s and peak RSS)
+and query/API latency on synthetic IMGW-format archives served by the
+fake IMGW server (imgwtools.testing). No network access is needed.
+
+Usage (from the repository root, with imgwtools installed):
+    python -m benchmarks --list
+    python -m benchmarks -o baseline.json
+    python -m benchmarks --baseline baseline.json --tolerance 0.25
+"""
@@ -0,0 +1,165 @@
+"""
+Run the benchmark suite.
+
+Usage:
+    python -m benchmarks                        # all benchmarks, 850 stations
+    python -m benchmarks --quick                # smaller files, for a smoke run
+    python -m benchmarks -k query -o new.json   # selected benchmarks, save results
+    python -m benchmarks --baseline old.json    # exit 1 on regressions
+
+Every benchmark runs in a separate (spawned) process, so peak RSS is
+measured per benchmark.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from benchmarks.suite import BENCHMARKS, Result, run_benchmark
+from imgwtools.testing.synthetic import DEFAULT_STATIONS
+
+QUICK_STATIONS = 50
+
+# Metric -> True if a higher value is better
+TRACKED_METRICS = {
+    "rows_per_sec": True,
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+def _run(name: str, n_stations: int) -> Result:
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="imgw-bench-") as workdir:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            return pool.submit(run_benchmark, name, n_stations, workdir).result()
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Find tracked metrics that got worse than baseline by more than tolerance.
+
+    Args:
+        results: Benchmark name -> metrics of the current run.
+        baseline: Benchmark name -> metrics of the reference run.
+        tolerance: Allowed relative change (0.25 = 25%).
+
+    Returns:
+        Human-readable descriptions of regressions (empty if none).
+    """
+    regressions = []
+    for name, metrics in results.items():
+        for metric, higher_is_better in TRACKED_METRICS.items():
+            old = baseline.get(name, {}).get(metric)
+            new = metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"{name}.{metric}: {old:.4g} -> {new:.4g} ({change:+.0%})"
+                )
+    return regressions
+
+
+def _format(metrics: dict[str, float]) -> str:
+    parts = []
+    if "rows_per_sec" in metrics:
+        parts.append(
+            f"{metrics['rows']:>9,.0f} rows {metrics['rows_per_sec']:>11,.0f} rows/s"
+        )
+    if "latency_p50_ms" in metrics:
+        parts.append(
+            f"p50 {metrics['latency_p50_ms']:>8.2f} ms "
+            f"p95 {metrics['latency_p95_ms']:>8.2f} ms"
+        )
+    if "peak_rss_mb" in metrics:
+        parts.append(f"RSS {metrics['peak_rss_mb']:>6.0f} MB")
+    return "  ".join(parts)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("-k", dest="select", help="run benchmarks matching a substring")
+    parser.add_argument(
+        "--stations",
+        type=int,
+        default=DEFAULT_STATIONS,
+        help=f"stations per generated file (default {DEFAULT_STATIONS})",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help=f"use {QUICK_STATIONS} stations"
+    )
+    parser.add_argument("-o", "--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON results to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative regression (default 0.25)",
+    )
+    parser.add_argument("--list", action="store_true", help="list benchmarks")
+    args = parser.parse_args(argv)
+
+    names = [n for n in BENCHMARKS if not args.select or args.select in n]
+    if args.list:
+        for name in names:
+            print(f"{name:<26} {BENCHMARKS[name].__doc__}")
+        return 0
+
+    n_stations = QUICK_STATIONS if args.quick else args.stations
+    print(f"{len(names)} benchmarks, {n_stations} stations")
+
+    results: dict[str, dict[str, float]] = {}
+    for name in names:
+        result = _run(name, n_stations)
+        if result.skipped:
+            print(f"{name:<26} skipped ({result.skipped})")
+            continue
+        results[name] = result.metrics
+        print(f"{name:<26} {_format(result.metrics)}")
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "stations": n_stations,
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("stations") != n_stations:
+            print(f"warning: baseline uses {baseline.get('stations')} stations")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Benchmark definitions.
+
+Each benchmark runs in a fresh process (see benchmarks.__main__) with
+its own temporary SQLite cache, so peak RSS is per benchmark and runs
+do not share state. Everything is generated locally; no network access
+is needed.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Benchmark name -> function(n_stations, workdir) -> metrics
+BENCHMARKS: dict[str, Callable[[int, Path], dict[str, float]]] = {}
+
+# Number of timed calls for latency benchmarks
+QUERY_REPEATS = 30
+
+
+@dataclass
+class Result:
+    """Metrics of one benchmark run."""
+
+    name: str
+    metrics: dict[str, float] = field(default_factory=dict)
+    skipped: str | None = None
+
+
+def benchmark(func: Callable[[int, Path], dict[str, float]]):
+    """Register a benchmark under its function name."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _throughput(rows: int, seconds: float) -> dict[str, float]:
+    return {"rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds}
+
+
+def _latency(
+    call: Callable[[], object], repeats: int = QUERY_REPEATS
+) -> dict[str, float]:
+    call()  # warm-up (page cache, imports)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "latency_p50_ms": statistics.median(timings),
+        "latency_p95_ms": timings[int(0.95 * (len(timings) - 1))],
+    }
+
+
+def _configure_db(workdir: Path) -> None:
+    """Point imgwtools at a fresh database in workdir (before importing it)."""
+    os.environ["IMGW_DB_ENABLED"] = "true"
+    os.environ["IMGW_DB_PATH"] = str(workdir / "bench.db")
+    # Keep API background refresh loops from touching the network
+    for name in (
+        "STATION_REFRESH_INTERVAL",
+        "MAP_REFRESH_INTERVAL",
+        "FEED_POLL_INTERVAL",
+        "WARNINGS_REFRESH_INTERVAL",
+    ):
+        os.environ[f"IMGW_{name}"] = "0"
+
+
+def _populated_cache(n_stations: int, workdir: Path) -> None:
+    """Cache one synthetic hydrological year of daily data (12 files)."""
+    _configure_db(workdir)
+    from imgwtools.db import get_cache_manager, init_db
+    from imgwtools.testing.synthetic import archive_for
+
+    init_db()
+    manager = get_cache_manager()
+    for month in range(1, 13):
+        manager._import_zip_data(
+            zip_data=archive_for(f"codz_2020_{month:02d}.zip", n_stations),
+            interval="dobowe",
+            year=2020,
+            month=month,
+            source_file=f"codz_2020_{month:02d}.zip",
+        )
+
+
+def _parse(filename: str, interval: str, n_stations: int) -> dict[str, float]:
+    from imgwtools.db.parsers import parse_zip_file
+    from imgwtools.testing.synthetic import archive_for
+
+    data = archive_for(filename, n_stations)
+    start = time.perf_counter()
+    rows = sum(1 for _ in parse_zip_file(data, interval))
+    return _throughput(rows, time.perf_counter() - start)
+
+
+# --- Parsers ---
+
+
+@benchmark
+def parse_daily_month(n_stations: int, workdir: Path) -> dict[str, float]:
+    """parse_daily_csv on a monthly codz_YYYY_MM file."""
+    return _parse("codz_2020_01.zip", "dobowe", n_stations)
+
+
+@benchmark
+def parse_daily_year(n_stations: int, workdir: Path) -> dict[str, float]:
+    """parse_daily_csv on a yearly codz_2023 file."""
+    return _parse("codz_2023.zip", "dobowe", n_stations)
+
+
+@benchmark
+def parse_monthly(n_stations: int, workdir: Path) -> dict[str, float]:
+    """parse_monthly_csv on a mies_YYYY file."""
+    return _parse("mies_2020.zip", "miesieczne", n_stations)
+
+
+@benchmark
+def parse_semi_annual(n_stations: int, workdir: Path) -> dict[str, float]:
+    """parse_semi_annual_csv on a polr_H_YYYY file."""
+    return _parse("polr_H_2020.zip", "polroczne", n_stations)
+
+
+# --- Cache import ---
+
+
+@benchmark
+def import_daily_month_http(n_stations: int, workdir: Path) -> dict[str, float]:
+    """ensure_data_cached for one month: HTTP download, parse and insert."""
+    import asyncio
+
+    _configure_db(workdir)
+    from imgwtools.core.url_builder import set_base_url
+    from imgwtools.db import get_cache_manager, get_table_counts, init_db
+    from imgwtools.testing import FakeIMGWServer
+
+    init_db()
+    with FakeIMGWServer(n_stations) as server:
+        set_base_url(server.base_url)
+        server.archive("codz_2020_01.zip")  # generate outside the timing
+        start = time.perf_counter()
+        asyncio.run(get_cache_manager().ensure_data_cached("dobowe", 2020, 1))
+        seconds = time.perf_counter() - start
+    return _throughput(get_table_counts(exact=True)["hydro_daily"], seconds)
+
+
+@benchmark
+def import_daily_year(n_stations: int, workdir: Path) -> dict[str, float]:
+    """_import_zip_data for a yearly codz_2023 file (no HTTP)."""
+    _configure_db(workdir)
+    from imgwtools.db import get_cache_manager, init_db
+    from imgwtools.testing.synthetic import archive_for
+
+    init_db()
+    data = archive_for("codz_2023.zip", n_stations)
+    start = time.perf_counter()
+    rows = get_cache_manager()._import_zip_data(data, "dobowe", 2023, "codz_2023.zip")
+    return _throughput(rows, time.perf_counter() - start)
+
+
+# --- Queries ---
+
+
+@benchmark
+def query_daily_station(n_stations: int, workdir: Path) -> dict[str, float]:
+    """HydroRepository.get_daily_data for one station and year."""
+    _populated_cache(n_stations, workdir)
+    from imgwtools.db import get_repository
+    from imgwtools.testing.synthetic import station_codes
+
+    repo = get_repository()
+    code = station_codes(n_stations)[n_stations // 2]
+    return _latency(lambda: repo.get_daily_data(code, 2020, 2020))
+
+
+@benchmark
+def query_bulk(n_stations: int, workdir: Path) -> dict[str, float]:
+    """Columnar multi-station query for every 8th station."""
+    _populated_cache(n_stations, workdir)
+    from imgwtools.db import get_repository
+    from imgwtools.testing.synthetic import station_codes
+
+    repo = get_repository()
+    codes = station_codes(n_stations)[::8]
+    return _latency(lambda: repo.get_daily_data_bulk(codes, 2020, 2020))
+
+
+@benchmark
+def query_matrix(n_stations: int, workdir: Path) -> dict[str, float]:
+    """Dates x stations matrix of flows for all stations."""
+    _populated_cache(n_stations, workdir)
+    from imgwtools.db import get_repository
+    from imgwtools.testing.synthetic import station_codes
+
+    repo = get_repository()
+    codes = station_codes(n_stations)
+    return _latency(lambda: repo.get_daily_matrix(codes, "Q", 2020, 2020), repeats=5)
+
+
+@benchmark
+def query_aggregate(n_stations: int, workdir: Path) -> dict[str, float]:
+    """Monthly means and extremes computed in SQLite for one station."""
+    _populated_cache(n_stations, workdir)
+    from imgwtools.db.aggregate import aggregate_daily
+    from imgwtools.testing.synthetic import station_codes
+
+    code = station_codes(n_stations)[0]
+    return _latency(lambda: aggregate_daily(code, "Q", "month"))
+
+
+@benchmark
+def query_coverage(n_stations: int, workdir: Path) -> dict[str, float]:
+    """Station coverage overview from the summary table."""
+    _populated_cache(n_stations, workdir)
+    from imgwtools.db import get_repository
+
+    repo = get_repository()
+    return _latency(repo.get_station_coverage)
+
+
+# --- REST API ---
+
+
+@benchmark
+def api_hydro_data(n_stations: int, workdir: Path) -> dict[str, float]:
+    """GET /api/v1/hydro/data for one station and year (in-process client)."""
+    _populated_cache(n_stations, workdir)
+    from fastapi.testclient import TestClient
+
+    from imgwtools.api.main import app
+    from imgwtools.testing.synthetic import station_codes
+
+    code = station_codes(n_stations)[0]
+    with TestClient(app) as client:
+        params = {"station_id": code, "start_year": 2020, "end_year": 2020}
+
+        def call():
+            client.get("/api/v1/hydro/data", params=params).raise_for_status()
+
+        return _latency(call, repeats=10)
+
+
+# --- Startup ---
+
+
+def _startup(*args: str) -> dict[str, float]:
+    """Wall time of a fresh interpreter running args (import + command)."""
+    import subprocess
+
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    env = {**os.environ, "PYTHONPATH": src}
+
+    def call():
+        subprocess.run(
+            [sys.executable, *args], env=env, check=True, capture_output=True
+        )
+
+    return _latency(call, repeats=10)
+
+
+@benchmark
+def startup_import(n_stations: int, workdir: Path) -> dict[str, float]:
+    """python -c "import imgwtools" (lazy top-level package)."""
+    return _startup("-c", "import imgwtools")
+
+
+@benchmark
+def startup_cli_help(n_stations: int, workdir: Path) -> dict[str, float]:
+    """imgw --help (subcommand groups are not imported)."""
+    return _startup("-m", "imgwtools.cli.main", "--help")
+
+
+@benchmark
+def startup_cli_version(n_stations: int, workdir: Path) -> dict[str, float]:
+    """imgw version."""
+    return _startup("-m", "imgwtools.cli.main", "version")
+
+
+def run_benchmark(name: str, n_stations: int, workdir: str) -> Result:
+    """Run one benchmark (in the current process) and collect peak RSS."""
+    try:
+        metrics = BENCHMARKS[name](n_stations, Path(workdir))
+    except ImportError as e:
+        return Result(name, skipped=f"missing dependency: {e.name or e}")
+    peak = _peak_rss_mb()
+    if peak is not None:
+        metrics["peak_rss_mb"] = peak
+    return Result(name, metrics)
@@ -21,8 +21,10 @@ Features:
     - PMAXTP data (probabilistic maximum precipitation)
     - Current hydrological data (water levels, flows)
     - Current synoptic data (temperature, wind, precipitation)
+    - Current data of many selected stations in one call
     - Weather and hydro warnings
-    - Archive data download (daily, monthly, semi-annual)
+    - Archive data download (daily, monthly, semi-annual), also in bulk
+      (concurrent, resumable)
     - Station listings with coordinates
 
 Installation:
@@ -32,6 +34,8 @@ Installation:
     pip install imgwtools[full]     # All features
 """
 
+from typing import TYPE_CHECKING
+
 from imgwtools._version import __version__
 
 # Exceptions
@@ -42,71 +46,210 @@ from imgwtools.exceptions import (
     IMGWValidationError,
 )
 
-# Fetch functions
-from imgwtools.fetch import (
-    download_hydro_data,
-    download_hydro_data_async,
-    download_meteo_data,
-    download_meteo_data_async,
-    fetch_hydro_current,
-    fetch_hydro_current_async,
-    fetch_pmaxtp,
-    fetch_pmaxtp_async,
-    fetch_synop,
-    fetch_synop_async,
-    fetch_warnings,
-    fetch_warnings_async,
-)
+# Everything else is imported on first access (module __getattr__), so
+# `import imgwtools` and the CLI start without loading httpx and pydantic.
+_LAZY_IMPORTS: dict[str, str] = {
+    # Bulk archive download
+    **dict.fromkeys(
+        ("ArchiveFile", "download_archives", "download_archives_async"),
+        "imgwtools.bulk",
+    ),
+    # Fetch functions
+    **dict.fromkeys(
+        (
+            "download_hydro_data",
+            "download_hydro_data_async",
+            "download_meteo_data",
+            "download_meteo_data_async",
+            "fetch_hydro_current",
+            "fetch_hydro_current_async",
+            "fetch_hydro_current_many",
+            "fetch_hydro_current_many_async",
+            "fetch_pmaxtp",
+            "fetch_pmaxtp_async",
+            "fetch_synop",
+            "fetch_synop_async",
+            "fetch_synop_many",
+            "fetch_synop_many_async",
+            "fetch_warnings",
+            "fetch_warnings_async",
+        ),
+        "imgwtools.fetch",
+    ),
+    # Data models
+    **dict.fromkeys(
+        ("HydroCurrentData", "PMaXTPData", "PMaXTPResult", "SynopData", "WarningData"),
+        "imgwtools.models",
+    ),
+    # Parsers
+    **dict.fromkeys(
+        (
+            "IMGW_ENCODING",
+            "parse_daily_csv",
+            "parse_monthly_csv",
+            "parse_semi_annual_csv",
+            "parse_stations_csv",
+            "parse_zip_file",
+        ),
+        "imgwtools.parsers",
+    ),
+    # Spatial index
+    **dict.fromkeys(
+        ("StationIndex", "build_station_index", "haversine_km"),
+        "imgwtools.spatial_index",
+    ),
+    # Station functions
+    **dict.fromkeys(
+        (
+            "HydroStation",
+            "MeteoStation",
+            "get_hydro_stations_with_coords",
+            "get_hydro_stations_with_coords_async",
+            "list_hydro_stations",
+            "list_hydro_stations_async",
+            "list_meteo_stations",
+            "list_meteo_stations_async",
+            "load_hydro_stations_from_csv",
+            "load_meteo_stations_from_csv",
+            "load_station_locations_from_csv",
+        ),
+        "imgwtools.stations",
+    ),
+    # URL builders and types
+    **dict.fromkeys(
+        (
+            "IMGW_API_URL",
+            "IMGW_PMAXTP_URL",
+            "IMGW_PUBLIC_DATA_URL",
+            "DataType",
+            "DownloadURL",
+            "HydroInterval",
+            "HydroParam",
+            "MeteoInterval",
+            "MeteoSubtype",
+            "PMaXTPMethod",
+            "build_api_url",
+            "build_hydro_url",
+            "build_meteo_url",
+            "build_pmaxtp_url",
+            "get_available_years",
+            "set_base_url",
+        ),
+        "imgwtools.urls",
+    ),
+}
 
-# Data models
-from imgwtools.models import (
-    HydroCurrentData,
-    PMaXTPData,
-    PMaXTPResult,
-    SynopData,
-    WarningData,
-)
 
-# Parsers
-from imgwtools.parsers import (
-    IMGW_ENCODING,
-    parse_daily_csv,
-    parse_monthly_csv,
-    parse_semi_annual_csv,
-    parse_stations_csv,
-    parse_zip_file,
-)
+# Not cached: they change with set_base_url()
+_URL_CONSTANTS = frozenset({"IMGW_API_URL", "IMGW_PMAXTP_URL", "IMGW_PUBLIC_DATA_URL"})
 
-# Station functions
-from imgwtools.stations import (
-    HydroStation,
-    MeteoStation,
-    get_hydro_stations_with_coords,
-    get_hydro_stations_with_coords_async,
-    list_hydro_stations,
-    list_hydro_stations_async,
-    list_meteo_stations,
-    list_meteo_stations_async,
-)
 
-# URL builders and types
-from imgwtools.urls import (
-    IMGW_API_URL,
-    IMGW_PMAXTP_URL,
-    IMGW_PUBLIC_DATA_URL,
-    DataType,
-    DownloadURL,
-    HydroInterval,
-    HydroParam,
-    MeteoInterval,
-    MeteoSubtype,
-    PMaXTPMethod,
-    build_api_url,
-    build_hydro_url,
-    build_meteo_url,
-    build_pmaxtp_url,
-    get_available_years,
-)
+def __getattr__(name: str):
+    """Lazy import of the public API."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'imgwtools' has no attribute '{name}'")
+    import importlib
+
+    value = getattr(importlib.import_module(module_name), name)
+    if name not in _URL_CONSTANTS:
+        globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+if TYPE_CHECKING:
+    # Bulk archive download
+    from imgwtools.bulk import (
+        ArchiveFile,
+        download_archives,
+        download_archives_async,
+    )
+
+    # Fetch functions
+    from imgwtools.fetch import (
+        download_hydro_data,
+        download_hydro_data_async,
+        download_meteo_data,
+        download_meteo_data_async,
+        fetch_hydro_current,
+        fetch_hydro_current_async,
+        fetch_hydro_current_many,
+        fetch_hydro_current_many_async,
+        fetch_pmaxtp,
+        fetch_pmaxtp_async,
+        fetch_synop,
+        fetch_synop_async,
+        fetch_synop_many,
+        fetch_synop_many_async,
+        fetch_warnings,
+        fetch_warnings_async,
+    )
+
+    # Data models
+    from imgwtools.models import (
+        HydroCurrentData,
+        PMaXTPData,
+        PMaXTPResult,
+        SynopData,
+        WarningData,
+    )
+
+    # Parsers
+    from imgwtools.parsers import (
+        IMGW_ENCODING,
+        parse_daily_csv,
+        parse_monthly_csv,
+        parse_semi_annual_csv,
+        parse_stations_csv,
+        parse_zip_file,
+    )
+
+    # Spatial index
+    from imgwtools.spatial_index import (
+        StationIndex,
+        build_station_index,
+        haversine_km,
+    )
+
+    # Station functions
+    from imgwtools.stations import (
+        HydroStation,
+        MeteoStation,
+        get_hydro_stations_with_coords,
+        get_hydro_stations_with_coords_async,
+        list_hydro_stations,
+        list_hydro_stations_async,
+        list_meteo_stations,
+        list_meteo_stations_async,
+        load_hydro_stations_from_csv,
+        load_meteo_stations_from_csv,
+        load_station_locations_from_csv,
+    )
+
+    # URL builders and types
+    from imgwtools.urls import (
+        IMGW_API_URL,
+        IMGW_PMAXTP_URL,
+        IMGW_PUBLIC_DATA_URL,
+        DataType,
+        DownloadURL,
+        HydroInterval,
+        HydroParam,
+        MeteoInterval,
+        MeteoSubtype,
+        PMaXTPMethod,
+        build_api_url,
+        build_hydro_url,
+        build_meteo_url,
+        build_pmaxtp_url,
+        get_available_years,
+        set_base_url,
+    )
+
 
 __all__ = [
     # Version
@@ -128,6 +271,7 @@ __all__ = [
     "build_pmaxtp_url",
     "build_api_url",
     "get_available_years",
+    "set_base_url",
     # URL types and enums
     "DownloadURL",
     "DataType",
@@ -147,6 +291,8 @@ __all__ = [
     "fetch_warnings",
     "download_hydro_data",
     "download_meteo_data",
+    "fetch_hydro_current_many",
+    "fetch_synop_many",
     # Fetch functions (async)
     "fetch_pmaxtp_async",
     "fetch_hydro_current_async",
@@ -154,6 +300,12 @@ __all__ = [
     "fetch_warnings_async",
     "download_hydro_data_async",
     "download_meteo_data_async",
+    "fetch_hydro_current_many_async",
+    "fetch_synop_many_async",
+    # Bulk archive download
+    "download_archives",
+    "download_archives_async",
+    "ArchiveFile",
     # Station functions (sync)
     "list_hydro_stations",
     "list_meteo_stations",
@@ -162,9 +314,17 @@ __all__ = [
     "list_hydro_stations_async",
     "list_meteo_stations_async",
     "get_hydro_stations_with_coords_async",
+    # Station functions (local files)
+    "load_hydro_stations_from_csv",
+    "load_meteo_stations_from_csv",
+    "load_station_locations_from_csv",
     # Station types
     "HydroStation",
     "MeteoStation",
+    # Spatial index
+    "StationIndex",
+    "build_station_index",
+    "haversine_km",
     # Parsers
     "parse_daily_csv",
     "parse_monthly_csv",
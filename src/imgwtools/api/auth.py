@@ -0,0 +1,407 @@
+"""
+API keys and request rate limits of the REST API.
+
+Keys are managed with ``imgw admin`` in ``api_keys.json``. The API looks
+them up by SHA-256 hash (a dict lookup, secrets are never compared
+character by character) and reloads the file when it changes, so new
+and revoked keys take effect without a restart.
+
+Requests are counted in memory per client (API key, or client address
+of anonymous requests) in a sliding window of one hour: the count of the
+previous fixed window is weighted by the part of it still covered by the
+sliding window. Every few seconds the counts are added to a SQLite file
+and read back, so all workers of an instance share the limits (with the
+delay of one flush interval) and ``imgw admin stats`` sees the usage,
+without disk I/O per request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+WINDOW_SECONDS = 3600
+FLUSH_INTERVAL = 5.0
+KEYS_CHECK_INTERVAL = 5.0
+
+API_KEY_HEADER = "x-api-key"
+
+
+def hash_key(key: str) -> str:
+    """SHA-256 hex digest of an API key."""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def key_identity(key: str) -> str:
+    """Usage identity of an API key (never the key itself)."""
+    return f"key:{hash_key(key)[:16]}"
+
+
+def sliding_count(current: int, previous: int, elapsed: float, window: float) -> float:
+    """Requests in the sliding window from two fixed-window counts."""
+    return current + previous * max(1.0 - elapsed / window, 0.0)
+
+
+@dataclass(frozen=True)
+class ApiKey:
+    """
+    API key entry of api_keys.json.
+
+    Attributes:
+        name: Key name.
+        identity: Usage identity (see key_identity).
+        rate_limit: Requests per hour (0 = unlimited).
+        active: False if revoked.
+    """
+
+    name: str
+    identity: str
+    rate_limit: int
+    active: bool = True
+
+
+class ApiKeyStore:
+    """
+    API keys of api_keys.json by key hash, reloaded when the file changes.
+
+    Args:
+        path: Keys file (see imgw admin).
+        default_limit: Limit of keys without ``rate_limit``.
+        check_interval: Seconds between checks of the file modification time.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        default_limit: int = 100,
+        check_interval: float = KEYS_CHECK_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.default_limit = default_limit
+        self.check_interval = check_interval
+        self._keys: dict[str, ApiKey] = {}
+        self._mtime: float | None = None
+        self._checked = -math.inf
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> ApiKey | None:
+        """Entry of a key (also revoked ones), or None if unknown."""
+        self._reload_if_changed()
+        return self._keys.get(hash_key(key))
+
+    def __len__(self) -> int:
+        self._reload_if_changed()
+        return len(self._keys)
+
+    def _reload_if_changed(self) -> None:
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        with self._lock:
+            self._checked = now
+            try:
+                mtime = self.path.stat().st_mtime
+            except OSError:
+                self._keys, self._mtime = {}, None
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return  # keep the previous keys while the file is rewritten
+            keys = {}
+            for entry in data.get("keys", []):
+                keys[hash_key(entry["id"])] = ApiKey(
+                    name=entry.get("name", ""),
+                    identity=key_identity(entry["id"]),
+                    rate_limit=entry.get("rate_limit", self.default_limit),
+                    active=entry.get("active", True),
+                )
+            self._keys, self._mtime = keys, mtime
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """
+    Outcome of counting one request.
+
+    Attributes:
+        allowed: False if the limit was reached (the request is not counted).
+        limit: Requests per window (0 = unlimited).
+        remaining: Requests left in the sliding window.
+        retry_after: Seconds until a request is allowed again (if denied).
+    """
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int = 0
+
+
+@dataclass(frozen=True)
+class UsageTotal:
+    """Usage of one client recorded in the usage store."""
+
+    identity: str
+    name: str
+    requests: int
+    last_hour: float
+    last_used: str
+
+
+class UsageStore:
+    """
+    SQLite file with request counts of all API workers.
+
+    Args:
+        path: Database file (created if missing).
+        window: Rate limit window in seconds.
+    """
+
+    def __init__(self, path: str | Path, window: int = WINDOW_SECONDS):
+        self.path = Path(path)
+        self.window = window
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS api_usage (
+                    identity TEXT NOT NULL,
+                    window_start INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (identity, window_start)
+                ) WITHOUT ROWID;
+
+                CREATE TABLE IF NOT EXISTS api_usage_totals (
+                    identity TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    requests INTEGER NOT NULL,
+                    last_used TEXT NOT NULL
+                );
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+
+    def add(
+        self,
+        counts: dict[tuple[str, int], int],
+        names: dict[str, str],
+        current_window: int,
+    ) -> dict[tuple[str, int], int]:
+        """
+        Add request counts and read back those of the last two windows.
+
+        Args:
+            counts: (identity, window start) -> requests since the last add.
+            names: identity -> name for the usage totals.
+            current_window: Start of the current window.
+
+        Returns:
+            (identity, window start) -> requests of all workers, for the
+            current and the previous window.
+        """
+        now = datetime.now(UTC).isoformat(timespec="seconds")
+        totals: dict[str, int] = defaultdict(int)
+        for (identity, _), count in counts.items():
+            totals[identity] += count
+
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    """
+                    INSERT INTO api_usage (identity, window_start, count)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (identity, window_start)
+                    DO UPDATE SET count = count + excluded.count
+                    """,
+                    [(i, w, c) for (i, w), c in counts.items()],
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO api_usage_totals (identity, name, requests, last_used)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (identity) DO UPDATE SET
+                        name = excluded.name,
+                        requests = requests + excluded.requests,
+                        last_used = excluded.last_used
+                    """,
+                    [(i, names.get(i, i), c, now) for i, c in totals.items()],
+                )
+                conn.execute(
+                    "DELETE FROM api_usage WHERE window_start < ?",
+                    (current_window - self.window,),
+                )
+                rows = conn.execute(
+                    "SELECT identity, window_start, count FROM api_usage "
+                    "WHERE window_start >= ?",
+                    (current_window - self.window,),
+                ).fetchall()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return {(identity, start): count for identity, start, count in rows}
+
+    def totals(self) -> dict[str, UsageTotal]:
+        """Usage per identity (total requests and the sliding last hour)."""
+        now = time.time()
+        current = int(now // self.window * self.window)
+        with closing(self._connect()) as conn:
+            recent: dict[tuple[str, int], int] = {
+                (identity, start): count
+                for identity, start, count in conn.execute(
+                    "SELECT identity, window_start, count FROM api_usage"
+                )
+            }
+            rows = conn.execute(
+                "SELECT identity, name, requests, last_used FROM api_usage_totals"
+            ).fetchall()
+        return {
+            identity: UsageTotal(
+                identity,
+                name,
+                requests,
+                sliding_count(
+                    recent.get((identity, current), 0),
+                    recent.get((identity, current - self.window), 0),
+                    now - current,
+                    self.window,
+                ),
+                last_used,
+            )
+            for identity, name, requests, last_used in rows
+        }
+
+
+class SlidingWindowLimiter:
+    """
+    In-memory sliding-window request counter, synchronised via a UsageStore.
+
+    Args:
+        store: Shared usage store (None = this process only, no stats).
+        window: Window length in seconds.
+        flush_interval: Seconds between synchronisations with the store.
+    """
+
+    def __init__(
+        self,
+        store: UsageStore | None = None,
+        window: int = WINDOW_SECONDS,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.store = store
+        self.window = window
+        self.flush_interval = flush_interval
+        # Counts of all workers as of the last flush, and local counts since
+        self._shared: dict[tuple[str, int], int] = {}
+        self._pending: dict[tuple[str, int], int] = defaultdict(int)
+        self._names: dict[str, str] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def _count(self, identity: str, start: int) -> int:
+        key = (identity, start)
+        return self._shared.get(key, 0) + self._pending.get(key, 0)
+
+    def hit(self, identity: str, limit: int, name: str = "") -> RateLimitResult:
+        """
+        Count a request of identity if it is within limit (0 = unlimited).
+        """
+        now = time.time()
+        start = int(now // self.window * self.window)
+        elapsed = now - start
+        with self._lock:
+            current = self._count(identity, start)
+            previous = self._count(identity, start - self.window)
+            used = sliding_count(current, previous, elapsed, self.window)
+            if limit and used + 1 > limit:
+                retry_after = self._retry_after(current, previous, elapsed, limit)
+                return RateLimitResult(False, limit, 0, retry_after)
+            self._pending[(identity, start)] += 1
+            self._names[identity] = name or identity
+        remaining = max(int(limit - used - 1), 0) if limit else 0
+        return RateLimitResult(True, limit, remaining)
+
+    def _retry_after(
+        self, current: int, previous: int, elapsed: float, limit: int
+    ) -> int:
+        """Seconds until the sliding count drops below limit."""
+        if current + 1 > limit or not previous:
+            return math.ceil(self.window - elapsed)
+        # previous * (1 - t / window) + current + 1 <= limit
+        needed = self.window * (1 - (limit - current - 1) / previous)
+        return max(math.ceil(needed - elapsed), 1)
+
+    def needs_flush(self) -> bool:
+        return (
+            self.store is not None
+            and time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self) -> None:
+        """Add local counts to the store and load those of other workers."""
+        if self.store is None or not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = time.monotonic()
+            with self._lock:
+                counts = dict(self._pending)
+                names = dict(self._names)
+            start = int(time.time() // self.window * self.window)
+            try:
+                shared = self.store.add(counts, names, start)
+            except sqlite3.Error:
+                return  # keep the counts for the next flush
+            with self._lock:
+                for key, count in counts.items():
+                    self._pending[key] -= count
+                    if not self._pending[key]:
+                        del self._pending[key]
+                self._shared = shared
+        finally:
+            self._flush_lock.release()
+
+
+# Singletons used by the API (created from the settings on first use)
+_key_store: ApiKeyStore | None = None
+_limiter: SlidingWindowLimiter | None = None
+
+
+def get_api_key_store() -> ApiKeyStore:
+    """Get the API key store of the configured keys file."""
+    global _key_store
+    if _key_store is None:
+        from imgwtools.config import settings
+
+        _key_store = ApiKeyStore(settings.api_keys_file, settings.rate_limit)
+    return _key_store
+
+
+def get_rate_limiter() -> SlidingWindowLimiter:
+    """Get the request limiter backed by the configured usage file."""
+    global _limiter
+    if _limiter is None:
+        from imgwtools.config import settings
+
+        _limiter = SlidingWindowLimiter(UsageStore(settings.api_usage_file))
+    return _limiter
+
+
+def flush_usage() -> None:
+    """Write pending request counts of the API limiter (at shutdown)."""
+    if _limiter is not None:
+        _limiter.flush()
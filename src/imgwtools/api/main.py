@@ -2,17 +2,36 @@
 Main FastAPI application for IMGWTools REST API.
 """
 
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from imgwtools.api.routes import download, hydro, meteo, pmaxtp
+from imgwtools.api.auth import flush_usage
+from imgwtools.api.middleware import AuthMiddleware, MetricsMiddleware
+from imgwtools.api.routes import (
+    download,
+    feed,
+    hydro,
+    meteo,
+    pmaxtp,
+    stations,
+    warnings,
+)
 from imgwtools.api.schemas import HealthCheck
 from imgwtools.config import settings
+from imgwtools.feed import get_change_feed
+from imgwtools.metrics import CONTENT_TYPE, get_metrics_registry
+from imgwtools.registry import get_station_registry
+from imgwtools.throttle import request_lane
+from imgwtools.warnings_store import get_warnings_store
 from imgwtools.web.app import router as web_router
+from imgwtools.web.map_payload import get_map_cache
 
 # Static files directory
 STATIC_DIR = Path(__file__).parent.parent / "web" / "static"
@@ -26,6 +45,8 @@ API do pobierania danych publicznych z IMGW-PIB.
 
 * **Stacje** - lista stacji hydrologicznych i meteorologicznych
 * **Dane biezace** - aktualne dane z API IMGW
+* **Zmiany** - strumien zmian danych biezacych (SSE / WebSocket)
+* **Ostrzezenia** - aktywne ostrzezenia wedlug regionu (TERYT)
 * **Pobieranie** - generowanie linkow do pobierania danych archiwalnych
 * **PMAXTP** - dane o opadach maksymalnych prawdopodobnych
 
@@ -36,8 +57,43 @@ do serwerow IMGW, skad uzytkownik pobiera dane na swoj komputer.
 """
 API_VERSION = "1.0.0"
 
+
+async def _map_water_states() -> dict[str, str]:
+    """Water states from the map cache (shared with the change feed)."""
+    cache = get_map_cache()
+    await cache.ensure_fresh()
+    return cache.water_states()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Load shared caches at startup and keep them fresh in the background."""
+    registry = get_station_registry()
+    registry.load()
+    # Periodic refreshes yield to requests of API clients (see throttle)
+    with request_lane("background"):
+        tasks = [asyncio.create_task(registry.run_refresh_loop())]
+        if settings.map_refresh_interval > 0:
+            tasks.append(asyncio.create_task(get_map_cache().run_refresh_loop()))
+        if settings.warnings_refresh_interval > 0:
+            tasks.append(asyncio.create_task(get_warnings_store().run_refresh_loop()))
+        if settings.feed_poll_interval > 0:
+            change_feed = get_change_feed(water_states=_map_water_states)
+            tasks.append(asyncio.create_task(change_feed.run_poll_loop()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        flush_usage()
+
+
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title=API_TITLE,
     description=API_DESCRIPTION,
     version=API_VERSION,
@@ -46,7 +102,8 @@ app = FastAPI(
     openapi_url="/openapi.json",
 )
 
-# Middleware
+# Middleware (the last added runs first)
+app.add_middleware(AuthMiddleware)
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 app.add_middleware(
     CORSMiddleware,
@@ -55,12 +112,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Include API routers
 app.include_router(hydro.router, prefix="/api/v1/hydro", tags=["Hydrologia"])
 app.include_router(meteo.router, prefix="/api/v1/meteo", tags=["Meteorologia"])
 app.include_router(download.router, prefix="/api/v1/download", tags=["Pobieranie"])
 app.include_router(pmaxtp.router, prefix="/api/v1/pmaxtp", tags=["PMAXTP"])
+app.include_router(stations.router, prefix="/api/v1/stations", tags=["Stacje"])
+app.include_router(feed.router, prefix="/api/v1/feed", tags=["Zmiany"])
+app.include_router(warnings.router, prefix="/api/v1/warnings", tags=["Ostrzezenia"])
 
 # Include Web GUI router
 app.include_router(web_router)
@@ -75,6 +136,14 @@ async def health_check():
     return HealthCheck(status="ok", version=API_VERSION)
 
 
+@app.get("/metrics", tags=["System"], response_class=Response)
+async def metrics():
+    """Metryki w formacie Prometheus (IMGW, cache, baza danych, API)."""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return Response(get_metrics_registry().render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/api/v1", tags=["System"])
 async def api_info():
     """API information."""
@@ -86,6 +155,10 @@ async def api_info():
             "meteo": "/api/v1/meteo",
             "download": "/api/v1/download",
             "pmaxtp": "/api/v1/pmaxtp",
+            "stations": "/api/v1/stations",
+            "feed": "/api/v1/feed",
+            "warnings": "/api/v1/warnings",
+            "metrics": "/metrics",
         },
     }
 
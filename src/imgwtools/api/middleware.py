@@ -0,0 +1,187 @@
+"""
+ASGI middleware for the REST API.
+"""
+
+import asyncio
+import json
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette.websockets import WebSocketClose
+
+from imgwtools.api.auth import (
+    API_KEY_HEADER,
+    ApiKeyStore,
+    SlidingWindowLimiter,
+    get_api_key_store,
+    get_rate_limiter,
+)
+from imgwtools.config import settings
+from imgwtools.metrics import (
+    HTTP_IN_PROGRESS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    span,
+)
+
+
+class MetricsMiddleware:
+    """
+    Count and time API requests per route template.
+
+    Routes are labelled by their path template (``/api/v1/hydro/data``,
+    ``/stations/{station_id}``), not the raw path, so the number of label
+    values stays bounded. Requests that match no route are labelled
+    ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        with span(f"{method} request", method=method) as current:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - start
+                HTTP_IN_PROGRESS.dec()
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                HTTP_REQUESTS.inc(method=method, route=route, status=status)
+                HTTP_REQUEST_SECONDS.observe(elapsed, method=method, route=route)
+                if current is not None:
+                    current.update_name(f"{method} {route}")
+                    current.set_attribute("http.route", route)
+                    current.set_attribute("http.status_code", status)
+
+
+class AuthMiddleware:
+    """
+    Check API keys and rate limits of requests under ``/api/``.
+
+    - A key in the ``X-API-Key`` header must be known and active (401)
+      and is limited to its ``rate_limit`` requests per hour.
+    - Requests without a key are rejected if ``api_auth_required`` is
+      set, otherwise limited per client address to ``rate_limit`` of
+      the settings.
+
+    Requests over the limit get 429 with ``Retry-After``; all limited
+    responses carry ``X-RateLimit-Limit`` and ``X-RateLimit-Remaining``.
+    WebSocket connections are checked the same way and closed with code
+    1008 (policy violation) before the handshake instead.
+
+    Args:
+        app: Wrapped ASGI application.
+        keys: API key store (default: settings.api_keys_file).
+        limiter: Request counter (default: settings.api_usage_file).
+        prefix: Path prefix of protected routes.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        keys: ApiKeyStore | None = None,
+        limiter: SlidingWindowLimiter | None = None,
+        prefix: str = "/api/",
+    ):
+        self.app = app
+        self._keys = keys
+        self._limiter = limiter
+        self.prefix = prefix
+
+    @property
+    def keys(self) -> ApiKeyStore:
+        if self._keys is None:
+            self._keys = get_api_key_store()
+        return self._keys
+
+    @property
+    def limiter(self) -> SlidingWindowLimiter:
+        if self._limiter is None:
+            self._limiter = get_rate_limiter()
+        return self._limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] not in ("http", "websocket")
+            or scope.get("method") == "OPTIONS"
+            or not scope["path"].startswith(self.prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = Headers(scope=scope).get(API_KEY_HEADER)
+        if key:
+            entry = self.keys.lookup(key)
+            if entry is None or not entry.active:
+                response = _error(401, "Invalid or inactive API key")
+                await _reject(response, scope, receive, send)
+                return
+            identity, name, limit = entry.identity, entry.name, entry.rate_limit
+        elif settings.api_auth_required:
+            response = _error(401, "API key required (X-API-Key header)")
+            response.headers["WWW-Authenticate"] = "ApiKey"
+            await _reject(response, scope, receive, send)
+            return
+        else:
+            client = scope.get("client")
+            identity = f"ip:{client[0] if client else 'unknown'}"
+            name, limit = identity, settings.rate_limit
+
+        limiter = self.limiter
+        result = limiter.hit(identity, limit, name)
+        if limiter.needs_flush():
+            await asyncio.to_thread(limiter.flush)
+
+        headers = (
+            {
+                "X-RateLimit-Limit": str(result.limit),
+                "X-RateLimit-Remaining": str(result.remaining),
+            }
+            if result.limit
+            else {}
+        )
+        if not result.allowed:
+            response = _error(429, "Rate limit exceeded")
+            response.headers.update(headers)
+            response.headers["Retry-After"] = str(result.retry_after)
+            await _reject(response, scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and headers:
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def _error(status: int, detail: str) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status)
+
+
+async def _reject(
+    response: JSONResponse, scope: Scope, receive: Receive, send: Send
+) -> None:
+    """Send an error response, or close a websocket before accepting it."""
+    if scope["type"] == "websocket":
+        reason = json.loads(response.body)["detail"]
+        await WebSocketClose(code=1008, reason=reason)(scope, receive, send)
+    else:
+        await response(scope, receive, send)
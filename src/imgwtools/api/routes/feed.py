@@ -0,0 +1,139 @@
+"""
+Real-time change feed routes (Server-Sent Events and WebSocket).
+"""
+
+import json
+from collections.abc import AsyncIterator
+from typing import Literal
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+
+from imgwtools.feed import ChangeBatch, ChangeFeed, ChangeFilter, get_change_feed
+
+router = APIRouter()
+
+# Keep-alive interval for idle connections [s]
+HEARTBEAT_SECONDS = 15.0
+
+Topic = Literal["hydro", "synop", "warnings"]
+
+
+def _make_filter(
+    topic: list[Topic] | None,
+    station_id: list[str] | None,
+    river: list[str] | None,
+    state: list[str] | None,
+) -> ChangeFilter:
+    return ChangeFilter.create(
+        topics=topic, station_ids=station_id, rivers=river, states=state
+    )
+
+
+def _get_feed() -> ChangeFeed:
+    feed = get_change_feed()
+    if feed.interval <= 0:
+        raise HTTPException(status_code=503, detail="Kanal zmian jest wylaczony")
+    return feed
+
+
+def _format_sse(batch: ChangeBatch) -> str:
+    data = json.dumps(batch.to_dict(), ensure_ascii=False, separators=(",", ":"))
+    return f"id: {batch.version}\nevent: {batch.topic}\ndata: {data}\n\n"
+
+
+@router.get("/events")
+async def change_events(
+    request: Request,
+    topic: list[Topic] | None = Query(None, description="Kanaly (domyslnie wszystkie)"),
+    station_id: list[str] | None = Query(None, description="Filtr ID stacji"),
+    river: list[str] | None = Query(None, description="Filtr nazwy rzeki"),
+    state: list[str] | None = Query(None, description="Filtr stanu wody (np. alarm)"),
+    snapshot: bool = Query(True, description="Zacznij od pelnego stanu"),
+):
+    """
+    Strumien zmian (Server-Sent Events).
+
+    Serwer pobiera dane biezace z IMGW raz na interwal i wysyla tylko
+    stacje, ktorych dane sie zmienily. Kazde zdarzenie to partia zmian
+    jednego kanalu (``event: hydro|synop|warnings``) w formacie JSON.
+    """
+    feed = _get_feed()
+    flt = _make_filter(topic, station_id, river, state)
+
+    async def stream() -> AsyncIterator[str]:
+        with feed.subscribe(flt, snapshot=snapshot) as sub:
+            while not await request.is_disconnected():
+                batch = await sub.get(timeout=HEARTBEAT_SECONDS)
+                if batch is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield _format_sse(batch)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def change_websocket(
+    websocket: WebSocket,
+    topic: list[Topic] | None = Query(None),
+    station_id: list[str] | None = Query(None),
+    river: list[str] | None = Query(None),
+    state: list[str] | None = Query(None),
+    snapshot: bool = Query(True),
+):
+    """
+    Strumien zmian przez WebSocket (te same filtry i komunikaty co /events).
+    """
+    feed = get_change_feed()
+    if feed.interval <= 0:
+        await websocket.close(code=1013, reason="Kanal zmian jest wylaczony")
+        return
+
+    await websocket.accept()
+    flt = _make_filter(topic, station_id, river, state)
+    with feed.subscribe(flt, snapshot=snapshot) as sub:
+        try:
+            while True:
+                batch = await sub.get(timeout=HEARTBEAT_SECONDS)
+                if batch is None:
+                    await websocket.send_json({"heartbeat": True})
+                else:
+                    await websocket.send_json(batch.to_dict())
+        except WebSocketDisconnect:
+            pass
+
+
+@router.get("/snapshot/{topic}")
+async def change_snapshot(
+    topic: Topic,
+    station_id: list[str] | None = Query(None, description="Filtr ID stacji"),
+    river: list[str] | None = Query(None, description="Filtr nazwy rzeki"),
+    state: list[str] | None = Query(None, description="Filtr stanu wody"),
+):
+    """
+    Ostatni pobrany stan kanalu.
+
+    Dane pochodza z tego samego pobrania co strumien zmian; IMGW jest
+    odpytywane najwyzej raz na interwal.
+    """
+    feed = _get_feed()
+    await feed.ensure_fresh()
+    flt = _make_filter(None, station_id, river, state)
+    return {
+        "topic": topic,
+        "version": feed.version(topic),
+        "error": feed.last_errors.get(topic),
+        "records": [r for r in feed.snapshot(topic).values() if flt.matches(r)],
+    }
@@ -2,18 +2,30 @@
 Hydrological data routes.
 """
 
+import asyncio
+import csv
+import io
+import json
 
 import httpx
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 from imgwtools.api.schemas import (
     DownloadURLResponse,
+    HydroAggregatePoint,
+    HydroAggregateResponse,
+    HydroBulkDataResponse,
+    HydroCoverage,
+    HydroCoverageList,
     HydroCurrentData,
     HydroDailyDataPoint,
     HydroDataResponse,
     HydroDownloadRequest,
     HydroMonthlyDataPoint,
     MultiDownloadURLResponse,
+    NearbyStation,
+    NearbyStationList,
     Station,
     StationList,
 )
@@ -23,10 +35,43 @@ from imgwtools.core.url_builder import (
     build_api_url,
     build_hydro_url,
 )
+from imgwtools.metrics import upstream_call
+from imgwtools.registry import get_station_registry
+from imgwtools.resilience import async_retry_transport
+from imgwtools.spatial_index import StationIndex
+from imgwtools.stations import HydroStation
 
 router = APIRouter()
 
 
+def _get_station_index() -> StationIndex[HydroStation]:
+    registry = get_station_registry()
+    index = registry.hydro_index
+    if not len(index) and registry.last_error:
+        raise HTTPException(
+            status_code=503, detail=f"Station data unavailable: {registry.last_error}"
+        )
+    return index
+
+
+def _to_station(station: HydroStation) -> Station:
+    return Station(
+        id=station.station_id,
+        name=station.name,
+        river=station.river,
+        latitude=station.latitude,
+        longitude=station.longitude,
+    )
+
+
+def _to_nearby(results: list[tuple[HydroStation, float]]) -> NearbyStationList:
+    stations = [
+        NearbyStation(**_to_station(s).model_dump(), distance_km=round(km, 3))
+        for s, km in results
+    ]
+    return NearbyStationList(stations=stations, count=len(stations))
+
+
 @router.get("/stations", response_model=StationList)
 async def list_hydro_stations(
     limit: int = Query(100, ge=1, le=1000),
@@ -36,15 +81,62 @@ async def list_hydro_stations(
     Lista stacji hydrologicznych.
 
     Zwraca liste stacji z ID, nazwa i rzeka.
-    Dane pochodza z lokalnego pliku CSV.
+    Dane pochodza z rejestru stacji w pamieci (pliki CSV + odswiezanie z IMGW).
     """
-    # TODO: Load from CSV file
-    # For now, return example data
-    stations = [
-        Station(id="150160180", name="Warszawa", river="Wisla"),
-        Station(id="150170010", name="Krakow", river="Wisla"),
-    ]
-    return StationList(stations=stations[offset : offset + limit], count=len(stations))
+    stations = get_station_registry().hydro_stations
+    return StationList(
+        stations=[_to_station(s) for s in stations[offset : offset + limit]],
+        count=len(stations),
+    )
+
+
+@router.get("/stations/nearest", response_model=NearbyStationList)
+async def nearest_hydro_stations(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude (WGS84)"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude (WGS84)"),
+    k: int = Query(5, ge=1, le=100, description="Number of stations"),
+    max_distance_km: float | None = Query(None, gt=0, description="Search limit [km]"),
+):
+    """
+    Najblizsze stacje hydrologiczne.
+
+    Zwraca k stacji najblizszych podanemu punktowi (indeks przestrzenny w pamieci).
+    """
+    index = _get_station_index()
+    return _to_nearby(index.nearest(lat, lon, k=k, max_distance_km=max_distance_km))
+
+
+@router.get("/stations/within", response_model=NearbyStationList)
+async def hydro_stations_within_radius(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude (WGS84)"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude (WGS84)"),
+    radius_km: float = Query(..., gt=0, le=1000, description="Radius [km]"),
+):
+    """
+    Stacje hydrologiczne w promieniu od punktu.
+
+    Wyniki posortowane wedlug odleglosci.
+    """
+    index = _get_station_index()
+    return _to_nearby(index.within_radius(lat, lon, radius_km))
+
+
+@router.get("/stations/bbox", response_model=StationList)
+async def hydro_stations_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+):
+    """
+    Stacje hydrologiczne w prostokacie (bounding box).
+    """
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="min values must be <= max values")
+
+    index = _get_station_index()
+    stations = [_to_station(s) for s in index.within_bbox(min_lat, min_lon, max_lat, max_lon)]
+    return StationList(stations=stations, count=len(stations))
 
 
 @router.get("/stations/{station_id}", response_model=Station)
@@ -56,10 +148,11 @@ async def get_hydro_station(station_id: str):
     """
     url = build_api_url("hydro", station_id=station_id)
 
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=async_retry_transport()) as client:
         try:
-            response = await client.get(url, timeout=10.0)
-            response.raise_for_status()
+            with upstream_call("hydro"):
+                response = await client.get(url, timeout=10.0)
+                response.raise_for_status()
             data = response.json()
 
             if not data:
@@ -88,10 +181,11 @@ async def get_current_hydro_data(
     """
     url = build_api_url("hydro", station_id=station_id)
 
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=async_retry_transport()) as client:
         try:
-            response = await client.get(url, timeout=10.0)
-            response.raise_for_status()
+            with upstream_call("hydro"):
+                response = await client.get(url, timeout=10.0)
+                response.raise_for_status()
             data = response.json()
 
             if not data:
@@ -258,11 +352,10 @@ async def get_hydro_data(
         )
 
     try:
-        from imgwtools.db import db_exists, get_cache_manager, init_db
+        from imgwtools.db import get_cache_manager, init_db
 
-        # Initialize DB if needed
-        if not db_exists():
-            init_db()
+        # Create the database or apply pending migrations
+        init_db()
 
         manager = get_cache_manager()
 
@@ -335,3 +428,325 @@ async def get_hydro_data(
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
+
+
+_BULK_COLUMNS = (
+    "station_id",
+    "date",
+    "water_level_cm",
+    "flow_m3s",
+    "water_temp_c",
+)
+
+
+async def _csv_stream(rows, stations, batch_size: int = 5000):
+    """Yield CSV chunks of bulk rows with station metadata."""
+    # The SQLite connection behind ``rows`` must stay on one thread, so
+    # batches are read here and control is yielded between chunks.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["station_id", "station_name", "river", *_BULK_COLUMNS[1:]])
+    try:
+        for i, (code, *values) in enumerate(rows, 1):
+            meta = stations.get(code)
+            writer.writerow([
+                code,
+                meta.station_name if meta else "",
+                meta.river_name if meta and meta.river_name else "",
+                *values,
+            ])
+            if i % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                await asyncio.sleep(0)
+        yield buffer.getvalue()
+    finally:
+        # Release the read connection now if the client disconnected
+        rows.close()
+
+
+@router.get(
+    "/data/bulk",
+    response_model=HydroBulkDataResponse,
+    responses={200: {"content": {"text/csv": {}}}},
+)
+async def get_hydro_data_bulk(
+    station_id: list[str] | None = Query(None, description="Station codes"),
+    river: str | None = Query(None, description="All cached stations on a river"),
+    min_lat: float | None = Query(None, ge=-90, le=90),
+    min_lon: float | None = Query(None, ge=-180, le=180),
+    max_lat: float | None = Query(None, ge=-90, le=90),
+    max_lon: float | None = Query(None, ge=-180, le=180),
+    start_year: int = Query(..., ge=1951, le=2024, description="Start hydrological year"),
+    end_year: int = Query(..., ge=1951, le=2024, description="End hydrological year"),
+    format: str = Query("json", description="json (columnar) or csv (streamed)"),
+):
+    """
+    Dane dobowe wielu stacji jednym zapytaniem.
+
+    Stacje wybierane sa lista kodow, nazwa rzeki i/lub prostokatem
+    (wszystkie podane filtry musza byc spelnione). Brakujace pliki IMGW
+    sa pobierane raz dla wszystkich stacji. Format ``json`` zwraca dane
+    kolumnowo, ``csv`` strumieniowo.
+    """
+    from imgwtools.config import settings
+
+    if start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    if format not in ("json", "csv"):
+        raise HTTPException(status_code=400, detail="Invalid format. Allowed: json, csv")
+
+    bbox_values = (min_lat, min_lon, max_lat, max_lon)
+    bbox = None
+    if any(v is not None for v in bbox_values):
+        if any(v is None for v in bbox_values):
+            raise HTTPException(
+                status_code=400,
+                detail="bbox requires min_lat, min_lon, max_lat and max_lon",
+            )
+        if min_lat > max_lat or min_lon > max_lon:
+            raise HTTPException(
+                status_code=400, detail="min values must be <= max values"
+            )
+        bbox = bbox_values
+    if not station_id and river is None and bbox is None:
+        raise HTTPException(
+            status_code=400, detail="Provide station_id, river or bbox"
+        )
+
+    if not settings.db_enabled:
+        raise HTTPException(
+            status_code=400,
+            detail="Database cache is not enabled. Set IMGW_DB_ENABLED=true.",
+        )
+
+    from imgwtools.db import get_cache_manager, get_repository, init_db
+
+    init_db()
+    manager = get_cache_manager()
+    try:
+        for year in range(start_year, end_year + 1):
+            if year < 2023:
+                for month in range(1, 13):
+                    await manager.ensure_data_cached("dobowe", year, month)
+            else:
+                await manager.ensure_data_cached("dobowe", year)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
+
+    repo = get_repository()
+    codes = repo.find_station_codes(station_id, river, bbox)
+
+    if format == "csv":
+        rows = repo.iter_daily_rows(codes, start_year, end_year)
+        return StreamingResponse(
+            _csv_stream(rows, repo.get_stations_by_code(codes)),
+            media_type="text/csv",
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="hydro_{start_year}_{end_year}.csv"'
+                )
+            },
+        )
+
+    data = repo.get_daily_data_bulk(codes, start_year, end_year)
+    # Serialised directly: validating millions of column items through
+    # the response model would dominate the request time.
+    payload = {
+        "start_year": start_year,
+        "end_year": end_year,
+        "stations": {
+            code: {
+                "id": code,
+                "name": s.station_name,
+                "river": s.river_name,
+                "latitude": s.latitude,
+                "longitude": s.longitude,
+            }
+            for code, s in data.stations.items()
+        },
+        "columns": dict(
+            zip(
+                _BULK_COLUMNS,
+                (
+                    data.station_code,
+                    data.measurement_date,
+                    data.water_level_cm,
+                    data.flow_m3s,
+                    data.water_temp_c,
+                ),
+                strict=True,
+            )
+        ),
+        "count": len(data),
+    }
+    return Response(
+        content=json.dumps(payload, separators=(",", ":")),
+        media_type="application/json",
+    )
+
+
+@router.get("/coverage", response_model=HydroCoverageList)
+async def get_hydro_coverage(
+    station_id: str | None = Query(None, description="Station code"),
+    start_year: int | None = Query(
+        None, ge=1951, le=2024, description="Start hydrological year"
+    ),
+    end_year: int | None = Query(
+        None, ge=1951, le=2024, description="End hydrological year"
+    ),
+):
+    """
+    Zakres i kompletnosc danych dobowych w cache dla stacji.
+
+    Odczytywane z tabeli podsumowan (bez skanowania danych dobowych).
+    """
+    from imgwtools.config import settings
+
+    if not settings.db_enabled:
+        raise HTTPException(
+            status_code=400,
+            detail="Database cache is not enabled. Set IMGW_DB_ENABLED=true.",
+        )
+
+    from imgwtools.db import get_cache_manager, init_db
+
+    init_db()
+
+    coverage = get_cache_manager().get_station_coverage(
+        station_id, start_year, end_year
+    )
+    stations = [
+        HydroCoverage(
+            station_id=c.station_code,
+            name=c.station_name,
+            river=c.river_name,
+            first_year=c.first_year,
+            last_year=c.last_year,
+            first_date=c.first_date,
+            last_date=c.last_date,
+            day_count=c.day_count,
+            completeness=c.completeness,
+            water_level_min_cm=c.level_min,
+            water_level_max_cm=c.level_max,
+            flow_min_m3s=c.flow_min,
+            flow_max_m3s=c.flow_max,
+        )
+        for c in coverage
+    ]
+    return HydroCoverageList(stations=stations, count=len(stations))
+
+
+@router.get("/aggregate", response_model=HydroAggregateResponse)
+async def aggregate_hydro_data(
+    station_id: str = Query(..., description="Station code"),
+    param: str = Query("Q", description="Parameter: H, Q, T"),
+    by: str = Query(
+        "hydro_year",
+        description="Aggregation: month, year, hydro_year, doy (climatology), fdc",
+    ),
+    start_year: int | None = Query(
+        None, ge=1951, le=2024, description="Start hydrological year"
+    ),
+    end_year: int | None = Query(
+        None, ge=1951, le=2024, description="End hydrological year"
+    ),
+    quantiles: list[float] = Query(
+        [0.05, 0.5, 0.95], description="Quantiles in [0, 1]"
+    ),
+    fetch_missing: bool = Query(
+        False, description="Download missing daily data first (requires years)"
+    ),
+):
+    """
+    Statystyki danych dobowych obliczane w bazie cache.
+
+    Srednie i ekstrema miesieczne, roczne lub dla lat hydrologicznych,
+    klimatologia dnia roku (``by=doy``) oraz krzywa czasu trwania
+    (``by=fdc``). Percentyle zwracane sa zawsze.
+    """
+    from imgwtools.config import settings
+
+    param = param.upper()
+    if param not in ["H", "Q", "T"]:
+        raise HTTPException(status_code=400, detail="Invalid param. Allowed: H, Q, T")
+    valid_by = ["month", "year", "hydro_year", "doy", "fdc"]
+    if by not in valid_by:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid by. Allowed: {', '.join(valid_by)}"
+        )
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    if any(not 0.0 <= q <= 1.0 for q in quantiles):
+        raise HTTPException(status_code=400, detail="Quantiles must be in [0, 1]")
+
+    if not settings.db_enabled:
+        raise HTTPException(
+            status_code=400,
+            detail="Database cache is not enabled. Set IMGW_DB_ENABLED=true.",
+        )
+
+    from imgwtools.db import (
+        aggregate_daily,
+        climatology,
+        flow_duration_curve,
+        get_cache_manager,
+        init_db,
+        percentiles,
+    )
+
+    init_db()
+
+    if fetch_missing:
+        if start_year is None or end_year is None:
+            raise HTTPException(
+                status_code=400,
+                detail="fetch_missing requires start_year and end_year",
+            )
+        manager = get_cache_manager()
+        try:
+            for year in range(start_year, end_year + 1):
+                if year < 2023:
+                    for month in range(1, 13):
+                        await manager.ensure_data_cached("dobowe", year, month)
+                else:
+                    await manager.ensure_data_cached("dobowe", year)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error fetching data: {str(e)}"
+            )
+
+    response = HydroAggregateResponse(
+        station_id=station_id,
+        param=param,
+        by=by,
+        start_year=start_year,
+        end_year=end_year,
+        percentiles={
+            f"{q:g}": value
+            for q, value in percentiles(
+                station_id, param, quantiles, start_year, end_year
+            ).items()
+        },
+    )
+    if by == "fdc":
+        response.duration_curve = [
+            point.model_dump()
+            for point in flow_duration_curve(
+                station_id, param=param, start_year=start_year, end_year=end_year
+            )
+        ]
+    elif by == "doy":
+        response.data = [
+            HydroAggregatePoint(
+                period=r.day, count=r.count, mean=r.mean, min=r.min, max=r.max
+            )
+            for r in climatology(station_id, param, start_year, end_year)
+        ]
+    else:
+        response.data = [
+            HydroAggregatePoint(**r.model_dump(exclude={"station_code", "param"}))
+            for r in aggregate_daily(station_id, param, by, start_year, end_year)
+        ]
+    return response
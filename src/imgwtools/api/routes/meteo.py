@@ -20,6 +20,9 @@ from imgwtools.core.url_builder import (
     build_api_url,
     build_meteo_url,
 )
+from imgwtools.metrics import upstream_call
+from imgwtools.registry import get_station_registry
+from imgwtools.resilience import async_retry_transport
 
 router = APIRouter()
 
@@ -33,13 +36,21 @@ async def list_meteo_stations(
     Lista stacji meteorologicznych.
 
     Zwraca liste stacji z ID i nazwa.
+    Dane pochodza z rejestru stacji w pamieci (pliki CSV + odswiezanie z IMGW).
     """
-    # TODO: Load from CSV file
-    stations = [
-        Station(id="12375", name="Warszawa-Okecie"),
-        Station(id="12566", name="Krakow-Balice"),
-    ]
-    return StationList(stations=stations[offset : offset + limit], count=len(stations))
+    stations = get_station_registry().meteo_stations
+    return StationList(
+        stations=[
+            Station(
+                id=s.station_id,
+                name=s.name,
+                latitude=s.latitude,
+                longitude=s.longitude,
+            )
+            for s in stations[offset : offset + limit]
+        ],
+        count=len(stations),
+    )
 
 
 @router.get("/synop", response_model=list[MeteoCurrentData])
@@ -54,10 +65,11 @@ async def get_synop_data(
     """
     url = build_api_url("synop", station_id=station_id, station_name=station_name)
 
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=async_retry_transport()) as client:
         try:
-            response = await client.get(url, timeout=10.0)
-            response.raise_for_status()
+            with upstream_call("synop"):
+                response = await client.get(url, timeout=10.0)
+                response.raise_for_status()
             data = response.json()
 
             if not data:
@@ -98,10 +110,11 @@ async def get_current_meteo_data(
     """
     url = build_api_url("meteo", station_id=station_id)
 
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=async_retry_transport()) as client:
         try:
-            response = await client.get(url, timeout=10.0)
-            response.raise_for_status()
+            with upstream_call("meteo"):
+                response = await client.get(url, timeout=10.0)
+                response.raise_for_status()
             data = response.json()
 
             if not data:
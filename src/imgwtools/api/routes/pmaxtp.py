@@ -9,6 +9,8 @@ from fastapi import APIRouter, HTTPException
 
 from imgwtools.api.schemas import PMaXTPRequest
 from imgwtools.core.url_builder import PMaXTPMethod, build_pmaxtp_url
+from imgwtools.metrics import upstream_call
+from imgwtools.resilience import async_retry_transport
 
 router = APIRouter()
 
@@ -73,10 +75,11 @@ async def fetch_pmaxtp_data(request: PMaXTPRequest) -> dict[str, Any]:
         longitude=request.longitude,
     )
 
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=async_retry_transport()) as client:
         try:
-            response = await client.get(url, timeout=30.0)
-            response.raise_for_status()
+            with upstream_call("pmaxtp"):
+                response = await client.get(url, timeout=30.0)
+                response.raise_for_status()
             data = response.json()
 
             return {
@@ -0,0 +1,48 @@
+"""
+Station search routes.
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, Query
+
+from imgwtools.api.schemas import StationSearchHit, StationSearchResponse
+from imgwtools.registry import get_station_registry
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=StationSearchResponse)
+async def search_stations(
+    q: str = Query("", description="Szukany tekst (nazwa stacji lub rzeki)"),
+    type: Literal["hydro", "meteo"] = Query("hydro", description="Typ stacji"),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Wyszukiwanie stacji (podpowiedzi dla pola wyboru stacji).
+
+    Wielkosc liter i polskie znaki nie maja znaczenia ("lodz" znajdzie "Łódź").
+    Kazde slowo musi pasowac do poczatku slowa w nazwie/rzece lub wystepowac
+    jako fragment. Wyniki posortowane wedlug trafnosci.
+    """
+    registry = get_station_registry()
+    index = registry.hydro_search if type == "hydro" else registry.meteo_search
+    page = index.search(q, limit=limit, offset=offset)
+
+    return StationSearchResponse(
+        stations=[
+            StationSearchHit(
+                id=hit.station.station_id,
+                name=hit.station.name,
+                river=getattr(hit.station, "river", None),
+                latitude=hit.station.latitude,
+                longitude=hit.station.longitude,
+                score=hit.score,
+            )
+            for hit in page.hits
+        ],
+        total=page.total,
+        limit=limit,
+        offset=offset,
+    )
@@ -0,0 +1,69 @@
+"""
+Warnings routes (active IMGW warnings by region).
+"""
+
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+
+from imgwtools.exceptions import IMGWDataError
+from imgwtools.warnings_store import WarningsStore, get_warnings_store
+
+router = APIRouter()
+
+
+async def _get_store() -> WarningsStore:
+    store = get_warnings_store()
+    if store.is_stale:
+        await store.refresh_async()
+    return store
+
+
+@router.get("/active")
+async def active_warnings(
+    teryt: list[str] | None = Query(
+        None, description="Kody TERYT (wojewodztwo, powiat lub gmina)"
+    ),
+    lat: float | None = Query(None, ge=49.0, le=55.0, description="Szerokosc"),
+    lon: float | None = Query(None, ge=14.0, le=24.5, description="Dlugosc"),
+    at: datetime | None = Query(None, description="Czas (domyslnie teraz)"),
+):
+    """
+    Aktywne ostrzezenia hydrologiczne i meteorologiczne.
+
+    Bez filtrow zwraca wszystkie ostrzezenia wazne w danym czasie.
+    Z parametrem ``teryt`` zwraca ostrzezenia dla kazdego podanego
+    regionu (``regions``), a z ``lat``/``lon`` dla punktu.
+    """
+    store = await _get_store()
+    response: dict = {"token": store.token, "error": store.last_error}
+
+    if teryt:
+        response["regions"] = store.active_for_regions(teryt, at)
+    elif lat is not None and lon is not None:
+        try:
+            response["warnings"] = store.active_at_point(lat, lon, at)
+        except IMGWDataError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    else:
+        response["warnings"] = store.active(at)
+    return response
+
+
+@router.get("/changes")
+async def warning_changes(
+    since: str | None = Query(None, description="Token z poprzedniej odpowiedzi"),
+):
+    """
+    Ostrzezenia dodane, zmienione lub usuniete od podanego tokenu.
+
+    Nieznany lub pusty token zwraca pelna liste (``full: true``).
+    """
+    store = await _get_store()
+    changes = store.changes_since(since)
+    return {
+        "token": changes.token,
+        "full": changes.full,
+        "added": changes.added,
+        "removed": changes.removed,
+    }
@@ -60,6 +60,34 @@ class StationList(BaseModel):
     count: int
 
 
+class NearbyStation(Station):
+    """Station with distance from the query point."""
+
+    distance_km: float = Field(..., description="Distance from query point [km]")
+
+
+class NearbyStationList(BaseModel):
+    """List of stations ordered by distance."""
+
+    stations: list[NearbyStation]
+    count: int
+
+
+class StationSearchHit(Station):
+    """Station search result with relevance score."""
+
+    score: float = Field(..., description="Relevance score (higher is better)")
+
+
+class StationSearchResponse(BaseModel):
+    """Ranked, paginated station search results."""
+
+    stations: list[StationSearchHit]
+    total: int = Field(..., description="Number of matches across all pages")
+    limit: int
+    offset: int
+
+
 # Dataset schemas
 class Dataset(BaseModel):
     """Available dataset description."""
@@ -204,3 +232,74 @@ class HydroDataResponse(BaseModel):
     data: list[HydroDailyDataPoint | HydroMonthlyDataPoint]
     count: int
     source: str = Field(..., description="'cache' or 'imgw'")
+
+
+class HydroAggregatePoint(BaseModel):
+    """Statistics of daily values over one period or calendar day."""
+
+    period: str = Field(..., description="'YYYY-MM', 'YYYY', hydro year or 'MM-DD'")
+    count: int = Field(..., description="Number of days with data")
+    mean: float
+    min: float
+    min_date: str | None = None
+    max: float
+    max_date: str | None = None
+
+
+class HydroAggregateResponse(BaseModel):
+    """Response with aggregated cached hydrological data."""
+
+    station_id: str
+    param: str = Field(..., description="'H', 'Q' or 'T'")
+    by: str = Field(..., description="'month', 'year', 'hydro_year', 'doy' or 'fdc'")
+    start_year: int | None = None
+    end_year: int | None = None
+    data: list[HydroAggregatePoint] = Field(default_factory=list)
+    percentiles: dict[str, float] = Field(
+        default_factory=dict, description="Quantile -> value"
+    )
+    duration_curve: list[dict[str, float]] = Field(
+        default_factory=list,
+        description="Points {exceedance_percent, value} (by=fdc)",
+    )
+
+
+class HydroCoverage(BaseModel):
+    """Cached daily data coverage of one station."""
+
+    station_id: str
+    name: str | None = None
+    river: str | None = None
+    first_year: int
+    last_year: int
+    first_date: str | None = None
+    last_date: str | None = None
+    day_count: int = Field(..., description="Days with at least one value")
+    completeness: float | None = Field(None, description="Share of days with data")
+    water_level_min_cm: float | None = None
+    water_level_max_cm: float | None = None
+    flow_min_m3s: float | None = None
+    flow_max_m3s: float | None = None
+
+
+class HydroCoverageList(BaseModel):
+    """Cached daily data coverage of stations."""
+
+    stations: list[HydroCoverage]
+    count: int
+
+
+class HydroBulkDataResponse(BaseModel):
+    """Daily data of many stations in columnar form."""
+
+    start_year: int
+    end_year: int
+    stations: dict[str, Station] = Field(..., description="Station ID -> metadata")
+    columns: dict[str, list] = Field(
+        ...,
+        description=(
+            "Aligned columns: station_id, date, water_level_cm, flow_m3s, "
+            "water_temp_c"
+        ),
+    )
+    count: int
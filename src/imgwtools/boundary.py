@@ -0,0 +1,397 @@
+"""
+Preprocessed boundary geometry for map rendering.
+
+The Poland outline shapefile is parsed once and stored as a compact NumPy
+archive with several simplification levels. Loading the archive is cheap
+and memoised, so batch map rendering and the web map do not re-read the
+shapefile on every call.
+
+Requires numpy; building the cache additionally needs pyshp (and pyproj
+for WGS84 output). Install with: pip install imgwtools[spatial]
+
+Example:
+    >>> from imgwtools.boundary import load_boundary
+    >>> outline = load_boundary(level=2)
+    >>> for part in outline.parts():
+    ...     plt.plot(part[:, 0], part[:, 1])
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "numpy is required for imgwtools.boundary. "
+        "Install with: pip install imgwtools[spatial]"
+    ) from e
+
+from imgwtools.exceptions import IMGWDataError, IMGWValidationError
+
+# Simplification tolerances in source CRS units (metres for EPSG:2180).
+# Level 0 keeps every vertex.
+DEFAULT_TOLERANCES: tuple[float, ...] = (0.0, 100.0, 500.0, 2000.0)
+
+# CRS of the bundled shapefile (ETRS89 / Poland CS92)
+DEFAULT_SOURCE_CRS = "EPSG:2180"
+
+# Bump when the archive layout changes
+CACHE_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Boundary:
+    """
+    Boundary outline at one simplification level.
+
+    All parts are stored in a single coordinate array; ``offsets`` marks
+    where each part starts (with a final end offset).
+
+    Attributes:
+        xy: (N, 2) coordinates in the source CRS.
+        offsets: (P + 1,) part start offsets into ``xy``.
+        tolerance: Simplification tolerance used for this level.
+        lonlat: (N, 2) WGS84 longitude/latitude, if available.
+    """
+
+    xy: np.ndarray
+    offsets: np.ndarray
+    tolerance: float
+    lonlat: np.ndarray | None = None
+
+    @property
+    def n_parts(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_vertices(self) -> int:
+        return len(self.xy)
+
+    def parts(self, wgs84: bool = False) -> list[np.ndarray]:
+        """
+        Split coordinates into parts (rings or lines).
+
+        Args:
+            wgs84: Return longitude/latitude instead of source coordinates.
+
+        Returns:
+            List of (n, 2) arrays, one per part.
+        """
+        coords = self._wgs84() if wgs84 else self.xy
+        return [
+            coords[start:end]
+            for start, end in zip(self.offsets[:-1], self.offsets[1:], strict=True)
+        ]
+
+    def to_geojson(self, precision: int = 5) -> dict:
+        """
+        Convert the outline to a GeoJSON FeatureCollection in WGS84.
+
+        Args:
+            precision: Number of decimal places kept in coordinates.
+
+        Returns:
+            FeatureCollection with a single MultiLineString feature.
+        """
+        lines = [
+            np.round(part, precision).tolist() for part in self.parts(wgs84=True)
+        ]
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "properties": {
+                        "tolerance": self.tolerance,
+                        "vertices": self.n_vertices,
+                    },
+                    "geometry": {"type": "MultiLineString", "coordinates": lines},
+                }
+            ],
+        }
+
+    def _wgs84(self) -> np.ndarray:
+        if self.lonlat is None:
+            raise IMGWDataError(
+                "Boundary cache has no WGS84 coordinates. "
+                "Rebuild it with pyproj installed: pip install imgwtools[spatial]"
+            )
+        return self.lonlat
+
+
+def simplify_line(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Simplify a polyline with the Douglas-Peucker algorithm.
+
+    Args:
+        points: (n, 2) vertex array.
+        tolerance: Maximum allowed distance of removed vertices.
+
+    Returns:
+        Simplified (m, 2) array; first and last vertices are kept.
+    """
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    if tolerance <= 0 or n < 3:
+        return points
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        start, end = points[first], points[last]
+        inner = points[first + 1 : last]
+        seg = end - start
+        seg_len = np.hypot(seg[0], seg[1])
+        if seg_len == 0:
+            # Closed ring: distance to the shared endpoint
+            dist = np.hypot(inner[:, 0] - start[0], inner[:, 1] - start[1])
+        else:
+            rel = inner - start
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / seg_len
+
+        idx = int(np.argmax(dist))
+        if dist[idx] > tolerance:
+            split = first + 1 + idx
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+
+    return points[keep]
+
+
+def save_boundary_cache(
+    parts: Sequence[np.ndarray],
+    cache_path: Path,
+    tolerances: Sequence[float] = DEFAULT_TOLERANCES,
+    source_crs: str = DEFAULT_SOURCE_CRS,
+) -> Path:
+    """
+    Simplify boundary parts and write them to a NumPy archive.
+
+    Args:
+        parts: Boundary parts as (n, 2) arrays in ``source_crs``.
+        cache_path: Output ``.npz`` path.
+        tolerances: Simplification tolerance per level.
+        source_crs: CRS of the input coordinates.
+
+    Returns:
+        Path of the written archive.
+    """
+    if not tolerances:
+        raise IMGWValidationError("At least one tolerance level is required")
+
+    arrays: dict[str, np.ndarray] = {
+        "format_version": np.array(CACHE_FORMAT_VERSION),
+        "tolerances": np.asarray(tolerances, dtype=float),
+        "source_crs": np.array(source_crs),
+    }
+
+    for level, tolerance in enumerate(tolerances):
+        simplified = []
+        for part in parts:
+            part = np.asarray(part, dtype=float)
+            closed = len(part) > 3 and np.array_equal(part[0], part[-1])
+            line = simplify_line(part, tolerance)
+            # Drop rings that collapsed to a sliver at this scale
+            if len(line) < (4 if closed else 2):
+                continue
+            simplified.append(line)
+
+        xy = np.concatenate(simplified) if simplified else np.empty((0, 2))
+        offsets = np.cumsum([0] + [len(p) for p in simplified])
+        arrays[f"xy_{level}"] = xy
+        arrays[f"offsets_{level}"] = offsets.astype(np.int64)
+
+        lonlat = _to_wgs84(xy, source_crs)
+        if lonlat is not None:
+            arrays[f"lonlat_{level}"] = lonlat
+
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    _load_cache.cache_clear()
+    return cache_path
+
+
+def build_boundary_cache(
+    shapefile_path: Path | None = None,
+    cache_path: Path | None = None,
+    tolerances: Sequence[float] = DEFAULT_TOLERANCES,
+    source_crs: str = DEFAULT_SOURCE_CRS,
+) -> Path:
+    """
+    Convert a boundary shapefile into the cached NumPy archive.
+
+    Args:
+        shapefile_path: Shapefile path (default: settings.shapefile_path).
+        cache_path: Output path
+            (default: boundary_cache_path(shapefile_path)).
+        tolerances: Simplification tolerance per level.
+        source_crs: CRS of the shapefile coordinates.
+
+    Returns:
+        Path of the written archive.
+
+    Raises:
+        ImportError: If pyshp is not installed.
+        IMGWDataError: If the shapefile cannot be read.
+    """
+    shapefile_path, cache_path = _default_paths(shapefile_path, cache_path)
+    return save_boundary_cache(
+        _read_shapefile_parts(shapefile_path), cache_path, tolerances, source_crs
+    )
+
+
+def load_boundary(
+    level: int = 1,
+    shapefile_path: Path | None = None,
+    cache_path: Path | None = None,
+) -> Boundary:
+    """
+    Load a boundary outline, building the cache on first use.
+
+    The archive is rebuilt when it is missing or older than the shapefile.
+    Loaded archives are memoised per file and modification time.
+
+    Args:
+        level: Simplification level (0 = full detail).
+        shapefile_path: Shapefile path (default: settings.shapefile_path).
+        cache_path: Cache path
+            (default: boundary_cache_path(shapefile_path)).
+
+    Returns:
+        Boundary for the requested level.
+
+    Raises:
+        IMGWValidationError: If the level does not exist.
+        IMGWDataError: If neither the cache nor the shapefile is available.
+    """
+    shapefile_path, cache_path = _default_paths(shapefile_path, cache_path)
+
+    if not cache_path.exists() and not shapefile_path.exists():
+        raise IMGWDataError(
+            f"Boundary shapefile not found: {shapefile_path}"
+        )
+    if _is_stale(cache_path, shapefile_path):
+        build_boundary_cache(shapefile_path, cache_path)
+
+    levels = _load_cache(str(cache_path), cache_path.stat().st_mtime_ns)
+    if not 0 <= level < len(levels):
+        raise IMGWValidationError(
+            f"Boundary level must be between 0 and {len(levels) - 1}, got {level}"
+        )
+    return levels[level]
+
+
+def boundary_cache_path(shapefile_path: Path | None = None) -> Path:
+    """
+    Cache archive path of a boundary shapefile.
+
+    The configured shapefile uses settings.boundary_cache_path (shared by
+    the web map, the API and StationMap); other shapefiles get
+    ``<name>_boundary.npz`` next to them.
+
+    Args:
+        shapefile_path: Shapefile path (default: settings.shapefile_path).
+    """
+    from imgwtools.config import settings
+
+    if shapefile_path is None or Path(shapefile_path).resolve() == (
+        settings.shapefile_path.resolve()
+    ):
+        return settings.boundary_cache_path
+    shapefile_path = Path(shapefile_path)
+    return shapefile_path.with_name(f"{shapefile_path.stem}_boundary.npz")
+
+
+def _default_paths(
+    shapefile_path: Path | None, cache_path: Path | None
+) -> tuple[Path, Path]:
+    if cache_path is None:
+        cache_path = boundary_cache_path(shapefile_path)
+    if shapefile_path is None:
+        from imgwtools.config import settings
+
+        shapefile_path = settings.shapefile_path
+    return Path(shapefile_path), Path(cache_path)
+
+
+def _is_stale(cache_path: Path, shapefile_path: Path) -> bool:
+    if not cache_path.exists():
+        return True
+    if not shapefile_path.exists():
+        return False
+    return shapefile_path.stat().st_mtime_ns > cache_path.stat().st_mtime_ns
+
+
+@lru_cache(maxsize=8)
+def _load_cache(path: str, mtime_ns: int) -> tuple[Boundary, ...]:
+    """Read all levels of an archive (keyed by mtime to pick up rebuilds)."""
+    with np.load(path, allow_pickle=False) as archive:
+        if int(archive["format_version"]) != CACHE_FORMAT_VERSION:
+            raise IMGWDataError(f"Unsupported boundary cache format: {path}")
+        tolerances = archive["tolerances"]
+        return tuple(
+            Boundary(
+                xy=archive[f"xy_{level}"],
+                offsets=archive[f"offsets_{level}"],
+                tolerance=float(tolerance),
+                lonlat=(
+                    archive[f"lonlat_{level}"]
+                    if f"lonlat_{level}" in archive.files
+                    else None
+                ),
+            )
+            for level, tolerance in enumerate(tolerances)
+        )
+
+
+def _read_shapefile_parts(shapefile_path: Path) -> list[np.ndarray]:
+    """Read every part of every shape as an (n, 2) array."""
+    try:
+        import shapefile as shp
+    except ImportError as e:
+        raise ImportError(
+            "pyshp is required to build the boundary cache. "
+            "Install with: pip install imgwtools[spatial]"
+        ) from e
+
+    try:
+        reader = shp.Reader(str(shapefile_path))
+    except (OSError, shp.ShapefileException) as e:
+        raise IMGWDataError(f"Cannot read shapefile {shapefile_path}: {e}") from e
+
+    parts = []
+    with reader:
+        for shape in reader.iterShapes():
+            points = np.asarray(shape.points, dtype=float)
+            bounds = list(shape.parts) + [len(points)]
+            for start, end in zip(bounds[:-1], bounds[1:], strict=True):
+                if end - start >= 2:
+                    parts.append(points[start:end, :2])
+    return parts
+
+
+def _to_wgs84(xy: np.ndarray, source_crs: str) -> np.ndarray | None:
+    """Reproject coordinates to lon/lat; None if pyproj is unavailable."""
+    if source_crs.upper() in ("EPSG:4326", "WGS84"):
+        return xy.copy()
+    try:
+        from imgwtools.core.projection import WGS84, get_transformer
+    except ImportError:
+        return None
+
+    lon, lat = get_transformer(source_crs, WGS84).transform(xy[:, 0], xy[:, 1])
+    return np.column_stack([lon, lat])
@@ -0,0 +1,329 @@
+"""
+Bulk download of IMGW archive files.
+
+Downloads a plan of files (DownloadURL objects from build_hydro_url() /
+build_meteo_url()) concurrently over one pooled HTTP client:
+
+- interrupted downloads are kept as ``<file>.part`` and resumed with
+  HTTP Range requests on the next run,
+- ZIP archives are verified (CRC of every member) before they replace
+  the target file,
+- complete files already on disk are skipped,
+- a JSON manifest (file, URL, size, SHA-256, status) is kept in the
+  output directory,
+- requests run in the "background" lane of the upstream rate limit
+  (imgwtools.throttle).
+
+Example:
+    >>> from imgwtools import HydroInterval, build_hydro_url, download_archives
+    >>> plan = [build_hydro_url(HydroInterval.MONTHLY, y) for y in range(1951, 2024)]
+    >>> results = download_archives(plan, "./data/hydro", concurrency=8)
+    >>> print(sum(r.status == "failed" for r in results))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+import zipfile
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Literal
+
+import httpx
+
+from imgwtools.core.url_builder import DataType, DownloadURL
+from imgwtools.db.progress import CacheEventCallback, StageTracker
+from imgwtools.exceptions import IMGWDataError, IMGWValidationError
+from imgwtools.metrics import upstream_call
+from imgwtools.resilience import async_retry_transport
+from imgwtools.throttle import request_lane
+
+DEFAULT_CONCURRENCY = 4
+DOWNLOAD_TIMEOUT = 120.0
+
+MANIFEST_NAME = "manifest.json"
+PART_SUFFIX = ".part"
+
+ArchiveStatus = Literal["downloaded", "resumed", "skipped", "failed"]
+
+
+@dataclass
+class ArchiveFile:
+    """
+    Outcome of one file of a bulk download (one manifest entry).
+
+    Attributes:
+        filename: File name in the output directory.
+        url: Source URL.
+        status: "downloaded", "resumed" (completed from a .part file),
+            "skipped" (already complete on disk) or "failed".
+        size: File size in bytes (0 if failed).
+        sha256: SHA-256 of the file (None if failed).
+        error: Error message of a failed download.
+        seconds: Download time.
+    """
+
+    filename: str
+    url: str
+    status: ArchiveStatus
+    size: int = 0
+    sha256: str | None = None
+    error: str | None = None
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+async def download_archives_async(
+    plan: Iterable[DownloadURL],
+    output_dir: str | Path,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DOWNLOAD_TIMEOUT,
+    manifest: bool = True,
+    on_event: CacheEventCallback | None = None,
+) -> list[ArchiveFile]:
+    """
+    Download archive files concurrently, resuming partial downloads.
+
+    Failed files do not stop the other downloads; their partial data
+    is kept for the next run (unless it is not a valid ZIP).
+
+    Args:
+        plan: Files to download (from build_hydro_url/build_meteo_url).
+        output_dir: Target directory (created if missing).
+        concurrency: Number of simultaneous downloads.
+        timeout: Timeout of a single HTTP operation in seconds.
+        manifest: Update ``manifest.json`` in the output directory.
+        on_event: Optional callback for progress events (byte-level
+            "download" progress, then "done", "skipped" or "error"; see
+            imgwtools.db.progress).
+
+    Returns:
+        One ArchiveFile per distinct file name, in plan order.
+
+    Raises:
+        IMGWValidationError: If concurrency is less than 1.
+
+    Example:
+        >>> plan = [build_meteo_url(MeteoInterval.MONTHLY, MeteoSubtype.SYNOP, y)
+        ...         for y in range(2001, 2024)]
+        >>> results = await download_archives_async(plan, "./data/meteo")
+    """
+    if concurrency < 1:
+        raise IMGWValidationError("concurrency must be at least 1")
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    items = list({item.filename: item for item in plan}.values())
+    known = _read_manifest(output) if manifest else {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(client: httpx.AsyncClient, item: DownloadURL) -> ArchiveFile:
+        async with semaphore:
+            tracker = StageTracker(
+                on_event,
+                source_file=item.filename,
+                interval=item.interval,
+                year=item.year,
+                month=item.month,
+            )
+            return await _download_one(
+                client, item, output, known.get(item.filename), tracker
+            )
+
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    transport = async_retry_transport(limits=limits)
+    async with httpx.AsyncClient(
+        timeout=timeout, follow_redirects=True, transport=transport
+    ) as client:
+        with request_lane("background"):
+            results = await asyncio.gather(*(run(client, item) for item in items))
+
+    if manifest:
+        _write_manifest(output, known, results)
+    return list(results)
+
+
+def download_archives(
+    plan: Iterable[DownloadURL],
+    output_dir: str | Path,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DOWNLOAD_TIMEOUT,
+    manifest: bool = True,
+    on_event: CacheEventCallback | None = None,
+) -> list[ArchiveFile]:
+    """
+    Synchronous version of download_archives_async.
+
+    See download_archives_async for full documentation. Must not be
+    called from a running event loop.
+    """
+    return asyncio.run(
+        download_archives_async(
+            plan,
+            output_dir,
+            concurrency=concurrency,
+            timeout=timeout,
+            manifest=manifest,
+            on_event=on_event,
+        )
+    )
+
+
+async def _download_one(
+    client: httpx.AsyncClient,
+    item: DownloadURL,
+    output: Path,
+    known: dict[str, Any] | None,
+    tracker: StageTracker,
+) -> ArchiveFile:
+    """
+    Download one file into output (skip, resume or fetch from scratch).
+
+    Hashing and ZIP verification read the whole file, so they run in a
+    worker thread to keep the other transfers going.
+    """
+    target = output / item.filename
+    part = output / (item.filename + PART_SUFFIX)
+    is_zip = item.filename.lower().endswith(".zip")
+
+    if target.exists():
+        if not is_zip or zipfile.is_zipfile(target):
+            size = target.stat().st_size
+            sha256 = (
+                known["sha256"]
+                if known and known.get("size") == size and known.get("sha256")
+                else await asyncio.to_thread(_sha256, target)
+            )
+            tracker.emit("skipped", size, "Already downloaded")
+            return ArchiveFile(item.filename, item.url, "skipped", size, sha256)
+        target.unlink()  # corrupt: download again
+
+    offset = part.stat().st_size if part.exists() else 0
+    start = time.perf_counter()
+    try:
+        offset = await _fetch(client, item, part, offset, tracker)
+        if is_zip and (error := await asyncio.to_thread(_verify_zip, part)):
+            part.unlink()
+            raise IMGWDataError(f"Invalid ZIP archive {item.filename}: {error}")
+        part.replace(target)
+    except (httpx.HTTPError, IMGWDataError, OSError) as e:
+        if isinstance(e, httpx.HTTPStatusError):
+            error = f"HTTP {e.response.status_code}"
+        else:
+            error = str(e) or type(e).__name__
+        tracker.emit("error", message=error)
+        return ArchiveFile(
+            item.filename,
+            item.url,
+            "failed",
+            error=error,
+            seconds=time.perf_counter() - start,
+        )
+
+    size = target.stat().st_size
+    tracker.emit("done", size, f"Downloaded {item.filename}")
+    return ArchiveFile(
+        item.filename,
+        item.url,
+        "resumed" if offset else "downloaded",
+        size,
+        await asyncio.to_thread(_sha256, target),
+        seconds=time.perf_counter() - start,
+    )
+
+
+async def _fetch(
+    client: httpx.AsyncClient,
+    item: DownloadURL,
+    part: Path,
+    offset: int,
+    tracker: StageTracker,
+) -> int:
+    """
+    Download item into the .part file, continuing at offset.
+
+    Returns:
+        The offset the download actually continued from (0 if the
+        server does not support ranges and sent the whole file).
+    """
+    is_hydro = item.data_type == DataType.HYDRO.value
+    endpoint = "hydro_archive" if is_hydro else "meteo_archive"
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    tracker.start("download")
+    with upstream_call(endpoint):
+        async with client.stream("GET", item.url, headers=headers) as response:
+            if response.status_code == 416 and offset:
+                # The .part file already holds the whole file
+                tracker.finish(offset, offset)
+                return offset
+            response.raise_for_status()
+            if response.status_code != 206:
+                offset = 0
+
+            length = response.headers.get("content-length")
+            total = offset + int(length) if length and length.isdigit() else None
+            with part.open("ab" if offset else "wb") as f:
+                async for chunk in response.aiter_bytes():
+                    f.write(chunk)
+                    tracker.update(offset + response.num_bytes_downloaded, total)
+            received = offset + response.num_bytes_downloaded
+
+    tracker.finish(received, total if total is not None else received)
+    return offset
+
+
+def _verify_zip(path: Path) -> str | None:
+    """Error description if path is not a valid ZIP archive, else None."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            bad = archive.testzip()
+    except (zipfile.BadZipFile, OSError) as e:
+        return str(e)
+    return f"CRC error in {bad}" if bad else None
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_manifest(output: Path) -> dict[str, dict[str, Any]]:
+    """Entries of an existing manifest by file name (empty if none)."""
+    try:
+        data = json.loads((output / MANIFEST_NAME).read_text(encoding="utf-8"))
+        return {entry["filename"]: entry for entry in data["files"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def _write_manifest(
+    output: Path,
+    known: dict[str, dict[str, Any]],
+    results: Iterable[ArchiveFile],
+) -> None:
+    """Merge results into the manifest (atomic replace)."""
+    entries = dict(known)
+    entries.update((result.filename, result.to_dict()) for result in results)
+
+    data = {
+        "updated": datetime.now().isoformat(timespec="seconds"),
+        "files": [entries[name] for name in sorted(entries)],
+    }
+    tmp = output / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(output / MANIFEST_NAME)
@@ -192,6 +192,8 @@ def key_stats(
         imgw admin stats
         imgw admin stats abc123
     """
+    from imgwtools.api.auth import UsageStore, key_identity
+
     data = load_api_keys()
     keys = data.get("keys", [])
 
@@ -199,20 +201,40 @@ def key_stats(
         console.print("[yellow]Brak zarejestrowanych kluczy API[/yellow]")
         return
 
+    # Request counts written by the API workers
+    usage = (
+        UsageStore(settings.api_usage_file).totals()
+        if settings.api_usage_file.exists()
+        else {}
+    )
+
     table = Table(title="Statystyki kluczy API")
     table.add_column("Nazwa", style="green")
     table.add_column("Limit", style="cyan")
     table.add_column("Zapytan", style="blue")
+    table.add_column("Ostatnia godzina", style="blue")
+    table.add_column("Ostatnio", style="blue")
     table.add_column("Status", style="yellow")
 
     for key in keys:
         if key_id is None or key["id"].startswith(key_id):
             status = "Aktywny" if key.get("active", True) else "Nieaktywny"
+            total = usage.get(key_identity(key["id"]))
             table.add_row(
                 key["name"],
-                str(key.get("rate_limit", 100)),
-                str(key.get("request_count", 0)),
+                str(key.get("rate_limit", settings.rate_limit)),
+                str(key.get("request_count", 0) + (total.requests if total else 0)),
+                str(round(total.last_hour)) if total else "0",
+                total.last_used[:19].replace("T", " ") if total else "-",
                 status,
             )
 
     console.print(table)
+
+    anonymous = [u for u in usage.values() if u.identity.startswith("ip:")]
+    if anonymous and key_id is None:
+        console.print(
+            f"\nZapytania bez klucza: {sum(u.requests for u in anonymous):,} "
+            f"z {len(anonymous)} adresow "
+            f"(limit {settings.rate_limit} req/h na adres)"
+        )
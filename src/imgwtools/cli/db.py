@@ -6,10 +6,11 @@ for hydrological data.
 """
 
 import asyncio
+import sys
 
 import typer
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 
 from imgwtools.config import settings
@@ -42,10 +43,17 @@ def init(
     from imgwtools.db import db_exists, init_db
 
     if db_exists() and not force:
-        console.print(
-            f"[yellow]Baza danych juz istnieje:[/yellow] {settings.db_path}\n"
-            "Uzyj --force aby wymusic ponowne utworzenie."
-        )
+        with console.status("[bold green]Aktualizacja schematu bazy danych..."):
+            migrated = init_db()
+        if migrated:
+            console.print(
+                f"[green]Zaktualizowano schemat bazy danych:[/green] {settings.db_path}"
+            )
+        else:
+            console.print(
+                f"[yellow]Baza danych juz istnieje:[/yellow] {settings.db_path}\n"
+                "Uzyj --force aby wymusic ponowne utworzenie."
+            )
         return
 
     with console.status("[bold green]Inicjalizacja bazy danych..."):
@@ -69,6 +77,7 @@ def status():
     from imgwtools.db import (
         db_exists,
         get_cached_years,
+        get_repository,
         get_schema_version,
         get_table_counts,
     )
@@ -109,6 +118,24 @@ def status():
 
     console.print(table)
 
+    from imgwtools.db.schema import CURRENT_VERSION
+
+    if version < CURRENT_VERSION:
+        console.print(
+            "[yellow]Schemat bazy jest nieaktualny. "
+            "Uruchom 'imgw db init' aby go zaktualizowac.[/yellow]"
+        )
+
+    # Daily data coverage (from hydro_daily_summary)
+    if version >= 4 and counts.get("hydro_daily"):
+        coverage = get_repository().get_station_coverage()
+        if coverage:
+            first = min(c.first_date for c in coverage if c.first_date)
+            last = max(c.last_date for c in coverage if c.last_date)
+            console.print(
+                f"\n[bold]Dane dobowe:[/bold] {len(coverage)} stacji, {first} - {last}"
+            )
+
     # Cached years
     if any(years for years in cached_years.values()):
         console.print("\n[bold]Zcache'owane lata:[/bold]")
@@ -149,6 +176,24 @@ def _format_year_ranges(years: list[int]) -> str:
     return ", ".join(ranges)
 
 
+_STAGE_LABELS = {"download": "Pobieranie", "parse": "Parsowanie", "insert": "Zapis"}
+
+
+def _format_event(event) -> str:
+    """Postep etapu: bajty/wiersze, predkosc i ETA."""
+    rate = event.rate or 0.0
+    if event.stage == "download":
+        done = f"{event.completed / 1e6:.1f}"
+        if event.total:
+            done += f"/{event.total / 1e6:.1f}"
+        text = f"{done} MB  {rate / 1e6:.2f} MB/s"
+    else:
+        text = f"{event.completed:,} wierszy  {rate:,.0f} wierszy/s"
+    if event.eta is not None and not event.finished:
+        text += f"  ETA {event.eta:.0f}s"
+    return text
+
+
 @app.command()
 def cache(
     years: str = typer.Option(..., "--years", "-y", help="Zakres lat (np. 2020-2023 lub 2020)"),
@@ -162,15 +207,23 @@ def cache(
         "--param", "-p",
         help="Parametr dla danych polrocznych: H, Q, T"
     ),
+    json_events: bool = typer.Option(
+        False,
+        "--json-events",
+        help="Wypisuj zdarzenia postepu jako JSON (jedna linia na zdarzenie) na stderr",
+    ),
 ):
     """
     Pobierz i zcache'uj dane dla zakresu lat.
 
+    Pokazuje postep pobierania (bajty, predkosc, ETA) oraz parsowania
+    i zapisu (wiersze/s) kazdego pliku.
+
     Przyklad: imgw db cache --years 2020-2023 --interval dobowe
     """
     check_db_enabled()
 
-    from imgwtools.db import db_exists, get_cache_manager, init_db
+    from imgwtools.db import get_cache_manager, init_db
 
     # Parse year range
     if "-" in years:
@@ -200,9 +253,12 @@ def cache(
         raise typer.Exit(1)
 
     # Initialize DB if needed
-    if not db_exists():
-        with console.status("[bold green]Inicjalizacja bazy danych..."):
-            init_db()
+    with console.status("[bold green]Inicjalizacja bazy danych..."):
+        init_db()
+
+    from imgwtools.db.progress import CacheEvent, JsonEventLogger
+
+    json_logger = JsonEventLogger(sys.stderr) if json_events else None
 
     # Run async cache operation
     async def run_cache():
@@ -211,22 +267,43 @@ def cache(
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("{task.fields[detail]}"),
             console=console,
+            disable=json_events,
         ) as progress:
-            task = progress.add_task(
-                f"Cache'owanie danych {interval} {start_year}-{end_year}...",
-                total=None,
+            years_task = progress.add_task(
+                f"Cache'owanie danych {interval} {start_year}-{end_year}",
+                total=end_year - start_year + 1,
+                detail="",
             )
-
-            def progress_callback(msg: str, current: int, total: int):
-                progress.update(task, description=f"{msg}")
+            file_task = progress.add_task("", total=None, detail="", visible=False)
+
+            def on_event(event: CacheEvent):
+                if json_logger:
+                    json_logger(event)
+                if event.stage == "year":
+                    progress.update(years_task, completed=event.completed)
+                elif event.stage in ("download", "parse", "insert"):
+                    progress.update(
+                        file_task,
+                        description=f"{_STAGE_LABELS[event.stage]} {event.source_file}",
+                        completed=event.completed,
+                        total=event.total,
+                        detail=_format_event(event),
+                        visible=True,
+                    )
+                elif event.stage == "error":
+                    progress.console.print(
+                        f"[yellow]{event.source_file}: {event.message}[/yellow]"
+                    )
 
             results = await manager.cache_year_range(
                 interval=interval,
                 start_year=start_year,
                 end_year=end_year,
                 param=param.upper() if param else None,
-                progress_callback=progress_callback,
+                on_event=on_event,
             )
 
         return results
@@ -248,6 +325,102 @@ def cache(
 
         console.print(table)
 
+    _print_failures_hint(interval)
+
+
+def _print_failures_hint(interval: str | None = None) -> None:
+    """Print the number of ranges left in the failure ledger."""
+    from imgwtools.db import get_repository
+
+    failed = len(get_repository().get_failed_ranges(interval))
+    if failed:
+        console.print(
+            f"\n[yellow]Nieudane pliki: {failed}.[/yellow] "
+            "Uzyj 'imgw db retry' aby ponowic lub 'imgw db failures' aby je wyswietlic."
+        )
+
+
+@app.command()
+def failures(
+    interval: str | None = typer.Option(
+        None, "--interval", "-i", help="Tylko dany interwal"
+    ),
+):
+    """
+    Pokaz pliki, ktorych pobranie lub import sie nie powiodly.
+
+    Przyklad: imgw db failures --interval dobowe
+    """
+    check_db_enabled()
+
+    from imgwtools.db import db_exists, get_repository, init_db
+
+    if not db_exists():
+        console.print("[yellow]Baza danych nie istnieje.[/yellow]")
+        raise typer.Exit(0)
+    init_db()
+
+    ranges = get_repository().get_failed_ranges(interval)
+    if not ranges:
+        console.print("[green]Brak nieudanych plikow.[/green]")
+        return
+
+    table = Table(title=f"Nieudane pliki ({len(ranges)})")
+    table.add_column("Interwal", style="cyan")
+    table.add_column("Rok", justify="right")
+    table.add_column("Miesiac/param")
+    table.add_column("Plik")
+    table.add_column("Proby", justify="right")
+    table.add_column("Ostatnio")
+    table.add_column("Blad", style="red")
+
+    for r in ranges:
+        table.add_row(
+            r.interval,
+            str(r.year),
+            str(r.month or r.param or "-"),
+            r.source_file or "-",
+            str(r.attempts),
+            r.last_failed_at[:19].replace("T", " "),
+            r.error,
+        )
+
+    console.print(table)
+
+
+@app.command()
+def retry(
+    interval: str | None = typer.Option(
+        None, "--interval", "-i", help="Tylko dany interwal"
+    ),
+):
+    """
+    Ponow pobranie plikow, ktore sie nie powiodly (imgw db failures).
+
+    Przyklad: imgw db retry
+    """
+    check_db_enabled()
+
+    from imgwtools.db import db_exists, get_cache_manager, init_db
+
+    if not db_exists():
+        console.print("[yellow]Baza danych nie istnieje.[/yellow]")
+        raise typer.Exit(0)
+    init_db()
+
+    with console.status("[bold green]Ponawianie nieudanych pobran..."):
+        summary = asyncio.run(get_cache_manager().retry_failed(interval))
+
+    if not summary["retried"]:
+        console.print("[green]Brak nieudanych plikow.[/green]")
+        return
+
+    cached, retried = summary["cached"], summary["retried"]
+    console.print(f"[green]Zcache'owano {cached} z {retried} plikow.[/green]")
+    if summary["failed"]:
+        _print_failures_hint(interval)
+        raise typer.Exit(1)
+
 
 @app.command()
 def clear(
@@ -343,10 +516,9 @@ def stations(
     """
     check_db_enabled()
 
-    from imgwtools.db import db_exists, get_cache_manager, get_repository, init_db
+    from imgwtools.db import get_cache_manager, get_repository, init_db
 
-    if not db_exists():
-        init_db()
+    init_db()
 
     if refresh:
         async def run_refresh():
@@ -367,16 +539,23 @@ def stations(
             console.print("[yellow]Brak stacji w cache. Uzyj --refresh aby pobrac.[/yellow]")
         return
 
+    coverage = {c.station_code: c for c in repo.get_station_coverage()}
+
     table = Table(title=f"Stacje hydrologiczne ({len(stations_list)})")
     table.add_column("Kod", style="cyan")
     table.add_column("Nazwa", style="green")
     table.add_column("Rzeka", style="blue")
+    table.add_column("Dane dobowe", justify="right")
+    table.add_column("Kompletnosc", justify="right")
 
     for station in stations_list:
+        c = coverage.get(station.station_code)
         table.add_row(
             station.station_code,
             station.station_name,
             station.river_name or "-",
+            f"{c.first_year}-{c.last_year}" if c else "-",
+            f"{c.completeness:.0%}" if c and c.completeness is not None else "-",
         )
 
     console.print(table)
@@ -384,23 +563,55 @@ def stations(
 
 @app.command()
 def query(
-    station: str = typer.Option(..., "--station", "-s", help="Kod stacji"),
+    station: str | None = typer.Option(
+        None, "--station", "-s", help="Kod stacji (lub kilka po przecinku)"
+    ),
     years: str = typer.Option(..., "--years", "-y", help="Zakres lat (np. 2020-2023)"),
     interval: str = typer.Option(
         "dobowe",
         "--interval", "-i",
         help="Interwal: dobowe, miesieczne, polroczne"
     ),
+    river: str | None = typer.Option(None, "--river", help="Wszystkie stacje na rzece"),
+    bbox: str | None = typer.Option(
+        None, "--bbox", help="Prostokat: min_lat,min_lon,max_lat,max_lon"
+    ),
     output: str | None = typer.Option(None, "--output", "-o", help="Zapisz do pliku CSV"),
 ):
     """
     Zapytaj o dane dla stacji i zakresu lat.
 
     Automatycznie pobiera brakujace dane z IMGW (lazy loading).
+    Dla wielu stacji (lista kodow, --river, --bbox) dane dobowe pobierane
+    sa jednym zapytaniem.
+
+    Przyklad: imgw db query --river Nysa Klodzka -y 2020-2022 -o nysa.csv
     """
     check_db_enabled()
 
-    from imgwtools.db import db_exists, get_cache_manager, init_db
+    from imgwtools.db import get_cache_manager, init_db
+
+    station_codes = [c.strip() for c in station.split(",") if c.strip()] if station else []
+    if not station_codes and not river and not bbox:
+        console.print("[red]Blad: Podaj --station, --river lub --bbox[/red]")
+        raise typer.Exit(1)
+
+    bbox_values = None
+    if bbox:
+        try:
+            bbox_values = tuple(float(v) for v in bbox.split(","))
+        except ValueError:
+            bbox_values = ()
+        if len(bbox_values) != 4:
+            console.print("[red]Blad: --bbox musi miec postac min_lat,min_lon,max_lat,max_lon[/red]")
+            raise typer.Exit(1)
+
+    bulk = len(station_codes) > 1 or river is not None or bbox_values is not None
+    if bulk and interval != "dobowe":
+        console.print("[red]Blad: Zapytanie o wiele stacji obsluguje tylko dane dobowe[/red]")
+        raise typer.Exit(1)
+    if not bulk:
+        station = station_codes[0]
 
     # Parse year range
     if "-" in years:
@@ -410,8 +621,7 @@ def query(
     else:
         start_year = end_year = int(years)
 
-    if not db_exists():
-        init_db()
+    init_db()
 
     async def run_query():
         manager = get_cache_manager()
@@ -426,6 +636,8 @@ def query(
                     await manager.ensure_data_cached(interval, year)
 
         # Query data
+        if bulk:
+            return None
         if interval == "dobowe":
             return manager.get_daily_data(station, start_year, end_year)
         elif interval == "miesieczne":
@@ -435,6 +647,12 @@ def query(
 
     records = asyncio.run(run_query())
 
+    if bulk:
+        _query_bulk(
+            station_codes or None, river, bbox_values, start_year, end_year, output
+        )
+        return
+
     if not records:
         console.print(f"[yellow]Brak danych dla stacji {station} w latach {start_year}-{end_year}[/yellow]")
         return
@@ -486,3 +704,264 @@ def query(
 
         if len(records) > 20:
             console.print(f"\n[dim]Pokazano 20 z {len(records)} rekordow. Uzyj --output aby zapisac wszystkie.[/dim]")
+
+
+def _query_bulk(
+    station_codes: list[str] | None,
+    river: str | None,
+    bbox: tuple[float, float, float, float] | None,
+    start_year: int,
+    end_year: int,
+    output: str | None,
+) -> None:
+    """Daily data of many stations: stream to CSV or show a summary table."""
+    from imgwtools.db import get_repository
+
+    repo = get_repository()
+    codes = repo.find_station_codes(station_codes, river, bbox)
+    if not codes:
+        console.print("[yellow]Nie znaleziono stacji w cache. Uzyj 'imgw db stations --refresh'.[/yellow]")
+        return
+
+    stations = repo.get_stations_by_code(codes)
+
+    if output:
+        import csv
+
+        count = 0
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                "station_code", "station_name", "river_name", "measurement_date",
+                "water_level_cm", "flow_m3s", "water_temp_c",
+            ])
+            for code, *values in repo.iter_daily_rows(codes, start_year, end_year):
+                meta = stations.get(code)
+                writer.writerow([
+                    code,
+                    meta.station_name if meta else "",
+                    meta.river_name if meta and meta.river_name else "",
+                    *values,
+                ])
+                count += 1
+        console.print(
+            f"[green]Zapisano {count} rekordow z {len(codes)} stacji do {output}[/green]"
+        )
+        return
+
+    data = repo.get_daily_data_bulk(codes, start_year, end_year)
+    if not len(data):
+        console.print(f"[yellow]Brak danych dla {len(codes)} stacji w latach {start_year}-{end_year}[/yellow]")
+        return
+
+    per_station: dict[str, int] = {}
+    for code in data.station_code:
+        per_station[code] = per_station.get(code, 0) + 1
+
+    table = Table(title=f"Dane dobowe ({len(data)} rekordow, {len(per_station)} stacji)")
+    table.add_column("Kod", style="cyan")
+    table.add_column("Nazwa", style="green")
+    table.add_column("Rzeka", style="blue")
+    table.add_column("Rekordy", justify="right")
+    for code, count in per_station.items():
+        meta = data.stations.get(code)
+        table.add_row(
+            code,
+            meta.station_name if meta else "-",
+            meta.river_name if meta and meta.river_name else "-",
+            str(count),
+        )
+    console.print(table)
+    console.print("\n[dim]Uzyj --output aby zapisac dane do pliku CSV.[/dim]")
+
+
+@app.command()
+def history(
+    station: str = typer.Option(..., "--station", "-s", help="Kod stacji"),
+    days: float = typer.Option(30, "--days", "-d", help="Liczba ostatnich dni"),
+    param: str = typer.Option(
+        "H",
+        "--param", "-p",
+        help="Parametr: H, Q, T (hydro) lub SYNOP",
+    ),
+    output: str | None = typer.Option(None, "--output", "-o", help="Zapisz do pliku CSV"),
+):
+    """
+    Historia danych biezacych zapisanych przez 'imgw record'.
+
+    Przyklad: imgw db history --station 150160180 --days 30
+    """
+    check_db_enabled()
+
+    from imgwtools.db import db_exists, get_hydro_history, get_synop_history
+
+    if not db_exists():
+        console.print("[yellow]Baza danych nie istnieje.[/yellow]")
+        return
+
+    param = param.upper()
+    if param not in ["H", "Q", "T", "SYNOP"]:
+        console.print("[red]Blad: Parametr musi byc H, Q, T lub SYNOP[/red]")
+        raise typer.Exit(1)
+
+    if param == "SYNOP":
+        records = get_synop_history(station, days=days)
+    else:
+        records = get_hydro_history(station, param, days=days)
+
+    if not records:
+        console.print(
+            f"[yellow]Brak zapisanych danych dla stacji {station} "
+            f"z ostatnich {days:g} dni.[/yellow]\n"
+            "Uruchom 'imgw record' aby zapisywac dane biezace."
+        )
+        return
+
+    if output:
+        import csv
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=records[0].model_dump().keys())
+            writer.writeheader()
+            for r in records:
+                writer.writerow(r.model_dump())
+        console.print(f"[green]Zapisano {len(records)} rekordow do {output}[/green]")
+        return
+
+    table = Table(title=f"Dane dla stacji {station} ({len(records)} rekordow)")
+    table.add_column("Czas (UTC)", style="cyan")
+    if param == "SYNOP":
+        table.add_column("Temp [°C]", justify="right")
+        table.add_column("Opad [mm]", justify="right")
+        table.add_column("Cisnienie [hPa]", justify="right")
+        for r in records[-20:]:
+            table.add_row(
+                r.measured_at.strftime("%Y-%m-%d %H:%M"),
+                f"{r.temperature_c:.1f}" if r.temperature_c is not None else "-",
+                f"{r.precipitation_mm:.1f}" if r.precipitation_mm is not None else "-",
+                f"{r.pressure_hpa:.1f}" if r.pressure_hpa is not None else "-",
+            )
+    else:
+        table.add_column("Wartosc", justify="right")
+        for r in records[-20:]:
+            table.add_row(r.measured_at.strftime("%Y-%m-%d %H:%M"), f"{r.value:g}")
+
+    console.print(table)
+
+    if len(records) > 20:
+        console.print(
+            f"\n[dim]Pokazano ostatnie 20 z {len(records)} rekordow. "
+            "Uzyj --output aby zapisac wszystkie.[/dim]"
+        )
+
+
+@app.command()
+def stats(
+    station: str = typer.Option(..., "--station", "-s", help="Kod stacji"),
+    years: str | None = typer.Option(
+        None, "--years", "-y", help="Zakres lat hydrologicznych (np. 1991-2020)"
+    ),
+    param: str = typer.Option("H", "--param", "-p", help="Parametr: H, Q lub T"),
+    by: str = typer.Option(
+        "hydro_year",
+        "--by", "-b",
+        help="Agregacja: month, year, hydro_year, doy (klimatologia), fdc",
+    ),
+    output: str | None = typer.Option(None, "--output", "-o", help="Zapisz do pliku CSV"),
+):
+    """
+    Statystyki danych dobowych z cache (srednie, ekstrema, krzywa czasu trwania).
+
+    Obliczenia wykonywane sa w bazie danych na danych juz pobranych
+    (np. przez 'imgw db query' lub 'imgw db cache').
+
+    Przyklad: imgw db stats --station 150160180 --param Q --by month -y 2000-2020
+    """
+    check_db_enabled()
+
+    from imgwtools.db import (
+        aggregate_daily,
+        climatology,
+        db_exists,
+        flow_duration_curve,
+        percentiles,
+    )
+
+    if not db_exists():
+        console.print("[yellow]Baza danych nie istnieje.[/yellow]")
+        return
+
+    param = param.upper()
+    if param not in ["H", "Q", "T"]:
+        console.print("[red]Blad: Parametr musi byc H, Q lub T[/red]")
+        raise typer.Exit(1)
+    if by not in ["month", "year", "hydro_year", "doy", "fdc"]:
+        console.print("[red]Blad: --by musi byc month, year, hydro_year, doy lub fdc[/red]")
+        raise typer.Exit(1)
+
+    start_year = end_year = None
+    if years:
+        if "-" in years:
+            parts = years.split("-")
+            start_year = int(parts[0])
+            end_year = int(parts[1])
+        else:
+            start_year = end_year = int(years)
+
+    if by == "doy":
+        records = climatology(station, param, start_year, end_year)
+    elif by == "fdc":
+        records = flow_duration_curve(
+            station, param=param, start_year=start_year, end_year=end_year
+        )
+    else:
+        records = aggregate_daily(station, param, by, start_year, end_year)
+
+    if not records:
+        console.print(
+            f"[yellow]Brak danych dobowych {param} dla stacji {station} w cache.[/yellow]\n"
+            "Pobierz dane poleceniem 'imgw db query'."
+        )
+        return
+
+    if output:
+        import csv
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=records[0].model_dump().keys())
+            writer.writeheader()
+            for r in records:
+                writer.writerow(r.model_dump())
+        console.print(f"[green]Zapisano {len(records)} rekordow do {output}[/green]")
+        return
+
+    table = Table(title=f"Statystyki {param} dla stacji {station}")
+    if by == "fdc":
+        table.add_column("Przewyzszenie [%]", justify="right", style="cyan")
+        table.add_column("Wartosc", justify="right")
+        for r in records:
+            table.add_row(f"{r.exceedance_percent:g}", f"{r.value:.3f}")
+    else:
+        table.add_column("Dzien" if by == "doy" else "Okres", style="cyan")
+        table.add_column("Dni", justify="right")
+        table.add_column("Srednia", justify="right")
+        table.add_column("Min", justify="right")
+        table.add_column("Max", justify="right")
+        for r in records:
+            min_text = f"{r.min:g}"
+            max_text = f"{r.max:g}"
+            if by != "doy":
+                min_text += f" ({r.min_date})"
+                max_text += f" ({r.max_date})"
+            table.add_row(
+                r.day if by == "doy" else r.period,
+                str(r.count),
+                f"{r.mean:.2f}",
+                min_text,
+                max_text,
+            )
+    console.print(table)
+
+    quantiles = percentiles(station, param, [0.05, 0.5, 0.95], start_year, end_year)
+    console.print(
+        f"\nP5: {quantiles[0.05]:.2f}  P50: {quantiles[0.5]:.2f}  "
+        f"P95: {quantiles[0.95]:.2f}"
+    )
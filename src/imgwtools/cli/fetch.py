@@ -2,14 +2,23 @@
 Fetch command for downloading IMGW data.
 """
 
+from collections import Counter
 from pathlib import Path
 
 import httpx
 import typer
 from rich.console import Console
-from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
-
+from rich.progress import BarColumn, Progress, SpinnerColumn, TaskID, TextColumn
+
+import imgwtools.config  # noqa: F401 (applies IMGW_UPSTREAM_URL)
+from imgwtools.bulk import (
+    DEFAULT_CONCURRENCY,
+    MANIFEST_NAME,
+    ArchiveFile,
+    download_archives,
+)
 from imgwtools.core.url_builder import (
+    DownloadURL,
     HydroInterval,
     HydroParam,
     MeteoInterval,
@@ -20,51 +29,65 @@ from imgwtools.core.url_builder import (
     build_meteo_url,
     build_pmaxtp_url,
 )
+from imgwtools.db.progress import CacheEvent
+from imgwtools.resilience import retry_transport
 
 app = typer.Typer(help="Pobieranie danych z IMGW")
 console = Console()
 
 
-def download_file(url: str, output_path: Path, filename: str) -> bool:
-    """Download a file from URL to output path."""
-    output_file = output_path / filename
-
-    if output_file.exists():
-        console.print(f"[yellow]Plik {filename} juz istnieje, pomijam[/yellow]")
-        return False
-
+def download_plan(
+    plan: list[DownloadURL], output: Path, jobs: int, manifest: bool
+) -> list[ArchiveFile]:
+    """Download files concurrently with progress bars (see imgwtools.bulk)."""
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        TextColumn("{task.fields[detail]}"),
         console=console,
     ) as progress:
-        task = progress.add_task(f"Pobieranie {filename}...", total=100)
-
-        try:
-            with httpx.stream("GET", url, timeout=60.0, follow_redirects=True) as response:
-                response.raise_for_status()
-                total = int(response.headers.get("content-length", 0))
-
-                with open(output_file, "wb") as f:
-                    downloaded = 0
-                    for chunk in response.iter_bytes(chunk_size=8192):
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total:
-                            progress.update(task, completed=(downloaded / total) * 100)
-
-            progress.update(task, completed=100)
-            console.print(f"[green]Pobrano: {output_file}[/green]")
-            return True
-
-        except httpx.HTTPStatusError as e:
-            console.print(f"[red]Blad HTTP {e.response.status_code}: {url}[/red]")
-            return False
-        except httpx.HTTPError as e:
-            console.print(f"[red]Blad polaczenia: {e}[/red]")
-            return False
+        overall = progress.add_task("Pliki", total=len(plan), detail="")
+        file_tasks: dict[str, TaskID] = {}
+
+        def on_event(event: CacheEvent):
+            name = event.source_file
+            if event.stage == "download" and not event.finished:
+                if name not in file_tasks:
+                    file_tasks[name] = progress.add_task(name, total=None, detail="")
+                rate = (event.rate or 0) / 1e6
+                progress.update(
+                    file_tasks[name],
+                    completed=event.completed,
+                    total=event.total,
+                    detail=f"{event.completed / 1e6:.1f} MB  {rate:.2f} MB/s",
+                )
+            elif event.stage in ("done", "skipped", "error"):
+                if name in file_tasks:
+                    progress.remove_task(file_tasks.pop(name))
+                progress.advance(overall)
+                if event.stage == "error":
+                    progress.console.print(f"[red]{name}: {event.message}[/red]")
+
+        results = download_archives(
+            plan, output, concurrency=jobs, manifest=manifest, on_event=on_event
+        )
+
+    counts = Counter(result.status for result in results)
+    console.print()
+    console.print(
+        f"[bold green]Pobrano: {counts['downloaded'] + counts['resumed']} plikow"
+        f"[/bold green] (wznowiono: {counts['resumed']}, "
+        f"pominieto istniejace: {counts['skipped']})"
+    )
+    if counts["failed"]:
+        console.print(
+            f"[yellow]Niepowodzenia: {counts['failed']} "
+            f"(ponowne uruchomienie wznowi pobieranie)[/yellow]"
+        )
+    if manifest:
+        console.print(f"Manifest: {output / MANIFEST_NAME}")
+    return results
 
 
 @app.command("hydro")
@@ -94,10 +117,24 @@ def fetch_hydro(
         "--output", "-o",
         help="Katalog wyjsciowy",
     ),
+    jobs: int = typer.Option(
+        DEFAULT_CONCURRENCY,
+        "--jobs", "-j",
+        min=1,
+        help="Liczba plikow pobieranych jednoczesnie",
+    ),
+    manifest: bool = typer.Option(
+        True,
+        "--manifest/--no-manifest",
+        help="Zapisz manifest.json (rozmiary, SHA-256) w katalogu wyjsciowym",
+    ),
 ):
     """
     Pobierz dane hydrologiczne z IMGW.
 
+    Pliki sa pobierane rownolegle; przerwane pobrania sa wznawiane przy
+    kolejnym uruchomieniu, a archiwa ZIP sprawdzane przed zapisem.
+
     Przykłady:
         imgw fetch hydro --interval dobowe --year 2023 --month 1
         imgw fetch hydro --interval polroczne_i_roczne --year 2020-2023 --param Q
@@ -126,54 +163,41 @@ def fetch_hydro(
     console.print(f"Katalog: {output}")
     console.print()
 
-    downloaded = 0
-    failed = 0
+    plan: list[DownloadURL] = []
 
     for y in range(start_year, end_year + 1):
         if hydro_interval == HydroInterval.DAILY:
             if y >= 2023:
                 # From 2023: single file per year
                 try:
-                    result = build_hydro_url(hydro_interval, y)
-                    if download_file(result.url, output, result.filename):
-                        downloaded += 1
+                    plan.append(build_hydro_url(hydro_interval, y))
                 except ValueError as e:
                     console.print(f"[yellow]Pomijam {y}: {e}[/yellow]")
-                    failed += 1
             else:
                 # Before 2023: monthly files
                 months = [month] if month else range(1, 14)  # 13 = phenomena
                 for m in months:
                     try:
-                        result = build_hydro_url(hydro_interval, y, m, hydro_param)
-                        if download_file(result.url, output, result.filename):
-                            downloaded += 1
+                        plan.append(build_hydro_url(hydro_interval, y, m, hydro_param))
                     except ValueError as e:
                         console.print(f"[yellow]Pomijam {y}/{m}: {e}[/yellow]")
-                        failed += 1
         else:
             if hydro_interval == HydroInterval.SEMI_ANNUAL and not hydro_param:
                 # Download all parameters
                 for p in [HydroParam.FLOW, HydroParam.DEPTH, HydroParam.TEMPERATURE]:
                     try:
-                        result = build_hydro_url(hydro_interval, y, param=p)
-                        if download_file(result.url, output, result.filename):
-                            downloaded += 1
-                    except ValueError:
-                        failed += 1
+                        plan.append(build_hydro_url(hydro_interval, y, param=p))
+                    except ValueError as e:
+                        console.print(f"[yellow]Pomijam {y}/{p.value}: {e}[/yellow]")
             else:
                 try:
-                    result = build_hydro_url(hydro_interval, y, param=hydro_param)
-                    if download_file(result.url, output, result.filename):
-                        downloaded += 1
+                    plan.append(build_hydro_url(hydro_interval, y, param=hydro_param))
                 except ValueError as e:
                     console.print(f"[yellow]Pomijam {y}: {e}[/yellow]")
-                    failed += 1
 
-    console.print()
-    console.print(f"[bold green]Pobrano: {downloaded} plikow[/bold green]")
-    if failed:
-        console.print(f"[yellow]Niepowodzenia: {failed}[/yellow]")
+    results = download_plan(plan, output, jobs, manifest)
+    if any(result.status == "failed" for result in results):
+        raise typer.Exit(1)
 
 
 @app.command("meteo")
@@ -203,10 +227,24 @@ def fetch_meteo(
         "--output", "-o",
         help="Katalog wyjsciowy",
     ),
+    jobs: int = typer.Option(
+        DEFAULT_CONCURRENCY,
+        "--jobs", "-j",
+        min=1,
+        help="Liczba plikow pobieranych jednoczesnie",
+    ),
+    manifest: bool = typer.Option(
+        True,
+        "--manifest/--no-manifest",
+        help="Zapisz manifest.json (rozmiary, SHA-256) w katalogu wyjsciowym",
+    ),
 ):
     """
     Pobierz dane meteorologiczne z IMGW.
 
+    Pliki sa pobierane rownolegle; przerwane pobrania sa wznawiane przy
+    kolejnym uruchomieniu, a archiwa ZIP sprawdzane przed zapisem.
+
     Przykłady:
         imgw fetch meteo --interval dobowe --subtype klimat --year 2023 --month 1
         imgw fetch meteo --interval miesieczne --subtype synop --year 2020-2023
@@ -235,42 +273,32 @@ def fetch_meteo(
     console.print(f"Katalog: {output}")
     console.print()
 
-    downloaded = 0
-    failed = 0
+    plan: list[DownloadURL] = []
 
     for y in range(start_year, end_year + 1):
         if y <= 2000:
             # 1951-2000: yearly files (no monthly split)
             try:
-                result = build_meteo_url(meteo_interval, meteo_subtype, y)
-                if download_file(result.url, output, result.filename):
-                    downloaded += 1
+                plan.append(build_meteo_url(meteo_interval, meteo_subtype, y))
             except ValueError as e:
                 console.print(f"[yellow]Pomijam {y}: {e}[/yellow]")
-                failed += 1
         elif meteo_interval in [MeteoInterval.DAILY, MeteoInterval.HOURLY]:
             # 2001+: monthly files
             months = [month] if month else range(1, 13)
             for m in months:
                 try:
-                    result = build_meteo_url(meteo_interval, meteo_subtype, y, m)
-                    if download_file(result.url, output, result.filename):
-                        downloaded += 1
-                except ValueError:
-                    failed += 1
+                    plan.append(build_meteo_url(meteo_interval, meteo_subtype, y, m))
+                except ValueError as e:
+                    console.print(f"[yellow]Pomijam {y}/{m}: {e}[/yellow]")
         else:
             try:
-                result = build_meteo_url(meteo_interval, meteo_subtype, y)
-                if download_file(result.url, output, result.filename):
-                    downloaded += 1
+                plan.append(build_meteo_url(meteo_interval, meteo_subtype, y))
             except ValueError as e:
                 console.print(f"[yellow]Pomijam {y}: {e}[/yellow]")
-                failed += 1
 
-    console.print()
-    console.print(f"[bold green]Pobrano: {downloaded} plikow[/bold green]")
-    if failed:
-        console.print(f"[yellow]Niepowodzenia: {failed}[/yellow]")
+    results = download_plan(plan, output, jobs, manifest)
+    if any(result.status == "failed" for result in results):
+        raise typer.Exit(1)
 
 
 @app.command("current")
@@ -316,7 +344,7 @@ def fetch_current(
     console.print()
 
     try:
-        with httpx.Client(timeout=30.0) as client:
+        with httpx.Client(timeout=30.0, transport=retry_transport()) as client:
             response = client.get(url)
             response.raise_for_status()
             data = response.json()
@@ -379,7 +407,7 @@ def fetch_pmaxtp(
     console.print()
 
     try:
-        with httpx.Client(timeout=30.0) as client:
+        with httpx.Client(timeout=30.0, transport=retry_transport()) as client:
             response = client.get(url)
             response.raise_for_status()
             data = response.json()
@@ -429,7 +457,7 @@ def fetch_warnings(
     console.print()
 
     try:
-        with httpx.Client(timeout=30.0) as client:
+        with httpx.Client(timeout=30.0, transport=retry_transport()) as client:
             response = client.get(url)
             response.raise_for_status()
             data = response.json()
@@ -0,0 +1,59 @@
+"""
+Lazily loaded CLI subcommand groups.
+
+Subcommand modules (fetch, db, ...) import httpx, rich and the settings;
+loading them only when their group is invoked keeps `imgw --help`,
+`imgw version` and other short calls fast.
+"""
+
+import importlib
+
+import typer
+from typer.core import TyperCommand, TyperGroup
+from typer.models import TyperInfo
+
+
+class LazyTyperGroup(TyperGroup):
+    """
+    Typer group whose subcommand groups are imported on first use.
+
+    Subclasses set ``lazy_commands``: name -> (module, help). Each module
+    must define a ``typer.Typer`` instance called ``app``; it is built
+    like a group added with ``add_typer`` (markup mode of this group, no
+    completion options). Help output lists lazy groups from their help
+    text without importing them.
+
+    Example:
+        >>> class Group(LazyTyperGroup):
+        ...     lazy_commands = {"db": ("imgwtools.cli.db", "Baza danych")}
+        >>> app = typer.Typer(cls=Group)
+    """
+
+    lazy_commands: dict[str, tuple[str, str]] = {}
+
+    _listing = False
+
+    def list_commands(self, ctx) -> list[str]:
+        eager = [name for name in self.commands if name not in self.lazy_commands]
+        return [*self.lazy_commands, *eager]
+
+    def get_command(self, ctx, cmd_name: str):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module_name, help_text = self.lazy_commands[cmd_name]
+            if self._listing:
+                return TyperCommand(name=cmd_name, help=help_text)
+            module = importlib.import_module(module_name)
+            self.commands[cmd_name] = typer.main.get_group_from_info(
+                TyperInfo(module.app, name=cmd_name, help=help_text),
+                pretty_exceptions_short=module.app.pretty_exceptions_short,
+                suggest_commands=self.suggest_commands,
+                rich_markup_mode=self.rich_markup_mode,
+            )
+        return self.commands.get(cmd_name)
+
+    def format_commands(self, ctx, formatter) -> None:
+        self._listing = True
+        try:
+            super().format_commands(ctx, formatter)
+        finally:
+            self._listing = False
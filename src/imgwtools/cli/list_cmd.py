@@ -7,6 +7,8 @@ import typer
 from rich.console import Console
 from rich.table import Table
 
+import imgwtools.config  # noqa: F401 (applies IMGW_UPSTREAM_URL)
+
 app = typer.Typer(help="Listowanie stacji i zbiorow danych")
 console = Console()
 
@@ -28,6 +30,16 @@ def list_stations(
         "--search", "-s",
         help="Szukaj po nazwie",
     ),
+    near: str | None = typer.Option(
+        None,
+        "--near", "-n",
+        help="Najblizsze stacje do punktu 'lat,lon' (np. 52.23,21.01)",
+    ),
+    radius: float | None = typer.Option(
+        None,
+        "--radius", "-r",
+        help="Promien wyszukiwania [km] (z --near)",
+    ),
 ):
     """
     Lista stacji pomiarowych.
@@ -35,37 +47,31 @@ def list_stations(
     Przykłady:
         imgw list stations --type hydro
         imgw list stations --type meteo --search Warszawa
+        imgw list stations --near 52.23,21.01 --limit 5
+        imgw list stations --near 52.23,21.01 --radius 25
     """
-    import pandas as pd
+    if near:
+        _list_nearest_stations(data_type, near, radius, limit)
+        return
 
-    from imgwtools.config import settings
+    from imgwtools.registry import get_station_registry
 
+    registry = get_station_registry()
     if data_type == "hydro":
-        csv_file = settings.hydro_stations_file
+        stations = registry.search_hydro(search)
     elif data_type == "meteo":
-        csv_file = settings.meteo_stations_file
+        stations = registry.search_meteo(search)
     else:
         console.print(f"[red]Nieprawidlowy typ: {data_type}[/red]")
         raise typer.Exit(1)
 
-    if not csv_file.exists():
-        console.print(f"[yellow]Plik {csv_file} nie istnieje[/yellow]")
+    if not stations and registry.last_error:
+        console.print(f"[red]Blad odczytu pliku: {registry.last_error}[/red]")
         console.print("Pobierz dane stacji lub skonfiguruj IMGW_DATA_DIR")
         raise typer.Exit(1)
 
-    try:
-        df = pd.read_csv(csv_file, encoding="utf-8")
-    except Exception as e:
-        console.print(f"[red]Blad odczytu pliku: {e}[/red]")
-        raise typer.Exit(1)
-
-    # Filter by search term
-    if search:
-        mask = df.iloc[:, 1].str.contains(search, case=False, na=False)
-        df = df[mask]
-
     # Limit results
-    df = df.head(limit)
+    stations = stations[:limit]
 
     # Display table
     table = Table(title=f"Stacje {data_type}")
@@ -74,14 +80,58 @@ def list_stations(
     if data_type == "hydro":
         table.add_column("Rzeka", style="blue")
 
-    for _, row in df.iterrows():
+    for station in stations:
         if data_type == "hydro":
-            table.add_row(str(row.iloc[0]), str(row.iloc[1]), str(row.iloc[2]) if len(row) > 2 else "")
+            table.add_row(station.station_id, station.name, station.river or "")
         else:
-            table.add_row(str(row.iloc[0]), str(row.iloc[1]))
+            table.add_row(station.station_id, station.name)
+
+    console.print(table)
+    console.print(f"\nWyswietlono {len(stations)} z {limit} wynikow")
+
+
+def _list_nearest_stations(
+    data_type: str,
+    near: str,
+    radius: float | None,
+    limit: int,
+) -> None:
+    """Display stations nearest to a point using the spatial index."""
+    from imgwtools.registry import get_station_registry
+
+    if data_type != "hydro":
+        console.print("[red]Wspolrzedne dostepne sa tylko dla stacji hydro[/red]")
+        raise typer.Exit(1)
+
+    try:
+        lat_str, lon_str = near.split(",")
+        lat, lon = float(lat_str), float(lon_str)
+    except ValueError:
+        console.print(f"[red]Nieprawidlowy punkt: {near} (oczekiwano lat,lon)[/red]")
+        raise typer.Exit(1)
+
+    registry = get_station_registry()
+    index = registry.hydro_index
+    if not len(index) and registry.last_error:
+        console.print(f"[red]Blad odczytu pliku: {registry.last_error}[/red]")
+        raise typer.Exit(1)
+
+    if radius is not None:
+        results = index.within_radius(lat, lon, radius)[:limit]
+    else:
+        results = index.nearest(lat, lon, k=limit)
+
+    table = Table(title=f"Stacje hydro najblizej {lat:.4f}, {lon:.4f}")
+    table.add_column("ID", style="cyan")
+    table.add_column("Nazwa", style="green")
+    table.add_column("Rzeka", style="blue")
+    table.add_column("Odleglosc [km]", justify="right")
+
+    for station, km in results:
+        table.add_row(station.station_id, station.name, station.river or "", f"{km:.1f}")
 
     console.print(table)
-    console.print(f"\nWyswietlono {len(df)} z {limit} wynikow")
+    console.print(f"\nWyswietlono {len(results)} stacji")
 
 
 @app.command("datasets")
@@ -6,34 +6,51 @@ Usage:
     imgw fetch meteo --interval miesieczne --year 2023 --subtype klimat
     imgw list stations --type hydro
     imgw admin keys create --name "User1"
+    imgw record --interval 600
+    imgw fake-server --port 8090 --latency 0.05
 """
 
+from functools import cache
+
 import typer
-from rich.console import Console
 
-from imgwtools.cli import admin, db, fetch, list_cmd
+from imgwtools._version import __version__
+from imgwtools.cli.lazy import LazyTyperGroup
+
+
+class _MainGroup(LazyTyperGroup):
+    # Subcommands imported only when invoked (fast startup)
+    lazy_commands = {
+        "fetch": ("imgwtools.cli.fetch", "Pobieranie danych"),
+        "list": ("imgwtools.cli.list_cmd", "Listowanie stacji i zbiorow danych"),
+        "admin": ("imgwtools.cli.admin", "Administracja (klucze API)"),
+        "db": ("imgwtools.cli.db", "Zarzadzanie baza danych cache"),
+    }
 
-# Create main app
+
+# Create main app (plain help output: rich help rendering alone takes
+# longer to import than the rest of the CLI)
 app = typer.Typer(
     name="imgw",
     help="Narzedzie do pobierania danych publicznych z IMGW-PIB",
     add_completion=False,
+    cls=_MainGroup,
+    rich_markup_mode=None,
 )
 
-# Console for rich output
-console = Console()
 
-# Add subcommands
-app.add_typer(fetch.app, name="fetch", help="Pobieranie danych")
-app.add_typer(list_cmd.app, name="list", help="Listowanie stacji i zbiorow danych")
-app.add_typer(admin.app, name="admin", help="Administracja (klucze API)")
-app.add_typer(db.app, name="db", help="Zarzadzanie baza danych cache")
+@cache
+def get_console():
+    """Console for rich output (rich is imported on first use)."""
+    from rich.console import Console
+
+    return Console()
 
 
 @app.command()
 def version():
     """Wyswietl wersje programu."""
-    console.print("[bold]IMGWTools[/bold] v1.0.0")
+    typer.echo(f"{typer.style('IMGWTools', bold=True)} v{__version__}")
 
 
 @app.command()
@@ -45,6 +62,7 @@ def server(
     """Uruchom serwer API."""
     import uvicorn
 
+    console = get_console()
     console.print(f"[bold green]Uruchamiam serwer na {host}:{port}[/bold green]")
     uvicorn.run(
         "imgwtools.api.main:app",
@@ -54,6 +72,102 @@ def server(
     )
 
 
+@app.command("fake-server")
+def fake_server(
+    host: str = typer.Option("127.0.0.1", help="Host do nasluchu"),
+    port: int = typer.Option(8090, help="Port do nasluchu"),
+    stations: int = typer.Option(850, "--stations", "-n", help="Liczba stacji hydro"),
+    latency: float = typer.Option(0.0, "--latency", help="Opoznienie odpowiedzi [s]"),
+    failure_rate: float = typer.Option(
+        0.0, "--failure-rate", help="Udzial odpowiedzi z bledem (0-1)"
+    ),
+    failure_status: int = typer.Option(503, "--failure-status", help="Kod bledu HTTP"),
+):
+    """
+    Uruchom lokalny serwer udajacy IMGW (testy offline i obciazeniowe).
+
+    Serwuje syntetyczne archiwa ZIP, dane biezace, ostrzezenia, PMAXTP
+    i mape stacji. Aby z niego korzystac, ustaw IMGW_UPSTREAM_URL na
+    adres serwera, np. IMGW_UPSTREAM_URL=http://127.0.0.1:8090.
+    """
+    from imgwtools.testing import FakeIMGWServer
+
+    console = get_console()
+    server = FakeIMGWServer(
+        n_stations=stations,
+        host=host,
+        port=port,
+        latency=latency,
+        failure_rate=failure_rate,
+        failure_status=failure_status,
+    )
+    console.print(
+        f"[bold green]Serwer IMGW (fake) na {server.base_url}[/bold green] "
+        f"(Ctrl+C aby zakonczyc)"
+    )
+    console.print(f"export IMGW_UPSTREAM_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Zatrzymano.[/yellow]")
+    finally:
+        server.stop()
+
+
+@app.command()
+def record(
+    interval: int = typer.Option(
+        600, "--interval", "-i", help="Odstep miedzy pobraniami [s]"
+    ),
+    retention: int | None = typer.Option(
+        None,
+        "--retention", "-r",
+        help="Przechowuj dane z ostatnich N dni (0 = bez limitu)",
+    ),
+    once: bool = typer.Option(False, "--once", help="Pobierz dane jeden raz i zakoncz"),
+):
+    """
+    Zapisuj dane biezace (hydro i synop) do bazy danych.
+
+    Dziala w petli do przerwania (Ctrl+C). Kazdy pomiar zapisywany jest raz.
+    Historie mozna odczytac poleceniem 'imgw db history'.
+    """
+    import asyncio
+    from datetime import datetime
+
+    from imgwtools.cli.db import check_db_enabled
+    from imgwtools.config import settings
+    from imgwtools.db import RealtimeRecorder, init_db
+
+    console = get_console()
+    check_db_enabled()
+    init_db()
+
+    recorder = RealtimeRecorder(retention_days=retention)
+
+    def report(result):
+        now = datetime.now().strftime("%H:%M:%S")
+        console.print(
+            f"[dim]{now}[/dim] hydro: [green]+{result.hydro}[/green], "
+            f"synop: [green]+{result.synop}[/green]"
+            + (f", usunieto: {result.pruned}" if result.pruned else "")
+        )
+        for error in result.errors:
+            console.print(f"[yellow]Blad pobierania {error}[/yellow]")
+
+    if not once:
+        console.print(
+            f"[bold green]Zapisywanie danych biezacych co {interval} s "
+            f"do {settings.db_path}[/bold green] (Ctrl+C aby zakonczyc)"
+        )
+    try:
+        asyncio.run(
+            recorder.run(interval, iterations=1 if once else None, on_poll=report)
+        )
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Zatrzymano.[/yellow]")
+
+
 def main():
     """Entry point for CLI."""
     app()
@@ -7,6 +7,10 @@ from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from imgwtools.core.url_builder import set_base_url
+from imgwtools.resilience import RetryPolicy, configure_resilience
+from imgwtools.throttle import UpstreamThrottle, configure_throttle
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -25,19 +29,66 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
 
-    # API Keys
+    # API Keys (imgw admin); without a required key, requests with no
+    # X-API-Key header are limited per client address
     api_keys_file: Path = Path("./api_keys.json")
+    api_auth_required: bool = False
 
-    # Rate limiting (requests per hour, 0 = unlimited)
+    # Rate limiting (requests per hour, 0 = unlimited) of anonymous clients
+    # and keys without their own limit
     rate_limit: int = 100
 
+    # Request counts shared by API workers, read by 'imgw admin stats'
+    api_usage_file: Path = Path("./data/api_usage.db")
+
     # Data directory
     data_dir: Path = Path("./data")
 
+    # Host serving all IMGW endpoints instead of the public servers, e.g. a
+    # local fake server (imgw fake-server) for offline and load tests
+    upstream_url: str | None = None
+
+    # Retries of failed IMGW requests (attempts including the first one,
+    # exponential backoff base and cap in seconds)
+    retry_attempts: int = 4
+    retry_backoff: float = 0.5
+    retry_max_delay: float = 30.0
+
+    # Per-host circuit breaker: consecutive failures that open it and
+    # seconds until a trial request is let through
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_reset: float = 30.0
+
+    # Client-side rate limit per IMGW host (requests/s, 0 = unlimited),
+    # burst size and tokens kept for interactive requests during
+    # backfills; the optional SQLite file shares the limit between processes
+    upstream_rate: float = 10.0
+    upstream_burst: int = 20
+    upstream_reserve: int = 5
+    upstream_rate_store: Path | None = None
+
+    # Station registry refresh from IMGW in seconds (0 = bundled files only)
+    station_refresh_interval: int = 86400
+
+    # Web map payload refresh in seconds (0 = refresh on request only)
+    map_refresh_interval: int = 120
+
+    # Change feed poll interval in seconds (0 = feed disabled)
+    feed_poll_interval: int = 60
+
+    # Warnings store refresh in seconds (0 = refresh on request only)
+    warnings_refresh_interval: int = 60
+
     # Database settings (SQLite cache for hydro data)
     db_enabled: bool = False
     db_path: Path = Path("./data/imgw_hydro.db")
 
+    # Real-time history kept by 'imgw record' in days (0 = keep everything)
+    realtime_retention_days: int = 90
+
+    # Prometheus metrics at GET /metrics
+    metrics_enabled: bool = True
+
     # Logging
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
 
@@ -66,6 +117,37 @@ class Settings(BaseSettings):
         """Path to Poland shapefile."""
         return self.data_dir / "shp" / "polska.shp"
 
+    @property
+    def regions_geojson_path(self) -> Path:
+        """Path to TERYT region boundaries (GeoJSON, WGS84) for point queries."""
+        return self.data_dir / "shp" / "powiaty.geojson"
+
+    @property
+    def boundary_cache_path(self) -> Path:
+        """Path to preprocessed boundary geometry (built from the shapefile)."""
+        return self.data_dir / "shp" / "polska_boundary.npz"
+
 
 # Global settings instance
 settings = Settings()
+
+if settings.upstream_url:
+    set_base_url(settings.upstream_url)
+
+configure_resilience(
+    RetryPolicy(
+        max_attempts=settings.retry_attempts,
+        backoff=settings.retry_backoff,
+        max_delay=settings.retry_max_delay,
+    ),
+    failure_threshold=settings.circuit_breaker_threshold,
+    reset_timeout=settings.circuit_breaker_reset,
+)
+configure_throttle(
+    UpstreamThrottle(
+        rate=settings.upstream_rate,
+        burst=settings.upstream_burst,
+        reserve=settings.upstream_reserve,
+        store_path=settings.upstream_rate_store,
+    )
+)
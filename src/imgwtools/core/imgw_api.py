@@ -26,6 +26,8 @@ import warnings
 
 import requests
 
+from imgwtools.core.url_builder import get_api_url, get_pmaxtp_url
+
 _DEPRECATION_MESSAGE = (
     "Legacy IMGW API classes (IMGWAPI, HYDRO, SYNOP, METEO, WARNINGS, PMAXTPAPI) "
     "are deprecated since version 2.0.0 and will be removed in version 3.0.0. "
@@ -47,7 +49,7 @@ class IMGWAPI:
         Initializes the IMGWAPI instance with the base URL.
         """
         warnings.warn(_DEPRECATION_MESSAGE, DeprecationWarning, stacklevel=2)
-        self.base_url = "https://danepubliczne.imgw.pl/api/data/"
+        self.base_url = f"{get_api_url()}/"
 
     def establish_connection(self, url):
         """
@@ -242,7 +244,7 @@ class PMAXTPAPI:
             DeprecationWarning,
             stacklevel=2,
         )
-        self.base_url = "https://powietrze.imgw.pl/tpmax-api/point/"
+        self.base_url = f"{get_pmaxtp_url()}/"
         self.method = method
         self.lon = self.format_coordinate(lon)  # Formatowanie długości geograficznej
         self.lat = self.format_coordinate(lat)  # Formatowanie szerokości geograficznej
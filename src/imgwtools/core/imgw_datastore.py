@@ -4,6 +4,8 @@ from pathlib import Path
 
 import wget
 
+from imgwtools.core.url_builder import get_public_data_url
+
 
 class DataDownloader:
     """
@@ -23,9 +25,7 @@ class DataDownloader:
         :param meteo_data_subtype: Podtyp danych meteorologicznych (np. klimat, opad, synop).
         :param meteo_data_interval: Interwał danych meteorologicznych (dobowe, miesięczne, terminowe).
         """
-        self.public_data_url = (
-            r"https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne"
-        )
+        self.public_data_url = get_public_data_url()
         self.data_type = data_type
         self.meteo_data_subtype = meteo_data_subtype
         self.meteo_data_interval = meteo_data_interval
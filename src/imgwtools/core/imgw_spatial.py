@@ -1,22 +1,74 @@
 import matplotlib.pyplot as plt
-import pandas as pd
-import shapefile as shp
-from imgw_api import HYDRO, METEO, SYNOP
-from pyproj import Transformer
+import numpy as np
+
+from imgwtools.boundary import load_boundary
+from imgwtools.core.imgw_api import HYDRO, METEO, SYNOP
+from imgwtools.core.projection import PUWG1992, WGS84, get_transformer
+from imgwtools.stations import load_station_locations_from_csv
+
+
+def wgs84_to_epsg2180(lat, lon):
+    """
+    Reproject WGS84 coordinates to EPSG:2180 (PUWG 1992).
+
+    Accepts scalars or arrays; whole arrays are transformed in one call.
+
+    :param lat: Latitude(s) in decimal degrees
+    :param lon: Longitude(s) in decimal degrees
+    :return: Tuple of arrays (x, y) - easting and northing in metres
+    """
+    x, y = get_transformer(WGS84, PUWG1992).transform(
+        np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)
+    )
+    return np.asarray(x), np.asarray(y)
+
+
+def epsg2180_to_wgs84(x, y):
+    """
+    Reproject EPSG:2180 (PUWG 1992) coordinates back to WGS84.
+
+    :param x: Easting(s) in metres
+    :param y: Northing(s) in metres
+    :return: Tuple of arrays (lat, lon) in decimal degrees
+    """
+    lon, lat = get_transformer(PUWG1992, WGS84).transform(
+        np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    )
+    return np.asarray(lat), np.asarray(lon)
+
+
+def load_station_locations_epsg2180(csv_path):
+    """
+    Read a station locations CSV (id, X=lon, Y=lat) and reproject all rows.
+
+    Rows with missing coordinates ("NA") are skipped.
+
+    :param csv_path: Path to the CSV file (e.g. hydro_stations_locations.csv)
+    :return: Tuple (ids, x, y) - list of station IDs and coordinate arrays
+    """
+    coords = load_station_locations_from_csv(csv_path)
+    ids = list(coords)
+    if not ids:
+        return ids, np.empty(0), np.empty(0)
+    lat, lon = np.array([coords[i] for i in ids], dtype=float).T
+    x, y = wgs84_to_epsg2180(lat, lon)
+    return ids, x, y
 
 
 class StationMap:
-    def __init__(self, station_id, data_type, shapefile_path):
+    def __init__(self, station_id, data_type, shapefile_path, boundary_level=1):
         """
         Initialize the StationMap with station ID, data type, and shapefile path.
 
         :param station_id: ID of the station
         :param data_type: Type of data (hydro, synop, meteo)
         :param shapefile_path: Path to the shapefile
+        :param boundary_level: Outline simplification level (0 = full detail)
         :param measurement_api: API instance to fetch measurement data
         """
         self.station_id = station_id
         self.shapefile_path = shapefile_path
+        self.boundary_level = boundary_level
         self.data_type = data_type
         self.measurement_data = self.fetch_measurement_data()
         if data_type != "synop":
@@ -55,23 +107,30 @@ class StationMap:
 
         :param lat: Latitude
         :param lon: Longitude
-        :return: Reprojected coordinates (x, y)
+        :return: Reprojected coordinates (northing, easting)
+        """
+        x, y = wgs84_to_epsg2180(lat, lon)
+        return float(y), float(x)
+
+    def plot_boundary(self):
+        """
+        Plot the country outline from the preprocessed boundary cache.
+
+        The configured shapefile shares its cache with the web map.
         """
-        transformer = Transformer.from_crs("EPSG:4326", "EPSG:2180")
-        y, x = transformer.transform(lat, lon)
-        return y, x
+        boundary = load_boundary(
+            self.boundary_level, shapefile_path=self.shapefile_path
+        )
+        for part in boundary.parts():
+            plt.plot(part[:, 0], part[:, 1])
 
     def plot_map(self):
         """
         Plot the map with the station location.
         """
         try:
-            sf = shp.Reader(self.shapefile_path)
             plt.figure()
-            for shape in sf.shapeRecords():
-                x = [i[0] for i in shape.shape.points[:]]
-                y = [i[1] for i in shape.shape.points[:]]
-                plt.plot(x, y)
+            self.plot_boundary()
 
             plt.plot(
                 self.station_x, self.station_y, "ro"
@@ -93,22 +152,12 @@ class StationMap:
         :param csv_path: Path to the CSV file
         """
         try:
-            data = pd.read_csv(csv_path)
-            sf = shp.Reader(self.shapefile_path)
+            _ids, station_x, station_y = load_station_locations_epsg2180(csv_path)
             plt.figure()
-            for shape in sf.shapeRecords():
-                x = [i[0] for i in shape.shape.points[:]]
-                y = [i[1] for i in shape.shape.points[:]]
-                plt.plot(x, y)
-
-            for _index, row in data.iterrows():
-                if row["X"] != "NA" and row["Y"] != "NA":
-                    station_y, station_x = self.reproject_to_epsg2180(
-                        float(row["Y"]), float(row["X"])
-                    )
-                plt.plot(
-                    station_x, station_y, "ro"
-                )  # 'ro' means red color, circle marker
+            self.plot_boundary()
+
+            # 'ro' means red color, circle marker
+            plt.plot(station_x, station_y, "ro")
 
             plt.title("Hydrological Stations")
             plt.xlabel("Longitude")
@@ -0,0 +1,36 @@
+"""
+Module: projection
+
+Cached pyproj transformers shared by the spatial helpers and the boundary
+cache. Requires pyproj: pip install imgwtools[spatial]
+"""
+
+import threading
+
+from pyproj import Transformer
+
+WGS84 = "EPSG:4326"
+PUWG1992 = "EPSG:2180"
+
+# pyproj transformers are expensive to build and not thread-safe,
+# so each thread keeps its own instances, built once per CRS pair.
+_local = threading.local()
+
+
+def get_transformer(source_crs, target_crs):
+    """
+    Get a cached transformer between two coordinate reference systems.
+
+    Axis order is always (x/longitude, y/latitude).
+
+    :param source_crs: Source CRS (e.g. "EPSG:4326")
+    :param target_crs: Target CRS (e.g. "EPSG:2180")
+    :return: pyproj Transformer
+    """
+    cache = getattr(_local, "transformers", None)
+    if cache is None:
+        cache = _local.transformers = {}
+    key = (source_crs, target_crs)
+    if key not in cache:
+        cache[key] = Transformer.from_crs(source_crs, target_crs, always_xy=True)
+    return cache[key]
@@ -60,10 +60,87 @@ class DownloadURL:
     month: int | None = None
 
 
-# Base URLs for IMGW services
-IMGW_PUBLIC_DATA_URL = "https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne"
-IMGW_API_URL = "https://danepubliczne.imgw.pl/api/data"
-IMGW_PMAXTP_URL = "https://powietrze.imgw.pl/tpmax-api/point"
+# Base URLs of the public IMGW services
+_DEFAULT_URLS = {
+    "IMGW_PUBLIC_DATA_URL": (
+        "https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne"
+    ),
+    "IMGW_API_URL": "https://danepubliczne.imgw.pl/api/data",
+    "IMGW_PMAXTP_URL": "https://powietrze.imgw.pl/tpmax-api/point",
+    "IMGW_HYDRO_BACK_URL": "https://hydro-back.imgw.pl",
+}
+
+# Paths of the services on their hosts (kept when the host is overridden)
+_SERVICE_PATHS = {
+    "IMGW_PUBLIC_DATA_URL": "/data/dane_pomiarowo_obserwacyjne",
+    "IMGW_API_URL": "/api/data",
+    "IMGW_PMAXTP_URL": "/tpmax-api/point",
+    "IMGW_HYDRO_BACK_URL": "",
+}
+
+# Current base URLs (changed by set_base_url)
+_urls = dict(_DEFAULT_URLS)
+
+# Served by __getattr__ (annotated only, so they are never bound here)
+IMGW_PUBLIC_DATA_URL: str
+IMGW_API_URL: str
+IMGW_PMAXTP_URL: str
+IMGW_HYDRO_BACK_URL: str
+
+
+def __getattr__(name: str) -> str:
+    """IMGW_*_URL constants, resolved on access so they follow set_base_url."""
+    try:
+        return _urls[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+def get_public_data_url() -> str:
+    """Base URL of the IMGW public data archives (danepubliczne)."""
+    return _urls["IMGW_PUBLIC_DATA_URL"]
+
+
+def get_api_url() -> str:
+    """Base URL of the IMGW real-time API."""
+    return _urls["IMGW_API_URL"]
+
+
+def get_pmaxtp_url() -> str:
+    """Base URL of the PMAXTP API."""
+    return _urls["IMGW_PMAXTP_URL"]
+
+
+def get_hydro_back_url() -> str:
+    """Base URL of the hydro-back map API."""
+    return _urls["IMGW_HYDRO_BACK_URL"]
+
+
+def set_base_url(base_url: str | None) -> None:
+    """
+    Redirect all IMGW services to one host, e.g. a local fake server.
+
+    Service paths are kept, so with ``http://localhost:8090`` archives are
+    fetched from ``http://localhost:8090/data/dane_pomiarowo_obserwacyjne``
+    and the real-time API from ``http://localhost:8090/api/data``.
+    The API and CLI apply ``IMGW_UPSTREAM_URL`` through this function.
+    The ``IMGW_*_URL`` constants (also those re-exported by imgwtools and
+    imgwtools.urls) and the get_*_url() accessors follow the override.
+
+    Args:
+        base_url: Scheme and host (optionally a path prefix), or None to
+            restore the public IMGW servers.
+
+    Example:
+        >>> set_base_url("http://127.0.0.1:8090")
+        >>> build_api_url("hydro")
+        'http://127.0.0.1:8090/api/data/hydro'
+    """
+    for name, path in _SERVICE_PATHS.items():
+        if base_url:
+            _urls[name] = f"{base_url.rstrip('/')}{path}"
+        else:
+            _urls[name] = _DEFAULT_URLS[name]
 
 
 def _get_meteo_folder(year: int) -> str:
@@ -110,7 +187,7 @@ def build_hydro_url(
     Raises:
         ValueError: If required parameters are missing.
     """
-    base = f"{IMGW_PUBLIC_DATA_URL}/{DataType.HYDRO.value}"
+    base = f"{get_public_data_url()}/{DataType.HYDRO.value}"
 
     if interval == HydroInterval.DAILY:
         if month == 13:
@@ -178,7 +255,7 @@ def build_meteo_url(
         For years 1951-2000: data in 5-year folders, yearly files (no monthly split).
         For years 2001+: data in yearly folders, monthly files.
     """
-    base = f"{IMGW_PUBLIC_DATA_URL}/{DataType.METEO.value}"
+    base = f"{get_public_data_url()}/{DataType.METEO.value}"
 
     # Get subtype abbreviation
     subtype_abbr = subtype.value[0]  # k, o, s
@@ -239,7 +316,7 @@ def build_pmaxtp_url(
     lat_str = f"{latitude:.4f}"
     lon_str = f"{longitude:.4f}"
 
-    return f"{IMGW_PMAXTP_URL}/{method.value[0]}/KS/{lat_str}/{lon_str}"
+    return f"{get_pmaxtp_url()}/{method.value[0]}/KS/{lat_str}/{lon_str}"
 
 
 def build_api_url(
@@ -258,7 +335,7 @@ def build_api_url(
     Returns:
         URL for IMGW API endpoint.
     """
-    url = f"{IMGW_API_URL}/{endpoint}"
+    url = f"{get_api_url()}/{endpoint}"
 
     if station_id:
         url += f"/id/{station_id}"
@@ -268,6 +345,32 @@ def build_api_url(
     return url
 
 
+def build_station_list_url(data_type: DataType) -> str:
+    """
+    Build URL of the IMGW station list CSV.
+
+    Args:
+        data_type: Type of data (hydro or meteo)
+
+    Returns:
+        URL of lista_stacji_hydro.csv or wykaz_stacji.csv.
+    """
+    filename = (
+        "lista_stacji_hydro.csv" if data_type == DataType.HYDRO else "wykaz_stacji.csv"
+    )
+    return f"{get_public_data_url()}/{data_type.value}/{filename}"
+
+
+def build_hydro_map_url() -> str:
+    """
+    Build URL of the hydro-back station map feed.
+
+    Returns:
+        URL returning hydrological stations with coordinates and state.
+    """
+    return f"{get_hydro_back_url()}/map/stations/hydrologic"
+
+
 def get_available_years(data_type: DataType, interval: str) -> tuple[int, int]:
     """
     Get the range of available years for a given data type and interval.
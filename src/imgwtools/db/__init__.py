@@ -47,6 +47,36 @@ def __getattr__(name: str):
     elif name == "get_repository":
         from imgwtools.db.repository import get_repository
         return get_repository
+    elif name == "RealtimeRecorder":
+        from imgwtools.db.realtime import RealtimeRecorder
+        return RealtimeRecorder
+    elif name == "get_hydro_history":
+        from imgwtools.db.realtime import get_hydro_history
+        return get_hydro_history
+    elif name == "get_synop_history":
+        from imgwtools.db.realtime import get_synop_history
+        return get_synop_history
+    elif name == "aggregate_daily":
+        from imgwtools.db.aggregate import aggregate_daily
+        return aggregate_daily
+    elif name == "climatology":
+        from imgwtools.db.aggregate import climatology
+        return climatology
+    elif name == "percentiles":
+        from imgwtools.db.aggregate import percentiles
+        return percentiles
+    elif name == "flow_duration_curve":
+        from imgwtools.db.aggregate import flow_duration_curve
+        return flow_duration_curve
+    elif name == "DailyMatrix":
+        from imgwtools.db.matrix import DailyMatrix
+        return DailyMatrix
+    elif name == "CacheEvent":
+        from imgwtools.db.progress import CacheEvent
+        return CacheEvent
+    elif name == "JsonEventLogger":
+        from imgwtools.db.progress import JsonEventLogger
+        return JsonEventLogger
     elif name == "init_db":
         from imgwtools.db.schema import init_db
         return init_db
@@ -73,4 +103,14 @@ __all__ = [
     "get_repository",
     "HydroCacheManager",
     "get_cache_manager",
+    "CacheEvent",
+    "JsonEventLogger",
+    "RealtimeRecorder",
+    "get_hydro_history",
+    "get_synop_history",
+    "aggregate_daily",
+    "climatology",
+    "percentiles",
+    "flow_duration_curve",
+    "DailyMatrix",
 ]
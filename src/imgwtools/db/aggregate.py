@@ -0,0 +1,320 @@
+"""
+Aggregation of cached daily hydro series.
+
+Statistics are computed inside SQLite (GROUP BY and window functions),
+so only the aggregated rows leave the database instead of every daily
+record of a station.
+
+Example:
+    >>> from imgwtools.db.aggregate import aggregate_daily, flow_duration_curve
+    >>> annual = aggregate_daily("150160180", param="Q", by="hydro_year")
+    >>> for row in annual:
+    ...     print(row.period, row.mean, row.max, row.max_date)
+    >>> fdc = flow_duration_curve("150160180", start_year=1991, end_year=2020)
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+from collections.abc import Sequence
+from typing import Literal
+
+from imgwtools.db.connection import get_db_connection
+from imgwtools.db.models import (
+    AggregateRecord,
+    ClimatologyRecord,
+    FlowDurationPoint,
+)
+from imgwtools.metrics import instrument_query
+
+AggregatePeriod = Literal["month", "year", "hydro_year"]
+
+# Parameter code -> hydro_daily column
+PARAM_COLUMNS = {
+    "H": "water_level_cm",
+    "Q": "flow_m3s",
+    "T": "water_temp_c",
+}
+
+# Period -> SQL expression over hydro_daily
+_PERIOD_EXPRESSIONS: dict[str, str] = {
+    "month": "substr(measurement_date, 1, 7)",
+    "year": "substr(measurement_date, 1, 4)",
+    "hydro_year": "CAST(hydro_year AS TEXT)",
+}
+
+DEFAULT_QUANTILES = (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95)
+
+# Exceedance probabilities [%] of the default flow duration curve
+DEFAULT_EXCEEDANCE = (1, 5, 10, 20, 30, 40, 50, 60, 70, 80, 90, 95, 99)
+
+
+def param_column(param: str) -> str:
+    """
+    Get the hydro_daily column of a parameter code.
+
+    Raises:
+        ValueError: If param is not "H", "Q" or "T".
+    """
+    try:
+        return PARAM_COLUMNS[param.upper()]
+    except KeyError:
+        raise ValueError(
+            f"Invalid param '{param}'. Allowed: {', '.join(PARAM_COLUMNS)}"
+        ) from None
+
+
+def _series_filter(
+    station_code: str,
+    column: str,
+    start_year: int | None,
+    end_year: int | None,
+) -> tuple[str, list]:
+    """WHERE clause selecting non-missing values of one station."""
+    conditions = ["station_code = ?", f"{column} IS NOT NULL"]
+    params: list = [station_code]
+    if start_year is not None:
+        conditions.append("hydro_year >= ?")
+        params.append(start_year)
+    if end_year is not None:
+        conditions.append("hydro_year <= ?")
+        params.append(end_year)
+    return " AND ".join(conditions), params
+
+
+@instrument_query
+def aggregate_daily(
+    station_code: str,
+    param: str = "H",
+    by: AggregatePeriod = "month",
+    start_year: int | None = None,
+    end_year: int | None = None,
+) -> list[AggregateRecord]:
+    """
+    Mean and extremes of daily values per month, calendar or hydro year.
+
+    Args:
+        station_code: Station code.
+        param: "H" (water level), "Q" (flow) or "T" (water temperature).
+        by: Aggregation period: "month" (YYYY-MM), "year" or "hydro_year".
+        start_year: Start hydrological year (inclusive).
+        end_year: End hydrological year (inclusive).
+
+    Returns:
+        One record per period with data, in period order. Dates of the
+        extremes are the first day on which they occurred.
+
+    Raises:
+        ValueError: If param or period is invalid.
+    """
+    column = param_column(param)
+    if by not in _PERIOD_EXPRESSIONS:
+        raise ValueError(
+            f"Invalid period '{by}'. Allowed: {', '.join(_PERIOD_EXPRESSIONS)}"
+        )
+    where, params = _series_filter(station_code, column, start_year, end_year)
+
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.execute(
+            f"""
+            WITH ranked AS (
+                SELECT
+                    {_PERIOD_EXPRESSIONS[by]} AS period,
+                    measurement_date,
+                    {column} AS value,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY {_PERIOD_EXPRESSIONS[by]}
+                        ORDER BY {column}, measurement_date
+                    ) AS rn_min,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY {_PERIOD_EXPRESSIONS[by]}
+                        ORDER BY {column} DESC, measurement_date
+                    ) AS rn_max
+                FROM hydro_daily
+                WHERE {where}
+            )
+            SELECT
+                period,
+                COUNT(*) AS count,
+                AVG(value) AS mean,
+                MAX(CASE WHEN rn_min = 1 THEN value END) AS min_value,
+                MAX(CASE WHEN rn_min = 1 THEN measurement_date END) AS min_date,
+                MAX(CASE WHEN rn_max = 1 THEN value END) AS max_value,
+                MAX(CASE WHEN rn_max = 1 THEN measurement_date END) AS max_date
+            FROM ranked
+            GROUP BY period
+            ORDER BY period
+            """,
+            params,
+        )
+        return [
+            AggregateRecord(
+                station_code=station_code,
+                param=param.upper(),
+                period=row["period"],
+                count=row["count"],
+                mean=row["mean"],
+                min=row["min_value"],
+                min_date=row["min_date"],
+                max=row["max_value"],
+                max_date=row["max_date"],
+            )
+            for row in cursor
+        ]
+
+
+@instrument_query
+def climatology(
+    station_code: str,
+    param: str = "H",
+    start_year: int | None = None,
+    end_year: int | None = None,
+) -> list[ClimatologyRecord]:
+    """
+    Day-of-year climatology (mean and extremes per calendar day).
+
+    Args:
+        station_code: Station code.
+        param: "H", "Q" or "T".
+        start_year: Start hydrological year (inclusive).
+        end_year: End hydrological year (inclusive).
+
+    Returns:
+        One record per calendar day ("MM-DD") with data, January first.
+    """
+    column = param_column(param)
+    where, params = _series_filter(station_code, column, start_year, end_year)
+
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.execute(
+            f"""
+            SELECT
+                substr(measurement_date, 6, 5) AS calendar_day,
+                COUNT(*) AS count,
+                AVG({column}) AS mean,
+                MIN({column}) AS min_value,
+                MAX({column}) AS max_value
+            FROM hydro_daily
+            WHERE {where} AND measurement_date IS NOT NULL
+            GROUP BY calendar_day
+            ORDER BY calendar_day
+            """,
+            params,
+        )
+        return [
+            ClimatologyRecord(
+                day=row["calendar_day"],
+                count=row["count"],
+                mean=row["mean"],
+                min=row["min_value"],
+                max=row["max_value"],
+            )
+            for row in cursor
+        ]
+
+
+@instrument_query
+def percentiles(
+    station_code: str,
+    param: str = "Q",
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    start_year: int | None = None,
+    end_year: int | None = None,
+) -> dict[float, float]:
+    """
+    Quantiles of daily values (linear interpolation between ranks).
+
+    Only the rows at the needed ranks are read from the database.
+
+    Args:
+        station_code: Station code.
+        param: "H", "Q" or "T".
+        quantiles: Quantiles in [0, 1].
+        start_year: Start hydrological year (inclusive).
+        end_year: End hydrological year (inclusive).
+
+    Returns:
+        Mapping quantile -> value (empty if there is no data).
+
+    Raises:
+        ValueError: If a quantile is outside [0, 1].
+    """
+    if any(not 0.0 <= q <= 1.0 for q in quantiles):
+        raise ValueError("Quantiles must be in [0, 1]")
+    column = param_column(param)
+    where, params = _series_filter(station_code, column, start_year, end_year)
+
+    with get_db_connection(readonly=True) as conn:
+        return _ranked_quantiles(conn, column, where, params, quantiles)
+
+
+def _ranked_quantiles(
+    conn: sqlite3.Connection,
+    column: str,
+    where: str,
+    params: list,
+    quantiles: Sequence[float],
+) -> dict[float, float]:
+    query = f"SELECT COUNT(*) FROM hydro_daily WHERE {where}"
+    n = conn.execute(query, params).fetchone()[0]
+    if n == 0:
+        return {}
+
+    positions = {q: (n - 1) * q for q in quantiles}
+    ranks = sorted(
+        {math.floor(p) for p in positions.values()}
+        | {math.ceil(p) for p in positions.values()}
+    )
+    cursor = conn.execute(
+        f"""
+        SELECT rn, value FROM (
+            SELECT {column} AS value,
+                   ROW_NUMBER() OVER (ORDER BY {column}) - 1 AS rn
+            FROM hydro_daily
+            WHERE {where}
+        )
+        WHERE rn IN ({", ".join("?" * len(ranks))})
+        """,
+        [*params, *ranks],
+    )
+    values = {row[0]: row[1] for row in cursor}
+
+    result = {}
+    for q, pos in positions.items():
+        lo, hi = math.floor(pos), math.ceil(pos)
+        result[q] = values[lo] + (values[hi] - values[lo]) * (pos - lo)
+    return result
+
+
+@instrument_query
+def flow_duration_curve(
+    station_code: str,
+    exceedance: Sequence[float] = DEFAULT_EXCEEDANCE,
+    param: str = "Q",
+    start_year: int | None = None,
+    end_year: int | None = None,
+) -> list[FlowDurationPoint]:
+    """
+    Flow duration curve: value equalled or exceeded for a share of days.
+
+    Args:
+        station_code: Station code.
+        exceedance: Exceedance probabilities in percent (0-100).
+        param: Usually "Q"; "H" gives a water level duration curve.
+        start_year: Start hydrological year (inclusive).
+        end_year: End hydrological year (inclusive).
+
+    Returns:
+        Points ordered by exceedance probability (empty if no data).
+    """
+    quantiles = {p: 1.0 - p / 100.0 for p in exceedance}
+    values = percentiles(
+        station_code, param, list(quantiles.values()), start_year, end_year
+    )
+    if not values:
+        return []
+    return [
+        FlowDurationPoint(exceedance_percent=p, value=values[q])
+        for p, q in sorted(quantiles.items())
+    ]
@@ -4,7 +4,11 @@ Cache manager for lazy loading IMGW hydrological data.
 Handles downloading data from IMGW servers and caching it in SQLite.
 """
 
+import sqlite3
+import time
+import zipfile
 from collections.abc import Callable
+from typing import TYPE_CHECKING
 
 import httpx
 
@@ -15,23 +19,49 @@ from imgwtools.core.url_builder import (
 )
 from imgwtools.db.connection import get_transaction
 from imgwtools.db.models import (
+    HydroDailyColumns,
     HydroDailyRecord,
     HydroMonthlyRecord,
     HydroSemiAnnualRecord,
     HydroStation,
+    StationCoverage,
+)
+from imgwtools.db.parsers import parse_zip_file
+from imgwtools.db.progress import (
+    PARSE_EVENT_EVERY,
+    CacheEvent,
+    CacheEventCallback,
+    StageTracker,
 )
-from imgwtools.db.parsers import parse_stations_csv, parse_zip_file
 from imgwtools.db.repository import get_repository
-
-# IMGW station list URL
-HYDRO_STATIONS_CSV_URL = (
-    "https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne/"
-    "dane_hydrologiczne/lista_stacji_hydro.csv"
+from imgwtools.db.schema import get_station_search_tables
+from imgwtools.metrics import (
+    CACHE_BYTES,
+    CACHE_REQUESTS,
+    CACHE_ROWS,
+    CACHE_STAGE_SECONDS,
+    DOWNLOADS_IN_PROGRESS,
+    timed,
+    upstream_call,
 )
+from imgwtools.resilience import async_retry_transport
+from imgwtools.throttle import in_lane
 
-# Callback type for progress reporting
+if TYPE_CHECKING:
+    from imgwtools.db.matrix import DailyMatrix
+
+# Callback type for coarse progress messages (see CacheEventCallback for
+# structured events)
 ProgressCallback = Callable[[str, int, int], None]
 
+# Interval names used in the database -> URL builder intervals
+_INTERVALS = {
+    "dobowe": HydroInterval.DAILY,
+    "miesieczne": HydroInterval.MONTHLY,
+    "polroczne": HydroInterval.SEMI_ANNUAL,
+    "polroczne_i_roczne": HydroInterval.SEMI_ANNUAL,
+}
+
 
 class HydroCacheManager:
     """
@@ -58,6 +88,7 @@ class HydroCacheManager:
         month: int | None = None,
         param: str | None = None,
         progress_callback: ProgressCallback | None = None,
+        on_event: CacheEventCallback | None = None,
     ) -> bool:
         """
         Ensure data for given range is cached.
@@ -70,27 +101,30 @@ class HydroCacheManager:
             month: Month (for daily data before 2023).
             param: Parameter 'H', 'Q', or 'T' (for semi-annual data).
             progress_callback: Optional callback for progress updates.
+            on_event: Optional callback for structured progress events
+                (byte-level download, parse/insert throughput, see
+                imgwtools.db.progress).
 
         Returns:
             True if data was downloaded, False if already cached.
 
         Raises:
             ValueError: If invalid parameters.
-            httpx.HTTPError: If download fails.
+            httpx.HTTPError: If download fails (after retries, see
+                imgwtools.resilience).
+
+        Failed downloads and imports are recorded in the failure ledger
+        (see retry_failed) and removed from it once the range is cached.
         """
         # Check if already cached
         if self.repo.is_range_cached(interval, year, month, param):
+            CACHE_REQUESTS.inc(interval=interval, result="hit")
+            StageTracker(
+                on_event, interval=interval, year=year, month=month, param=param
+            ).emit("skipped", message="Already cached")
             return False
 
-        # Map interval string to enum
-        interval_map = {
-            "dobowe": HydroInterval.DAILY,
-            "miesieczne": HydroInterval.MONTHLY,
-            "polroczne": HydroInterval.SEMI_ANNUAL,
-            "polroczne_i_roczne": HydroInterval.SEMI_ANNUAL,
-        }
-
-        hydro_interval = interval_map.get(interval)
+        hydro_interval = _INTERVALS.get(interval)
         if not hydro_interval:
             raise ValueError(f"Unknown interval: {interval}")
 
@@ -106,34 +140,113 @@ class HydroCacheManager:
         if progress_callback:
             progress_callback(f"Downloading {download_info.filename}", 0, 1)
 
-        # Download ZIP file
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                download_info.url,
-                timeout=self.timeout,
-                follow_redirects=True,
-            )
-            response.raise_for_status()
-            zip_data = response.content
-
-        if progress_callback:
-            progress_callback(f"Parsing {download_info.filename}", 0, 1)
-
-        # Parse and insert data
-        record_count = self._import_zip_data(
-            zip_data=zip_data,
+        tracker = StageTracker(
+            on_event,
+            source_file=download_info.filename,
             interval=interval,
             year=year,
             month=month,
             param=param,
-            source_file=download_info.filename,
         )
+        failure = {
+            "interval": interval,
+            "year": year,
+            "month": month,
+            "param": param,
+            "source_file": download_info.filename,
+        }
+        try:
+            zip_data = await self._download(download_info.url, interval, tracker)
+        except httpx.HTTPError as e:
+            tracker.emit("error", message=_describe_error(e))
+            self._record_failure(_describe_error(e), **failure)
+            raise
+        CACHE_REQUESTS.inc(interval=interval, result="miss")
+
+        if progress_callback:
+            progress_callback(f"Parsing {download_info.filename}", 0, 1)
+
+        # Parse and insert data
+        try:
+            record_count = self._import_zip_data(
+                zip_data=zip_data,
+                interval=interval,
+                year=year,
+                month=month,
+                param=param,
+                source_file=download_info.filename,
+                tracker=tracker,
+            )
+        except Exception as e:
+            tracker.emit("error", message=_describe_error(e))
+            self._record_failure(_describe_error(e), **failure)
+            raise
+        self._clear_failure(interval, year, month, param)
+        tracker.emit("done", record_count, f"Cached {record_count} records")
 
         if progress_callback:
             progress_callback(f"Cached {record_count} records", 1, 1)
 
         return True
 
+    def _record_failure(self, error: str, **failure) -> None:
+        try:
+            self.repo.record_failed_range(error=error, **failure)
+        except sqlite3.OperationalError:
+            pass  # failed_ranges is missing until 'imgw db init'
+
+    def _clear_failure(
+        self, interval: str, year: int, month: int | None, param: str | None
+    ) -> None:
+        try:
+            self.repo.clear_failed_range(interval, year, month, param)
+        except sqlite3.OperationalError:
+            pass
+
+    async def _download(
+        self, url: str, interval: str, tracker: StageTracker
+    ) -> bytes:
+        """
+        Download a file, reporting byte-level progress to the tracker.
+
+        Progress counts bytes received on the wire so it matches the
+        Content-Length total.
+        """
+        chunks: list[bytes] = []
+        total: int | None = None
+        received = 0
+
+        DOWNLOADS_IN_PROGRESS.inc()
+        try:
+            with (
+                timed(CACHE_STAGE_SECONDS, interval=interval, stage="download"),
+                upstream_call("hydro_archive"),
+            ):
+                tracker.start("download")
+                async with (
+                    httpx.AsyncClient(transport=async_retry_transport()) as client,
+                    client.stream(
+                        "GET", url, timeout=self.timeout, follow_redirects=True
+                    ) as response,
+                ):
+                    response.raise_for_status()
+                    length = response.headers.get("content-length")
+                    total = int(length) if length and length.isdigit() else None
+                    async for chunk in response.aiter_bytes():
+                        chunks.append(chunk)
+                        received = response.num_bytes_downloaded
+                        tracker.update(received, total)
+        except httpx.HTTPError:
+            CACHE_REQUESTS.inc(interval=interval, result="error")
+            raise
+        finally:
+            DOWNLOADS_IN_PROGRESS.dec()
+
+        tracker.finish(received, total if total is not None else received)
+        zip_data = b"".join(chunks)
+        CACHE_BYTES.inc(len(zip_data), interval=interval)
+        return zip_data
+
     def _import_zip_data(
         self,
         zip_data: bytes,
@@ -142,6 +255,7 @@ class HydroCacheManager:
         source_file: str,
         month: int | None = None,
         param: str | None = None,
+        tracker: StageTracker | None = None,
     ) -> int:
         """
         Import data from ZIP file into database.
@@ -153,40 +267,59 @@ class HydroCacheManager:
             source_file: Source filename for tracking.
             month: Month (optional).
             param: Parameter (optional).
+            tracker: Progress event tracker (optional).
 
         Returns:
             Number of records imported.
         """
+        tracker = tracker or StageTracker(None)
         stations: dict[str, HydroStation] = {}
         daily_records: list[HydroDailyRecord] = []
         monthly_records: list[HydroMonthlyRecord] = []
         semi_annual_records: list[HydroSemiAnnualRecord] = []
 
         # Parse ZIP file
-        for station, record in parse_zip_file(zip_data, interval):
-            # Collect unique stations
-            if station.station_code not in stations:
-                stations[station.station_code] = station
-
-            # Collect records by type
-            if isinstance(record, HydroDailyRecord):
-                daily_records.append(record)
-            elif isinstance(record, HydroMonthlyRecord):
-                monthly_records.append(record)
-            elif isinstance(record, HydroSemiAnnualRecord):
-                semi_annual_records.append(record)
+        parsed = 0
+        with timed(CACHE_STAGE_SECONDS, interval=interval, stage="parse"):
+            tracker.start("parse")
+            for station, record in parse_zip_file(zip_data, interval):
+                parsed += 1
+                if parsed % PARSE_EVENT_EVERY == 0:
+                    tracker.update(parsed)
+
+                # Collect unique stations
+                if station.station_code not in stations:
+                    stations[station.station_code] = station
+
+                # Collect records by type
+                if isinstance(record, HydroDailyRecord):
+                    daily_records.append(record)
+                elif isinstance(record, HydroMonthlyRecord):
+                    monthly_records.append(record)
+                elif isinstance(record, HydroSemiAnnualRecord):
+                    semi_annual_records.append(record)
+            tracker.finish(parsed, parsed)
 
         # Insert all data in a single transaction
-        with get_transaction() as conn:
+        with (
+            timed(CACHE_STAGE_SECONDS, interval=interval, stage="insert"),
+            get_transaction() as conn,
+        ):
+            tracker.start("insert")
+
             # Insert stations
+            search_tables = get_station_search_tables(conn)
             for station in stations.values():
-                self.repo.upsert_station(station)
+                self.repo.upsert_station(station, conn, search_tables)
 
             # Insert records
             record_count = 0
 
             if daily_records:
                 record_count += self.repo.insert_daily_batch(daily_records, conn)
+                self.repo.refresh_daily_summary(
+                    {(r.station_code, r.hydro_year) for r in daily_records}, conn
+                )
             if monthly_records:
                 record_count += self.repo.insert_monthly_batch(monthly_records, conn)
             if semi_annual_records:
@@ -202,9 +335,12 @@ class HydroCacheManager:
                 record_count=record_count,
                 conn=conn,
             )
+        tracker.finish(record_count, record_count)
 
+        CACHE_ROWS.inc(record_count, interval=interval)
         return record_count
 
+    @in_lane("background")
     async def cache_year_range(
         self,
         interval: str,
@@ -212,6 +348,7 @@ class HydroCacheManager:
         end_year: int,
         param: str | None = None,
         progress_callback: ProgressCallback | None = None,
+        on_event: CacheEventCallback | None = None,
     ) -> dict[int, int]:
         """
         Cache data for a range of years.
@@ -222,14 +359,38 @@ class HydroCacheManager:
             end_year: End year (inclusive).
             param: Parameter for semi-annual data.
             progress_callback: Optional progress callback.
+            on_event: Optional callback for structured progress events of
+                every file and a "year" event after each year.
+
+        Downloads run in the "background" lane of the upstream rate limit,
+        so interactive requests are not starved (see imgwtools.throttle).
 
         Returns:
-            Dictionary mapping year to record count.
+            Dictionary mapping year to record count. Files that fail
+            (after retries) do not stop the backfill; they are recorded
+            in the failure ledger and can be fetched later with
+            retry_failed().
+
+        Raises:
+            ValueError: If the interval or param is invalid.
         """
+        if interval not in _INTERVALS:
+            raise ValueError(f"Unknown interval: {interval}")
+        # Fail fast on arguments no year could be downloaded with
+        # (e.g. semi-annual data without param)
+        build_hydro_url(
+            interval=_INTERVALS[interval],
+            year=start_year,
+            month=1,
+            param=HydroParam(param) if param else None,
+        )
+
         results: dict[int, int] = {}
 
         total_years = end_year - start_year + 1
         current = 0
+        failed = 0
+        started = time.perf_counter()
 
         for year in range(start_year, end_year + 1):
             if progress_callback:
@@ -241,49 +402,124 @@ class HydroCacheManager:
                 year_total = 0
                 for month in range(1, 13):
                     if not self.repo.is_range_cached(interval, year, month):
-                        try:
-                            await self.ensure_data_cached(
-                                interval=interval,
-                                year=year,
-                                month=month,
-                            )
-                            # Get record count from cached_ranges
-                            ranges = self.repo.get_cached_ranges(interval)
-                            for r in ranges:
-                                if r.year == year and r.month == month:
-                                    year_total += r.record_count or 0
-                                    break
-                        except Exception:
-                            continue
+                        count = await self._cache_range(
+                            interval, year, month=month, on_event=on_event
+                        )
+                        if count is None:
+                            failed += 1
+                        else:
+                            year_total += count
 
                 results[year] = year_total
             else:
                 # Single file per year
                 if not self.repo.is_range_cached(interval, year, param=param):
-                    try:
-                        await self.ensure_data_cached(
-                            interval=interval,
-                            year=year,
-                            param=param,
-                        )
-                        # Get record count
-                        ranges = self.repo.get_cached_ranges(interval)
-                        for r in ranges:
-                            if r.year == year and r.param == param:
-                                results[year] = r.record_count or 0
-                                break
-                    except Exception:
-                        results[year] = 0
+                    count = await self._cache_range(
+                        interval, year, param=param, on_event=on_event
+                    )
+                    if count is None:
+                        failed += 1
+                    results[year] = count or 0
                 else:
                     results[year] = 0  # Already cached
 
             current += 1
+            if on_event:
+                message = f"Processed year {year}"
+                if failed:
+                    message += f" ({failed} failed, see 'imgw db failures')"
+                on_event(
+                    CacheEvent(
+                        stage="year",
+                        interval=interval,
+                        year=year,
+                        param=param,
+                        completed=current,
+                        total=total_years,
+                        elapsed=time.perf_counter() - started,
+                        finished=current == total_years,
+                        message=message,
+                    )
+                )
 
         if progress_callback:
             progress_callback("Done", total_years, total_years)
 
         return results
 
+    async def _cache_range(
+        self,
+        interval: str,
+        year: int,
+        month: int | None = None,
+        param: str | None = None,
+        on_event: CacheEventCallback | None = None,
+    ) -> int | None:
+        """Cache one file; record count, or None if it failed (see ledger)."""
+        try:
+            await self.ensure_data_cached(
+                interval=interval,
+                year=year,
+                month=month,
+                param=param,
+                on_event=on_event,
+            )
+        except (httpx.HTTPError, sqlite3.Error, zipfile.BadZipFile, ValueError):
+            # Download and import errors are recorded in the failure
+            # ledger by ensure_data_cached
+            return None
+
+        for r in self.repo.get_cached_ranges(interval):
+            if r.year == year and r.month == month and r.param == param:
+                return r.record_count or 0
+        return 0
+
+    @in_lane("background")
+    async def retry_failed(
+        self,
+        interval: str | None = None,
+        on_event: CacheEventCallback | None = None,
+    ) -> dict[str, int]:
+        """
+        Retry ranges recorded in the failure ledger.
+
+        Ranges cached in the meantime are removed from the ledger without
+        downloading.
+
+        Args:
+            interval: Only retry ranges of this interval.
+            on_event: Optional callback for structured progress events.
+
+        Returns:
+            Counts: "retried", "cached" and "failed" (still in the ledger).
+        """
+        pending = self.repo.get_failed_ranges(interval)
+        cached = 0
+        for failure in pending:
+            if self.repo.is_range_cached(
+                failure.interval, failure.year, failure.month, failure.param
+            ):
+                self._clear_failure(
+                    failure.interval, failure.year, failure.month, failure.param
+                )
+                cached += 1
+                continue
+            count = await self._cache_range(
+                failure.interval,
+                failure.year,
+                month=failure.month,
+                param=failure.param,
+                on_event=on_event,
+            )
+            if count is not None:
+                cached += 1
+
+        return {
+            "retried": len(pending),
+            "cached": cached,
+            "failed": len(pending) - cached,
+        }
+
     async def refresh_stations(
         self,
         progress_callback: ProgressCallback | None = None,
@@ -291,7 +527,9 @@ class HydroCacheManager:
         """
         Refresh station list from IMGW.
 
-        Downloads the station list CSV and updates the database.
+        Refreshes the shared station registry (station list and map API
+        coordinates) and copies its stations into the database. If IMGW
+        is unreachable, the bundled station list is used.
 
         Args:
             progress_callback: Optional progress callback.
@@ -299,24 +537,33 @@ class HydroCacheManager:
         Returns:
             Number of stations updated.
         """
+        from imgwtools.registry import get_station_registry
+
         if progress_callback:
             progress_callback("Downloading station list", 0, 1)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                HYDRO_STATIONS_CSV_URL,
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            content = response.content
+        registry = get_station_registry()
+        await registry.refresh_async()
 
         if progress_callback:
-            progress_callback("Parsing stations", 0, 1)
+            progress_callback("Updating stations", 0, 1)
 
         count = 0
-        for station in parse_stations_csv(content):
-            self.repo.upsert_station(station)
-            count += 1
+        with get_transaction() as conn:
+            search_tables = get_station_search_tables(conn)
+            for station in registry.hydro_stations:
+                self.repo.upsert_station(
+                    HydroStation(
+                        station_code=station.station_id,
+                        station_name=station.name,
+                        river_name=station.river,
+                        latitude=station.latitude,
+                        longitude=station.longitude,
+                    ),
+                    conn,
+                    search_tables,
+                )
+                count += 1
 
         if progress_callback:
             progress_callback(f"Updated {count} stations", 1, 1)
@@ -349,6 +596,62 @@ class HydroCacheManager:
             end_year=end_year,
         )
 
+    def get_daily_data_bulk(
+        self,
+        station_codes: list[str] | None = None,
+        river: str | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+        start_year: int | None = None,
+        end_year: int | None = None,
+    ) -> HydroDailyColumns:
+        """
+        Get daily data of many stations in one query.
+
+        Note: This does NOT trigger lazy loading. IMGW files contain all
+        stations, so ensure_data_cached() is needed once per file, not
+        per station.
+
+        Args:
+            station_codes: Station codes.
+            river: River name (all cached stations on the river).
+            bbox: (min_lat, min_lon, max_lat, max_lon).
+            start_year: Start hydrological year.
+            end_year: End hydrological year.
+
+        Returns:
+            Columnar daily data (see HydroDailyColumns).
+        """
+        codes = self.repo.find_station_codes(station_codes, river, bbox)
+        return self.repo.get_daily_data_bulk(codes, start_year, end_year)
+
+    def get_daily_matrix(
+        self,
+        station_codes: list[str] | None = None,
+        river: str | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+        param: str = "Q",
+        start_year: int | None = None,
+        end_year: int | None = None,
+    ) -> "DailyMatrix":
+        """
+        Get a dates x stations matrix of daily values from cache.
+
+        Note: This does NOT trigger lazy loading. Requires numpy.
+
+        Args:
+            station_codes: Station codes.
+            river: River name (all cached stations on the river).
+            bbox: (min_lat, min_lon, max_lat, max_lon).
+            param: "H", "Q" or "T".
+            start_year: Start hydrological year.
+            end_year: End hydrological year.
+
+        Returns:
+            DailyMatrix (see imgwtools.db.matrix).
+        """
+        codes = self.repo.find_station_codes(station_codes, river, bbox)
+        return self.repo.get_daily_matrix(codes, param, start_year, end_year)
+
     def get_monthly_data(
         self,
         station_code: str | None = None,
@@ -364,6 +667,15 @@ class HydroCacheManager:
             extremum=extremum,
         )
 
+    def get_station_coverage(
+        self,
+        station_code: str | None = None,
+        start_year: int | None = None,
+        end_year: int | None = None,
+    ) -> list[StationCoverage]:
+        """Get daily data coverage per station from the summary table."""
+        return self.repo.get_station_coverage(station_code, start_year, end_year)
+
     def get_semi_annual_data(
         self,
         station_code: str | None = None,
@@ -382,6 +694,13 @@ class HydroCacheManager:
         )
 
 
+def _describe_error(error: Exception) -> str:
+    """Short error description for the failure ledger."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    return str(error) or type(error).__name__
+
+
 # Singleton instance
 _cache_manager: HydroCacheManager | None = None
 
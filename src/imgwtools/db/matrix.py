@@ -0,0 +1,204 @@
+"""
+Wide-format (dates x stations) matrices of cached daily hydro data.
+
+The matrix is filled directly from a per-station index scan of
+hydro_daily: SQLite returns numeric (column, day offset, value) triples
+which are scattered into a preallocated array batch by batch, without
+creating per-row record objects.
+
+Requires numpy: pip install imgwtools[spatial]
+
+Example:
+    >>> from imgwtools.db import get_repository
+    >>> repo = get_repository()
+    >>> codes = repo.find_station_codes(river="Wisła")
+    >>> m = repo.get_daily_matrix(codes, param="Q", start_year=1991, end_year=2020)
+    >>> m.values.shape        # (days, stations), NaN where missing
+    >>> m.mask.sum(axis=0)    # missing days per station
+    >>> df = m.to_dataframe() # requires pandas
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "numpy is required for imgwtools.db.matrix. "
+        "Install with: pip install imgwtools[spatial]"
+    ) from e
+
+from imgwtools.db.aggregate import param_column
+from imgwtools.db.connection import get_db_connection
+
+
+@dataclass
+class DailyMatrix:
+    """
+    Daily values of many stations on a common date axis.
+
+    Attributes:
+        dates: Dates of the rows (``datetime64[D]``), consecutive days.
+        station_codes: Station codes of the columns.
+        values: Float matrix of shape (dates, stations), NaN where missing.
+        param: Parameter code ("H", "Q" or "T").
+    """
+
+    dates: np.ndarray
+    station_codes: list[str]
+    values: np.ndarray
+    param: str
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Boolean matrix, True where a value is missing."""
+        return np.isnan(self.values)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.values.shape
+
+    def masked(self) -> np.ma.MaskedArray:
+        """Values as a NumPy masked array."""
+        return np.ma.masked_invalid(self.values)
+
+    def column(self, station_code: str) -> np.ndarray:
+        """Series of one station (view into the matrix)."""
+        return self.values[:, self.station_codes.index(station_code)]
+
+    def to_dataframe(self) -> Any:
+        """
+        Convert to pandas DataFrame (dates as index, stations as columns).
+
+        Requires pandas to be installed.
+
+        Raises:
+            ImportError: If pandas is not installed.
+        """
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError(
+                "pandas is required for to_dataframe(). "
+                "Install with: pip install imgwtools[spatial]"
+            ) from e
+
+        return pd.DataFrame(
+            self.values,
+            index=pd.DatetimeIndex(self.dates, name="date"),
+            columns=pd.Index(self.station_codes, name="station_code"),
+            copy=False,
+        )
+
+
+def _as_date(value: date | str) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def build_daily_matrix(
+    station_codes: list[str],
+    param: str = "Q",
+    start_date: date | str | None = None,
+    end_date: date | str | None = None,
+    batch_size: int = 100_000,
+) -> DailyMatrix:
+    """
+    Build a dates x stations matrix from hydro_daily.
+
+    Args:
+        station_codes: Station codes; column order follows this list.
+        param: "H" (water level), "Q" (flow) or "T" (water temperature).
+        start_date: First row date. Defaults to the first cached date of
+            the stations.
+        end_date: Last row date. Defaults to the last cached date.
+        batch_size: Number of rows fetched from SQLite at a time.
+
+    Returns:
+        DailyMatrix (empty if there is no data in the range).
+
+    Raises:
+        ValueError: If param is invalid or start_date > end_date.
+    """
+    column = param_column(param)
+    codes = list(dict.fromkeys(station_codes))
+    empty = DailyMatrix(
+        dates=np.array([], dtype="datetime64[D]"),
+        station_codes=codes,
+        values=np.empty((0, len(codes))),
+        param=param.upper(),
+    )
+    if not codes:
+        return empty
+
+    placeholders = ", ".join("?" * len(codes))
+    with get_db_connection(readonly=True) as conn:
+        if start_date is None or end_date is None:
+            # Date range from the per-station summary; scanning hydro_daily
+            # is only needed for rows inserted outside of imports.
+            row = conn.execute(
+                f"""
+                SELECT MIN(first_date), MAX(last_date)
+                FROM hydro_daily_summary
+                WHERE station_code IN ({placeholders})
+                """,
+                codes,
+            ).fetchone()
+            if row[0] is None:
+                row = conn.execute(
+                    f"""
+                    SELECT MIN(measurement_date), MAX(measurement_date)
+                    FROM hydro_daily
+                    WHERE station_code IN ({placeholders}) AND {column} IS NOT NULL
+                    """,
+                    codes,
+                ).fetchone()
+            if row[0] is None:
+                return empty
+            start_date = start_date if start_date is not None else row[0]
+            end_date = end_date if end_date is not None else row[1]
+
+        start, end = _as_date(start_date), _as_date(end_date)
+        if start > end:
+            raise ValueError("start_date must be <= end_date")
+
+        n_days = (end - start).days + 1
+        values = np.full((n_days, len(codes)), np.nan)
+
+        # Station code -> column index as a VALUES table, so every row
+        # leaves SQLite as three numbers. Stations are scanned in column
+        # order through idx_daily_station_year; no sort is needed because
+        # values are scattered by (day, column).
+        columns_sql = ", ".join("(?, ?)" for _ in codes)
+        column_params = [v for i, code in enumerate(codes) for v in (code, i)]
+        cursor = conn.execute(
+            f"""
+            WITH cols(code, idx) AS (VALUES {columns_sql})
+            SELECT
+                cols.idx,
+                CAST(julianday(d.measurement_date) - julianday(?) AS INTEGER),
+                d.{column}
+            FROM hydro_daily d
+            JOIN cols ON cols.code = d.station_code
+            WHERE d.measurement_date BETWEEN ? AND ?
+              AND d.{column} IS NOT NULL
+            """,
+            [*column_params, start.isoformat(), start.isoformat(), end.isoformat()],
+        )
+        while rows := cursor.fetchmany(batch_size):
+            batch = np.fromiter(
+                itertools.chain.from_iterable(rows), dtype=float, count=3 * len(rows)
+            ).reshape(-1, 3)
+            day, col = batch[:, 1].astype(np.intp), batch[:, 0].astype(np.intp)
+            values[day, col] = batch[:, 2]
+
+    dates = np.arange(
+        np.datetime64(start, "D"), np.datetime64(end + timedelta(days=1), "D")
+    )
+    return DailyMatrix(
+        dates=dates, station_codes=codes, values=values, param=param.upper()
+    )
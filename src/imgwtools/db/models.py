@@ -5,7 +5,7 @@ These models represent data structures for hydrological measurements
 and station metadata stored in the SQLite cache.
 """
 
-from datetime import date
+from datetime import date, datetime
 
 from pydantic import BaseModel, Field
 
@@ -36,6 +36,25 @@ class HydroDailyRecord(BaseModel):
     measurement_date: str | None = Field(None, description="Date in YYYY-MM-DD format")
 
 
+class HydroDailyColumns(BaseModel):
+    """
+    Daily records of many stations in columnar form.
+
+    Column lists are aligned by index and ordered by station and date.
+    Station metadata is stored once per station, not per row.
+    """
+
+    stations: dict[str, HydroStation] = Field(default_factory=dict)
+    station_code: list[str] = Field(default_factory=list)
+    measurement_date: list[str | None] = Field(default_factory=list)
+    water_level_cm: list[float | None] = Field(default_factory=list)
+    flow_m3s: list[float | None] = Field(default_factory=list)
+    water_temp_c: list[float | None] = Field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.station_code)
+
+
 class HydroMonthlyRecord(BaseModel):
     """Monthly hydrological measurement record."""
 
@@ -66,6 +85,79 @@ class HydroSemiAnnualRecord(BaseModel):
     extremum_end_date: str | None = None
 
 
+class RealtimeHydroValue(BaseModel):
+    """Single recorded real-time hydrological value."""
+
+    station_code: str
+    param: str = Field(..., description="'H' (level), 'Q' (flow), or 'T' (temp)")
+    measured_at: datetime = Field(..., description="Measurement time (UTC)")
+    value: float
+
+
+class RealtimeSynopRecord(BaseModel):
+    """Recorded real-time synoptic measurement."""
+
+    station_id: str
+    measured_at: datetime = Field(..., description="Measurement time (UTC)")
+    temperature_c: float | None = None
+    wind_speed_ms: float | None = None
+    wind_direction: int | None = None
+    humidity_percent: float | None = None
+    precipitation_mm: float | None = None
+    pressure_hpa: float | None = None
+
+
+class AggregateRecord(BaseModel):
+    """Statistics of daily values over one period."""
+
+    station_code: str
+    param: str = Field(..., description="'H' (level), 'Q' (flow), or 'T' (temp)")
+    period: str = Field(..., description="'YYYY-MM', 'YYYY' or hydro year")
+    count: int = Field(..., description="Number of days with data")
+    mean: float
+    min: float
+    min_date: str | None = Field(None, description="First day of the minimum")
+    max: float
+    max_date: str | None = Field(None, description="First day of the maximum")
+
+
+class ClimatologyRecord(BaseModel):
+    """Statistics of daily values for one calendar day across years."""
+
+    day: str = Field(..., description="Calendar day in MM-DD format")
+    count: int
+    mean: float
+    min: float
+    max: float
+
+
+class FlowDurationPoint(BaseModel):
+    """Point of a flow duration curve."""
+
+    exceedance_percent: float = Field(..., description="Share of days [%]")
+    value: float = Field(..., description="Value equalled or exceeded")
+
+
+class StationCoverage(BaseModel):
+    """Overview of cached daily data for one station."""
+
+    station_code: str
+    station_name: str | None = None
+    river_name: str | None = None
+    first_year: int = Field(..., description="First cached hydrological year")
+    last_year: int = Field(..., description="Last cached hydrological year")
+    first_date: str | None = Field(None, description="First date with a record")
+    last_date: str | None = Field(None, description="Last date with a record")
+    day_count: int = Field(..., description="Days with at least one value")
+    completeness: float | None = Field(
+        None, description="day_count / days between first and last date"
+    )
+    level_min: float | None = None
+    level_max: float | None = None
+    flow_min: float | None = None
+    flow_max: float | None = None
+
+
 class CachedRange(BaseModel):
     """Record of cached data range."""
 
@@ -79,6 +171,21 @@ class CachedRange(BaseModel):
     record_count: int | None = None
 
 
+class FailedRange(BaseModel):
+    """Data range whose download or import failed (retried later)."""
+
+    id: int | None = None
+    interval: str = Field(..., description="'dobowe', 'miesieczne', or 'polroczne'")
+    year: int
+    month: int | None = None
+    param: str | None = None
+    source_file: str | None = None
+    error: str
+    attempts: int = 1
+    first_failed_at: str
+    last_failed_at: str
+
+
 # Constants for missing data detection
 MISSING_WATER_LEVEL = 9999
 MISSING_FLOW = 99999.999
@@ -0,0 +1,217 @@
+"""
+Structured progress events of the cache ingestion path.
+
+HydroCacheManager reports each archive file it imports as a sequence of
+CacheEvent objects: byte-level download progress, parsed and inserted
+rows with per-stage durations, and a final "done" (or "skipped"/"error")
+event. Consumers get throughput and ETA from the events, which is enough
+to drive progress bars, tune concurrency or spot stalled transfers.
+
+Example:
+    >>> import sys
+    >>> from imgwtools.db import get_cache_manager
+    >>> from imgwtools.db.progress import JsonEventLogger
+    >>> await get_cache_manager().cache_year_range(
+    ...     "dobowe", 2020, 2021, on_event=JsonEventLogger(sys.stderr)
+    ... )
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal, TextIO
+
+EventStage = Literal["download", "parse", "insert", "done", "skipped", "error", "year"]
+
+# Minimal time [s] between two download/parse progress events of one file
+DEFAULT_MIN_INTERVAL = 0.1
+
+# Parsed records between two parse progress events
+PARSE_EVENT_EVERY = 50_000
+
+
+@dataclass(frozen=True)
+class CacheEvent:
+    """
+    Progress of one cache import stage.
+
+    Attributes:
+        stage: "download" (completed/total in bytes), "parse" (rows
+            parsed), "insert" (rows inserted), "done" (rows of the file,
+            with ``stage_seconds``), "skipped" (already cached), "error"
+            (download or import failed, see ``message``) and "year"
+            (cache_year_range: years processed / total).
+        source_file: IMGW file name (e.g. "codz_2020_01.zip").
+        interval: Data interval ("dobowe", "miesieczne", "polroczne").
+        year: Hydrological year.
+        month: Month (daily files before 2023).
+        param: Parameter (semi-annual files).
+        completed: Bytes, rows or years done so far.
+        total: Expected total (None if unknown, e.g. no Content-Length).
+        elapsed: Seconds since the stage started.
+        finished: True on the last event of a stage.
+        message: Human-readable description.
+        stage_seconds: Durations of download/parse/insert ("done" only).
+    """
+
+    stage: EventStage
+    source_file: str = ""
+    interval: str = ""
+    year: int | None = None
+    month: int | None = None
+    param: str | None = None
+    completed: int = 0
+    total: int | None = None
+    elapsed: float = 0.0
+    finished: bool = False
+    message: str = ""
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def rate(self) -> float | None:
+        """Throughput in units per second (bytes/s, rows/s), if measurable."""
+        if self.elapsed <= 0:
+            return None
+        return self.completed / self.elapsed
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated seconds to the end of the stage, if the total is known."""
+        rate = self.rate
+        if self.total is None or not rate:
+            return None
+        return max(self.total - self.completed, 0) / rate
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "source_file": self.source_file,
+            "interval": self.interval,
+            "year": self.year,
+            "month": self.month,
+            "param": self.param,
+            "completed": self.completed,
+            "total": self.total,
+            "elapsed": round(self.elapsed, 6),
+            "rate": None if self.rate is None else round(self.rate, 3),
+            "eta": None if self.eta is None else round(self.eta, 3),
+            "finished": self.finished,
+            "message": self.message,
+            "stage_seconds": {k: round(v, 6) for k, v in self.stage_seconds.items()},
+        }
+
+
+# Callback receiving cache events
+CacheEventCallback = Callable[[CacheEvent], None]
+
+
+class JsonEventLogger:
+    """
+    Cache event callback writing one JSON object per event.
+
+    Args:
+        stream: Text stream for JSON lines (e.g. sys.stderr).
+        logger: Logger receiving the JSON at INFO level (used if no stream).
+        progress: Also write intermediate download/parse events
+            (default: only finished stages, "done", "skipped" and "error").
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        logger: logging.Logger | None = None,
+        progress: bool = False,
+    ):
+        self.stream = stream
+        self.logger = logger or logging.getLogger("imgwtools.cache")
+        self.progress = progress
+
+    def __call__(self, event: CacheEvent) -> None:
+        if not (self.progress or event.finished):
+            return
+        line = json.dumps(event.to_dict(), ensure_ascii=False)
+        if self.stream is not None:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+        else:
+            self.logger.info(line)
+
+
+class StageTracker:
+    """
+    Emit events of one file import, throttling intermediate progress.
+
+    Used by HydroCacheManager; a no-op without a callback.
+    """
+
+    def __init__(
+        self,
+        callback: CacheEventCallback | None,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        **context: Any,
+    ):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.context = context
+        self.stage_seconds: dict[str, float] = {}
+        self._stage: EventStage | None = None
+        self._start = 0.0
+        self._last_emit = 0.0
+
+    def start(self, stage: EventStage) -> None:
+        """Start timing a stage."""
+        self._stage = stage
+        self._start = self._last_emit = time.perf_counter()
+
+    def update(self, completed: int, total: int | None = None) -> None:
+        """Report intermediate progress of the current stage (throttled)."""
+        now = time.perf_counter()
+        if self.callback is None or now - self._last_emit < self.min_interval:
+            return
+        self._last_emit = now
+        self._emit(self._stage, completed, total, now - self._start)
+
+    def finish(self, completed: int, total: int | None = None) -> float:
+        """Finish the current stage; returns its duration."""
+        elapsed = time.perf_counter() - self._start
+        self.stage_seconds[self._stage] = elapsed
+        self._emit(self._stage, completed, total, elapsed, finished=True)
+        return elapsed
+
+    def emit(self, stage: EventStage, completed: int = 0, message: str = "") -> None:
+        """Report a file-level event (done, skipped, error)."""
+        elapsed = sum(self.stage_seconds.values())
+        self._emit(
+            stage,
+            completed,
+            completed if stage == "done" else None,
+            elapsed,
+            finished=True,
+            message=message,
+            stage_seconds=dict(self.stage_seconds),
+        )
+
+    def _emit(
+        self,
+        stage: EventStage | None,
+        completed: int,
+        total: int | None,
+        elapsed: float,
+        **kwargs: Any,
+    ) -> None:
+        if self.callback is None or stage is None:
+            return
+        self.callback(
+            CacheEvent(
+                stage=stage,
+                completed=completed,
+                total=total,
+                elapsed=elapsed,
+                **self.context,
+                **kwargs,
+            )
+        )
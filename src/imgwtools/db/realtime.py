@@ -0,0 +1,386 @@
+"""
+Recorder for real-time IMGW hydro and synop data.
+
+The IMGW current-data API only returns the latest measurements and the
+archive ZIP files lag by months. The recorder polls the API, stores
+each measurement once (deduplicated by station and measurement time)
+and prunes rows older than the retention period, so recent history such
+as "last 30 days at gauge X" is answered from the local cache.
+
+Example:
+    >>> from imgwtools.db.realtime import RealtimeRecorder, get_hydro_history
+    >>> recorder = RealtimeRecorder(retention_days=90)
+    >>> await recorder.poll_once()
+    >>> values = get_hydro_history("150160180", days=30)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from imgwtools.db.connection import get_db_connection, get_transaction
+from imgwtools.db.models import RealtimeHydroValue, RealtimeSynopRecord
+from imgwtools.exceptions import IMGWError
+from imgwtools.fetch import (
+    DEFAULT_TIMEOUT,
+    fetch_hydro_current_async,
+    fetch_synop_async,
+)
+from imgwtools.models import HydroCurrentData, SynopData, parse_local_time
+
+logger = logging.getLogger(__name__)
+
+# Default poll interval [s]; hydro data is updated every 10 min, synop hourly
+DEFAULT_RECORD_INTERVAL = 600
+
+# Interval between retention pruning runs [s]
+PRUNE_INTERVAL = 24 * 3600
+
+# Hydro parameters: code -> HydroCurrentData (value, date) attributes
+HYDRO_PARAMS = {
+    "H": ("water_level_cm", "water_level_date"),
+    "Q": ("flow_m3s", "flow_date"),
+    "T": ("water_temp_c", "water_temp_date"),
+}
+
+_SYNOP_COLUMNS = (
+    "temperature_c",
+    "wind_speed_ms",
+    "wind_direction",
+    "humidity_percent",
+    "precipitation_mm",
+    "pressure_hpa",
+)
+
+
+def synop_time(record: SynopData) -> int | None:
+    """Unix time of a synop measurement (date plus full UTC hour)."""
+    if not record.measurement_date or record.measurement_hour is None:
+        return None
+    try:
+        day = datetime.fromisoformat(record.measurement_date).replace(tzinfo=UTC)
+    except ValueError:
+        return None
+    return int((day + timedelta(hours=record.measurement_hour)).timestamp())
+
+
+@dataclass
+class RecordResult:
+    """Outcome of one recorder poll."""
+
+    hydro: int = 0
+    synop: int = 0
+    pruned: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+class RealtimeRecorder:
+    """
+    Polls IMGW real-time feeds and appends new measurements to the cache DB.
+
+    Attributes:
+        retention_days: Rows older than this are pruned (0 keeps everything).
+    """
+
+    def __init__(
+        self,
+        retention_days: int | None = None,
+        *,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        """
+        Create a recorder.
+
+        Args:
+            retention_days: History length in days; defaults to
+                settings.realtime_retention_days.
+            timeout: Request timeout in seconds.
+        """
+        if retention_days is None:
+            from imgwtools.config import settings
+
+            retention_days = settings.realtime_retention_days
+        self.retention_days = retention_days
+        self.timeout = timeout
+        self._pruned_at: float | None = None
+
+    # --- Writing ---
+
+    def record_hydro(
+        self,
+        data: Iterable[HydroCurrentData],
+        conn: sqlite3.Connection | None = None,
+    ) -> int:
+        """
+        Store hydro measurements not yet recorded.
+
+        Each parameter is stored with its own measurement time, so a
+        water level updated every 10 minutes and a daily temperature are
+        both kept exactly once.
+
+        Args:
+            data: Current hydro data (e.g. from fetch_hydro_current).
+            conn: Optional existing connection (for transaction grouping).
+
+        Returns:
+            Number of new rows.
+        """
+        rows = []
+        for record in data:
+            for param, (value_attr, date_attr) in HYDRO_PARAMS.items():
+                value = getattr(record, value_attr)
+                measured_at = parse_local_time(getattr(record, date_attr))
+                if value is not None and measured_at is not None:
+                    rows.append((record.station_id, param, measured_at, value))
+
+        return self._insert(
+            """
+            INSERT OR IGNORE INTO hydro_realtime
+                (station_code, param, measured_at, value)
+            VALUES (?, ?, ?, ?)
+            """,
+            rows,
+            conn,
+        )
+
+    def record_synop(
+        self,
+        data: Iterable[SynopData],
+        conn: sqlite3.Connection | None = None,
+    ) -> int:
+        """
+        Store synop measurements not yet recorded.
+
+        Args:
+            data: Current synop data (e.g. from fetch_synop).
+            conn: Optional existing connection (for transaction grouping).
+
+        Returns:
+            Number of new rows.
+        """
+        rows = []
+        for record in data:
+            measured_at = synop_time(record)
+            if measured_at is not None:
+                rows.append(
+                    (record.station_id, measured_at)
+                    + tuple(getattr(record, c) for c in _SYNOP_COLUMNS)
+                )
+
+        return self._insert(
+            f"""
+            INSERT OR IGNORE INTO synop_realtime
+                (station_id, measured_at, {", ".join(_SYNOP_COLUMNS)})
+            VALUES (?, ?, {", ".join("?" * len(_SYNOP_COLUMNS))})
+            """,
+            rows,
+            conn,
+        )
+
+    @staticmethod
+    def _insert(sql: str, rows: list[tuple], conn: sqlite3.Connection | None) -> int:
+        if not rows:
+            return 0
+
+        def _run(c: sqlite3.Connection) -> int:
+            before = c.total_changes
+            c.executemany(sql, rows)
+            return c.total_changes - before
+
+        if conn:
+            return _run(conn)
+        with get_transaction() as c:
+            return _run(c)
+
+    def prune(self, now: float | None = None) -> int:
+        """
+        Delete rows older than the retention period.
+
+        Args:
+            now: Current Unix time (for testing).
+
+        Returns:
+            Number of deleted rows.
+        """
+        self._pruned_at = time.monotonic()
+        if self.retention_days <= 0:
+            return 0
+        cutoff = int((now or time.time()) - self.retention_days * 86400)
+        with get_transaction() as conn:
+            before = conn.total_changes
+            conn.execute("DELETE FROM hydro_realtime WHERE measured_at < ?", (cutoff,))
+            conn.execute("DELETE FROM synop_realtime WHERE measured_at < ?", (cutoff,))
+            return conn.total_changes - before
+
+    # --- Polling ---
+
+    async def poll_once(self) -> RecordResult:
+        """
+        Fetch hydro and synop data once and record new measurements.
+
+        Fetch errors (IMGW outages, but also unexpected errors of one
+        feed) are reported in the result instead of raised, so a daemon
+        keeps running; the other feed is still recorded.
+        """
+        result = RecordResult()
+        hydro, synop = await asyncio.gather(
+            fetch_hydro_current_async(timeout=self.timeout),
+            fetch_synop_async(timeout=self.timeout),
+            return_exceptions=True,
+        )
+        for name, data in (("hydro", hydro), ("synop", synop)):
+            if isinstance(data, Exception):
+                if not isinstance(data, IMGWError):
+                    logger.error("Fetching %s data failed", name, exc_info=data)
+                result.errors.append(f"{name}: {data}")
+            elif isinstance(data, BaseException):
+                raise data  # cancellation
+
+        with get_transaction() as conn:
+            if not isinstance(hydro, BaseException):
+                result.hydro = self.record_hydro(hydro, conn)
+            if not isinstance(synop, BaseException):
+                result.synop = self.record_synop(synop, conn)
+
+        since_prune = time.monotonic() - (self._pruned_at or float("-inf"))
+        if since_prune >= PRUNE_INTERVAL:
+            result.pruned = self.prune()
+        return result
+
+    async def run(
+        self,
+        interval: float = DEFAULT_RECORD_INTERVAL,
+        iterations: int | None = None,
+        on_poll: Callable[[RecordResult], None] | None = None,
+    ) -> None:
+        """
+        Poll repeatedly until cancelled.
+
+        A poll that fails (e.g. the database is locked) is logged and
+        reported to on_poll as an error; polling continues.
+
+        Args:
+            interval: Seconds between polls.
+            iterations: Stop after this many polls (None = forever).
+            on_poll: Callback receiving each poll result.
+        """
+        count = 0
+        while iterations is None or count < iterations:
+            started = time.monotonic()
+            try:
+                result = await self.poll_once()
+            except Exception as e:
+                logger.exception("Real-time poll failed")
+                result = RecordResult(errors=[f"{type(e).__name__}: {e}"])
+            if on_poll:
+                on_poll(result)
+            count += 1
+            if iterations is None or count < iterations:
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+# --- Queries ---
+
+
+def _time_range(
+    start: datetime | None, end: datetime | None, days: float | None
+) -> tuple[int, int]:
+    end_ts = int(end.timestamp()) if end else int(time.time())
+    if start:
+        start_ts = int(start.timestamp())
+    elif days is not None:
+        start_ts = end_ts - int(days * 86400)
+    else:
+        start_ts = 0
+    return start_ts, end_ts
+
+
+def get_hydro_history(
+    station_code: str,
+    param: str = "H",
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    days: float | None = None,
+) -> list[RealtimeHydroValue]:
+    """
+    Get recorded real-time values for a hydro station.
+
+    Args:
+        station_code: Station code.
+        param: "H" (water level), "Q" (flow) or "T" (water temperature).
+        start: Start time (inclusive); naive datetimes are local time.
+        end: End time (inclusive, default now).
+        days: Period length ending at ``end`` (used if ``start`` is None).
+
+    Returns:
+        Values ordered by measurement time.
+
+    Example:
+        >>> levels = get_hydro_history("150160180", days=30)
+        >>> print(levels[-1].measured_at, levels[-1].value)
+    """
+    start_ts, end_ts = _time_range(start, end, days)
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.execute(
+            """
+            SELECT measured_at, value FROM hydro_realtime
+            WHERE station_code = ? AND param = ? AND measured_at BETWEEN ? AND ?
+            ORDER BY measured_at
+            """,
+            (station_code, param, start_ts, end_ts),
+        )
+        return [
+            RealtimeHydroValue(
+                station_code=station_code,
+                param=param,
+                measured_at=datetime.fromtimestamp(row[0], UTC),
+                value=row[1],
+            )
+            for row in cursor
+        ]
+
+
+def get_synop_history(
+    station_id: str,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    days: float | None = None,
+) -> list[RealtimeSynopRecord]:
+    """
+    Get recorded real-time synop measurements for a station.
+
+    Args:
+        station_id: Synop station ID.
+        start: Start time (inclusive); naive datetimes are local time.
+        end: End time (inclusive, default now).
+        days: Period length ending at ``end`` (used if ``start`` is None).
+
+    Returns:
+        Records ordered by measurement time.
+    """
+    start_ts, end_ts = _time_range(start, end, days)
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.execute(
+            f"""
+            SELECT measured_at, {", ".join(_SYNOP_COLUMNS)} FROM synop_realtime
+            WHERE station_id = ? AND measured_at BETWEEN ? AND ?
+            ORDER BY measured_at
+            """,
+            (station_id, start_ts, end_ts),
+        )
+        return [
+            RealtimeSynopRecord(
+                station_id=station_id,
+                measured_at=datetime.fromtimestamp(row["measured_at"], UTC),
+                **{c: row[c] for c in _SYNOP_COLUMNS},
+            )
+            for row in cursor
+        ]
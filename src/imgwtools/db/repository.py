@@ -5,16 +5,49 @@ Provides repository pattern for querying cached IMGW data.
 """
 
 import sqlite3
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
+from typing import TYPE_CHECKING
 
 from imgwtools.db.connection import get_db_connection, get_transaction
 from imgwtools.db.models import (
     CachedRange,
+    FailedRange,
+    HydroDailyColumns,
     HydroDailyRecord,
     HydroMonthlyRecord,
     HydroSemiAnnualRecord,
     HydroStation,
+    StationCoverage,
 )
+from imgwtools.db.schema import DAILY_SUMMARY_SELECT, get_station_search_tables
+from imgwtools.metrics import instrument_query
+from imgwtools.text import fold_text, tokenize
+
+if TYPE_CHECKING:
+    from imgwtools.db.matrix import DailyMatrix
+
+
+def _row_to_station(row: sqlite3.Row) -> HydroStation:
+    return HydroStation(
+        station_code=row["station_code"],
+        station_name=row["station_name"],
+        river_name=row["river_name"],
+        latitude=row["latitude"],
+        longitude=row["longitude"],
+    )
+
+
+def _in_clause(values: list) -> str:
+    return f"IN ({', '.join('?' * len(values))})"
+
+
+def _fts_prefix_query(search: str) -> str | None:
+    """Build an FTS5 MATCH expression: every token must match as a prefix."""
+    tokens = tokenize(search)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
 
 
 class HydroRepository:
@@ -22,6 +55,7 @@ class HydroRepository:
 
     # --- Station methods ---
 
+    @instrument_query
     def get_stations(
         self,
         search: str | None = None,
@@ -41,38 +75,165 @@ class HydroRepository:
         """
         with get_db_connection(readonly=True) as conn:
             if search:
+                match = _fts_prefix_query(search)
+                if match is None:
+                    return []
+                if "hydro_stations_fts" in get_station_search_tables(conn):
+                    # Prefix search on folded names: "klodz" matches "Kłodzko"
+                    cursor = conn.execute(
+                        """
+                        SELECT s.station_code, s.station_name, s.river_name,
+                               s.latitude, s.longitude
+                        FROM hydro_stations_fts f
+                        JOIN hydro_stations s ON s.rowid = f.rowid
+                        WHERE hydro_stations_fts MATCH ?
+                        ORDER BY f.rank, s.station_name
+                        LIMIT ? OFFSET ?
+                        """,
+                        (match, limit, offset),
+                    )
+                else:
+                    cursor = conn.execute(
+                        """
+                        SELECT station_code, station_name, river_name, latitude, longitude
+                        FROM hydro_stations
+                        WHERE station_name LIKE ? OR river_name LIKE ?
+                        ORDER BY station_name
+                        LIMIT ? OFFSET ?
+                        """,
+                        (f"%{search}%", f"%{search}%", limit, offset),
+                    )
+            else:
                 cursor = conn.execute(
                     """
                     SELECT station_code, station_name, river_name, latitude, longitude
                     FROM hydro_stations
-                    WHERE station_name LIKE ? OR river_name LIKE ?
                     ORDER BY station_name
                     LIMIT ? OFFSET ?
                     """,
-                    (f"%{search}%", f"%{search}%", limit, offset),
+                    (limit, offset),
+                )
+
+            return [_row_to_station(row) for row in cursor]
+
+    @instrument_query
+    def get_stations_in_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        limit: int = 1000,
+    ) -> list[HydroStation]:
+        """
+        Get stations located inside a bounding box.
+
+        Uses the R-tree index when available.
+
+        Args:
+            min_lat: Southern edge in decimal degrees.
+            min_lon: Western edge in decimal degrees.
+            max_lat: Northern edge in decimal degrees.
+            max_lon: Eastern edge in decimal degrees.
+            limit: Maximum number of results.
+
+        Returns:
+            List of HydroStation objects ordered by name.
+        """
+        with get_db_connection(readonly=True) as conn:
+            if "hydro_stations_rtree" in get_station_search_tables(conn):
+                cursor = conn.execute(
+                    """
+                    SELECT s.station_code, s.station_name, s.river_name,
+                           s.latitude, s.longitude
+                    FROM hydro_stations_rtree r
+                    JOIN hydro_stations s ON s.rowid = r.id
+                    WHERE r.min_lat >= ? AND r.max_lat <= ?
+                      AND r.min_lon >= ? AND r.max_lon <= ?
+                    ORDER BY s.station_name
+                    LIMIT ?
+                    """,
+                    (min_lat, max_lat, min_lon, max_lon, limit),
                 )
             else:
                 cursor = conn.execute(
                     """
                     SELECT station_code, station_name, river_name, latitude, longitude
                     FROM hydro_stations
+                    WHERE latitude BETWEEN ? AND ?
+                      AND longitude BETWEEN ? AND ?
                     ORDER BY station_name
-                    LIMIT ? OFFSET ?
+                    LIMIT ?
                     """,
-                    (limit, offset),
+                    (min_lat, max_lat, min_lon, max_lon, limit),
                 )
 
-            return [
-                HydroStation(
-                    station_code=row["station_code"],
-                    station_name=row["station_name"],
-                    river_name=row["river_name"],
-                    latitude=row["latitude"],
-                    longitude=row["longitude"],
+            return [_row_to_station(row) for row in cursor]
+
+    @instrument_query
+    def find_station_codes(
+        self,
+        station_codes: Iterable[str] | None = None,
+        river: str | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+    ) -> list[str]:
+        """
+        Select cached stations by code list, river and/or bounding box.
+
+        All given filters must match. River names are compared without
+        case and Polish diacritics ("wisla" matches "Wisła").
+
+        Args:
+            station_codes: Explicit station codes.
+            river: River or lake name.
+            bbox: (min_lat, min_lon, max_lat, max_lon) in decimal degrees.
+
+        Returns:
+            Sorted station codes.
+        """
+        selected: set[str] | None = None
+        if station_codes is not None:
+            selected = set(station_codes)
+
+        if river is not None:
+            folded = fold_text(river).strip()
+            with get_db_connection(readonly=True) as conn:
+                cursor = conn.execute(
+                    "SELECT station_code, river_name FROM hydro_stations"
                 )
-                for row in cursor
-            ]
+                on_river = {
+                    row["station_code"]
+                    for row in cursor
+                    if fold_text(row["river_name"]).strip() == folded
+                }
+            selected = on_river if selected is None else selected & on_river
+
+        if bbox is not None:
+            in_bbox = {
+                s.station_code
+                for s in self.get_stations_in_bbox(*bbox, limit=1_000_000)
+            }
+            selected = in_bbox if selected is None else selected & in_bbox
+
+        return sorted(selected or ())
+
+    @instrument_query
+    def get_stations_by_code(self, station_codes: list[str]) -> dict[str, HydroStation]:
+        """Get metadata of many stations in one query (code -> station)."""
+        if not station_codes:
+            return {}
+        with get_db_connection(readonly=True) as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT station_code, station_name, river_name, latitude, longitude
+                FROM hydro_stations
+                WHERE station_code {_in_clause(station_codes)}
+                """,
+                station_codes,
+            )
+            return {row["station_code"]: _row_to_station(row) for row in cursor}
 
+    @instrument_query
     def get_station(self, station_code: str) -> HydroStation | None:
         """Get single station by code."""
         with get_db_connection(readonly=True) as conn:
@@ -86,20 +247,30 @@ class HydroRepository:
             )
             row = cursor.fetchone()
             if row:
-                return HydroStation(
-                    station_code=row["station_code"],
-                    station_name=row["station_name"],
-                    river_name=row["river_name"],
-                    latitude=row["latitude"],
-                    longitude=row["longitude"],
-                )
+                return _row_to_station(row)
             return None
 
-    def upsert_station(self, station: HydroStation) -> None:
-        """Insert or update station metadata."""
+    def upsert_station(
+        self,
+        station: HydroStation,
+        conn: sqlite3.Connection | None = None,
+        search_tables: set[str] | None = None,
+    ) -> None:
+        """
+        Insert or update station metadata.
+
+        Search indexes (FTS5, R-tree) are updated in the same transaction.
+
+        Args:
+            station: Station to store.
+            conn: Optional existing connection (for transaction grouping).
+            search_tables: Result of get_station_search_tables() for conn,
+                so that loops over many stations look it up only once.
+        """
         now = datetime.now(UTC).isoformat()
-        with get_transaction() as conn:
-            conn.execute(
+
+        def _upsert(c: sqlite3.Connection) -> None:
+            c.execute(
                 """
                 INSERT INTO hydro_stations
                     (station_code, station_name, river_name, latitude, longitude, updated_at)
@@ -120,9 +291,58 @@ class HydroRepository:
                     now,
                 ),
             )
+            tables = (
+                get_station_search_tables(c) if search_tables is None else search_tables
+            )
+            self._sync_search_index(c, station.station_code, tables)
+
+        if conn:
+            _upsert(conn)
+        else:
+            with get_transaction() as c:
+                _upsert(c)
+
+    def _sync_search_index(
+        self, conn: sqlite3.Connection, station_code: str, tables: set[str]
+    ) -> None:
+        """Refresh FTS5 and R-tree entries of a single station."""
+        if not tables:
+            return
+
+        row = conn.execute(
+            """
+            SELECT rowid, station_name, river_name, latitude, longitude
+            FROM hydro_stations
+            WHERE station_code = ?
+            """,
+            (station_code,),
+        ).fetchone()
+        rowid, name, river, lat, lon = row
+
+        if "hydro_stations_fts" in tables:
+            conn.execute("DELETE FROM hydro_stations_fts WHERE rowid = ?", (rowid,))
+            conn.execute(
+                """
+                INSERT INTO hydro_stations_fts (rowid, station_name, river_name)
+                VALUES (?, ?, ?)
+                """,
+                (rowid, fold_text(name), fold_text(river)),
+            )
+
+        if "hydro_stations_rtree" in tables:
+            conn.execute("DELETE FROM hydro_stations_rtree WHERE id = ?", (rowid,))
+            if lat is not None and lon is not None:
+                conn.execute(
+                    """
+                    INSERT INTO hydro_stations_rtree (id, min_lat, max_lat, min_lon, max_lon)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (rowid, lat, lat, lon, lon),
+                )
 
     # --- Daily data methods ---
 
+    @instrument_query
     def get_daily_data(
         self,
         station_code: str | None = None,
@@ -202,6 +422,125 @@ class HydroRepository:
                 for row in cursor
             ]
 
+    def iter_daily_rows(
+        self,
+        station_codes: list[str],
+        start_year: int | None = None,
+        end_year: int | None = None,
+        batch_size: int = 10_000,
+    ) -> Iterator[tuple[str, str | None, float | None, float | None, float | None]]:
+        """
+        Stream daily values of many stations from one query.
+
+        Rows are plain tuples ``(station_code, measurement_date,
+        water_level_cm, flow_m3s, water_temp_c)`` ordered by station and
+        date, fetched in batches so memory use does not grow with the
+        result. Station metadata is not joined; use get_stations_by_code.
+
+        Args:
+            station_codes: Station codes.
+            start_year: Start hydrological year (inclusive).
+            end_year: End hydrological year (inclusive).
+            batch_size: Number of rows fetched from SQLite at a time.
+
+        Yields:
+            Row tuples.
+        """
+        if not station_codes:
+            return
+
+        conditions = [f"station_code {_in_clause(station_codes)}"]
+        params: list = list(station_codes)
+        if start_year:
+            conditions.append("hydro_year >= ?")
+            params.append(start_year)
+        if end_year:
+            conditions.append("hydro_year <= ?")
+            params.append(end_year)
+
+        with get_db_connection(readonly=True) as conn:
+            conn.row_factory = None
+            cursor = conn.execute(
+                f"""
+                SELECT station_code, measurement_date,
+                       water_level_cm, flow_m3s, water_temp_c
+                FROM hydro_daily
+                WHERE {" AND ".join(conditions)}
+                ORDER BY station_code, measurement_date
+                """,
+                params,
+            )
+            while rows := cursor.fetchmany(batch_size):
+                yield from rows
+
+    @instrument_query
+    def get_daily_data_bulk(
+        self,
+        station_codes: list[str],
+        start_year: int | None = None,
+        end_year: int | None = None,
+    ) -> HydroDailyColumns:
+        """
+        Get daily values of many stations as columns.
+
+        Args:
+            station_codes: Station codes.
+            start_year: Start hydrological year (inclusive).
+            end_year: End hydrological year (inclusive).
+
+        Returns:
+            Columnar result with station metadata looked up once.
+        """
+        rows = list(self.iter_daily_rows(station_codes, start_year, end_year))
+        columns = [list(column) for column in zip(*rows, strict=True)]
+        columns = columns or [[] for _ in range(5)]
+        # model_construct skips per-item validation of the column lists
+        return HydroDailyColumns.model_construct(
+            stations=self.get_stations_by_code(sorted({r[0] for r in rows})),
+            station_code=columns[0],
+            measurement_date=columns[1],
+            water_level_cm=columns[2],
+            flow_m3s=columns[3],
+            water_temp_c=columns[4],
+        )
+
+    @instrument_query
+    def get_daily_matrix(
+        self,
+        station_codes: list[str],
+        param: str = "Q",
+        start_year: int | None = None,
+        end_year: int | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ) -> "DailyMatrix":
+        """
+        Get a dates x stations matrix of daily values.
+
+        Requires numpy (pip install imgwtools[spatial]).
+
+        Args:
+            station_codes: Station codes (matrix columns, in this order).
+            param: "H" (water level), "Q" (flow) or "T" (water temperature).
+            start_year: Start hydrological year (rows from 1 November).
+            end_year: End hydrological year (rows up to 31 October).
+            start_date: Start date in YYYY-MM-DD format (overrides start_year).
+            end_date: End date in YYYY-MM-DD format (overrides end_year).
+
+        Returns:
+            DailyMatrix with NaN (masked) where data is missing.
+
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+        from imgwtools.db.matrix import build_daily_matrix
+
+        if start_date is None and start_year is not None:
+            start_date = f"{start_year - 1}-11-01"
+        if end_date is None and end_year is not None:
+            end_date = f"{end_year}-10-31"
+        return build_daily_matrix(station_codes, param, start_date, end_date)
+
     def insert_daily_batch(
         self,
         records: list[HydroDailyRecord],
@@ -251,8 +590,136 @@ class HydroRepository:
             with get_transaction() as c:
                 return _insert(c)
 
+    def refresh_daily_summary(
+        self,
+        keys: set[tuple[str, int]],
+        conn: sqlite3.Connection | None = None,
+    ) -> None:
+        """
+        Recompute hydro_daily_summary rows for (station_code, hydro_year) keys.
+
+        Each key is rebuilt from its own hydro_daily rows (an index range
+        scan), so the cost is proportional to the imported data only.
+
+        Args:
+            keys: Station-year pairs touched by an import.
+            conn: Optional existing connection (for transaction grouping).
+        """
+        if not keys:
+            return
+
+        def _refresh(c: sqlite3.Connection) -> None:
+            params = sorted(keys)
+            c.executemany(
+                """
+                DELETE FROM hydro_daily_summary
+                WHERE station_code = ? AND hydro_year = ?
+                """,
+                params,
+            )
+            c.executemany(
+                DAILY_SUMMARY_SELECT
+                + """
+                WHERE station_code = ? AND hydro_year = ?
+                GROUP BY station_code, hydro_year
+                """,
+                params,
+            )
+
+        if conn:
+            _refresh(conn)
+        else:
+            with get_transaction() as c:
+                _refresh(c)
+
+    @instrument_query
+    def get_station_coverage(
+        self,
+        station_code: str | None = None,
+        start_year: int | None = None,
+        end_year: int | None = None,
+    ) -> list[StationCoverage]:
+        """
+        Get record length, date range, completeness and extremes per station.
+
+        Reads hydro_daily_summary only, so the cost does not depend on the
+        number of daily records in the cache.
+
+        Args:
+            station_code: Optional single station.
+            start_year: Start hydrological year (inclusive).
+            end_year: End hydrological year (inclusive).
+
+        Returns:
+            Coverage of stations with daily data, ordered by station code.
+        """
+        conditions = []
+        params: list = []
+        if station_code:
+            conditions.append("s.station_code = ?")
+            params.append(station_code)
+        if start_year is not None:
+            conditions.append("s.hydro_year >= ?")
+            params.append(start_year)
+        if end_year is not None:
+            conditions.append("s.hydro_year <= ?")
+            params.append(end_year)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with get_db_connection(readonly=True) as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT
+                    s.station_code,
+                    st.station_name,
+                    st.river_name,
+                    MIN(s.hydro_year) AS first_year,
+                    MAX(s.hydro_year) AS last_year,
+                    MIN(s.first_date) AS first_date,
+                    MAX(s.last_date) AS last_date,
+                    SUM(s.day_count) AS day_count,
+                    MIN(s.level_min) AS level_min,
+                    MAX(s.level_max) AS level_max,
+                    MIN(s.flow_min) AS flow_min,
+                    MAX(s.flow_max) AS flow_max
+                FROM hydro_daily_summary s
+                LEFT JOIN hydro_stations st ON st.station_code = s.station_code
+                {where}
+                GROUP BY s.station_code
+                ORDER BY s.station_code
+                """,
+                params,
+            )
+            result = []
+            for row in cursor:
+                span = None
+                if row["first_date"] and row["last_date"]:
+                    span = (
+                        datetime.fromisoformat(row["last_date"])
+                        - datetime.fromisoformat(row["first_date"])
+                    ).days + 1
+                result.append(
+                    StationCoverage(
+                        station_code=row["station_code"],
+                        station_name=row["station_name"],
+                        river_name=row["river_name"],
+                        first_year=row["first_year"],
+                        last_year=row["last_year"],
+                        first_date=row["first_date"],
+                        last_date=row["last_date"],
+                        day_count=row["day_count"],
+                        completeness=row["day_count"] / span if span else None,
+                        level_min=row["level_min"],
+                        level_max=row["level_max"],
+                        flow_min=row["flow_min"],
+                        flow_max=row["flow_max"],
+                    )
+                )
+            return result
+
     # --- Monthly data methods ---
 
+    @instrument_query
     def get_monthly_data(
         self,
         station_code: str | None = None,
@@ -354,6 +821,7 @@ class HydroRepository:
 
     # --- Semi-annual data methods ---
 
+    @instrument_query
     def get_semi_annual_data(
         self,
         station_code: str | None = None,
@@ -460,6 +928,7 @@ class HydroRepository:
 
     # --- Cache management methods ---
 
+    @instrument_query
     def is_range_cached(
         self,
         interval: str,
@@ -533,6 +1002,7 @@ class HydroRepository:
             with get_transaction() as c:
                 _insert(c)
 
+    @instrument_query
     def get_cached_ranges(self, interval: str | None = None) -> list[CachedRange]:
         """Get list of cached ranges."""
         with get_db_connection(readonly=True) as conn:
@@ -569,6 +1039,72 @@ class HydroRepository:
                 for row in cursor
             ]
 
+    def record_failed_range(
+        self,
+        interval: str,
+        year: int,
+        error: str,
+        month: int | None = None,
+        param: str | None = None,
+        source_file: str | None = None,
+    ) -> None:
+        """Record a failed download/import of a range (count repeated failures)."""
+        now = datetime.now(UTC).isoformat()
+        with get_transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE failed_ranges
+                SET error = ?, source_file = COALESCE(?, source_file),
+                    attempts = attempts + 1, last_failed_at = ?
+                WHERE interval = ? AND year = ? AND month IS ? AND param IS ?
+                """,
+                (error, source_file, now, interval, year, month, param),
+            )
+            if cursor.rowcount == 0:
+                conn.execute(
+                    """
+                    INSERT INTO failed_ranges
+                        (interval, year, month, param, source_file, error,
+                         first_failed_at, last_failed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (interval, year, month, param, source_file, error, now, now),
+                )
+
+    def clear_failed_range(
+        self,
+        interval: str,
+        year: int,
+        month: int | None = None,
+        param: str | None = None,
+    ) -> None:
+        """Remove a range from the failure ledger."""
+        with get_transaction() as conn:
+            conn.execute(
+                """
+                DELETE FROM failed_ranges
+                WHERE interval = ? AND year = ? AND month IS ? AND param IS ?
+                """,
+                (interval, year, month, param),
+            )
+
+    @instrument_query
+    def get_failed_ranges(self, interval: str | None = None) -> list[FailedRange]:
+        """Get ranges whose download or import failed."""
+        query = """
+            SELECT id, interval, year, month, param, source_file, error,
+                   attempts, first_failed_at, last_failed_at
+            FROM failed_ranges
+        """
+        params: tuple = ()
+        if interval:
+            query += " WHERE interval = ?"
+            params = (interval,)
+        query += " ORDER BY interval, year, month, param"
+
+        with get_db_connection(readonly=True) as conn:
+            return [FailedRange(**dict(row)) for row in conn.execute(query, params)]
+
     def clear_cache(self, interval: str | None = None) -> int:
         """
         Clear cached data.
@@ -592,11 +1128,14 @@ class HydroRepository:
                 if table:
                     conn.execute(f"DELETE FROM {table}")
                     total += conn.total_changes
+                if table == "hydro_daily":
+                    conn.execute("DELETE FROM hydro_daily_summary")
                 conn.execute("DELETE FROM cached_ranges WHERE interval = ?", (interval,))
                 total += conn.total_changes
             else:
                 conn.execute("DELETE FROM hydro_daily")
                 total += conn.total_changes
+                conn.execute("DELETE FROM hydro_daily_summary")
                 conn.execute("DELETE FROM hydro_monthly")
                 total += conn.total_changes
                 conn.execute("DELETE FROM hydro_semi_annual")
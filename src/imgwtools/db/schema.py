@@ -10,7 +10,7 @@ from datetime import UTC, datetime
 from imgwtools.db.connection import db_exists, get_db_connection
 
 # Current schema version
-CURRENT_VERSION = 1
+CURRENT_VERSION = 5
 
 # Schema DDL statements
 SCHEMA_V1 = """
@@ -97,6 +97,128 @@ CREATE INDEX IF NOT EXISTS idx_semi_station_year ON hydro_semi_annual(station_co
 CREATE INDEX IF NOT EXISTS idx_cached_lookup ON cached_ranges(interval, year, month, param);
 """
 
+# Station search indexes. Rows share rowid with hydro_stations and are
+# kept in sync by HydroRepository.upsert_station. FTS columns hold
+# diacritic-folded text (see imgwtools.text.fold_text) because the
+# unicode61 tokenizer does not fold letters such as 'ł'.
+# Each statement is applied separately: FTS5/R-tree are optional SQLite
+# modules and search falls back to LIKE/BETWEEN queries without them.
+SCHEMA_V2 = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS hydro_stations_fts USING fts5(
+        station_name,
+        river_name,
+        tokenize = 'unicode61'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS hydro_stations_rtree USING rtree(
+        id,
+        min_lat, max_lat,
+        min_lon, max_lon
+    )
+    """,
+]
+
+# Real-time history recorded from the IMGW current-data API. Clustered
+# by station and time (WITHOUT ROWID) so "last N days at station X" is a
+# single primary-key range scan. Times are Unix seconds (UTC).
+SCHEMA_V3 = """
+CREATE TABLE IF NOT EXISTS hydro_realtime (
+    station_code TEXT NOT NULL,
+    param TEXT NOT NULL,
+    measured_at INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (station_code, param, measured_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS synop_realtime (
+    station_id TEXT NOT NULL,
+    measured_at INTEGER NOT NULL,
+    temperature_c REAL,
+    wind_speed_ms REAL,
+    wind_direction INTEGER,
+    humidity_percent REAL,
+    precipitation_mm REAL,
+    pressure_hpa REAL,
+    PRIMARY KEY (station_id, measured_at)
+) WITHOUT ROWID;
+"""
+
+# Per station x hydrological year rollup of hydro_daily, refreshed for
+# the imported keys by HydroCacheManager._import_zip_data. Station
+# overviews and status counts read this table instead of hydro_daily.
+SCHEMA_V4 = """
+CREATE TABLE IF NOT EXISTS hydro_daily_summary (
+    station_code TEXT NOT NULL,
+    hydro_year INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    day_count INTEGER NOT NULL,
+    first_date TEXT,
+    last_date TEXT,
+    level_count INTEGER NOT NULL,
+    level_min REAL,
+    level_max REAL,
+    flow_count INTEGER NOT NULL,
+    flow_min REAL,
+    flow_max REAL,
+    temp_count INTEGER NOT NULL,
+    PRIMARY KEY (station_code, hydro_year)
+) WITHOUT ROWID;
+"""
+
+# Rollup of hydro_daily rows; callers append WHERE and GROUP BY clauses.
+# day_count counts days with at least one measured value.
+DAILY_SUMMARY_SELECT = """
+    INSERT INTO hydro_daily_summary
+        (station_code, hydro_year, row_count, day_count, first_date, last_date,
+         level_count, level_min, level_max, flow_count, flow_min, flow_max,
+         temp_count)
+    SELECT
+        station_code,
+        hydro_year,
+        COUNT(*),
+        COUNT(COALESCE(water_level_cm, flow_m3s, water_temp_c)),
+        MIN(measurement_date),
+        MAX(measurement_date),
+        COUNT(water_level_cm),
+        MIN(water_level_cm),
+        MAX(water_level_cm),
+        COUNT(flow_m3s),
+        MIN(flow_m3s),
+        MAX(flow_m3s),
+        COUNT(water_temp_c)
+    FROM hydro_daily
+"""
+
+# Ledger of archive files whose download or import failed; the entries are
+# retried by HydroCacheManager.retry_failed and removed once cached.
+SCHEMA_V5 = """
+CREATE TABLE IF NOT EXISTS failed_ranges (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    interval TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER,
+    param TEXT,
+    source_file TEXT,
+    error TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    first_failed_at TEXT NOT NULL,
+    last_failed_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_failed_lookup ON failed_ranges(interval, year, month, param);
+"""
+
+# Migrations: version -> (statements, description)
+MIGRATIONS: dict[int, tuple[str | list[str], str]] = {
+    1: (SCHEMA_V1, "Initial schema with hydro tables"),
+    2: (SCHEMA_V2, "FTS5 and R-tree indexes for station search"),
+    3: (SCHEMA_V3, "Real-time hydro and synop history"),
+    4: (SCHEMA_V4, "Per-station hydro_daily summary"),
+    5: (SCHEMA_V5, "Ledger of failed cache downloads"),
+}
+
 
 def init_db(force: bool = False) -> bool:
     """
@@ -118,34 +240,147 @@ def init_db(force: bool = False) -> bool:
             # Drop all tables
             conn.executescript("""
                 DROP TABLE IF EXISTS hydro_daily;
+                DROP TABLE IF EXISTS hydro_daily_summary;
                 DROP TABLE IF EXISTS hydro_monthly;
                 DROP TABLE IF EXISTS hydro_semi_annual;
                 DROP TABLE IF EXISTS hydro_stations;
+                DROP TABLE IF EXISTS hydro_stations_fts;
+                DROP TABLE IF EXISTS hydro_stations_rtree;
+                DROP TABLE IF EXISTS hydro_realtime;
+                DROP TABLE IF EXISTS synop_realtime;
                 DROP TABLE IF EXISTS cached_ranges;
+                DROP TABLE IF EXISTS failed_ranges;
                 DROP TABLE IF EXISTS schema_version;
             """)
 
         # Check current version
-        current = get_schema_version(conn)
+        current = 0 if force else get_schema_version(conn)
 
-        if current >= CURRENT_VERSION and not force:
+        if current >= CURRENT_VERSION:
             return False
 
-        # Apply schema
-        conn.executescript(SCHEMA_V1)
-
-        # Record version
+        # Apply pending migrations in order
         now = datetime.now(UTC).isoformat()
-        conn.execute(
+        for version in sorted(MIGRATIONS):
+            if version <= current:
+                continue
+
+            statements, description = MIGRATIONS[version]
+            if isinstance(statements, str):
+                conn.executescript(statements)
+            else:
+                for statement in statements:
+                    _execute_optional(conn, statement)
+
+            if version == 2:
+                rebuild_station_search_index(conn)
+            elif version == 4:
+                rebuild_daily_summary(conn)
+
+            # Record version
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO schema_version (version, applied_at, description)
+                VALUES (?, ?, ?)
+                """,
+                (version, now, description),
+            )
+        conn.commit()
+
+        return True
+
+
+def _execute_optional(conn: sqlite3.Connection, statement: str) -> None:
+    """Execute DDL that needs an optional SQLite module (FTS5, R-tree)."""
+    try:
+        conn.execute(statement)
+    except sqlite3.OperationalError as e:
+        if "no such module" not in str(e):
+            raise
+
+
+def get_station_search_tables(conn: sqlite3.Connection) -> set[str]:
+    """
+    Get names of station search index tables present in the database.
+
+    Args:
+        conn: Open database connection.
+
+    Returns:
+        Subset of {"hydro_stations_fts", "hydro_stations_rtree"}.
+    """
+    cursor = conn.execute(
+        """
+        SELECT name FROM sqlite_master
+        WHERE name IN ('hydro_stations_fts', 'hydro_stations_rtree')
+        """
+    )
+    return {row[0] for row in cursor}
+
+
+def rebuild_station_search_index(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild FTS5 and R-tree station indexes from hydro_stations.
+
+    Args:
+        conn: Open database connection (caller commits).
+
+    Returns:
+        Number of stations indexed.
+    """
+    from imgwtools.text import fold_text
+
+    tables = get_station_search_tables(conn)
+    rows = conn.execute(
+        """
+        SELECT rowid, station_name, river_name, latitude, longitude
+        FROM hydro_stations
+        """
+    ).fetchall()
+
+    if "hydro_stations_fts" in tables:
+        conn.execute("DELETE FROM hydro_stations_fts")
+        conn.executemany(
             """
-            INSERT OR REPLACE INTO schema_version (version, applied_at, description)
+            INSERT INTO hydro_stations_fts (rowid, station_name, river_name)
             VALUES (?, ?, ?)
             """,
-            (CURRENT_VERSION, now, "Initial schema with hydro tables"),
+            [(r[0], fold_text(r[1]), fold_text(r[2])) for r in rows],
         )
-        conn.commit()
 
-        return True
+    if "hydro_stations_rtree" in tables:
+        conn.execute("DELETE FROM hydro_stations_rtree")
+        conn.executemany(
+            """
+            INSERT INTO hydro_stations_rtree (id, min_lat, max_lat, min_lon, max_lon)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (r[0], r[3], r[3], r[4], r[4])
+                for r in rows
+                if r[3] is not None and r[4] is not None
+            ],
+        )
+
+    return len(rows)
+
+
+def rebuild_daily_summary(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild hydro_daily_summary from all hydro_daily rows.
+
+    Needed only once when migrating an existing cache; imports keep
+    the summary up to date afterwards.
+
+    Args:
+        conn: Open database connection (caller commits).
+
+    Returns:
+        Number of station-year summaries written.
+    """
+    conn.execute("DELETE FROM hydro_daily_summary")
+    cursor = conn.execute(DAILY_SUMMARY_SELECT + " GROUP BY station_code, hydro_year")
+    return cursor.rowcount
 
 
 def get_schema_version(conn: sqlite3.Connection | None = None) -> int:
@@ -179,10 +414,16 @@ def get_schema_version(conn: sqlite3.Connection | None = None) -> int:
         return _get_version(c)
 
 
-def get_table_counts() -> dict[str, int]:
+def get_table_counts(exact: bool = False) -> dict[str, int]:
     """
     Get record counts for all data tables.
 
+    The hydro_daily count is read from hydro_daily_summary, which is
+    O(stations x years) instead of a full scan of the largest table.
+
+    Args:
+        exact: Count hydro_daily rows directly.
+
     Returns:
         Dictionary mapping table names to record counts.
     """
@@ -191,14 +432,33 @@ def get_table_counts() -> dict[str, int]:
         "hydro_daily",
         "hydro_monthly",
         "hydro_semi_annual",
+        "hydro_realtime",
+        "synop_realtime",
         "cached_ranges",
+        "failed_ranges",
     ]
 
     counts = {}
 
     with get_db_connection(readonly=True) as conn:
+        existing = {
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
         for table in tables:
-            cursor = conn.execute(f"SELECT COUNT(*) FROM {table}")
+            # Tables of pending migrations are missing until 'imgw db init'
+            if table not in existing:
+                continue
+            if (
+                table == "hydro_daily"
+                and not exact
+                and "hydro_daily_summary" in existing
+            ):
+                cursor = conn.execute(
+                    "SELECT COALESCE(SUM(row_count), 0) FROM hydro_daily_summary"
+                )
+            else:
+                cursor = conn.execute(f"SELECT COUNT(*) FROM {table}")
             counts[table] = cursor.fetchone()[0]
 
     return counts
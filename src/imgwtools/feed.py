@@ -0,0 +1,469 @@
+"""
+Change feed for current IMGW data.
+
+One poller fetches the current hydro, synop and warnings feeds once per
+interval, diffs each against the previous snapshot and pushes only the
+changed records to subscribers. Any number of clients (SSE, WebSocket)
+then cost a single upstream request per interval instead of one per
+client poll.
+
+Example:
+    >>> from imgwtools.feed import ChangeFeed, ChangeFilter
+    >>> feed = ChangeFeed(interval=60)
+    >>> with feed.subscribe(ChangeFilter.create(rivers=["Wisła"])) as sub:
+    ...     async for batch in sub:
+    ...         print(batch.topic, [c.key for c in batch.changes])
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from imgwtools.exceptions import IMGWError
+from imgwtools.fetch import (
+    DEFAULT_TIMEOUT,
+    fetch_hydro_current_async,
+    fetch_synop_async,
+    fetch_warnings_async,
+)
+from imgwtools.text import fold_text
+
+Record = dict[str, Any]
+Source = Callable[[], Awaitable[dict[str, Record]]]
+ChangeKind = Literal["added", "changed", "removed"]
+
+logger = logging.getLogger(__name__)
+
+TOPICS = ("hydro", "synop", "warnings")
+
+# Default poll interval [s] (IMGW current data updates every 10-60 min)
+DEFAULT_INTERVAL = 60.0
+
+# Batches buffered per subscriber before it is resynchronised
+DEFAULT_QUEUE_SIZE = 100
+
+
+@dataclass(frozen=True)
+class Change:
+    """Single changed record (``data`` is the last known record if removed)."""
+
+    key: str
+    kind: ChangeKind
+    data: Record
+
+
+@dataclass(frozen=True)
+class ChangeBatch:
+    """
+    Changes of one topic produced by one poll.
+
+    Attributes:
+        topic: Feed name ("hydro", "synop", "warnings").
+        version: Topic version after the poll (increments on every change).
+        changes: Changed records.
+        full: True if ``changes`` is the whole snapshot, not a diff
+            (sent on subscribe and after a subscriber fell behind).
+    """
+
+    topic: str
+    version: int
+    changes: list[Change]
+    full: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "topic": self.topic,
+            "version": self.version,
+            "full": self.full,
+            "changes": [
+                {"key": c.key, "kind": c.kind, "data": c.data} for c in self.changes
+            ],
+        }
+
+
+@dataclass(frozen=True)
+class ChangeFilter:
+    """
+    Subscriber filter; empty sets match everything.
+
+    Station, river and state filters only match records that have the
+    field (``station_id``, ``river``, ``state``), so e.g. a river filter
+    excludes synop and warnings records.
+    """
+
+    topics: frozenset[str] = frozenset()
+    station_ids: frozenset[str] = frozenset()
+    rivers: frozenset[str] = frozenset()
+    states: frozenset[str] = frozenset()
+
+    @classmethod
+    def create(
+        cls,
+        topics: Iterable[str] | None = None,
+        station_ids: Iterable[str] | None = None,
+        rivers: Iterable[str] | None = None,
+        states: Iterable[str] | None = None,
+    ) -> ChangeFilter:
+        """Build a filter; river names are matched case/diacritics-insensitive."""
+        return cls(
+            topics=frozenset(topics or ()),
+            station_ids=frozenset(station_ids or ()),
+            rivers=frozenset(fold_text(r) for r in rivers or ()),
+            states=frozenset(s.lower() for s in states or ()),
+        )
+
+    def matches(self, record: Record) -> bool:
+        if self.station_ids and record.get("station_id") not in self.station_ids:
+            return False
+        if self.rivers and fold_text(record.get("river")) not in self.rivers:
+            return False
+        if self.states and (record.get("state") or "").lower() not in self.states:
+            return False
+        return True
+
+    def apply(self, batch: ChangeBatch) -> ChangeBatch | None:
+        """Filtered batch, or None if nothing in it is of interest."""
+        if self.topics and batch.topic not in self.topics:
+            return None
+        if not (self.station_ids or self.rivers or self.states):
+            return batch
+        changes = [c for c in batch.changes if self.matches(c.data)]
+        if not changes and not batch.full:
+            return None
+        return ChangeBatch(batch.topic, batch.version, changes, batch.full)
+
+
+_CLOSED = object()
+
+
+class Subscription:
+    """
+    Queue of filtered change batches for one client.
+
+    Iterate with ``async for`` or call :meth:`get`; use as a context
+    manager to unsubscribe when the client goes away.
+    """
+
+    def __init__(self, feed: ChangeFeed, flt: ChangeFilter, maxsize: int):
+        self.feed = feed
+        self.filter = flt
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __aiter__(self) -> Subscription:
+        return self
+
+    async def __anext__(self) -> ChangeBatch:
+        item = await self._queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+    async def get(self, timeout: float | None = None) -> ChangeBatch | None:
+        """
+        Wait for the next batch.
+
+        Returns:
+            The batch, or None on timeout or when the subscription is closed.
+        """
+        try:
+            item = await asyncio.wait_for(self._queue.get(), timeout)
+        except TimeoutError:
+            return None
+        return None if item is _CLOSED else item
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.feed._unsubscribe(self)
+        with contextlib.suppress(asyncio.QueueFull):
+            self._queue.put_nowait(_CLOSED)
+
+    def _push(self, batch: ChangeBatch) -> None:
+        filtered = self.filter.apply(batch)
+        if filtered is None or self.closed:
+            return
+        try:
+            self._queue.put_nowait(filtered)
+        except asyncio.QueueFull:
+            # Slow client: drop its backlog and send full snapshots instead
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._push_snapshots()
+
+    def _push_snapshots(self) -> None:
+        for batch in self.feed._snapshot_batches():
+            filtered = self.filter.apply(batch)
+            if filtered is not None:
+                with contextlib.suppress(asyncio.QueueFull):
+                    self._queue.put_nowait(filtered)
+
+
+class ChangeFeed:
+    """
+    Poller that diffs current-data feeds and fans changes out to subscribers.
+
+    Attributes:
+        interval: Seconds between polls (polling pauses without subscribers).
+        last_errors: Error of the last failed poll per topic.
+    """
+
+    def __init__(
+        self,
+        sources: Mapping[str, Source] | None = None,
+        interval: float = DEFAULT_INTERVAL,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        """
+        Create the feed.
+
+        Args:
+            sources: Async callables returning records keyed by ID per
+                topic; defaults to :func:`default_sources`.
+            interval: Poll interval in seconds.
+            queue_size: Batches buffered per subscriber.
+        """
+        self.sources = dict(sources if sources is not None else default_sources())
+        self.interval = interval
+        self.queue_size = queue_size
+        self.last_errors: dict[str, str] = {}
+        self._snapshots: dict[str, dict[str, Record]] = {}
+        self._versions: dict[str, int] = {}
+        self._subscribers: set[Subscription] = set()
+        self._polled_at: float | None = None
+        self._has_subscribers = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def is_stale(self) -> bool:
+        if self._polled_at is None:
+            return True
+        return time.monotonic() - self._polled_at >= self.interval
+
+    def snapshot(self, topic: str) -> dict[str, Record]:
+        """Current records of a topic by key (empty before the first poll)."""
+        return self._snapshots.get(topic, {})
+
+    def version(self, topic: str) -> int:
+        return self._versions.get(topic, 0)
+
+    # --- Subscribers ---
+
+    def subscribe(
+        self, flt: ChangeFilter | None = None, *, snapshot: bool = True
+    ) -> Subscription:
+        """
+        Register a subscriber.
+
+        Args:
+            flt: Filter applied to every batch (default: everything).
+            snapshot: Start with full batches of the current snapshots.
+
+        Returns:
+            Subscription; close it (or leave its ``with`` block) when done.
+        """
+        sub = Subscription(self, flt or ChangeFilter(), self.queue_size)
+        if snapshot:
+            sub._push_snapshots()
+        self._subscribers.add(sub)
+        self._has_subscribers.set()
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+        if not self._subscribers:
+            self._has_subscribers.clear()
+
+    def _snapshot_batches(self) -> list[ChangeBatch]:
+        return [
+            ChangeBatch(
+                topic,
+                self._versions[topic],
+                [Change(key, "added", rec) for key, rec in records.items()],
+                full=True,
+            )
+            for topic, records in self._snapshots.items()
+        ]
+
+    # --- Polling ---
+
+    def publish(self, topic: str, records: dict[str, Record]) -> ChangeBatch | None:
+        """
+        Replace a topic snapshot and push the differences.
+
+        Args:
+            topic: Feed name.
+            records: Complete current records keyed by ID.
+
+        Returns:
+            Batch of changes, or None if nothing changed.
+        """
+        previous = self._snapshots.get(topic)
+        self._snapshots[topic] = records
+        if previous is None:
+            changes = [Change(key, "added", rec) for key, rec in records.items()]
+        else:
+            changes = [
+                Change(key, "added" if key not in previous else "changed", rec)
+                for key, rec in records.items()
+                if previous.get(key) != rec
+            ]
+            changes.extend(
+                Change(key, "removed", rec)
+                for key, rec in previous.items()
+                if key not in records
+            )
+        if previous is not None and not changes:
+            return None
+
+        self._versions[topic] = self._versions.get(topic, 0) + 1
+        batch = ChangeBatch(topic, self._versions[topic], changes)
+        for sub in list(self._subscribers):
+            sub._push(batch)
+        return batch
+
+    async def poll(self) -> list[ChangeBatch]:
+        """
+        Fetch all sources concurrently and publish their changes.
+
+        A failed source (IMGW error, or any other exception such as a
+        parsing error) keeps its previous snapshot; the error is stored
+        in ``last_errors``.
+        """
+        async with self._lock:
+            return await self._poll_locked()
+
+    async def ensure_fresh(self) -> None:
+        """Poll now unless another caller just did (for one-off reads)."""
+        async with self._lock:
+            if self.is_stale:
+                await self._poll_locked()
+
+    async def _poll_locked(self) -> list[ChangeBatch]:
+        topics = list(self.sources)
+        results = await asyncio.gather(
+            *(self.sources[t]() for t in topics), return_exceptions=True
+        )
+        self._polled_at = time.monotonic()
+
+        batches = []
+        for topic, result in zip(topics, results, strict=True):
+            if isinstance(result, Exception):
+                if not isinstance(result, IMGWError):
+                    logger.error("Polling %s failed", topic, exc_info=result)
+                self.last_errors[topic] = str(result) or type(result).__name__
+                continue
+            if isinstance(result, BaseException):
+                raise result  # cancellation
+            self.last_errors.pop(topic, None)
+            batch = self.publish(topic, result)
+            if batch is not None:
+                batches.append(batch)
+        return batches
+
+    async def run_poll_loop(self) -> None:
+        """
+        Poll every ``interval`` seconds until cancelled.
+
+        Upstream is not polled while nobody is subscribed; the first
+        subscriber after a pause triggers an immediate poll. Unexpected
+        errors are logged and the loop keeps running.
+        """
+        if self.interval <= 0:
+            return
+        while True:
+            try:
+                await self._has_subscribers.wait()
+                if self.is_stale:
+                    await self.poll()
+                else:
+                    elapsed = time.monotonic() - (self._polled_at or 0.0)
+                    await asyncio.sleep(self.interval - elapsed)
+            except Exception:
+                logger.exception("Change feed poll failed")
+                await asyncio.sleep(self.interval)
+
+
+def default_sources(
+    water_states: Callable[[], Awaitable[Mapping[str, str]]] | None = None,
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> dict[str, Source]:
+    """
+    Sources for the IMGW public data API.
+
+    Args:
+        water_states: Optional async callable returning the hydro-back
+            water state ("alarm", "warning", ...) by station ID; it is
+            added to hydro records as ``state``.
+        timeout: Request timeout in seconds.
+
+    Returns:
+        Sources for the "hydro", "synop" and "warnings" topics.
+    """
+
+    async def hydro() -> dict[str, Record]:
+        data = await fetch_hydro_current_async(timeout=timeout)
+        states = await water_states() if water_states else {}
+        return {
+            r.station_id: r.model_dump() | {"state": states.get(r.station_id)}
+            for r in data
+        }
+
+    async def synop() -> dict[str, Record]:
+        data = await fetch_synop_async(timeout=timeout)
+        return {r.station_id: r.model_dump() for r in data}
+
+    async def warnings() -> dict[str, Record]:
+        hydro_w, meteo_w = await asyncio.gather(
+            fetch_warnings_async("hydro", timeout=timeout),
+            fetch_warnings_async("meteo", timeout=timeout),
+        )
+        return {
+            f"{source}:{w.id}": w.model_dump() | {"source": source}
+            for source, items in (("hydro", hydro_w), ("meteo", meteo_w))
+            for w in items
+        }
+
+    return {"hydro": hydro, "synop": synop, "warnings": warnings}
+
+
+# Singleton feed instance
+_change_feed: ChangeFeed | None = None
+
+
+def get_change_feed(
+    water_states: Callable[[], Awaitable[Mapping[str, str]]] | None = None,
+) -> ChangeFeed:
+    """
+    Get singleton change feed.
+
+    Args:
+        water_states: Water state source used when the feed is created
+            (see :func:`default_sources`); ignored afterwards.
+    """
+    global _change_feed
+    if _change_feed is None:
+        from imgwtools.config import settings
+
+        _change_feed = ChangeFeed(
+            default_sources(water_states), interval=settings.feed_poll_interval
+        )
+    return _change_feed
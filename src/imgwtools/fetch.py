@@ -7,7 +7,9 @@ Data is fetched directly from IMGW servers - nothing is stored locally.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Literal
+import asyncio
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
 
 import httpx
 
@@ -27,6 +29,7 @@ from imgwtools.exceptions import (
     IMGWDataError,
     IMGWValidationError,
 )
+from imgwtools.metrics import instrument_upstream, upstream_call
 from imgwtools.models import (
     HydroCurrentData,
     PMaXTPData,
@@ -34,6 +37,7 @@ from imgwtools.models import (
     SynopData,
     WarningData,
 )
+from imgwtools.resilience import async_retry_transport, retry_transport
 
 if TYPE_CHECKING:
     pass
@@ -47,6 +51,13 @@ POLAND_LON_MAX = 24.5
 DEFAULT_TIMEOUT = 30.0
 DOWNLOAD_TIMEOUT = 120.0
 
+# *_many functions request up to this many stations one by one; for more
+# stations one download of the whole feed is cheaper
+FANOUT_MAX_STATIONS = 10
+FANOUT_CONCURRENCY = 4
+
+_Record = TypeVar("_Record", HydroCurrentData, SynopData)
+
 
 def _validate_poland_coords(latitude: float, longitude: float) -> None:
     """Validate that coordinates are within Poland bounds."""
@@ -67,6 +78,7 @@ def _validate_poland_coords(latitude: float, longitude: float) -> None:
 # ============================================================================
 
 
+@instrument_upstream("pmaxtp")
 def fetch_pmaxtp(
     latitude: float,
     longitude: float,
@@ -117,7 +129,7 @@ def fetch_pmaxtp(
     url = build_pmaxtp_url(pmaxtp_method, latitude, longitude)
 
     try:
-        with httpx.Client(timeout=timeout) as client:
+        with httpx.Client(timeout=timeout, transport=retry_transport()) as client:
             response = client.get(url)
             response.raise_for_status()
             raw_data = response.json()
@@ -141,6 +153,7 @@ def fetch_pmaxtp(
         raise IMGWDataError(f"Failed to parse PMAXTP response: {e}") from e
 
 
+@instrument_upstream("pmaxtp")
 async def fetch_pmaxtp_async(
     latitude: float,
     longitude: float,
@@ -160,7 +173,9 @@ async def fetch_pmaxtp_async(
     pmaxtp_method = PMaXTPMethod(method)
     url = build_pmaxtp_url(pmaxtp_method, latitude, longitude)
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(
+        timeout=timeout, transport=async_retry_transport()
+    ) as client:
         try:
             response = await client.get(url)
             response.raise_for_status()
@@ -190,6 +205,7 @@ async def fetch_pmaxtp_async(
 # ============================================================================
 
 
+@instrument_upstream("hydro")
 def fetch_hydro_current(
     station_id: str | None = None,
     *,
@@ -224,7 +240,7 @@ def fetch_hydro_current(
     url = build_api_url("hydro", station_id=station_id)
 
     try:
-        with httpx.Client(timeout=timeout) as client:
+        with httpx.Client(timeout=timeout, transport=retry_transport()) as client:
             response = client.get(url)
             response.raise_for_status()
             raw_data = response.json()
@@ -243,6 +259,7 @@ def fetch_hydro_current(
         raise IMGWDataError(f"Failed to parse hydro response: {e}") from e
 
 
+@instrument_upstream("hydro")
 async def fetch_hydro_current_async(
     station_id: str | None = None,
     *,
@@ -255,7 +272,9 @@ async def fetch_hydro_current_async(
     """
     url = build_api_url("hydro", station_id=station_id)
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(
+        timeout=timeout, transport=async_retry_transport()
+    ) as client:
         try:
             response = await client.get(url)
             response.raise_for_status()
@@ -274,6 +293,7 @@ async def fetch_hydro_current_async(
         raise IMGWDataError(f"Failed to parse hydro response: {e}") from e
 
 
+@instrument_upstream("synop")
 def fetch_synop(
     station_id: str | None = None,
     station_name: str | None = None,
@@ -309,7 +329,7 @@ def fetch_synop(
     url = build_api_url("synop", station_id=station_id)
 
     try:
-        with httpx.Client(timeout=timeout) as client:
+        with httpx.Client(timeout=timeout, transport=retry_transport()) as client:
             response = client.get(url)
             response.raise_for_status()
             raw_data = response.json()
@@ -333,6 +353,7 @@ def fetch_synop(
     return results
 
 
+@instrument_upstream("synop")
 async def fetch_synop_async(
     station_id: str | None = None,
     station_name: str | None = None,
@@ -346,7 +367,9 @@ async def fetch_synop_async(
     """
     url = build_api_url("synop", station_id=station_id)
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(
+        timeout=timeout, transport=async_retry_transport()
+    ) as client:
         try:
             response = await client.get(url)
             response.raise_for_status()
@@ -370,6 +393,212 @@ async def fetch_synop_async(
     return results
 
 
+async def _fetch_current_many(
+    endpoint: str,
+    parse: Callable[[dict[str, Any]], _Record],
+    station_ids: Iterable[str],
+    *,
+    timeout: float,
+    max_fanout: int,
+    concurrency: int,
+    client: httpx.AsyncClient | None,
+) -> dict[str, _Record]:
+    """
+    Fetch current data of several stations of a real-time feed.
+
+    Up to max_fanout stations are requested concurrently one by one,
+    otherwise the whole feed is downloaded once and filtered.
+    """
+    if concurrency < 1:
+        raise IMGWValidationError("concurrency must be at least 1")
+    ids = list(dict.fromkeys(str(station_id) for station_id in station_ids))
+    if not ids:
+        return {}
+
+    async def get(client: httpx.AsyncClient, station_id: str | None = None) -> list:
+        url = build_api_url(endpoint, station_id=station_id)
+        try:
+            with upstream_call(endpoint):
+                response = await client.get(url)
+                if station_id and response.status_code == 404:
+                    return []  # unknown station
+                response.raise_for_status()
+                raw_data = response.json()
+        except httpx.TimeoutException as e:
+            raise IMGWConnectionError(f"IMGW API timeout: {e}") from e
+        except httpx.HTTPError as e:
+            raise IMGWConnectionError(f"Connection error: {e}") from e
+        except ValueError as e:
+            raise IMGWDataError(f"Invalid {endpoint} response: {e}") from e
+        return [raw_data] if isinstance(raw_data, dict) else raw_data
+
+    async def fan_out(client: httpx.AsyncClient) -> list:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(station_id: str) -> list:
+            async with semaphore:
+                return await get(client, station_id)
+
+        # Let every request finish before raising, the client is closed next
+        batches = await asyncio.gather(
+            *(one(station_id) for station_id in ids), return_exceptions=True
+        )
+        for batch in batches:
+            if isinstance(batch, BaseException):
+                raise batch
+        return [item for batch in batches for item in batch]
+
+    fetch = fan_out if len(ids) <= max_fanout else get
+    if client is not None:
+        raw_data = await fetch(client)
+    else:
+        limits = httpx.Limits(
+            max_connections=concurrency, max_keepalive_connections=concurrency
+        )
+        async with httpx.AsyncClient(
+            timeout=timeout, transport=async_retry_transport(limits=limits)
+        ) as own_client:
+            raw_data = await fetch(own_client)
+
+    # Parse only the requested records of the (possibly whole) feed
+    wanted = set(ids)
+    found: dict[str, _Record] = {}
+    try:
+        for item in raw_data:
+            station_id = str(item.get("id_stacji", ""))
+            if station_id in wanted and station_id not in found:
+                found[station_id] = parse(item)
+    except Exception as e:
+        raise IMGWDataError(f"Failed to parse {endpoint} response: {e}") from e
+    return {station_id: found[station_id] for station_id in ids if station_id in found}
+
+
+async def fetch_hydro_current_many_async(
+    station_ids: Iterable[str],
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_fanout: int = FANOUT_MAX_STATIONS,
+    concurrency: int = FANOUT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+) -> dict[str, HydroCurrentData]:
+    """
+    Fetch current hydrological data of several stations.
+
+    Up to max_fanout stations are requested one by one (at most
+    concurrency at a time, over one pooled client); for more stations
+    the whole feed is downloaded in a single request and filtered.
+
+    Args:
+        station_ids: Station IDs (duplicates are ignored).
+        timeout: Request timeout in seconds (of the function's own client).
+        max_fanout: Largest number of stations requested one by one
+            (0 = always download the whole feed).
+        concurrency: Number of simultaneous per-station requests.
+        client: Client to reuse between calls (e.g. when polling);
+            by default a client is created for the call. Retries, the
+            circuit breaker and the upstream throttle only apply if it
+            is built with ``transport=async_retry_transport()``.
+
+    Returns:
+        Station ID -> HydroCurrentData, in the order of station_ids.
+        Stations missing from the feed are left out.
+
+    Raises:
+        IMGWConnectionError: If a request fails.
+        IMGWDataError: If response parsing fails.
+        IMGWValidationError: If concurrency is less than 1.
+
+    Example:
+        >>> data = await fetch_hydro_current_many_async(["150160180", "149180010"])
+        >>> print({sid: d.water_level_cm for sid, d in data.items()})
+    """
+    return await _fetch_current_many(
+        "hydro",
+        HydroCurrentData.from_api_response,
+        station_ids,
+        timeout=timeout,
+        max_fanout=max_fanout,
+        concurrency=concurrency,
+        client=client,
+    )
+
+
+def fetch_hydro_current_many(
+    station_ids: Iterable[str],
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_fanout: int = FANOUT_MAX_STATIONS,
+    concurrency: int = FANOUT_CONCURRENCY,
+) -> dict[str, HydroCurrentData]:
+    """
+    Synchronous version of fetch_hydro_current_many_async.
+
+    See fetch_hydro_current_many_async for full documentation. Must not
+    be called from a running event loop.
+    """
+    return asyncio.run(
+        fetch_hydro_current_many_async(
+            station_ids,
+            timeout=timeout,
+            max_fanout=max_fanout,
+            concurrency=concurrency,
+        )
+    )
+
+
+async def fetch_synop_many_async(
+    station_ids: Iterable[str],
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_fanout: int = FANOUT_MAX_STATIONS,
+    concurrency: int = FANOUT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+) -> dict[str, SynopData]:
+    """
+    Fetch current synoptic data of several stations.
+
+    Works like fetch_hydro_current_many_async (see there for the
+    arguments), on the synop feed.
+
+    Returns:
+        Station ID -> SynopData, in the order of station_ids.
+        Stations missing from the feed are left out.
+    """
+    return await _fetch_current_many(
+        "synop",
+        SynopData.from_api_response,
+        station_ids,
+        timeout=timeout,
+        max_fanout=max_fanout,
+        concurrency=concurrency,
+        client=client,
+    )
+
+
+def fetch_synop_many(
+    station_ids: Iterable[str],
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_fanout: int = FANOUT_MAX_STATIONS,
+    concurrency: int = FANOUT_CONCURRENCY,
+) -> dict[str, SynopData]:
+    """
+    Synchronous version of fetch_synop_many_async.
+
+    See fetch_hydro_current_many_async for full documentation. Must not
+    be called from a running event loop.
+    """
+    return asyncio.run(
+        fetch_synop_many_async(
+            station_ids,
+            timeout=timeout,
+            max_fanout=max_fanout,
+            concurrency=concurrency,
+        )
+    )
+
+
+@instrument_upstream("warnings")
 def fetch_warnings(
     warning_type: Literal["hydro", "meteo"] = "hydro",
     *,
@@ -396,7 +625,7 @@ def fetch_warnings(
     url = build_api_url(f"warnings/{warning_type}")
 
     try:
-        with httpx.Client(timeout=timeout) as client:
+        with httpx.Client(timeout=timeout, transport=retry_transport()) as client:
             response = client.get(url)
             response.raise_for_status()
             raw_data = response.json()
@@ -414,6 +643,7 @@ def fetch_warnings(
     return [WarningData.from_api_response(item) for item in raw_data]
 
 
+@instrument_upstream("warnings")
 async def fetch_warnings_async(
     warning_type: Literal["hydro", "meteo"] = "hydro",
     *,
@@ -426,7 +656,9 @@ async def fetch_warnings_async(
     """
     url = build_api_url(f"warnings/{warning_type}")
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(
+        timeout=timeout, transport=async_retry_transport()
+    ) as client:
         try:
             response = await client.get(url)
             response.raise_for_status()
@@ -450,6 +682,7 @@ async def fetch_warnings_async(
 # ============================================================================
 
 
+@instrument_upstream("hydro_archive")
 def download_hydro_data(
     interval: Literal["dobowe", "miesieczne", "polroczne_i_roczne"],
     year: int,
@@ -499,7 +732,9 @@ def download_hydro_data(
     url_info = build_hydro_url(hydro_interval, year, month, hydro_param)
 
     try:
-        with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        with httpx.Client(
+            timeout=timeout, follow_redirects=True, transport=retry_transport()
+        ) as client:
             response = client.get(url_info.url)
             response.raise_for_status()
             return response.content
@@ -513,6 +748,7 @@ def download_hydro_data(
         raise IMGWConnectionError(f"Download error: {e}") from e
 
 
+@instrument_upstream("hydro_archive")
 async def download_hydro_data_async(
     interval: Literal["dobowe", "miesieczne", "polroczne_i_roczne"],
     year: int,
@@ -531,7 +767,9 @@ async def download_hydro_data_async(
 
     url_info = build_hydro_url(hydro_interval, year, month, hydro_param)
 
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+    async with httpx.AsyncClient(
+        timeout=timeout, follow_redirects=True, transport=async_retry_transport()
+    ) as client:
         try:
             response = await client.get(url_info.url)
             response.raise_for_status()
@@ -546,6 +784,7 @@ async def download_hydro_data_async(
             raise IMGWConnectionError(f"Download error: {e}") from e
 
 
+@instrument_upstream("meteo_archive")
 def download_meteo_data(
     interval: Literal["dobowe", "miesieczne", "terminowe"],
     subtype: Literal["klimat", "opad", "synop"],
@@ -589,7 +828,9 @@ def download_meteo_data(
     url_info = build_meteo_url(meteo_interval, meteo_subtype, year, month)
 
     try:
-        with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        with httpx.Client(
+            timeout=timeout, follow_redirects=True, transport=retry_transport()
+        ) as client:
             response = client.get(url_info.url)
             response.raise_for_status()
             return response.content
@@ -603,6 +844,7 @@ def download_meteo_data(
         raise IMGWConnectionError(f"Download error: {e}") from e
 
 
+@instrument_upstream("meteo_archive")
 async def download_meteo_data_async(
     interval: Literal["dobowe", "miesieczne", "terminowe"],
     subtype: Literal["klimat", "opad", "synop"],
@@ -621,7 +863,9 @@ async def download_meteo_data_async(
 
     url_info = build_meteo_url(meteo_interval, meteo_subtype, year, month)
 
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+    async with httpx.AsyncClient(
+        timeout=timeout, follow_redirects=True, transport=async_retry_transport()
+    ) as client:
         try:
             response = await client.get(url_info.url)
             response.raise_for_status()
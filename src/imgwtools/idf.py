@@ -0,0 +1,425 @@
+"""
+Intensity-duration-frequency (IDF) curves built from PMAXTP data.
+
+PMAXTP returns precipitation quantiles for a fixed grid of durations and
+probabilities. This module interpolates between them (log-log across
+durations, Gumbel reduced variate across probabilities) and generates
+design hyetographs. All operations are vectorised over sites with NumPy,
+so many locations are processed in a single call.
+
+Requires numpy: pip install imgwtools[spatial]
+
+Example:
+    >>> from imgwtools import fetch_pmaxtp
+    >>> from imgwtools.idf import IDFCurves
+    >>> sites = [fetch_pmaxtp(52.23, 21.01), fetch_pmaxtp(50.06, 19.94)]
+    >>> idf = IDFCurves.from_pmaxtp(sites)
+    >>> depth = idf.depth(40, probability_percent=1)  # 40-min, p=1%, both sites
+    >>> storm = idf.hyetograph(60, 5, return_period_years=10, method="euler_ii")
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Any, Literal
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "numpy is required for imgwtools.idf. "
+        "Install with: pip install imgwtools[spatial]"
+    ) from e
+
+from imgwtools.exceptions import IMGWDataError, IMGWValidationError
+from imgwtools.models import PMaXTPData, PMaXTPResult
+
+HyetographMethod = Literal["block", "alternating_block", "euler_ii"]
+
+# Smallest depth used before taking logarithms [mm]
+_MIN_DEPTH_MM = 1e-6
+
+
+def _parse_key(key: str) -> float:
+    """Parse PMAXTP dict key ('15', 't15', 'p50') into a number."""
+    match = re.fullmatch(r"[a-zA-Z]*\s*(\d+(?:\.\d+)?)", str(key).strip())
+    if not match:
+        raise IMGWDataError(f"Unexpected PMAXTP key: {key!r}")
+    return float(match.group(1))
+
+
+def _gumbel_variate(probability_percent: Any) -> Any:
+    """Gumbel reduced variate for exceedance probability given in percent."""
+    p = np.asarray(probability_percent, dtype=float) / 100.0
+    if np.any((p <= 0.0) | (p >= 1.0)):
+        raise IMGWValidationError("Probability must be between 0 and 100 percent")
+    return -np.log(-np.log1p(-p))
+
+
+def probability_from_return_period(return_period_years: Any) -> Any:
+    """
+    Convert return period to annual exceedance probability.
+
+    Args:
+        return_period_years: Return period T in years (scalar or array, T > 1).
+
+    Returns:
+        Exceedance probability in percent (100 / T).
+
+    Example:
+        >>> probability_from_return_period(100)
+        1.0
+    """
+    t = np.asarray(return_period_years, dtype=float)
+    if np.any(t <= 1.0):
+        raise IMGWValidationError("Return period must be greater than 1 year")
+    result = 100.0 / t
+    return float(result) if result.ndim == 0 else result
+
+
+def _interp_indices(grid: Any, values: Any) -> tuple[Any, Any]:
+    """
+    Segment indices and weights for piecewise-linear interpolation.
+
+    Values outside the grid are extrapolated from the outermost segment.
+    """
+    idx = np.clip(np.searchsorted(grid, values), 1, len(grid) - 1)
+    lo = grid[idx - 1]
+    hi = grid[idx]
+    weight = (values - lo) / (hi - lo)
+    return idx, weight
+
+
+class IDFCurves:
+    """
+    Intensity-duration-frequency curves for one or more sites.
+
+    Attributes:
+        durations: Tabulated durations in minutes, shape (D,), ascending.
+        probabilities: Tabulated exceedance probabilities in percent,
+            shape (P,), descending (i.e. increasing return period).
+        depths: Precipitation depths in mm, shape (S, D, P).
+        sites: Optional (latitude, longitude) for each site.
+    """
+
+    def __init__(
+        self,
+        durations: Any,
+        probabilities: Any,
+        depths: Any,
+        sites: list[tuple[float, float]] | None = None,
+    ):
+        """
+        Create IDF curves from tabulated quantiles.
+
+        Args:
+            durations: Durations in minutes, shape (D,). Needs at least 2.
+            probabilities: Exceedance probabilities in percent, shape (P,).
+                Needs at least 2.
+            depths: Precipitation depths in mm, shape (S, D, P) or (D, P).
+            sites: Optional site coordinates, one per row of ``depths``.
+
+        Raises:
+            IMGWDataError: If the table shape is inconsistent.
+        """
+        durations = np.asarray(durations, dtype=float)
+        probabilities = np.asarray(probabilities, dtype=float)
+        depths = np.asarray(depths, dtype=float)
+        if depths.ndim == 2:
+            depths = depths[np.newaxis, :, :]
+
+        if len(durations) < 2 or len(probabilities) < 2:
+            raise IMGWDataError(
+                "IDF curves need at least 2 durations and 2 probabilities"
+            )
+        if depths.shape[1:] != (len(durations), len(probabilities)):
+            raise IMGWDataError(
+                f"Depth table shape {depths.shape} does not match "
+                f"{len(durations)} durations x {len(probabilities)} probabilities"
+            )
+        if sites is not None and len(sites) != depths.shape[0]:
+            raise IMGWDataError("Number of sites does not match depth table")
+
+        d_order = np.argsort(durations)
+        # Sort by reduced variate ascending (probability descending)
+        p_order = np.argsort(-probabilities)
+
+        self.durations = durations[d_order]
+        self.probabilities = probabilities[p_order]
+        self.depths = depths[:, d_order][:, :, p_order]
+        self.sites = sites
+
+        self._log_durations = np.log(self.durations)
+        self._log_depths = np.log(np.maximum(self.depths, _MIN_DEPTH_MM))
+        self._variates = _gumbel_variate(self.probabilities)
+
+    @classmethod
+    def from_pmaxtp(
+        cls,
+        data: PMaXTPData | PMaXTPResult | Iterable[PMaXTPData | PMaXTPResult],
+        quantity: Literal["ks", "sg"] = "ks",
+    ) -> IDFCurves:
+        """
+        Build IDF curves from one or many PMAXTP responses.
+
+        Only durations and probabilities present for every site are used.
+
+        Args:
+            data: PMaXTPData/PMaXTPResult or an iterable of them (one per site).
+            quantity: Which table to use - "ks" (quantiles, default) or
+                "sg" (upper confidence bounds).
+
+        Returns:
+            IDFCurves with one row per site.
+
+        Raises:
+            IMGWDataError: If the sites share fewer than 2 durations or
+                probabilities.
+        """
+        if isinstance(data, PMaXTPData | PMaXTPResult):
+            data = [data]
+
+        tables: list[dict[str, dict[str, float]]] = []
+        sites: list[tuple[float, float]] | None = []
+        for item in data:
+            if isinstance(item, PMaXTPResult):
+                tables.append(getattr(item.data, quantity))
+                if sites is not None:
+                    sites.append((item.latitude, item.longitude))
+            else:
+                tables.append(getattr(item, quantity))
+                sites = None
+
+        if not tables:
+            raise IMGWDataError("No PMAXTP data given")
+
+        # Parse keys into numbers: {duration: {probability: depth}} per site
+        parsed = [
+            {
+                _parse_key(d): {_parse_key(p): v for p, v in probs.items()}
+                for d, probs in table.items()
+            }
+            for table in tables
+        ]
+
+        durations = set(parsed[0])
+        for table in parsed[1:]:
+            durations &= set(table)
+        probabilities: set[float] | None = None
+        for table in parsed:
+            for d in durations:
+                keys = set(table[d])
+                probabilities = keys if probabilities is None else probabilities & keys
+
+        dur_list = sorted(durations)
+        prob_list = sorted(probabilities or set(), reverse=True)
+        if len(dur_list) < 2 or len(prob_list) < 2:
+            raise IMGWDataError(
+                "PMAXTP data must share at least 2 durations and 2 probabilities"
+            )
+
+        depths = np.array(
+            [
+                [[table[d][p] for p in prob_list] for d in dur_list]
+                for table in parsed
+            ],
+            dtype=float,
+        )
+        return cls(dur_list, prob_list, depths, sites=sites)
+
+    @property
+    def n_sites(self) -> int:
+        """Number of sites."""
+        return self.depths.shape[0]
+
+    def _resolve_probability(
+        self,
+        probability_percent: Any,
+        return_period_years: Any,
+    ) -> Any:
+        if (probability_percent is None) == (return_period_years is None):
+            raise IMGWValidationError(
+                "Give exactly one of probability_percent or return_period_years"
+            )
+        if probability_percent is None:
+            return probability_from_return_period(return_period_years)
+        return probability_percent
+
+    def depth(
+        self,
+        duration_minutes: Any,
+        probability_percent: Any = None,
+        *,
+        return_period_years: Any = None,
+    ) -> Any:
+        """
+        Interpolated precipitation depth.
+
+        Durations are interpolated linearly in log(duration)-log(depth)
+        space; probabilities linearly in depth vs Gumbel reduced variate.
+        Values outside the tabulated range are extrapolated from the
+        nearest segment.
+
+        Args:
+            duration_minutes: Duration(s) in minutes (scalar or array).
+            probability_percent: Exceedance probability in percent.
+            return_period_years: Alternatively, return period in years.
+
+        Returns:
+            Depth in mm with shape (S,) + broadcast shape of the inputs.
+
+        Example:
+            >>> idf.depth([15, 40, 120], probability_percent=10).shape
+            (n_sites, 3)
+        """
+        probability = self._resolve_probability(
+            probability_percent, return_period_years
+        )
+        dur, prob = np.broadcast_arrays(
+            np.asarray(duration_minutes, dtype=float),
+            np.asarray(probability, dtype=float),
+        )
+        if np.any(dur <= 0):
+            raise IMGWValidationError("Duration must be positive")
+
+        shape = dur.shape
+        dur = dur.ravel()
+        variate = _gumbel_variate(prob.ravel())
+
+        # Log-log interpolation across durations -> (S, Q, P)
+        d_idx, d_w = _interp_indices(self._log_durations, np.log(dur))
+        log_h = (
+            self._log_depths[:, d_idx - 1, :] * (1.0 - d_w)[None, :, None]
+            + self._log_depths[:, d_idx, :] * d_w[None, :, None]
+        )
+        h = np.exp(log_h)
+
+        # Linear interpolation in Gumbel variate across probabilities -> (S, Q)
+        p_idx, p_w = _interp_indices(self._variates, variate)
+        q = np.arange(len(dur))
+        result = h[:, q, p_idx - 1] * (1.0 - p_w) + h[:, q, p_idx] * p_w
+
+        return np.maximum(result, 0.0).reshape((self.n_sites,) + shape)
+
+    def intensity(
+        self,
+        duration_minutes: Any,
+        probability_percent: Any = None,
+        *,
+        return_period_years: Any = None,
+    ) -> Any:
+        """
+        Mean rainfall intensity in mm/h.
+
+        Same arguments and output shape as depth().
+        """
+        depth = self.depth(
+            duration_minutes,
+            probability_percent,
+            return_period_years=return_period_years,
+        )
+        return depth / (np.asarray(duration_minutes, dtype=float) / 60.0)
+
+    def hyetograph(
+        self,
+        duration_minutes: float,
+        time_step_minutes: float,
+        probability_percent: float | None = None,
+        *,
+        return_period_years: float | None = None,
+        method: HyetographMethod = "euler_ii",
+        peak_position: float | None = None,
+    ) -> Any:
+        """
+        Design storm hyetograph for every site.
+
+        Methods:
+            - "block": constant intensity over the whole duration.
+            - "alternating_block": increments of the depth-duration curve
+              placed alternately around the peak (Chicago-like).
+            - "euler_ii": Euler type II (DWA-A 118) - largest increment at
+              ``peak_position`` (default 1/3), preceded by the next largest
+              increments in ascending order and followed by the remaining
+              ones in descending order.
+
+        Args:
+            duration_minutes: Total storm duration in minutes.
+            time_step_minutes: Time step in minutes. Must divide the duration.
+            probability_percent: Exceedance probability in percent.
+            return_period_years: Alternatively, return period in years.
+            method: Hyetograph shape (see above).
+            peak_position: Relative peak position in [0, 1]. Defaults to
+                1/3 for "euler_ii" and 1/2 for "alternating_block".
+
+        Returns:
+            Depth per time step in mm, shape (S, n_steps). Rows sum to the
+            total depth for the given duration.
+
+        Raises:
+            IMGWValidationError: If the step does not divide the duration or
+                the method is unknown.
+        """
+        if time_step_minutes <= 0 or duration_minutes <= 0:
+            raise IMGWValidationError("Duration and time step must be positive")
+        n_steps = int(round(duration_minutes / time_step_minutes))
+        if n_steps < 1 or not np.isclose(
+            n_steps * time_step_minutes, duration_minutes
+        ):
+            raise IMGWValidationError(
+                f"Time step {time_step_minutes} min does not divide "
+                f"duration {duration_minutes} min"
+            )
+
+        probability = self._resolve_probability(
+            probability_percent, return_period_years
+        )
+
+        if method == "block":
+            total = self.depth(duration_minutes, probability)
+            return np.repeat(total[:, None] / n_steps, n_steps, axis=1)
+
+        if method not in ("alternating_block", "euler_ii"):
+            raise IMGWValidationError(f"Unknown hyetograph method: {method}")
+
+        # Cumulative depth-duration curve sampled at each step -> increments
+        steps = np.arange(1, n_steps + 1) * time_step_minutes
+        cumulative = self.depth(steps, probability)
+        cumulative = np.maximum.accumulate(cumulative, axis=1)
+        increments = np.diff(cumulative, axis=1, prepend=0.0)
+        # Increments of a concave DDF curve are already descending; sort to be safe
+        ranked = -np.sort(-increments, axis=1)
+
+        if peak_position is None:
+            peak_position = 1.0 / 3.0 if method == "euler_ii" else 0.5
+        if not 0.0 <= peak_position <= 1.0:
+            raise IMGWValidationError("peak_position must be between 0 and 1")
+        peak = min(int(peak_position * n_steps), n_steps - 1)
+
+        order = np.empty(n_steps, dtype=int)
+        if method == "euler_ii":
+            # Positions 0..peak get ranks peak..0, the rest keep rank order
+            order[: peak + 1] = np.arange(peak, -1, -1)
+            order[peak + 1 :] = np.arange(peak + 1, n_steps)
+        else:
+            order[:] = _alternating_order(n_steps, peak)
+
+        return ranked[:, order]
+
+
+def _alternating_order(n_steps: int, peak: int) -> Any:
+    """Rank index placed at each position for the alternating block method."""
+    order = np.empty(n_steps, dtype=int)
+    order[peak] = 0
+    left, right = peak - 1, peak + 1
+    rank = 1
+    while rank < n_steps:
+        if right < n_steps:
+            order[right] = rank
+            right += 1
+            rank += 1
+        if rank < n_steps and left >= 0:
+            order[left] = rank
+            left -= 1
+            rank += 1
+    return order
@@ -0,0 +1,431 @@
+"""
+Runtime metrics and tracing hooks.
+
+Lightweight in-process counters, gauges and histograms around the hot
+paths (IMGW requests, cache download/parse/insert stages, SQLite
+queries, API routes), exported in the Prometheus text format by the
+REST API at ``GET /metrics``.
+
+Timed sections are also reported as OpenTelemetry spans when
+opentelemetry-api is installed (pip install imgwtools[otel]). Without a
+configured OpenTelemetry SDK the spans are no-ops.
+
+Example:
+    >>> from imgwtools.metrics import UPSTREAM_SECONDS, get_metrics_registry, timed
+    >>> with timed(UPSTREAM_SECONDS, endpoint="hydro"):
+    ...     fetch_hydro_current()
+    >>> print(get_metrics_registry().render())
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+from imgwtools.exceptions import IMGWValidationError
+
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:  # optional
+    _otel_trace = None
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Default histogram buckets [s]: 1 ms .. 2 min
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0, 30.0, 60.0, 120.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INF_BUCKET = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class: named metric with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} expects labels {self.label_names}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _labels(self, key: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, key, strict=True)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing value (requests, rows, errors)."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (in-flight operations)."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (durations) in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts, sum, count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def sum(self, **labels: Any) -> float:
+        state = self._values.get(self._key(labels))
+        return state[1] if state else 0.0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{self._labels(key, le)} {cumulative}"
+            yield f"{self.name}_bucket{self._labels(key, _INF_BUCKET)} {count}"
+            yield f"{self.name}_sum{self._labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{self._labels(key)} {count}"
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type[_Metric], name: str, *args, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        return self._get_or_create(Counter, name, documentation, tuple(labels))
+
+    def gauge(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, tuple(labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, documentation, tuple(labels), buckets=buckets
+        )
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+    def clear(self) -> None:
+        """Reset all values (metrics stay registered)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
+
+
+# --- Metrics of the library ---
+
+UPSTREAM_SECONDS = _registry.histogram(
+    "imgw_upstream_request_seconds",
+    "Duration of requests to IMGW servers",
+    ["endpoint"],
+)
+UPSTREAM_ERRORS = _registry.counter(
+    "imgw_upstream_errors_total",
+    "Failed requests to IMGW servers",
+    ["endpoint"],
+)
+UPSTREAM_RETRIES = _registry.counter(
+    "imgw_upstream_retries_total",
+    "Repeated requests to IMGW servers after an error or 429/5xx",
+    ["host"],
+)
+UPSTREAM_THROTTLE_SECONDS = _registry.counter(
+    "imgw_upstream_throttle_seconds_total",
+    "Time requests to IMGW waited for the client-side rate limit",
+    ["lane"],
+)
+CIRCUIT_STATE = _registry.gauge(
+    "imgw_circuit_state",
+    "Circuit breaker state per host (0 closed, 1 open, 2 half-open)",
+    ["host"],
+)
+CACHE_REQUESTS = _registry.counter(
+    "imgw_cache_requests_total",
+    "Cache lookups for archive files by result (hit, miss, error)",
+    ["interval", "result"],
+)
+CACHE_STAGE_SECONDS = _registry.histogram(
+    "imgw_cache_stage_seconds",
+    "Duration of cache import stages (download, parse, insert)",
+    ["interval", "stage"],
+)
+CACHE_ROWS = _registry.counter(
+    "imgw_cache_rows_total",
+    "Records parsed and inserted into the cache",
+    ["interval"],
+)
+CACHE_BYTES = _registry.counter(
+    "imgw_cache_download_bytes_total",
+    "Bytes of archive files downloaded from IMGW",
+    ["interval"],
+)
+DOWNLOADS_IN_PROGRESS = _registry.gauge(
+    "imgw_downloads_in_progress",
+    "Archive downloads currently in progress",
+)
+DB_QUERY_SECONDS = _registry.histogram(
+    "imgw_db_query_seconds",
+    "Duration of SQLite cache queries",
+    ["query"],
+)
+HTTP_REQUESTS = _registry.counter(
+    "imgw_http_requests_total",
+    "REST API requests by route and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_SECONDS = _registry.histogram(
+    "imgw_http_request_seconds",
+    "REST API request duration by route",
+    ["method", "route"],
+)
+HTTP_IN_PROGRESS = _registry.gauge(
+    "imgw_http_requests_in_progress",
+    "REST API requests currently being handled",
+)
+
+
+# --- Timing helpers ---
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    OpenTelemetry span around a block (no-op without opentelemetry-api).
+
+    Yields:
+        The span, or None if OpenTelemetry is not installed.
+    """
+    if _otel_trace is None:
+        yield None
+        return
+    tracer = _otel_trace.get_tracer("imgwtools")
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+@contextmanager
+def timed(
+    histogram: Histogram,
+    span_name: str | None = None,
+    **labels: Any,
+) -> Iterator[None]:
+    """
+    Record the duration of a block in a histogram (and an OpenTelemetry span).
+
+    Args:
+        histogram: Histogram to observe the duration in.
+        span_name: Span name (default: histogram name).
+        **labels: Label values of the histogram, also used as span attributes.
+    """
+    with span(span_name or histogram.name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start, **labels)
+
+
+# Errors raised before anything is sent to IMGW
+_NOT_UPSTREAM_ERRORS = (IMGWValidationError, ValueError)
+
+
+@contextmanager
+def upstream_call(endpoint: str) -> Iterator[None]:
+    """
+    Time a request to IMGW and count its failure.
+
+    Durations go to imgw_upstream_request_seconds and failures (other
+    than invalid arguments) are counted in imgw_upstream_errors_total.
+
+    Args:
+        endpoint: Label identifying the IMGW endpoint (e.g. "hydro").
+
+    Example:
+        >>> with upstream_call("hydro"):
+        ...     response = await client.get(url)
+        ...     response.raise_for_status()
+    """
+    try:
+        with timed(UPSTREAM_SECONDS, f"imgw.{endpoint}", endpoint=endpoint):
+            yield
+    except _NOT_UPSTREAM_ERRORS:
+        raise
+    except Exception:
+        UPSTREAM_ERRORS.inc(endpoint=endpoint)
+        raise
+
+
+def instrument_upstream(endpoint: str) -> Callable[[F], F]:
+    """
+    Decorator applying upstream_call() to a (sync or async) function.
+
+    Args:
+        endpoint: Label identifying the IMGW endpoint (e.g. "hydro").
+    """
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with upstream_call(endpoint):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with upstream_call(endpoint):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def instrument_query(func: F) -> F:
+    """Decorator timing a repository query (label: method name)."""
+    query = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with timed(DB_QUERY_SECONDS, f"db.{query}", query=query):
+            return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
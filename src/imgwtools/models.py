@@ -6,10 +6,15 @@ These models provide type-safe access to data returned by IMGW APIs.
 
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any
+from zoneinfo import ZoneInfo
 
 from pydantic import BaseModel, Field
 
+# Timestamps in IMGW API responses are Polish local time
+IMGW_TIMEZONE = ZoneInfo("Europe/Warsaw")
+
 
 class PMaXTPData(BaseModel):
     """
@@ -131,6 +136,26 @@ class PMaXTPData(BaseModel):
                 )
         return pd.DataFrame(rows)
 
+    def to_idf_curves(self) -> Any:
+        """
+        Build intensity-duration-frequency curves from the quantiles.
+
+        Requires numpy to be installed.
+
+        Returns:
+            imgwtools.idf.IDFCurves for a single site.
+
+        Raises:
+            ImportError: If numpy is not installed.
+
+        Example:
+            >>> idf = data.to_idf_curves()
+            >>> idf.depth(40, return_period_years=50)
+        """
+        from imgwtools.idf import IDFCurves
+
+        return IDFCurves.from_pmaxtp(self)
+
 
 class PMaXTPResult(BaseModel):
     """Complete PMAXTP result with metadata."""
@@ -234,6 +259,9 @@ class WarningData(BaseModel):
     valid_from: str | None = Field(None, description="Valid from datetime")
     valid_to: str | None = Field(None, description="Valid to datetime")
     probability: int | None = Field(None, description="Probability [%]")
+    teryt: list[str] = Field(
+        default_factory=list, description="TERYT codes of affected areas (powiaty)"
+    )
 
     @classmethod
     def from_api_response(cls, data: dict[str, Any]) -> WarningData:
@@ -244,12 +272,50 @@ class WarningData(BaseModel):
             level=_safe_int(data.get("poziom", data.get("stopien"))),
             region=data.get("region", data.get("obszar")),
             description=data.get("opis", data.get("tresc")),
-            valid_from=data.get("wazne_od", data.get("od")),
-            valid_to=data.get("wazne_do", data.get("do")),
+            valid_from=_first(data, "wazne_od", "od", "obowiazuje_od"),
+            valid_to=_first(data, "wazne_do", "do", "obowiazuje_do"),
             probability=_safe_int(data.get("prawdopodobienstwo")),
+            teryt=_parse_teryt(data.get("teryt")),
         )
 
 
+def parse_local_time(text: str | None) -> int | None:
+    """
+    Parse an IMGW timestamp ("2024-01-15 10:00:00" or "2024-01-15").
+
+    Times without a UTC offset are taken as Polish local time.
+
+    Returns:
+        Unix seconds, or None if the text is empty or not a timestamp.
+    """
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=IMGW_TIMEZONE)
+    return int(parsed.timestamp())
+
+
+def _first(data: dict[str, Any], *keys: str) -> Any:
+    """Value of the first key present in the response."""
+    for key in keys:
+        if data.get(key) is not None:
+            return data[key]
+    return None
+
+
+def _parse_teryt(value: Any) -> list[str]:
+    """TERYT codes from a list or a comma-separated string."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(code).strip() for code in value if str(code).strip()]
+
+
 def _safe_float(value: Any) -> float | None:
     """Safely convert to float, returning None for invalid values."""
     if value is None:
@@ -0,0 +1,419 @@
+"""
+Shared in-memory station registry.
+
+Loads hydrological and meteorological stations once from the bundled
+CSV files (``data/*.csv``) and keeps them indexed by ID, name and river.
+The API, web GUI and CLI all read from the same registry, so listing or
+searching stations never requires a request to IMGW.
+
+The registry can be refreshed from IMGW (station lists and the hydro map
+API with coordinates and water state). A refresh builds a new immutable
+snapshot and swaps it in, so readers never see a half-updated state.
+
+Example:
+    >>> from imgwtools.registry import get_station_registry
+    >>> registry = get_station_registry()
+    >>> station = registry.get_hydro_station("149180020")
+    >>> registry.find_hydro_by_river("Wisła")[:3]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from imgwtools.exceptions import IMGWError
+from imgwtools.search import StationSearchIndex
+from imgwtools.spatial_index import StationIndex
+from imgwtools.stations import (
+    DEFAULT_TIMEOUT,
+    HydroStation,
+    MeteoStation,
+    get_hydro_stations_with_coords,
+    get_hydro_stations_with_coords_async,
+    list_hydro_stations,
+    list_hydro_stations_async,
+    list_meteo_stations,
+    list_meteo_stations_async,
+    load_hydro_stations_from_csv,
+    load_meteo_stations_from_csv,
+)
+from imgwtools.text import fold_text
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+# Default time after which a remote refresh is due [s]
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Immutable view of all stations with lookup tables."""
+
+    hydro: dict[str, HydroStation]
+    meteo: dict[str, MeteoStation]
+    version: int
+    hydro_by_name: dict[str, list[HydroStation]] = field(default_factory=dict)
+    hydro_by_river: dict[str, list[HydroStation]] = field(default_factory=dict)
+    meteo_by_name: dict[str, list[MeteoStation]] = field(default_factory=dict)
+    hydro_index: StationIndex[HydroStation] | None = None
+    hydro_search: StationSearchIndex[HydroStation] | None = None
+    meteo_search: StationSearchIndex[MeteoStation] | None = None
+
+    @classmethod
+    def build(
+        cls,
+        hydro: Iterable[HydroStation],
+        meteo: Iterable[MeteoStation],
+        version: int,
+    ) -> _Snapshot:
+        hydro_map = {s.station_id: s for s in hydro}
+        meteo_map = {s.station_id: s for s in meteo}
+
+        hydro_by_name: dict[str, list[HydroStation]] = {}
+        hydro_by_river: dict[str, list[HydroStation]] = {}
+        for station in hydro_map.values():
+            hydro_by_name.setdefault(fold_text(station.name), []).append(station)
+            if station.river:
+                hydro_by_river.setdefault(fold_text(station.river), []).append(station)
+
+        meteo_by_name: dict[str, list[MeteoStation]] = {}
+        for station in meteo_map.values():
+            meteo_by_name.setdefault(fold_text(station.name), []).append(station)
+
+        return cls(
+            hydro=hydro_map,
+            meteo=meteo_map,
+            version=version,
+            hydro_by_name=hydro_by_name,
+            hydro_by_river=hydro_by_river,
+            meteo_by_name=meteo_by_name,
+            hydro_index=StationIndex(hydro_map.values()),
+            hydro_search=StationSearchIndex(hydro_map.values()),
+            meteo_search=StationSearchIndex(meteo_map.values()),
+        )
+
+
+class StationRegistry:
+    """
+    In-memory registry of IMGW stations.
+
+    Attributes:
+        ttl_seconds: Age after which a remote refresh is due
+            (0 disables remote refresh).
+        last_error: Message of the last failed load or refresh, if any.
+    """
+
+    def __init__(
+        self,
+        hydro_names_file: str | Path | None = None,
+        meteo_names_file: str | Path | None = None,
+        hydro_locations_file: str | Path | None = None,
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        """
+        Create a registry (data is loaded lazily on first access).
+
+        Args:
+            hydro_names_file: Bundled hydro station list CSV.
+            meteo_names_file: Bundled meteo station list CSV.
+            hydro_locations_file: Bundled hydro station coordinates CSV.
+            ttl_seconds: Refresh interval for remote updates.
+            timeout: Request timeout for remote refresh in seconds.
+        """
+        self.hydro_names_file = Path(hydro_names_file) if hydro_names_file else None
+        self.meteo_names_file = Path(meteo_names_file) if meteo_names_file else None
+        self.hydro_locations_file = (
+            Path(hydro_locations_file) if hydro_locations_file else None
+        )
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self.last_error: str | None = None
+
+        self._snapshot: _Snapshot | None = None
+        self._lock = threading.Lock()
+        self._refreshed_at: float | None = None
+
+    # --- Loading ---
+
+    def load(self) -> None:
+        """
+        (Re)load stations from the bundled CSV files.
+
+        Missing or unreadable files leave the corresponding list empty
+        and are reported in ``last_error``.
+        """
+        errors = []
+        hydro: list[HydroStation] = []
+        meteo: list[MeteoStation] = []
+
+        if self.hydro_names_file is not None:
+            locations = self.hydro_locations_file
+            if locations is not None and not locations.exists():
+                locations = None
+            try:
+                hydro = load_hydro_stations_from_csv(self.hydro_names_file, locations)
+            except OSError as e:
+                errors.append(f"hydro: {e}")
+
+        if self.meteo_names_file is not None:
+            try:
+                meteo = load_meteo_stations_from_csv(self.meteo_names_file)
+            except OSError as e:
+                errors.append(f"meteo: {e}")
+
+        self.last_error = "; ".join(errors) or None
+        with self._lock:
+            self._swap(hydro, meteo)
+
+    def _swap(
+        self,
+        hydro: Iterable[HydroStation],
+        meteo: Iterable[MeteoStation],
+    ) -> None:
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        self._snapshot = _Snapshot.build(hydro, meteo, version)
+
+    @property
+    def _data(self) -> _Snapshot:
+        if self._snapshot is None:
+            self.load()
+        return self._snapshot
+
+    # --- Remote refresh ---
+
+    @property
+    def is_stale(self) -> bool:
+        """True if a remote refresh is due."""
+        if self.ttl_seconds <= 0:
+            return False
+        if self._refreshed_at is None:
+            return True
+        return time.monotonic() - self._refreshed_at >= self.ttl_seconds
+
+    def refresh(self) -> bool:
+        """
+        Refresh stations from IMGW (blocking).
+
+        Returns:
+            True if at least one remote source was merged.
+        """
+        results = []
+        for fetch in (
+            lambda: list_hydro_stations(timeout=self.timeout),
+            lambda: get_hydro_stations_with_coords(timeout=self.timeout),
+            lambda: list_meteo_stations(timeout=self.timeout),
+        ):
+            try:
+                results.append(fetch())
+            except IMGWError as e:
+                results.append(e)
+        return self._merge(*results)
+
+    async def refresh_async(self) -> bool:
+        """
+        Refresh stations from IMGW.
+
+        Returns:
+            True if at least one remote source was merged.
+        """
+        results = await asyncio.gather(
+            list_hydro_stations_async(timeout=self.timeout),
+            get_hydro_stations_with_coords_async(timeout=self.timeout),
+            list_meteo_stations_async(timeout=self.timeout),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, IMGWError):
+                raise result
+        return self._merge(*results)
+
+    async def run_refresh_loop(self) -> None:
+        """
+        Refresh periodically until cancelled (for application startup).
+
+        The first refresh runs immediately (bundled files may be dated),
+        then every ``ttl_seconds``; failures keep the current data and
+        are retried on the next cycle (unexpected errors are also logged).
+        """
+        if self.ttl_seconds <= 0:
+            return
+        while True:
+            if self.is_stale:
+                try:
+                    await self.refresh_async()
+                except Exception as e:
+                    logger.exception("Station registry refresh failed")
+                    self.last_error = str(e) or type(e).__name__
+                    self._refreshed_at = time.monotonic()
+            elapsed = time.monotonic() - (self._refreshed_at or 0.0)
+            await asyncio.sleep(max(1.0, self.ttl_seconds - elapsed))
+
+    def _merge(
+        self,
+        names: list[HydroStation] | BaseException,
+        coords: list[HydroStation] | BaseException,
+        meteo: list[MeteoStation] | BaseException,
+    ) -> bool:
+        """Merge remote results into a new snapshot."""
+        current = self._data
+        errors = [str(r) for r in (names, coords, meteo) if isinstance(r, BaseException)]
+        self.last_error = "; ".join(errors) or None
+        self._refreshed_at = time.monotonic()
+
+        if len(errors) == 3:
+            return False
+
+        hydro = {sid: s.model_copy() for sid, s in current.hydro.items()}
+
+        if not isinstance(names, BaseException):
+            for remote in names:
+                if not remote.station_id.isdigit():
+                    continue
+                station = hydro.get(remote.station_id)
+                if station is None:
+                    hydro[remote.station_id] = remote
+                else:
+                    station.name = remote.name
+                    station.river = remote.river or station.river
+                    station.river_id = remote.river_id or station.river_id
+
+        if not isinstance(coords, BaseException):
+            for remote in coords:
+                station = hydro.get(remote.station_id)
+                if station is None:
+                    if remote.station_id and remote.name:
+                        hydro[remote.station_id] = remote
+                    continue
+                if remote.latitude is not None and remote.longitude is not None:
+                    station.latitude = remote.latitude
+                    station.longitude = remote.longitude
+                station.water_state = remote.water_state
+
+        if isinstance(meteo, BaseException):
+            meteo_stations = current.meteo.values()
+        else:
+            merged = dict(current.meteo)
+            for remote in meteo:
+                if remote.station_id.isdigit():
+                    known = merged.get(remote.station_id)
+                    if known is not None:
+                        remote.latitude = known.latitude
+                        remote.longitude = known.longitude
+                    merged[remote.station_id] = remote
+            meteo_stations = merged.values()
+
+        with self._lock:
+            self._swap(hydro.values(), meteo_stations)
+        return True
+
+    # --- Queries ---
+
+    @property
+    def version(self) -> int:
+        """Snapshot number, incremented on every load or refresh."""
+        return self._data.version
+
+    @property
+    def hydro_stations(self) -> list[HydroStation]:
+        """All hydrological stations."""
+        return list(self._data.hydro.values())
+
+    @property
+    def meteo_stations(self) -> list[MeteoStation]:
+        """All meteorological stations."""
+        return list(self._data.meteo.values())
+
+    @property
+    def hydro_index(self) -> StationIndex[HydroStation]:
+        """Spatial index over hydro stations with coordinates."""
+        return self._data.hydro_index
+
+    def get_hydro_station(self, station_id: str) -> HydroStation | None:
+        """Get hydro station by ID."""
+        return self._data.hydro.get(station_id)
+
+    def get_meteo_station(self, station_id: str) -> MeteoStation | None:
+        """Get meteo station by ID."""
+        return self._data.meteo.get(station_id)
+
+    def find_hydro_by_name(self, name: str) -> list[HydroStation]:
+        """Get hydro stations with the given name (case/diacritics-insensitive)."""
+        return list(self._data.hydro_by_name.get(fold_text(name), ()))
+
+    def find_hydro_by_river(self, river: str) -> list[HydroStation]:
+        """Get hydro stations on the given river (case/diacritics-insensitive)."""
+        return list(self._data.hydro_by_river.get(fold_text(river), ()))
+
+    def find_meteo_by_name(self, name: str) -> list[MeteoStation]:
+        """Get meteo stations with the given name (case/diacritics-insensitive)."""
+        return list(self._data.meteo_by_name.get(fold_text(name), ()))
+
+    @property
+    def hydro_search(self) -> StationSearchIndex[HydroStation]:
+        """Ranked name/river search index over hydro stations."""
+        return self._data.hydro_search
+
+    @property
+    def meteo_search(self) -> StationSearchIndex[MeteoStation]:
+        """Ranked name search index over meteo stations."""
+        return self._data.meteo_search
+
+    def search_hydro(self, query: str | None = None) -> list[HydroStation]:
+        """
+        Search hydro stations by name or river.
+
+        Args:
+            query: Search text (case/diacritics-insensitive). None returns all.
+
+        Returns:
+            All matching stations, best match first.
+        """
+        index = self.hydro_search
+        return index.search(query, limit=len(index)).stations
+
+    def search_meteo(self, query: str | None = None) -> list[MeteoStation]:
+        """
+        Search meteo stations by name.
+
+        Args:
+            query: Search text (case/diacritics-insensitive). None returns all.
+
+        Returns:
+            All matching stations, best match first.
+        """
+        index = self.meteo_search
+        return index.search(query, limit=len(index)).stations
+
+
+# Singleton registry instance
+_registry: StationRegistry | None = None
+
+
+def get_station_registry() -> StationRegistry:
+    """
+    Get singleton registry backed by the configured data directory.
+
+    Requires pydantic-settings (installed with the api, cli or db extras).
+    """
+    global _registry
+    if _registry is None:
+        from imgwtools.config import settings
+
+        _registry = StationRegistry(
+            settings.hydro_stations_file,
+            settings.meteo_stations_file,
+            settings.hydro_stations_locations_file,
+            ttl_seconds=settings.station_refresh_interval,
+        )
+    return _registry
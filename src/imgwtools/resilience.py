@@ -0,0 +1,370 @@
+"""
+Retries, backoff and circuit breaking for requests to IMGW.
+
+Every HTTP client of the library uses retry_transport() /
+async_retry_transport(), which:
+
+- retries connection errors, timeouts and 408/429/5xx responses of
+  idempotent requests with exponential backoff and full jitter,
+- honours ``Retry-After`` (seconds or HTTP date) on 429/503,
+- keeps a circuit breaker per host: after a run of consecutive failures
+  requests fail fast with CircuitOpenError (an httpx.TransportError)
+  until a trial request succeeds after the reset timeout,
+- waits for the client-side rate limit of the host before every attempt
+  (see imgwtools.throttle).
+
+Example:
+    >>> from imgwtools.resilience import RetryPolicy, configure_resilience
+    >>> configure_resilience(RetryPolicy(max_attempts=6, backoff=1.0))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Literal
+
+import httpx
+
+from imgwtools.metrics import CIRCUIT_STATE, UPSTREAM_RETRIES
+from imgwtools.throttle import get_throttle
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+_STATE_VALUES = {"closed": 0, "open": 1, "half_open": 2}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how long to wait before repeating a request.
+
+    Attributes:
+        max_attempts: Attempts per request, including the first (1 = no
+            retries).
+        backoff: Base delay in seconds; attempt n waits a random time
+            between 0 and ``backoff * 2**n`` (capped at ``max_delay``).
+        max_delay: Upper bound of the backoff delay in seconds.
+        max_retry_after: Upper bound of a server ``Retry-After`` in seconds.
+        retry_statuses: Response codes that are retried.
+        retry_methods: HTTP methods that are retried (idempotent only).
+    """
+
+    max_attempts: int = 4
+    backoff: float = 0.5
+    max_delay: float = 30.0
+    max_retry_after: float = 120.0
+    retry_statuses: frozenset[int] = frozenset({408, 429, 500, 502, 503, 504})
+    retry_methods: frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        Seconds to wait after a failed attempt.
+
+        Args:
+            attempt: Number of the failed attempt (0 = first).
+            retry_after: ``Retry-After`` header of the response, if any.
+        """
+        if retry_after:
+            seconds = _parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.max_retry_after)
+        return random.uniform(0, min(self.max_delay, self.backoff * 2**attempt))
+
+
+def _parse_retry_after(value: str) -> float | None:
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max((when - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Request rejected because the host's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker of one host.
+
+    Closed: requests pass. After ``failure_threshold`` consecutive
+    failures the circuit opens and requests are rejected. After
+    ``reset_timeout`` seconds one trial request is let through
+    (half-open); its success closes the circuit, its failure opens it
+    again. A trial that ends without an outcome (cancelled, or failed
+    with an unexpected error) is given back with release_trial().
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._trial_owner: object | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> CircuitState:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self, owner: object | None = None) -> bool:
+        """
+        Whether a request may be sent now (reserves the half-open trial).
+
+        Args:
+            owner: Identifies the request holding the trial (for
+                release_trial).
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                self._trial_owner = owner
+                self._publish("half_open")
+                return True
+            return False
+
+    def release_trial(self, owner: object | None = None) -> None:
+        """Give back the half-open trial of owner without an outcome."""
+        with self._lock:
+            if self._trial_in_flight and self._trial_owner is owner:
+                self._trial_in_flight = False
+                self._trial_owner = None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+            self._trial_owner = None
+            self._publish("closed")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._publish("open")
+            self._trial_in_flight = False
+            self._trial_owner = None
+
+    def _publish(self, state: CircuitState) -> None:
+        CIRCUIT_STATE.set(_STATE_VALUES[state], host=self.name)
+
+
+# --- Shared configuration ---
+
+_policy = RetryPolicy()
+_breaker_config = {"failure_threshold": 5, "reset_timeout": 30.0}
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Get the retry policy used by IMGW clients."""
+    return _policy
+
+
+def configure_resilience(
+    policy: RetryPolicy | None = None,
+    failure_threshold: int | None = None,
+    reset_timeout: float | None = None,
+) -> None:
+    """
+    Change retry and circuit breaker settings of all IMGW clients.
+
+    Existing circuit breakers are reset.
+
+    Args:
+        policy: New retry policy (None = keep the current one).
+        failure_threshold: Consecutive failures that open a circuit.
+        reset_timeout: Seconds before an open circuit allows a trial.
+    """
+    global _policy
+    if policy is not None:
+        _policy = policy
+    if failure_threshold is not None:
+        _breaker_config["failure_threshold"] = failure_threshold
+    if reset_timeout is not None:
+        _breaker_config["reset_timeout"] = reset_timeout
+    reset_circuit_breakers()
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """Get the circuit breaker of a host (``name:port``)."""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host, **_breaker_config)
+        return breaker
+
+
+def reset_circuit_breakers() -> None:
+    """Forget the state of all circuit breakers."""
+    with _breakers_lock:
+        _breakers.clear()
+    CIRCUIT_STATE.clear()
+
+
+# --- Transports ---
+
+
+class _RetryState:
+    """Retry bookkeeping of one request, shared by both transports."""
+
+    def __init__(self, request: httpx.Request, policy: RetryPolicy | None):
+        self.request = request
+        self.policy = policy or _policy
+        self.host = f"{request.url.host}:{request.url.port or request.url.scheme}"
+        self.breaker = get_circuit_breaker(self.host)
+        self.attempt = 0
+        self.retryable = request.method in self.policy.retry_methods
+
+    def check_circuit(self) -> None:
+        if not self.breaker.allow(self):
+            raise CircuitOpenError(
+                f"Circuit open for {self.host} after repeated failures",
+                request=self.request,
+            )
+
+    def release(self) -> None:
+        """Give back a half-open trial if the attempt recorded no outcome."""
+        self.breaker.release_trial(self)
+
+    def on_error(self) -> float | None:
+        """Record a transport error; delay before the retry or None."""
+        self.breaker.record_failure()
+        return self._next_delay(None)
+
+    def on_response(self, response: httpx.Response) -> float | None:
+        """Record a response; delay before the retry or None to return it."""
+        if response.status_code not in self.policy.retry_statuses:
+            self.breaker.record_success()
+            return None
+        self.breaker.record_failure()
+        return self._next_delay(response.headers.get("Retry-After"))
+
+    def _next_delay(self, retry_after: str | None) -> float | None:
+        if not self.retryable or self.attempt + 1 >= self.policy.max_attempts:
+            return None
+        delay = self.policy.delay(self.attempt, retry_after)
+        self.attempt += 1
+        UPSTREAM_RETRIES.inc(host=self.host)
+        return delay
+
+
+class RetryTransport(httpx.BaseTransport):
+    """Sync transport adding retries and circuit breaking (see module doc)."""
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport | None = None,
+        policy: RetryPolicy | None = None,
+    ):
+        self._transport = transport or httpx.HTTPTransport()
+        self.policy = policy
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        state = _RetryState(request, self.policy)
+        while True:
+            state.check_circuit()
+            try:
+                get_throttle().wait(state.host)
+                try:
+                    response = self._transport.handle_request(request)
+                except httpx.TransportError:
+                    delay = state.on_error()
+                    if delay is None:
+                        raise
+                else:
+                    delay = state.on_response(response)
+                    if delay is None:
+                        return response
+                    response.close()
+            finally:
+                state.release()
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Async transport adding retries and circuit breaking (see module doc)."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        policy: RetryPolicy | None = None,
+    ):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self.policy = policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        state = _RetryState(request, self.policy)
+        while True:
+            state.check_circuit()
+            try:
+                await get_throttle().wait_async(state.host)
+                try:
+                    response = await self._transport.handle_async_request(request)
+                except httpx.TransportError:
+                    delay = state.on_error()
+                    if delay is None:
+                        raise
+                else:
+                    delay = state.on_response(response)
+                    if delay is None:
+                        return response
+                    await response.aclose()
+            finally:
+                # Cancelled or failed with a non-transport error
+                state.release()
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def retry_transport(**kwargs: Any) -> RetryTransport:
+    """
+    Transport for sync IMGW clients: ``httpx.Client(transport=...)``.
+
+    Keyword arguments (e.g. ``limits``) are passed to httpx.HTTPTransport.
+    """
+    return RetryTransport(httpx.HTTPTransport(**kwargs))
+
+
+def async_retry_transport(**kwargs: Any) -> AsyncRetryTransport:
+    """
+    Transport for async IMGW clients: ``httpx.AsyncClient(transport=...)``.
+
+    Keyword arguments (e.g. ``limits``) are passed to
+    httpx.AsyncHTTPTransport.
+    """
+    return AsyncRetryTransport(httpx.AsyncHTTPTransport(**kwargs))
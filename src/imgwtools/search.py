@@ -0,0 +1,231 @@
+"""
+Precomputed search index for station names and rivers.
+
+Built once per station list and queried on every keystroke of the
+station picker, so lookups avoid scanning all stations:
+
+- a sorted token list answers word-prefix queries with binary search,
+- a trigram index answers substring queries ("wars" in "Nowa Warszawa").
+
+All text is diacritic-folded (see imgwtools.text), so "lodz" finds "Łódź".
+Results are ranked: exact name, name prefix, word prefix in the name,
+then river matches and plain substrings.
+
+Example:
+    >>> from imgwtools.search import StationSearchIndex
+    >>> index = StationSearchIndex(stations)
+    >>> page = index.search("klodz", limit=10)
+    >>> print(page.total, [s.name for s in page.stations])
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Generic, Protocol, TypeVar
+
+from imgwtools.text import tokenize
+
+# Score components (higher ranks first)
+SCORE_EXACT_NAME = 100.0
+SCORE_NAME_PREFIX = 50.0
+SCORE_NAME_TOKEN = 10.0
+SCORE_NAME_TOKEN_PREFIX = 6.0
+SCORE_RIVER_TOKEN_PREFIX = 3.0
+SCORE_NAME_SUBSTRING = 2.0
+SCORE_RIVER_SUBSTRING = 1.0
+
+
+class Named(Protocol):
+    """Any station with a name (and optionally a river)."""
+
+    @property
+    def name(self) -> str: ...
+
+
+T = TypeVar("T", bound=Named)
+
+
+@dataclass(frozen=True)
+class SearchHit(Generic[T]):
+    """Single ranked search result."""
+
+    station: T
+    score: float
+
+
+@dataclass(frozen=True)
+class SearchPage(Generic[T]):
+    """
+    One page of ranked search results.
+
+    Attributes:
+        hits: Results on this page, best first.
+        total: Number of matching stations across all pages.
+        offset: Index of the first hit within all results.
+        limit: Requested page size.
+    """
+
+    hits: list[SearchHit[T]]
+    total: int
+    offset: int
+    limit: int
+
+    @property
+    def stations(self) -> list[T]:
+        return [hit.station for hit in self.hits]
+
+    @property
+    def has_more(self) -> bool:
+        return self.offset + len(self.hits) < self.total
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class StationSearchIndex(Generic[T]):
+    """
+    Prefix and trigram index over station names and rivers.
+
+    The index is immutable; build a new one when the station list changes.
+    """
+
+    def __init__(self, stations: Iterable[T]):
+        """
+        Build the index.
+
+        Args:
+            stations: Stations with ``name`` and optional ``river``.
+        """
+        self._stations: list[T] = list(stations)
+        self._names: list[str] = []
+        self._rivers: list[str] = []
+        # Sorted (token, doc, is_river) triples for prefix lookups
+        tokens: list[tuple[str, int, bool]] = []
+        self._trigrams: dict[str, set[int]] = {}
+
+        for doc, station in enumerate(self._stations):
+            # Words joined by single spaces: "warszawa-bulwary" -> "warszawa bulwary"
+            name_tokens = tokenize(station.name)
+            river_tokens = tokenize(getattr(station, "river", None))
+            name = " ".join(name_tokens)
+            river = " ".join(river_tokens)
+            self._names.append(name)
+            self._rivers.append(river)
+
+            tokens.extend((t, doc, False) for t in name_tokens)
+            tokens.extend((t, doc, True) for t in river_tokens)
+            for gram in _trigrams(name) | _trigrams(river):
+                self._trigrams.setdefault(gram, set()).add(doc)
+
+        tokens.sort()
+        self._tokens = tokens
+        self._token_keys = [t[0] for t in tokens]
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def search(
+        self,
+        query: str | None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> SearchPage[T]:
+        """
+        Find stations matching all words of the query.
+
+        Each word must match a name/river word prefix or occur as a
+        substring. An empty query returns all stations in input order.
+
+        Args:
+            query: Search text (case/diacritics-insensitive).
+            limit: Page size.
+            offset: Number of results to skip.
+
+        Returns:
+            SearchPage with ranked hits and the total match count.
+        """
+        limit = max(0, limit)
+        offset = max(0, offset)
+        words = tokenize(query)
+
+        if not words:
+            total = len(self._stations)
+            hits = [
+                SearchHit(s, 0.0) for s in self._stations[offset : offset + limit]
+            ]
+            return SearchPage(hits, total, offset, limit)
+
+        scores: dict[int, float] | None = None
+        for word in words:
+            word_scores = self._match_word(word)
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {
+                    doc: score + word_scores[doc]
+                    for doc, score in scores.items()
+                    if doc in word_scores
+                }
+            if not scores:
+                return SearchPage([], 0, offset, limit)
+
+        folded = " ".join(words)
+        for doc in scores:
+            name = self._names[doc]
+            if name == folded:
+                scores[doc] += SCORE_EXACT_NAME
+            elif name.startswith(folded):
+                scores[doc] += SCORE_NAME_PREFIX
+
+        ranked = sorted(
+            scores.items(), key=lambda item: (-item[1], self._names[item[0]], item[0])
+        )
+        hits = [
+            SearchHit(self._stations[doc], score)
+            for doc, score in ranked[offset : offset + limit]
+        ]
+        return SearchPage(hits, len(ranked), offset, limit)
+
+    def _match_word(self, word: str) -> dict[int, float]:
+        """Best score of a single query word for every matching station."""
+        scores: dict[int, float] = {}
+
+        def add(doc: int, score: float) -> None:
+            if score > scores.get(doc, 0.0):
+                scores[doc] = score
+
+        tokens = self._tokens
+        for i in range(bisect.bisect_left(self._token_keys, word), len(tokens)):
+            token, doc, is_river = tokens[i]
+            if not token.startswith(word):
+                break
+            if is_river:
+                add(doc, SCORE_RIVER_TOKEN_PREFIX)
+            elif token == word:
+                add(doc, SCORE_NAME_TOKEN)
+            else:
+                add(doc, SCORE_NAME_TOKEN_PREFIX)
+
+        if len(word) >= 3:
+            for doc in self._substring_candidates(word):
+                if word in self._names[doc]:
+                    add(doc, SCORE_NAME_SUBSTRING)
+                elif word in self._rivers[doc]:
+                    add(doc, SCORE_RIVER_SUBSTRING)
+
+        return scores
+
+    def _substring_candidates(self, word: str) -> Sequence[int]:
+        """Stations containing every trigram of the word."""
+        grams = sorted(_trigrams(word), key=lambda g: len(self._trigrams.get(g, ())))
+        if not grams or grams[0] not in self._trigrams:
+            return []
+        candidates = set(self._trigrams[grams[0]])
+        for gram in grams[1:]:
+            candidates &= self._trigrams.get(gram, set())
+            if not candidates:
+                break
+        return list(candidates)
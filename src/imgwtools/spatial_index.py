@@ -0,0 +1,315 @@
+"""
+In-memory spatial index for station coordinates.
+
+Provides nearest-neighbour, radius and bounding-box queries over
+hydrological (and any other) stations without external dependencies.
+Stations are bucketed into a regular latitude/longitude grid, so a query
+only inspects the cells around the point instead of every station.
+
+Example:
+    >>> from imgwtools import get_hydro_stations_with_coords
+    >>> from imgwtools.spatial_index import StationIndex
+    >>> index = StationIndex(get_hydro_stations_with_coords())
+    >>> for station, km in index.nearest(52.23, 21.01, k=3):
+    ...     print(f"{station.name}: {km:.1f} km")
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections.abc import Iterable, Sequence
+from typing import Generic, Protocol, TypeVar
+
+from imgwtools.exceptions import IMGWValidationError
+
+# Mean Earth radius [km]
+EARTH_RADIUS_KM = 6371.0088
+
+# Length of one degree of latitude [km]
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+# Default grid cell size in degrees (~28 km north-south)
+DEFAULT_CELL_SIZE_DEG = 0.25
+
+
+class Located(Protocol):
+    """Any object with optional WGS84 coordinates."""
+
+    @property
+    def latitude(self) -> float | None: ...
+
+    @property
+    def longitude(self) -> float | None: ...
+
+
+T = TypeVar("T", bound=Located)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two WGS84 points.
+
+    Args:
+        lat1, lon1: First point in decimal degrees.
+        lat2, lon2: Second point in decimal degrees.
+
+    Returns:
+        Distance in kilometres.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class StationIndex(Generic[T]):
+    """
+    Grid-based spatial index over stations with coordinates.
+
+    Stations without latitude/longitude are ignored. The index is
+    immutable; build a new one when the station list changes.
+
+    Attributes:
+        cell_size: Grid cell size in degrees.
+    """
+
+    def __init__(
+        self,
+        stations: Iterable[T],
+        cell_size_deg: float = DEFAULT_CELL_SIZE_DEG,
+    ):
+        """
+        Build the index.
+
+        Args:
+            stations: Stations exposing ``latitude`` and ``longitude``.
+            cell_size_deg: Grid cell size in degrees.
+        """
+        if cell_size_deg <= 0:
+            raise IMGWValidationError("cell_size_deg must be positive")
+
+        self.cell_size = cell_size_deg
+        self._cells: dict[tuple[int, int], list[tuple[float, float, T]]] = {}
+        self._count = 0
+
+        for station in stations:
+            lat, lon = station.latitude, station.longitude
+            if lat is None or lon is None:
+                continue
+            self._cells.setdefault(self._cell(lat, lon), []).append(
+                (lat, lon, station)
+            )
+            self._count += 1
+
+        if self._cells:
+            rows = [c[0] for c in self._cells]
+            cols = [c[1] for c in self._cells]
+            self._bounds = (min(rows), max(rows), min(cols), max(cols))
+        else:
+            self._bounds = (0, -1, 0, -1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (
+            math.floor(lat / self.cell_size),
+            math.floor(lon / self.cell_size),
+        )
+
+    def _ring(self, center: tuple[int, int], r: int) -> Iterable[tuple[int, int]]:
+        """Cells at Chebyshev distance ``r`` from ``center``."""
+        ci, cj = center
+        if r == 0:
+            yield center
+            return
+        for j in range(cj - r, cj + r + 1):
+            yield (ci - r, j)
+            yield (ci + r, j)
+        for i in range(ci - r + 1, ci + r):
+            yield (i, cj - r)
+            yield (i, cj + r)
+
+    def _max_ring(self, center: tuple[int, int]) -> int:
+        """Ring radius after which no populated cell can remain."""
+        min_i, max_i, min_j, max_j = self._bounds
+        ci, cj = center
+        return max(ci - min_i, max_i - ci, cj - min_j, max_j - cj, 0)
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+        max_distance_km: float | None = None,
+    ) -> list[tuple[T, float]]:
+        """
+        Find the ``k`` stations nearest to a point.
+
+        Args:
+            latitude: Latitude in decimal degrees.
+            longitude: Longitude in decimal degrees.
+            k: Number of stations to return.
+            max_distance_km: Optional search radius limit.
+
+        Returns:
+            List of (station, distance_km), nearest first.
+
+        Example:
+            >>> station, km = index.nearest(52.23, 21.01)[0]
+        """
+        if k < 1:
+            raise IMGWValidationError("k must be at least 1")
+        if not self._cells:
+            return []
+
+        center = self._cell(latitude, longitude)
+        # Max-heap of the best k candidates: (-distance, seq, station)
+        best: list[tuple[float, int, T]] = []
+        seq = 0
+        cos_lat = math.cos(math.radians(min(abs(latitude), 89.0)))
+
+        for r in range(self._max_ring(center) + 1):
+            for cell in self._ring(center, r):
+                for lat, lon, station in self._cells.get(cell, ()):
+                    dist = haversine_km(latitude, longitude, lat, lon)
+                    if max_distance_km is not None and dist > max_distance_km:
+                        continue
+                    seq += 1
+                    if len(best) < k:
+                        heapq.heappush(best, (-dist, seq, station))
+                    elif dist < -best[0][0]:
+                        heapq.heapreplace(best, (-dist, seq, station))
+
+            # Any cell outside ring r is at least r cells away
+            ring_lat = min(abs(latitude) + (r + 1) * self.cell_size, 89.0)
+            bound = r * self.cell_size * KM_PER_DEGREE * min(
+                cos_lat, math.cos(math.radians(ring_lat))
+            )
+            if max_distance_km is not None and bound > max_distance_km:
+                break
+            if len(best) == k and bound >= -best[0][0]:
+                break
+
+        return [(station, -neg) for neg, _, station in sorted(best, reverse=True)]
+
+    def nearest_many(
+        self,
+        points: Sequence[tuple[float, float]],
+        k: int = 1,
+        max_distance_km: float | None = None,
+    ) -> list[list[tuple[T, float]]]:
+        """
+        Nearest stations for many (latitude, longitude) points.
+
+        Args:
+            points: Sequence of (latitude, longitude) pairs.
+            k: Number of stations per point.
+            max_distance_km: Optional search radius limit.
+
+        Returns:
+            One nearest() result per input point, in the same order.
+        """
+        return [
+            self.nearest(lat, lon, k=k, max_distance_km=max_distance_km)
+            for lat, lon in points
+        ]
+
+    def within_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+    ) -> list[tuple[T, float]]:
+        """
+        Find all stations within a radius of a point.
+
+        Args:
+            latitude: Latitude in decimal degrees.
+            longitude: Longitude in decimal degrees.
+            radius_km: Search radius in kilometres.
+
+        Returns:
+            List of (station, distance_km), nearest first.
+        """
+        if radius_km < 0:
+            raise IMGWValidationError("radius_km must not be negative")
+
+        dlat = radius_km / KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(min(abs(latitude) + dlat, 89.0)))
+        dlon = min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+
+        found = [
+            (station, haversine_km(latitude, longitude, lat, lon))
+            for lat, lon, station in self._scan(
+                latitude - dlat, longitude - dlon, latitude + dlat, longitude + dlon
+            )
+        ]
+        found = [item for item in found if item[1] <= radius_km]
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def within_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+    ) -> list[T]:
+        """
+        Find all stations inside a bounding box (edges inclusive).
+
+        Args:
+            min_lat, min_lon: South-west corner in decimal degrees.
+            max_lat, max_lon: North-east corner in decimal degrees.
+
+        Returns:
+            List of stations inside the box.
+        """
+        if min_lat > max_lat or min_lon > max_lon:
+            raise IMGWValidationError("Bounding box minimum exceeds maximum")
+
+        return [
+            station
+            for lat, lon, station in self._scan(min_lat, min_lon, max_lat, max_lon)
+            if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+        ]
+
+    def _scan(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+    ) -> Iterable[tuple[float, float, T]]:
+        """Yield entries of every cell overlapping the box."""
+        min_i, max_i, min_j, max_j = self._bounds
+        lo_i, lo_j = self._cell(min_lat, min_lon)
+        hi_i, hi_j = self._cell(max_lat, max_lon)
+        for i in range(max(lo_i, min_i), min(hi_i, max_i) + 1):
+            for j in range(max(lo_j, min_j), min(hi_j, max_j) + 1):
+                yield from self._cells.get((i, j), ())
+
+
+def build_station_index(
+    stations: Iterable[T],
+    cell_size_deg: float = DEFAULT_CELL_SIZE_DEG,
+) -> StationIndex[T]:
+    """
+    Build a spatial index over stations.
+
+    Args:
+        stations: Stations with ``latitude``/``longitude`` attributes
+            (e.g. from get_hydro_stations_with_coords()).
+        cell_size_deg: Grid cell size in degrees.
+
+    Returns:
+        StationIndex ready for queries.
+    """
+    return StationIndex(stations, cell_size_deg=cell_size_deg)
@@ -9,27 +9,23 @@ from __future__ import annotations
 import csv
 import io
 import re
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import httpx
 from pydantic import BaseModel, ConfigDict, Field
 
+from imgwtools.core.url_builder import (
+    DataType,
+    build_hydro_map_url,
+    build_station_list_url,
+)
 from imgwtools.exceptions import IMGWConnectionError
+from imgwtools.resilience import async_retry_transport, retry_transport
 
 if TYPE_CHECKING:
     pass
 
-# URLs for station data
-HYDRO_STATIONS_CSV_URL = (
-    "https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne/"
-    "dane_hydrologiczne/lista_stacji_hydro.csv"
-)
-METEO_STATIONS_CSV_URL = (
-    "https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne/"
-    "dane_meteorologiczne/wykaz_stacji.csv"
-)
-HYDRO_MAP_API_URL = "https://hydro-back.imgw.pl/map/stations/hydrologic"
-
 # Default encoding for IMGW CSV files
 IMGW_ENCODING = "cp1250"
 
@@ -44,6 +40,7 @@ class HydroStation(BaseModel):
         station_id: Unique station identifier (kod stacji).
         name: Station name.
         river: River or lake name (optional).
+        river_id: Hydrographic river code from the station list (optional).
         latitude: Latitude in decimal degrees (optional, from map API).
         longitude: Longitude in decimal degrees (optional, from map API).
         water_state: Current water state status (optional, from map API).
@@ -55,6 +52,7 @@ class HydroStation(BaseModel):
     station_id: str = Field(alias="station_code")
     name: str = Field(alias="station_name")
     river: str | None = Field(None, alias="river_name")
+    river_id: str | None = None
     latitude: float | None = None
     longitude: float | None = None
     water_state: str | None = Field(
@@ -70,10 +68,14 @@ class MeteoStation(BaseModel):
     Attributes:
         station_id: Unique station identifier.
         name: Station name.
+        latitude: Latitude in decimal degrees (optional).
+        longitude: Longitude in decimal degrees (optional).
     """
 
     station_id: str
     name: str
+    latitude: float | None = None
+    longitude: float | None = None
 
 
 def list_hydro_stations(
@@ -101,8 +103,8 @@ def list_hydro_stations(
         >>> print(stations[0].name)
     """
     try:
-        with httpx.Client(timeout=timeout) as client:
-            response = client.get(HYDRO_STATIONS_CSV_URL)
+        with httpx.Client(timeout=timeout, transport=retry_transport()) as client:
+            response = client.get(build_station_list_url(DataType.HYDRO))
             response.raise_for_status()
             content = response.content.decode(IMGW_ENCODING)
     except httpx.TimeoutException as e:
@@ -122,9 +124,11 @@ async def list_hydro_stations_async(
 
     See list_hydro_stations for documentation.
     """
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(
+        timeout=timeout, transport=async_retry_transport()
+    ) as client:
         try:
-            response = await client.get(HYDRO_STATIONS_CSV_URL)
+            response = await client.get(build_station_list_url(DataType.HYDRO))
             response.raise_for_status()
             content = response.content.decode(IMGW_ENCODING)
         except httpx.TimeoutException as e:
@@ -170,8 +174,10 @@ def get_hydro_stations_with_coords(
     }
 
     try:
-        with httpx.Client(timeout=timeout) as client:
-            response = client.get(HYDRO_MAP_API_URL, params=params, headers=headers)
+        with httpx.Client(timeout=timeout, transport=retry_transport()) as client:
+            response = client.get(
+                build_hydro_map_url(), params=params, headers=headers
+            )
             response.raise_for_status()
             data = response.json()
     except httpx.TimeoutException as e:
@@ -198,10 +204,12 @@ async def get_hydro_stations_with_coords_async(
         "Referer": "https://hydro.imgw.pl/",
     }
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(
+        timeout=timeout, transport=async_retry_transport()
+    ) as client:
         try:
             response = await client.get(
-                HYDRO_MAP_API_URL, params=params, headers=headers
+                build_hydro_map_url(), params=params, headers=headers
             )
             response.raise_for_status()
             data = response.json()
@@ -234,8 +242,8 @@ def list_meteo_stations(
         >>> print(len(stations))
     """
     try:
-        with httpx.Client(timeout=timeout) as client:
-            response = client.get(METEO_STATIONS_CSV_URL)
+        with httpx.Client(timeout=timeout, transport=retry_transport()) as client:
+            response = client.get(build_station_list_url(DataType.METEO))
             response.raise_for_status()
             content = response.content.decode(IMGW_ENCODING)
     except httpx.TimeoutException as e:
@@ -255,9 +263,11 @@ async def list_meteo_stations_async(
 
     See list_meteo_stations for documentation.
     """
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(
+        timeout=timeout, transport=async_retry_transport()
+    ) as client:
         try:
-            response = await client.get(METEO_STATIONS_CSV_URL)
+            response = await client.get(build_station_list_url(DataType.METEO))
             response.raise_for_status()
             content = response.content.decode(IMGW_ENCODING)
         except httpx.TimeoutException as e:
@@ -268,6 +278,96 @@ async def list_meteo_stations_async(
     return _parse_meteo_stations_csv(content)
 
 
+def load_hydro_stations_from_csv(
+    names_file: str | Path,
+    locations_file: str | Path | None = None,
+    *,
+    encoding: str = IMGW_ENCODING,
+) -> list[HydroStation]:
+    """
+    Load hydrological stations from local CSV files (no network access).
+
+    Reads the station list (``data/hydro_stations_names.csv`` format:
+    id, name, river) and optionally joins coordinates from a locations
+    file (``data/hydro_stations_locations.csv`` format: id, X=lon, Y=lat,
+    with "NA" for unknown positions).
+
+    Args:
+        names_file: Path to station names CSV.
+        locations_file: Optional path to station locations CSV.
+        encoding: Encoding of the names file (default CP1250).
+
+    Returns:
+        List of HydroStation objects.
+
+    Example:
+        >>> stations = load_hydro_stations_from_csv(
+        ...     "data/hydro_stations_names.csv",
+        ...     "data/hydro_stations_locations.csv",
+        ... )
+    """
+    content = Path(names_file).read_bytes().decode(encoding)
+    # Skip header row and anything else without a numeric station code
+    stations = [
+        s for s in _parse_hydro_stations_csv(content) if s.station_id.isdigit()
+    ]
+
+    if locations_file is not None:
+        coords = load_station_locations_from_csv(locations_file)
+        for station in stations:
+            if station.station_id in coords:
+                station.latitude, station.longitude = coords[station.station_id]
+
+    return stations
+
+
+def load_meteo_stations_from_csv(
+    names_file: str | Path,
+    *,
+    encoding: str = IMGW_ENCODING,
+) -> list[MeteoStation]:
+    """
+    Load meteorological stations from a local CSV file (no network access).
+
+    Args:
+        names_file: Path to station list CSV (``data/meteo_stations_names.csv``).
+        encoding: File encoding (default CP1250).
+
+    Returns:
+        List of MeteoStation objects (without coordinates).
+    """
+    content = Path(names_file).read_bytes().decode(encoding)
+    return [
+        s for s in _parse_meteo_stations_csv(content) if s.station_id.isdigit()
+    ]
+
+
+def load_station_locations_from_csv(
+    locations_file: str | Path,
+) -> dict[str, tuple[float, float]]:
+    """
+    Load station coordinates from a local CSV file (no network access).
+
+    Args:
+        locations_file: Path to a locations CSV
+            (``data/hydro_stations_locations.csv`` format: id, X=lon, Y=lat).
+
+    Returns:
+        Dict of station ID -> (latitude, longitude). Rows with unknown
+        positions ("NA") are skipped.
+    """
+    coords: dict[str, tuple[float, float]] = {}
+    with open(locations_file, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                lon = float(row["X"])
+                lat = float(row["Y"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            coords[row["id"].strip()] = (lat, lon)
+    return coords
+
+
 def _parse_hydro_stations_csv(content: str) -> list[HydroStation]:
     """Parse hydro stations CSV content."""
     stations = []
@@ -282,12 +382,14 @@ def _parse_hydro_stations_csv(content: str) -> list[HydroStation]:
             name = row[1].strip().strip('"')
 
             river = None
+            river_id = None
             if len(row) > 2:
                 river_raw = row[2].strip().strip('"')
-                # Parse "Odra (1)" format - extract river name
-                match = re.match(r"^(.+?)\s*\(\d+\)$", river_raw)
+                # Parse "Odra (1)" format - extract river name and code
+                match = re.match(r"^(.+?)\s*\((\d+)\)$", river_raw)
                 if match:
                     river = match.group(1).strip()
+                    river_id = match.group(2)
                 else:
                     river = river_raw if river_raw else None
 
@@ -296,6 +398,7 @@ def _parse_hydro_stations_csv(content: str) -> list[HydroStation]:
                     station_code=station_id,
                     station_name=name,
                     river_name=river,
+                    river_id=river_id,
                 )
             )
         except (IndexError, ValueError):
@@ -0,0 +1,33 @@
+"""
+Offline test helpers: synthetic IMGW data and a fake IMGW server.
+
+Example:
+    >>> from imgwtools import set_base_url
+    >>> from imgwtools.testing import FakeIMGWServer
+    >>> with FakeIMGWServer(n_stations=100, latency=0.05) as server:
+    ...     set_base_url(server.base_url)
+    ...     ...
+    >>> set_base_url(None)
+"""
+
+from imgwtools.testing.fake_server import FakeIMGWServer
+from imgwtools.testing.synthetic import (
+    DEFAULT_STATIONS,
+    archive_for,
+    daily_csv,
+    monthly_csv,
+    semi_annual_csv,
+    station_codes,
+    station_list_csv,
+)
+
+__all__ = [
+    "FakeIMGWServer",
+    "DEFAULT_STATIONS",
+    "archive_for",
+    "daily_csv",
+    "monthly_csv",
+    "semi_annual_csv",
+    "station_codes",
+    "station_list_csv",
+]
@@ -0,0 +1,406 @@
+"""
+Local stand-in for the IMGW servers.
+
+Serves, from a background thread, synthetic responses under the same
+paths as the public IMGW services:
+
+- ``/data/dane_pomiarowo_obserwacyjne/...`` - hydro archives (ZIP, with
+  ``Range: bytes=N-`` resume support) and station lists
+  (danepubliczne.imgw.pl)
+- ``/api/data/{hydro,synop,meteo,warnings/...}`` - real-time JSON feeds
+- ``/tpmax-api/point/...`` - PMAXTP precipitation (powietrze.imgw.pl)
+- ``/map/stations/hydrologic`` - hydro-back station map
+
+Latency and failures can be injected to load-test the API and the
+ingestion pipeline without contacting (or being throttled by) IMGW.
+Point imgwtools at the server with ``set_base_url(server.base_url)``
+or ``IMGW_UPSTREAM_URL``.
+
+Example:
+    >>> with FakeIMGWServer(latency=0.05, failure_rate=0.1) as server:
+    ...     set_base_url(server.base_url)
+    ...     fetch_hydro_current()
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from imgwtools.testing.synthetic import (
+    DEFAULT_STATIONS,
+    archive_for,
+    station_codes,
+    station_list_csv,
+    station_location,
+    station_name,
+    station_river,
+)
+
+DATA_PREFIX = "/data/dane_pomiarowo_obserwacyjne"
+API_PREFIX = "/api/data"
+PMAXTP_PREFIX = "/tpmax-api/point"
+MAP_PATH = "/map/stations/hydrologic"
+
+# Number of synoptic stations in the synop feed
+SYNOP_STATIONS = 60
+
+# Real-time values change every this many seconds
+UPDATE_PERIOD = 600
+
+PMAXTP_DURATIONS = [5, 10, 15, 30, 45, 60, 90, 120, 180, 360, 720, 1080, 1440]
+PMAXTP_PROBABILITIES = [1, 2, 5, 10, 20, 30, 50, 60, 70, 80, 90, 99]
+
+# Open-ended byte range (the form used to resume downloads)
+_RANGE = re.compile(r"^bytes=(\d+)-$")
+
+_PMAXTP_PATH = re.compile(
+    rf"^{PMAXTP_PREFIX}/(?P<method>[PA])/KS/(?P<lat>[-\d.]+)/(?P<lon>[-\d.]+)$"
+)
+_WATER_STATES = ["normal"] * 17 + ["low", "warning", "alarm"]
+
+
+class FakeIMGWServer:
+    """
+    Fake IMGW server on a local port.
+
+    Archives are generated on first request and kept in memory. Real-time
+    values are deterministic within an update period (10 min), so
+    consumers see changes at the same cadence as with IMGW.
+
+    Attributes:
+        latency: Delay added to every response [s].
+        failure_rate: Share of requests answered with failure_status (0-1).
+        failure_status: HTTP status of injected failures.
+        requests: Paths requested so far.
+
+    Args:
+        n_stations: Number of hydrological stations.
+        host: Interface to listen on.
+        port: Port (0 = any free port).
+        latency: Delay added to every response [s].
+        failure_rate: Share of requests that fail (0-1).
+        failure_status: HTTP status of injected failures.
+        seed: Seed of the failure generator.
+
+    Example:
+        >>> with FakeIMGWServer(n_stations=100) as server:
+        ...     print(server.base_url)
+        http://127.0.0.1:53211
+    """
+
+    def __init__(
+        self,
+        n_stations: int = DEFAULT_STATIONS,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        seed: int | None = None,
+    ):
+        self.n_stations = n_stations
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.requests: list[str] = []
+        self._random = random.Random(seed)
+        self._archives: dict[str, bytes | None] = {}
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), self)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """URL to pass to set_base_url() or IMGW_UPSTREAM_URL."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeIMGWServer:
+        """Start serving in a daemon thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="fake-imgw",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the current thread (until interrupted)."""
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> FakeIMGWServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # --- Responses ---
+
+    def archive(self, filename: str) -> bytes | None:
+        """ZIP archive served under a file name (generated on first use)."""
+        with self._lock:
+            if filename not in self._archives:
+                self._archives[filename] = archive_for(filename, self.n_stations)
+            return self._archives[filename]
+
+    def respond(
+        self, path: str, query: dict[str, list[str]]
+    ) -> tuple[bytes, str] | None:
+        """
+        Response body and content type for a path (without injected faults).
+
+        Returns:
+            (body, content type), or None if the path is unknown.
+        """
+        if path.startswith(DATA_PREFIX):
+            filename = path.rsplit("/", 1)[-1]
+            if filename == "lista_stacji_hydro.csv":
+                return station_list_csv(self.n_stations), "text/csv"
+            if filename == "wykaz_stacji.csv":
+                return _synop_station_list(), "text/csv"
+            body = self.archive(filename)
+            return (body, "application/zip") if body is not None else None
+
+        if path.startswith(API_PREFIX):
+            data = self._api(path[len(API_PREFIX):].strip("/"))
+        elif match := _PMAXTP_PATH.match(path):
+            data = _pmaxtp(float(match["lat"]), float(match["lon"]))
+        elif path == MAP_PATH:
+            main_only = query.get("onlyMainStations", ["false"])[0] == "true"
+            data = self._map_stations(main_only)
+        else:
+            return None
+        if data is None:
+            return None
+        return json.dumps(data, ensure_ascii=False).encode(), "application/json"
+
+    def _api(self, endpoint: str) -> list[dict] | dict | None:
+        name, _, station_id = endpoint.partition("/id/")
+        if name == "hydro":
+            records = self._hydro_current()
+        elif name == "synop":
+            records = self._synop()
+        elif name == "meteo":
+            records = self._meteo()
+        elif name in ("warnings/hydro", "warnings/meteo"):
+            return self._warnings(name.split("/")[1])
+        else:
+            return None
+        if not station_id:
+            return records
+        for record in records:
+            if record["id_stacji"] == station_id:
+                return record
+        return None
+
+    def _tick(self) -> tuple[int, str]:
+        tick = int(time.time()) // UPDATE_PERIOD
+        when = datetime.fromtimestamp(tick * UPDATE_PERIOD)
+        return tick, when.strftime("%Y-%m-%d %H:%M:%S")
+
+    def _hydro_current(self) -> list[dict]:
+        tick, when = self._tick()
+        records = []
+        for i, code in enumerate(station_codes(self.n_stations)):
+            level = 100 + i % 300 + (tick + i) % 7
+            records.append(
+                {
+                    "id_stacji": code,
+                    "stacja": station_name(i),
+                    "rzeka": station_river(i),
+                    "województwo": "mazowieckie",
+                    "stan_wody": str(level),
+                    "stan_wody_data_pomiaru": when,
+                    "temperatura_wody": f"{5 + i % 15}.{tick % 10}",
+                    "temperatura_wody_data_pomiaru": when,
+                    "przeplyw": f"{level * 0.08:.2f}",
+                    "przeplyw_data_pomiaru": when,
+                    "zjawisko_lodowe": "0",
+                    "zjawisko_zarastania": "0",
+                }
+            )
+        return records
+
+    def _synop(self) -> list[dict]:
+        tick, when = self._tick()
+        day, hour = when.split(" ")
+        return [
+            {
+                "id_stacji": code,
+                "stacja": name,
+                "data_pomiaru": day,
+                "godzina_pomiaru": str(int(hour[:2])),
+                "temperatura": f"{(i + tick) % 30 - 5}.{i % 10}",
+                "predkosc_wiatru": str(i % 12),
+                "kierunek_wiatru": str(i * 37 % 360),
+                "wilgotnosc_wzgledna": f"{50 + i % 50}.0",
+                "suma_opadu": f"{(tick + i) % 5 * 0.2:.1f}",
+                "cisnienie": f"{1000 + i % 30}.{tick % 10}",
+            }
+            for i, (code, name) in enumerate(_synop_stations())
+        ]
+
+    def _meteo(self) -> list[dict]:
+        tick, when = self._tick()
+        return [
+            {
+                "id_stacji": code,
+                "nazwa_stacji": name,
+                "data_pomiaru": when,
+                "temperatura": f"{(i + tick) % 30 - 5}.{i % 10}",
+                "predkosc_wiatru": str(i % 12),
+                "wilgotnosc": f"{50 + i % 50}.0",
+                "opad": f"{(tick + i) % 5 * 0.2:.1f}",
+            }
+            for i, (code, name) in enumerate(_synop_stations())
+        ]
+
+    def _warnings(self, kind: str) -> list[dict]:
+        tick, when = self._tick()
+        start = datetime.fromisoformat(when)
+        return [
+            {
+                "id": f"{kind}-{tick}-{i}",
+                "nazwa": "Wezbranie z przekroczeniem stanów ostrzegawczych"
+                if kind == "hydro"
+                else "Intensywne opady deszczu",
+                "stopien": str(1 + i % 3),
+                "prawdopodobienstwo": "80",
+                "obowiazuje_od": when,
+                "obowiazuje_do": (start + timedelta(hours=24)).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                ),
+                "tresc": "Synthetic warning",
+                "teryt": [f"{1400 + j:04d}" for j in range(i * 3, i * 3 + 3)],
+            }
+            for i in range(1 + tick % 3)
+        ]
+
+    def _map_stations(self, main_only: bool) -> dict:
+        tick, _ = self._tick()
+        stations = []
+        for i, code in enumerate(station_codes(self.n_stations)):
+            if main_only and i % 3:
+                continue
+            latitude, longitude = station_location(i)
+            stations.append(
+                {
+                    "id": code,
+                    "n": station_name(i),
+                    "riverName": station_river(i),
+                    "la": latitude,
+                    "lo": longitude,
+                    "s": _WATER_STATES[(i + tick) % len(_WATER_STATES)],
+                }
+            )
+        return {"stations": stations}
+
+    # --- Fault injection ---
+
+    def _fault(self) -> bool:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        with self._lock:
+            return self.failure_rate > 0 and self._random.random() < self.failure_rate
+
+
+def _synop_stations() -> list[tuple[str, str]]:
+    return [(f"12{100 + i * 5:03d}", f"SYNOP {i}") for i in range(SYNOP_STATIONS)]
+
+
+def _synop_station_list() -> bytes:
+    lines = [f'"{code}","{name}"' for code, name in _synop_stations()]
+    return ("\r\n".join(lines) + "\r\n").encode("cp1250")
+
+
+def _pmaxtp(latitude: float, longitude: float) -> dict:
+    # Precipitation grows with duration and return period; the location
+    # only shifts the level a little.
+    shift = 1 + ((latitude * 7 + longitude * 3) % 1) * 0.2
+
+    def table(scale: float) -> dict[str, dict[str, float]]:
+        return {
+            str(duration): {
+                str(p): round(scale * shift * duration**0.33 * (1 + (100 - p) / 40), 2)
+                for p in PMAXTP_PROBABILITIES
+            }
+            for duration in PMAXTP_DURATIONS
+        }
+
+    return {"data": {"ks": table(4.0), "sg": table(4.8), "rb": table(0.3)}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _HTTPServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server API)
+        fake = self.server.fake
+        url = urlsplit(self.path)
+        with fake._lock:
+            fake.requests.append(url.path)
+
+        if fake._fault():
+            self._send(fake.failure_status, b"Service Unavailable", "text/plain")
+            return
+        response = fake.respond(url.path, parse_qs(url.query))
+        if response is None:
+            self._send(404, b"Not Found", "text/plain")
+            return
+
+        body, content_type = response
+        match = _RANGE.match(self.headers.get("Range", ""))
+        if match and content_type == "application/zip":
+            start, size = int(match[1]), len(body)
+            if start >= size:
+                self._send(416, b"", content_type, {"Content-Range": f"bytes */{size}"})
+                return
+            headers = {"Content-Range": f"bytes {start}-{size - 1}/{size}"}
+            self._send(206, body[start:], content_type, headers)
+            return
+        self._send(200, body, content_type)
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if content_type == "application/zip":
+            self.send_header("Accept-Ranges", "bytes")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], fake: FakeIMGWServer):
+        super().__init__(address, _Handler)
+        self.fake = fake
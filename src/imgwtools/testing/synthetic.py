@@ -0,0 +1,200 @@
+"""
+Synthetic IMGW hydrological archives and station lists.
+
+Generates CSV/ZIP files in the layout published on
+danepubliczne.imgw.pl (CP1250, semicolon separated, IMGW missing-value
+markers), so parsers, the cache import and the API can be exercised
+offline at realistic sizes. Used by the fake IMGW server and the
+benchmark suite.
+"""
+
+from __future__ import annotations
+
+import calendar
+import io
+import random
+import re
+import zipfile
+
+# Roughly the number of stations in current IMGW daily files
+DEFAULT_STATIONS = 850
+
+# Share of values replaced with IMGW missing-data markers
+MISSING_SHARE = 0.03
+
+_RIVERS = [
+    "Wisła", "Odra", "Warta", "Nysa Kłodzka", "Bóbr", "Narew", "Bug", "San"
+]
+_NAMES = [
+    "KŁODZKO", "ŁÓDŹ", "GORZÓW", "ZŁOTORYJA", "ŚREM", "PUŁTUSK", "NOWY SĄCZ"
+]
+
+HYDRO_TO_CALENDAR_MONTH = {m: (m + 9) % 12 + 1 for m in range(1, 13)}
+
+
+def station_codes(n_stations: int = DEFAULT_STATIONS) -> list[str]:
+    """Station codes in the IMGW 9-digit format."""
+    return [f"{149 + i % 6}{i:06d}" for i in range(n_stations)]
+
+
+def station_name(i: int) -> str:
+    """Name of the i-th synthetic station."""
+    return f"{_NAMES[i % len(_NAMES)]} {i}"
+
+
+def station_river(i: int) -> str:
+    """River of the i-th synthetic station."""
+    return _RIVERS[i % len(_RIVERS)]
+
+
+def station_location(i: int) -> tuple[float, float]:
+    """(latitude, longitude) of the i-th synthetic station, inside Poland."""
+    rng = random.Random(i)
+    return round(rng.uniform(49.5, 54.2), 4), round(rng.uniform(15.0, 23.5), 4)
+
+
+def _station_columns(i: int, code: str) -> str:
+    river = f"{station_river(i)} ({i % 40 + 1})"
+    return f'{code};"{station_name(i)}";"{river}"'
+
+
+def station_list_csv(n_stations: int = DEFAULT_STATIONS) -> bytes:
+    """Hydro station list CSV (lista_stacji_hydro.csv): code, name, river."""
+    lines = [
+        f'{code},"{station_name(i)}","{station_river(i)} ({i % 40 + 1})"'
+        for i, code in enumerate(station_codes(n_stations))
+    ]
+    return ("\r\n".join(lines) + "\r\n").encode("cp1250")
+
+
+def _days_in_hydro_month(hydro_year: int, hydro_month: int) -> int:
+    calendar_month = HYDRO_TO_CALENDAR_MONTH[hydro_month]
+    year = hydro_year - 1 if hydro_month <= 2 else hydro_year
+    return calendar.monthrange(year, calendar_month)[1]
+
+
+def daily_csv(
+    hydro_year: int,
+    hydro_months: list[int] | None = None,
+    n_stations: int = DEFAULT_STATIONS,
+    seed: int = 0,
+) -> bytes:
+    """
+    Daily data CSV (codz_*), 10 columns per row.
+
+    Args:
+        hydro_year: Hydrological year.
+        hydro_months: Months of the hydrological year (default: all 12).
+        n_stations: Number of stations.
+        seed: Random seed (output is deterministic for a seed).
+
+    Returns:
+        CSV content encoded in CP1250.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for i, code in enumerate(station_codes(n_stations)):
+        prefix = _station_columns(i, code)
+        level = rng.uniform(50, 400)
+        for month in hydro_months or range(1, 13):
+            calendar_month = HYDRO_TO_CALENDAR_MONTH[month]
+            for day in range(1, _days_in_hydro_month(hydro_year, month) + 1):
+                level = max(0.0, level + rng.gauss(0, 5))
+                flow = level * 0.08
+                temp = rng.uniform(0, 22)
+                h = "9999" if rng.random() < MISSING_SHARE else f"{level:.0f}"
+                q = "99999.999" if rng.random() < MISSING_SHARE else f"{flow:.3f}"
+                t = "99.9" if rng.random() < 0.3 else f"{temp:.1f}"
+                lines.append(
+                    f"{prefix};{hydro_year};{month:2d};{day:2d};{h};{q};{t};"
+                    f"{calendar_month:2d}"
+                )
+    return ("\r\n".join(lines) + "\r\n").encode("cp1250")
+
+
+def monthly_csv(
+    hydro_year: int,
+    n_stations: int = DEFAULT_STATIONS,
+    seed: int = 0,
+) -> bytes:
+    """Monthly data CSV (mies_*): min/mean/max per station and month."""
+    rng = random.Random(seed)
+    lines = []
+    for i, code in enumerate(station_codes(n_stations)):
+        prefix = _station_columns(i, code)
+        for month in range(1, 13):
+            base = rng.uniform(50, 400)
+            for extremum, factor in ((1, 0.8), (2, 1.0), (3, 1.3)):
+                lines.append(
+                    f"{prefix};{hydro_year};{month:2d};{extremum};"
+                    f"{base * factor:.0f};{base * factor * 0.08:.3f};"
+                    f"{rng.uniform(0, 22):.1f};{HYDRO_TO_CALENDAR_MONTH[month]:2d}"
+                )
+    return ("\r\n".join(lines) + "\r\n").encode("cp1250")
+
+
+def semi_annual_csv(
+    hydro_year: int,
+    param: str = "H",
+    n_stations: int = DEFAULT_STATIONS,
+    seed: int = 0,
+) -> bytes:
+    """Semi-annual and annual data CSV (polr_*), 18 columns per row."""
+    rng = random.Random(seed)
+    lines = []
+    for i, code in enumerate(station_codes(n_stations)):
+        prefix = _station_columns(i, code)
+        for period in (13, 14, 15):
+            for extremum in (1, 2, 3):
+                value = rng.uniform(50, 400) if param == "H" else rng.uniform(0, 50)
+                if extremum == 2:
+                    dates = ";" * 9
+                else:
+                    month, day = rng.randint(1, 12), rng.randint(1, 28)
+                    when = f"{hydro_year};{month};{day};6;0"
+                    dates = f"{when};{when}"
+                lines.append(
+                    f'{prefix};{hydro_year};{period};"{param}";{extremum};'
+                    f"{value:.2f};{dates}"
+                )
+    return ("\r\n".join(lines) + "\r\n").encode("cp1250")
+
+
+def to_zip(csv_name: str, content: bytes) -> bytes:
+    """Pack one CSV file into a ZIP archive (deflated, like IMGW)."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(csv_name, content)
+    return buffer.getvalue()
+
+
+_FILENAME = re.compile(
+    r"^(?:codz_(?P<dyear>\d{4})(?:_(?P<dmonth>\d{2}))?"
+    r"|mies_(?P<myear>\d{4})"
+    r"|polr_(?P<param>[HQT])_(?P<pyear>\d{4}))\.zip$"
+)
+
+
+def archive_for(filename: str, n_stations: int = DEFAULT_STATIONS) -> bytes | None:
+    """
+    Build the ZIP archive IMGW publishes under a given file name.
+
+    Supports codz_YYYY_MM.zip (one month), codz_YYYY.zip (whole year,
+    layout used since 2023), mies_YYYY.zip and polr_P_YYYY.zip.
+
+    Returns:
+        ZIP content, or None for unknown names.
+    """
+    match = _FILENAME.match(filename)
+    if match is None:
+        return None
+    stem = filename[:-4]
+    if match["dyear"]:
+        year = int(match["dyear"])
+        months = [int(match["dmonth"])] if match["dmonth"] else None
+        content = daily_csv(year, months, n_stations, seed=year)
+    elif match["myear"]:
+        content = monthly_csv(int(match["myear"]), n_stations)
+    else:
+        content = semi_annual_csv(int(match["pyear"]), match["param"], n_stations)
+    return to_zip(f"{stem}.csv", content)
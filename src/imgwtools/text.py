@@ -0,0 +1,48 @@
+"""
+Text normalisation helpers for station search.
+
+Station and river names from IMGW are mixed-case Polish text
+("KŁODZKO", "Nysa Kłodzka"). Search should match regardless of case
+and diacritics, so both the indexed names and the query are folded to
+plain lowercase ASCII-like text.
+"""
+
+import re
+import unicodedata
+
+# Letters without a Unicode decomposition to a base letter
+_EXTRA_FOLDS = str.maketrans({"ł": "l", "Ł": "l", "đ": "d", "Đ": "d", "ø": "o", "Ø": "o"})
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold_text(text: str | None) -> str:
+    """
+    Fold text for case- and diacritic-insensitive matching.
+
+    Args:
+        text: Input text (None is treated as empty).
+
+    Returns:
+        Lowercase text with diacritics removed and whitespace collapsed.
+
+    Example:
+        >>> fold_text("Nysa  Kłodzka")
+        'nysa klodzka'
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.translate(_EXTRA_FOLDS))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
+
+
+def tokenize(text: str | None) -> list[str]:
+    """
+    Split folded text into word tokens.
+
+    Example:
+        >>> tokenize("Warszawa-Bulwary (Wisła)")
+        ['warszawa', 'bulwary', 'wisla']
+    """
+    return _TOKEN_RE.findall(fold_text(text))
@@ -0,0 +1,238 @@
+"""
+Client-side rate limiting of requests to IMGW hosts.
+
+Every request sent by the transports of imgwtools.resilience (fetch
+functions, cache ingestion, bulk downloads, API proxy routes) first
+takes a token from the bucket of its host: ``rate`` requests per second
+with bursts of up to ``burst`` requests.
+
+Requests run in one of two lanes (see request_lane()):
+
+- "interactive" (default): API requests and direct library calls,
+- "background": backfills, bulk downloads and periodic refreshes.
+
+Background requests leave ``reserve`` tokens in the bucket, so
+interactive requests go out immediately while a backfill saturates the
+budget.
+
+With ``store_path`` the buckets are kept in a small SQLite file, so all
+processes on the machine (API workers, CLI backfills) share one budget
+per host.
+
+Example:
+    >>> from imgwtools.throttle import (
+    ...     UpstreamThrottle, configure_throttle, request_lane)
+    >>> configure_throttle(UpstreamThrottle(rate=2.0, burst=5, reserve=2))
+    >>> with request_lane("background"):
+    ...     download_archives(plan, "./data")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Literal, TypeVar
+
+from imgwtools.metrics import UPSTREAM_THROTTLE_SECONDS
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+Lane = Literal["interactive", "background"]
+
+LANES: tuple[Lane, ...] = ("interactive", "background")
+
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+DEFAULT_RESERVE = 5
+
+_lane: ContextVar[Lane] = ContextVar("imgw_request_lane", default="interactive")
+
+
+@contextmanager
+def request_lane(lane: Lane) -> Iterator[None]:
+    """
+    Send IMGW requests made inside the block in the given lane.
+
+    The lane is a context variable, so asyncio tasks created inside the
+    block inherit it.
+    """
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane: {lane}. Use one of {LANES}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def in_lane(lane: Lane) -> Callable[[F], F]:
+    """Decorator: run a function (sync or async) with request_lane(lane)."""
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with request_lane(lane):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with request_lane(lane):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def current_lane() -> Lane:
+    """Lane of IMGW requests made in the current context."""
+    return _lane.get()
+
+
+class UpstreamThrottle:
+    """
+    Token buckets of upstream hosts.
+
+    Args:
+        rate: Requests per second per host (0 = no limit).
+        burst: Bucket size (requests sent at once after a quiet period).
+        reserve: Tokens background requests leave for interactive ones
+            (at most burst - 1).
+        store_path: SQLite file shared by processes (None = this process).
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        reserve: int = DEFAULT_RESERVE,
+        store_path: str | Path | None = None,
+    ):
+        if burst < 1 or reserve < 0:
+            raise ValueError("burst must be >= 1 and reserve >= 0")
+        self.rate = rate
+        self.burst = burst
+        self.reserve = min(reserve, burst - 1)
+        self.store_path = Path(store_path) if store_path else None
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        if self.store_path:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS buckets (
+                        host TEXT PRIMARY KEY,
+                        tokens REAL NOT NULL,
+                        updated REAL NOT NULL
+                    )
+                    """
+                )
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def try_acquire(self, host: str, lane: Lane | None = None) -> float:
+        """
+        Take a token for a request to host.
+
+        Returns:
+            0 if the request may be sent now, otherwise seconds to wait
+            before trying again (no token is taken).
+        """
+        if not self.enabled:
+            return 0.0
+        lane = lane or current_lane()
+        need = 1.0 if lane == "interactive" else 1.0 + self.reserve
+        if self.store_path:
+            return self._acquire_shared(host, need)
+        with self._lock:
+            state, wait = self._take(self._buckets.get(host), need)
+            self._buckets[host] = state
+            return wait
+
+    def wait(self, host: str) -> None:
+        """Block until a request to host may be sent."""
+        lane = current_lane()
+        waited = 0.0
+        while (delay := self.try_acquire(host, lane)) > 0:
+            time.sleep(delay)
+            waited += delay
+        if waited:
+            UPSTREAM_THROTTLE_SECONDS.inc(waited, lane=lane)
+
+    async def wait_async(self, host: str) -> None:
+        """Wait (without blocking the event loop) until host may be queried."""
+        lane = current_lane()
+        waited = 0.0
+        while (delay := await self._try_acquire_async(host, lane)) > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+        if waited:
+            UPSTREAM_THROTTLE_SECONDS.inc(waited, lane=lane)
+
+    async def _try_acquire_async(self, host: str, lane: Lane) -> float:
+        # The shared store may block on the SQLite lock of other processes
+        if self.store_path and self.enabled:
+            return await asyncio.to_thread(self.try_acquire, host, lane)
+        return self.try_acquire(host, lane)
+
+    def _take(
+        self, state: tuple[float, float] | None, need: float
+    ) -> tuple[tuple[float, float], float]:
+        """New bucket state and wait time from the previous state."""
+        now = time.time()
+        tokens, updated = state or (float(self.burst), now)
+        tokens = min(float(self.burst), tokens + max(now - updated, 0.0) * self.rate)
+        if tokens >= need:
+            return (tokens - 1, now), 0.0
+        return (tokens, now), (need - tokens) / self.rate
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.store_path, timeout=10.0, isolation_level=None)
+
+    def _acquire_shared(self, host: str, need: float) -> float:
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE host = ?", (host,)
+                ).fetchone()
+                (tokens, updated), wait = self._take(row, need)
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (host, tokens, updated) "
+                    "VALUES (?, ?, ?)",
+                    (host, tokens, updated),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return wait
+
+
+_throttle = UpstreamThrottle()
+
+
+def get_throttle() -> UpstreamThrottle:
+    """Get the throttle used by IMGW clients."""
+    return _throttle
+
+
+def configure_throttle(throttle: UpstreamThrottle) -> None:
+    """Replace the throttle used by IMGW clients."""
+    global _throttle
+    _throttle = throttle
@@ -10,11 +10,8 @@ Example:
     >>> print(url.url)
 """
 
+from imgwtools.core import url_builder as _url_builder
 from imgwtools.core.url_builder import (
-    # Constants
-    IMGW_API_URL,
-    IMGW_PMAXTP_URL,
-    IMGW_PUBLIC_DATA_URL,
     # Enums
     DataType,
     # Types
@@ -26,17 +23,43 @@ from imgwtools.core.url_builder import (
     PMaXTPMethod,
     # Functions
     build_api_url,
+    build_hydro_map_url,
     build_hydro_url,
     build_meteo_url,
     build_pmaxtp_url,
+    build_station_list_url,
+    get_api_url,
     get_available_years,
+    get_hydro_back_url,
+    get_pmaxtp_url,
+    get_public_data_url,
+    set_base_url,
+)
+
+# Constants (resolved on access, so they follow set_base_url)
+_URL_CONSTANTS = frozenset(
+    {"IMGW_PUBLIC_DATA_URL", "IMGW_API_URL", "IMGW_PMAXTP_URL", "IMGW_HYDRO_BACK_URL"}
 )
 
+# Served by __getattr__ (annotated only, so they are never bound here)
+IMGW_PUBLIC_DATA_URL: str
+IMGW_API_URL: str
+IMGW_PMAXTP_URL: str
+IMGW_HYDRO_BACK_URL: str
+
+
+def __getattr__(name: str) -> str:
+    if name in _URL_CONSTANTS:
+        return getattr(_url_builder, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     # Constants
     "IMGW_PUBLIC_DATA_URL",
     "IMGW_API_URL",
     "IMGW_PMAXTP_URL",
+    "IMGW_HYDRO_BACK_URL",
     # Enums
     "DataType",
     "HydroInterval",
@@ -51,5 +74,12 @@ __all__ = [
     "build_meteo_url",
     "build_pmaxtp_url",
     "build_api_url",
+    "build_station_list_url",
+    "build_hydro_map_url",
     "get_available_years",
+    "get_public_data_url",
+    "get_api_url",
+    "get_pmaxtp_url",
+    "get_hydro_back_url",
+    "set_base_url",
 ]
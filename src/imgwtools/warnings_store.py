@@ -0,0 +1,544 @@
+"""
+Cached store of active IMGW warnings indexed by region.
+
+``fetch_warnings`` returns the whole warnings list on every call. The
+store keeps the current hydro and meteo warnings indexed by TERYT code
+(voivodeship ``02``, powiat ``0201``, gmina ``0201011``) with parsed
+validity intervals, so checking every municipality is a dictionary
+lookup per code instead of a scan of all warnings.
+
+Each change of the warning set gets a new token; ``changes_since``
+returns only warnings added or removed after a token.
+
+Example:
+    >>> from imgwtools.warnings_store import get_warnings_store
+    >>> store = get_warnings_store()
+    >>> store.refresh()
+    >>> for warning in store.active_for_region("0201011"):
+    ...     print(warning.level, warning.description)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from imgwtools.exceptions import IMGWDataError, IMGWError
+from imgwtools.fetch import DEFAULT_TIMEOUT, fetch_warnings, fetch_warnings_async
+from imgwtools.models import WarningData, parse_local_time
+from imgwtools.text import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Default time after which a refresh is due [s]
+DEFAULT_TTL_SECONDS = 60
+
+# Number of past versions kept for change tokens
+DEFAULT_HISTORY = 50
+
+# Voivodeship TERYT codes (hydro warnings name voivodeships, not codes)
+VOIVODESHIP_CODES = {
+    "dolnoslaskie": "02",
+    "kujawsko-pomorskie": "04",
+    "lubelskie": "06",
+    "lubuskie": "08",
+    "lodzkie": "10",
+    "malopolskie": "12",
+    "mazowieckie": "14",
+    "opolskie": "16",
+    "podkarpackie": "18",
+    "podlaskie": "20",
+    "pomorskie": "22",
+    "slaskie": "24",
+    "swietokrzyskie": "26",
+    "warminsko-mazurskie": "28",
+    "wielkopolskie": "30",
+    "zachodniopomorskie": "32",
+}
+
+# Voivodeship names as token tuples, longest first ("kujawsko pomorskie"
+# must win over "pomorskie")
+_VOIVODESHIP_TOKENS = sorted(
+    ((tuple(tokenize(name)), code) for name, code in VOIVODESHIP_CODES.items()),
+    key=lambda item: -len(item[0]),
+)
+
+# TERYT prefix lengths: voivodeship, powiat
+_PREFIX_LENGTHS = (2, 4)
+
+RegionLocator = Callable[[float, float], Iterable[str]]
+
+
+def region_codes(warning: WarningData) -> tuple[str, ...]:
+    """
+    TERYT codes covered by a warning.
+
+    Uses the warning's TERYT list, or voivodeship names found in its
+    region text (hydro warnings).
+    """
+    if warning.teryt:
+        return tuple(dict.fromkeys(warning.teryt))
+
+    tokens = tokenize(warning.region)
+    codes = []
+    i = 0
+    while i < len(tokens):
+        for name, code in _VOIVODESHIP_TOKENS:
+            if tuple(tokens[i : i + len(name)]) == name:
+                codes.append(code)
+                i += len(name)
+                break
+        else:
+            i += 1
+    return tuple(dict.fromkeys(codes))
+
+
+@dataclass(frozen=True)
+class _Entry:
+    key: str
+    warning: WarningData
+    codes: tuple[str, ...]
+    start: float
+    end: float
+
+    def is_active(self, at: float) -> bool:
+        return self.start <= at < self.end
+
+
+@dataclass(frozen=True)
+class WarningChanges:
+    """
+    Warnings changed since a token.
+
+    Attributes:
+        token: Token for the next ``changes_since`` call.
+        added: New or modified warnings (all published ones if ``full``).
+        removed: Keys ("source:id") of warnings no longer published.
+        full: True if the token was unknown and ``added`` is complete.
+    """
+
+    token: str
+    added: list[WarningData]
+    removed: list[str]
+    full: bool
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Immutable warning set with region index."""
+
+    version: int
+    entries: dict[str, _Entry] = field(default_factory=dict)
+    by_code: dict[str, list[_Entry]] = field(default_factory=dict)
+    codes: list[str] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, entries: dict[str, _Entry], version: int) -> _Snapshot:
+        by_code: dict[str, list[_Entry]] = {}
+        for entry in entries.values():
+            for code in entry.codes:
+                by_code.setdefault(code, []).append(entry)
+        return cls(version, entries, by_code, sorted(by_code))
+
+
+def _make_entry(key: str, warning: WarningData) -> _Entry:
+    start = parse_local_time(warning.valid_from)
+    end = parse_local_time(warning.valid_to)
+    return _Entry(
+        key=key,
+        warning=warning,
+        codes=region_codes(warning),
+        start=float("-inf") if start is None else start,
+        end=float("inf") if end is None else end,
+    )
+
+
+def _timestamp(at: datetime | float | None) -> float:
+    if at is None:
+        return time.time()
+    if isinstance(at, datetime):
+        return at.timestamp()
+    return float(at)
+
+
+class WarningsStore:
+    """
+    Active warnings indexed by TERYT code and validity interval.
+
+    Queries only read the current snapshot; call :meth:`refresh` (or run
+    :meth:`run_refresh_loop`) to keep it up to date.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        *,
+        locator: RegionLocator | None = None,
+        history: int = DEFAULT_HISTORY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        """
+        Create an empty store.
+
+        Args:
+            ttl_seconds: Age after which ``is_stale`` is True.
+            locator: Maps (lat, lon) to TERYT codes, for point queries.
+            history: Number of past versions kept for change tokens.
+            timeout: Request timeout in seconds.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.locator = locator
+        self.history = history
+        self.timeout = timeout
+        self.last_error: str | None = None
+        self._data = _Snapshot(version=0)
+        self._raw: dict[str, dict[str, WarningData]] = {}
+        self._versions: OrderedDict[int, dict[str, WarningData]] = OrderedDict()
+        self._epoch = secrets.token_hex(4)
+        self._refreshed_at: float | None = None
+        self._lock = threading.Lock()
+
+    # --- Loading ---
+
+    @property
+    def version(self) -> int:
+        return self._data.version
+
+    @property
+    def token(self) -> str:
+        """Opaque token of the current warning set."""
+        return f"{self._epoch}.{self._data.version}"
+
+    @property
+    def is_stale(self) -> bool:
+        if self._refreshed_at is None:
+            return True
+        return time.monotonic() - self._refreshed_at >= self.ttl_seconds
+
+    def update(self, warnings: Iterable[WarningData], source: str) -> bool:
+        """
+        Replace all warnings of one source ("hydro" or "meteo").
+
+        Args:
+            warnings: Complete current warning list of the source.
+            source: Source name; warnings are keyed "source:id".
+
+        Returns:
+            True if the warning set changed.
+        """
+        with self._lock:
+            current = {f"{source}:{w.id}": w for w in warnings}
+            if self._raw.get(source) == current:
+                return False
+            self._raw[source] = current
+            merged = {
+                key: w for items in self._raw.values() for key, w in items.items()
+            }
+
+            # Reuse parsed entries of unchanged warnings
+            old = self._data.entries
+            entries = {
+                key: (
+                    old[key]
+                    if key in old and old[key].warning == w
+                    else _make_entry(key, w)
+                )
+                for key, w in merged.items()
+            }
+            version = self._data.version + 1
+            self._versions[version] = merged
+            while len(self._versions) > self.history:
+                self._versions.popitem(last=False)
+            self._data = _Snapshot.build(entries, version)
+            return True
+
+    def refresh(self) -> bool:
+        """
+        Fetch hydro and meteo warnings from IMGW.
+
+        Returns:
+            True if the warning set changed. Failed sources keep their
+            previous warnings; the error is stored in ``last_error``.
+        """
+        results = {}
+        for source in ("hydro", "meteo"):
+            try:
+                results[source] = fetch_warnings(source, timeout=self.timeout)
+            except IMGWError as e:
+                results[source] = e
+        return self._apply(results)
+
+    async def refresh_async(self) -> bool:
+        """
+        Async version of :meth:`refresh`.
+
+        Unexpected errors of a source (not IMGWError) are logged and
+        handled like IMGW errors.
+        """
+        hydro, meteo = await asyncio.gather(
+            fetch_warnings_async("hydro", timeout=self.timeout),
+            fetch_warnings_async("meteo", timeout=self.timeout),
+            return_exceptions=True,
+        )
+        for source, result in (("hydro", hydro), ("meteo", meteo)):
+            if not isinstance(result, BaseException) or isinstance(result, IMGWError):
+                continue
+            if not isinstance(result, Exception):
+                raise result  # cancellation
+            logger.error("Fetching %s warnings failed", source, exc_info=result)
+        return self._apply({"hydro": hydro, "meteo": meteo})
+
+    async def run_refresh_loop(self) -> None:
+        """
+        Refresh every ``ttl_seconds`` until cancelled.
+
+        Errors keep the previous warnings; they are stored in
+        ``last_error`` and the loop keeps running.
+        """
+        if self.ttl_seconds <= 0:
+            return
+        while True:
+            try:
+                await self.refresh_async()
+            except Exception as e:
+                logger.exception("Warnings refresh failed")
+                self.last_error = str(e) or type(e).__name__
+            await asyncio.sleep(self.ttl_seconds)
+
+    def _apply(self, results: Mapping[str, list[WarningData] | BaseException]) -> bool:
+        self._refreshed_at = time.monotonic()
+        errors = [
+            f"{source}: {result}"
+            for source, result in results.items()
+            if isinstance(result, BaseException)
+        ]
+        self.last_error = "; ".join(errors) or None
+        changed = False
+        for source, result in results.items():
+            if not isinstance(result, BaseException):
+                changed |= self.update(result, source)
+        return changed
+
+    # --- Queries ---
+
+    def active(self, at: datetime | float | None = None) -> list[WarningData]:
+        """All warnings valid at a time (default now)."""
+        ts = _timestamp(at)
+        return [e.warning for e in self._data.entries.values() if e.is_active(ts)]
+
+    def active_for_region(
+        self, code: str, at: datetime | float | None = None
+    ) -> list[WarningData]:
+        """
+        Warnings valid at a time for a TERYT region.
+
+        A warning matches if it covers the region, a unit containing it
+        (its voivodeship or powiat), or a unit inside it.
+
+        Args:
+            code: TERYT code (2-digit voivodeship, 4-digit powiat or
+                7-digit gmina).
+            at: Time as datetime or Unix seconds (default now).
+
+        Returns:
+            Matching warnings, each at most once.
+        """
+        return [e.warning for e in self._match(self._data, code, _timestamp(at))]
+
+    def active_for_regions(
+        self, codes: Iterable[str], at: datetime | float | None = None
+    ) -> dict[str, list[WarningData]]:
+        """
+        Batch version of :meth:`active_for_region`.
+
+        Returns:
+            Mapping of every code with at least one active warning.
+        """
+        snapshot = self._data
+        ts = _timestamp(at)
+        result = {}
+        for code in codes:
+            entries = self._match(snapshot, code, ts)
+            if entries:
+                result[code] = [e.warning for e in entries]
+        return result
+
+    def active_at_point(
+        self,
+        latitude: float,
+        longitude: float,
+        at: datetime | float | None = None,
+    ) -> list[WarningData]:
+        """
+        Warnings valid at a time for the region containing a point.
+
+        Raises:
+            IMGWDataError: If no region locator is configured.
+        """
+        if self.locator is None:
+            raise IMGWDataError(
+                "Point queries need region boundaries (see RegionLocator)"
+            )
+        snapshot = self._data
+        ts = _timestamp(at)
+        seen: dict[str, _Entry] = {}
+        for code in self.locator(latitude, longitude):
+            for entry in self._match(snapshot, code, ts):
+                seen.setdefault(entry.key, entry)
+        return [e.warning for e in seen.values()]
+
+    @staticmethod
+    def _match(snapshot: _Snapshot, code: str, ts: float) -> list[_Entry]:
+        by_code = snapshot.by_code
+        candidates: list[_Entry] = []
+        # Warnings for units containing the region
+        for length in _PREFIX_LENGTHS:
+            if len(code) > length:
+                candidates.extend(by_code.get(code[:length], ()))
+        # Warnings for the region itself and units inside it
+        codes = snapshot.codes
+        for i in range(bisect.bisect_left(codes, code), len(codes)):
+            if not codes[i].startswith(code):
+                break
+            candidates.extend(by_code[codes[i]])
+
+        seen: dict[str, _Entry] = {}
+        for entry in candidates:
+            if entry.is_active(ts):
+                seen.setdefault(entry.key, entry)
+        return list(seen.values())
+
+    def changes_since(self, token: str | None) -> WarningChanges:
+        """
+        Warnings added, modified or removed since a token.
+
+        Args:
+            token: Token from a previous call (or ``self.token``); None or
+                an unknown token returns all current warnings.
+
+        Returns:
+            WarningChanges with the token to use next time.
+        """
+        current_version = self._data.version
+        current = self._versions.get(current_version, {})
+        previous = None
+        if token:
+            epoch, _, version = token.partition(".")
+            if epoch == self._epoch and version.isdigit():
+                previous = self._versions.get(int(version))
+
+        if previous is None:
+            return WarningChanges(self.token, list(current.values()), [], full=True)
+        return WarningChanges(
+            token=self.token,
+            added=[w for key, w in current.items() if previous.get(key) != w],
+            removed=[key for key in previous if key not in current],
+            full=False,
+        )
+
+
+class PolygonRegionLocator:
+    """
+    Point-in-polygon lookup of TERYT regions.
+
+    Built from GeoJSON administrative boundaries in WGS84 (e.g. PRG
+    powiaty exported as GeoJSON). Bounding boxes are checked first, so
+    only a few polygons are tested per point.
+    """
+
+    def __init__(self, regions: Mapping[str, Sequence[Sequence[tuple[float, float]]]]):
+        """
+        Args:
+            regions: TERYT code -> list of rings as (lon, lat) tuples.
+        """
+        self._regions = []
+        for code, rings in regions.items():
+            lons = [p[0] for ring in rings for p in ring]
+            lats = [p[1] for ring in rings for p in ring]
+            if lons:
+                bbox = (min(lons), min(lats), max(lons), max(lats))
+                self._regions.append((code, bbox, [list(r) for r in rings]))
+
+    @classmethod
+    def from_geojson(
+        cls, source: str | Path | dict, code_property: str = "JPT_KOD_JE"
+    ) -> PolygonRegionLocator:
+        """
+        Load regions from a GeoJSON FeatureCollection.
+
+        Args:
+            source: Path to a .geojson file or a parsed dict.
+            code_property: Feature property holding the TERYT code.
+        """
+        if not isinstance(source, dict):
+            source = json.loads(Path(source).read_text(encoding="utf-8"))
+        regions: dict[str, list] = {}
+        for feature in source.get("features", []):
+            code = str((feature.get("properties") or {}).get(code_property, ""))
+            geometry = feature.get("geometry") or {}
+            polygons = geometry.get("coordinates", [])
+            if geometry.get("type") == "Polygon":
+                polygons = [polygons]
+            elif geometry.get("type") != "MultiPolygon":
+                continue
+            if code:
+                rings = regions.setdefault(code, [])
+                for polygon in polygons:
+                    rings.extend([tuple(p[:2]) for p in ring] for ring in polygon)
+        return cls(regions)
+
+    def __call__(self, latitude: float, longitude: float) -> list[str]:
+        return [
+            code
+            for code, (x0, y0, x1, y1), rings in self._regions
+            if x0 <= longitude <= x1
+            and y0 <= latitude <= y1
+            and _inside(rings, longitude, latitude)
+        ]
+
+
+def _inside(rings: list[list[tuple[float, float]]], x: float, y: float) -> bool:
+    """Even-odd ray casting over all rings (holes cancel out)."""
+    inside = False
+    for ring in rings:
+        j = len(ring) - 1
+        for i in range(len(ring)):
+            xi, yi = ring[i]
+            xj, yj = ring[j]
+            if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                inside = not inside
+            j = i
+    return inside
+
+
+# Singleton store instance
+_warnings_store: WarningsStore | None = None
+
+
+def get_warnings_store() -> WarningsStore:
+    """
+    Get singleton warnings store.
+
+    Point queries are enabled if settings.regions_geojson_path exists.
+    """
+    global _warnings_store
+    if _warnings_store is None:
+        from imgwtools.config import settings
+
+        locator = None
+        if settings.regions_geojson_path.exists():
+            locator = PolygonRegionLocator.from_geojson(settings.regions_geojson_path)
+        _warnings_store = WarningsStore(
+            ttl_seconds=settings.warnings_refresh_interval, locator=locator
+        )
+    return _warnings_store
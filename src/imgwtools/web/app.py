@@ -5,11 +5,14 @@ This module provides a web interface for generating download URLs
 and browsing IMGW data.
 """
 
+import asyncio
+import json
+from functools import lru_cache
 from pathlib import Path
 
 import httpx
 from fastapi import APIRouter, Form, Query, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 
 from imgwtools.core.url_builder import (
@@ -22,6 +25,11 @@ from imgwtools.core.url_builder import (
     build_meteo_url,
     build_pmaxtp_url,
 )
+from imgwtools.exceptions import IMGWError
+from imgwtools.metrics import upstream_call
+from imgwtools.registry import get_station_registry
+from imgwtools.resilience import async_retry_transport
+from imgwtools.web.map_payload import Payload, get_map_cache
 
 # Templates directory
 TEMPLATES_DIR = Path(__file__).parent / "templates"
@@ -266,9 +274,10 @@ async def generate_pmaxtp_url(
         url = build_pmaxtp_url(pmaxtp_method, latitude, longitude)
 
         # Fetch data from IMGW
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=30.0)
-            response.raise_for_status()
+        async with httpx.AsyncClient(transport=async_retry_transport()) as client:
+            with upstream_call("pmaxtp"):
+                response = await client.get(url, timeout=30.0)
+                response.raise_for_status()
             data = response.json()
 
         return templates.TemplateResponse(
@@ -317,133 +326,72 @@ async def stations_page(request: Request):
 async def hydro_stations_partial(
     request: Request,
     search: str | None = Query(None),
-    limit: int = Query(50),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
 ):
     """
     Hydrological stations list (HTMX partial).
 
-    Fetches station data from IMGW CSV file (CP1250 encoding).
-    CSV format: ID, name, river (hydro_id), code
+    Ranked search over the shared station registry (no IMGW request).
     Links to station pages: https://hydro.imgw.pl/#/station/hydro/{id}
     """
-    csv_url = "https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne/dane_hydrologiczne/lista_stacji_hydro.csv"
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(csv_url, timeout=30.0)
-            response.raise_for_status()
-            content = response.content.decode("cp1250")
-
-        import csv
-        import io
-        import re
-
-        stations = []
-        reader = csv.reader(io.StringIO(content))
-        for row in reader:
-            if len(row) >= 3:
-                river_raw = row[2].strip('"')
-                # Extract river name and hydro ID from "Odra (1)" format
-                match = re.match(r'^(.+?)\s*\((\d+)\)$', river_raw)
-                if match:
-                    river_name = match.group(1).strip()
-                    river_id = match.group(2)
-                else:
-                    river_name = river_raw
-                    river_id = None
-
-                station = {
-                    "id": row[0].strip().strip('"'),
-                    "name": row[1].strip('"'),
-                    "river": river_name,
-                    "river_id": river_id,
-                }
-                if search:
-                    if search.lower() in station["name"].lower() or search.lower() in station["river"].lower():
-                        stations.append(station)
-                else:
-                    stations.append(station)
-
-        stations = stations[:limit]
-
-        return templates.TemplateResponse(
-            "partials/station_table.html",
-            {
-                "request": request,
-                "stations": stations,
-                "data_type": "hydro",
-                "count": len(stations),
-            },
-        )
+    page = get_station_registry().hydro_search.search(search, limit, offset)
+    stations = [
+        {
+            "id": s.station_id,
+            "name": s.name,
+            "river": s.river,
+            "river_id": s.river_id,
+        }
+        for s in page.stations
+    ]
 
-    except httpx.HTTPError as e:
-        return templates.TemplateResponse(
-            "partials/error.html",
-            {
-                "request": request,
-                "error": f"Błąd pobierania stacji: {e}",
-            },
-        )
+    return templates.TemplateResponse(
+        "partials/station_table.html",
+        {
+            "request": request,
+            "stations": stations,
+            "data_type": "hydro",
+            "count": len(stations),
+            "total": page.total,
+            "search": search or "",
+            "limit": limit,
+            "offset": offset,
+            "has_more": page.has_more,
+        },
+    )
 
 
 @router.get("/stations/meteo", response_class=HTMLResponse)
 async def meteo_stations_partial(
     request: Request,
     search: str | None = Query(None),
-    limit: int = Query(50),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
 ):
     """
     Meteorological stations list (HTMX partial).
 
-    Fetches station data from IMGW CSV file (CP1250 encoding).
-    CSV format: ID, name, code
+    Ranked search over the shared station registry (no IMGW request).
     Links to station pages: https://hydro.imgw.pl/#/station/meteo/{id}
     """
-    csv_url = "https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne/dane_meteorologiczne/wykaz_stacji.csv"
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(csv_url, timeout=30.0)
-            response.raise_for_status()
-            content = response.content.decode("cp1250")
-
-        import csv
-        import io
-
-        stations = []
-        reader = csv.reader(io.StringIO(content))
-        for row in reader:
-            if len(row) >= 2:
-                station = {
-                    "id": row[0].strip('"'),
-                    "name": row[1].strip('"'),
-                }
-                if search:
-                    if search.lower() in station["name"].lower():
-                        stations.append(station)
-                else:
-                    stations.append(station)
-
-        stations = stations[:limit]
+    page = get_station_registry().meteo_search.search(search, limit, offset)
+    stations = [{"id": s.station_id, "name": s.name} for s in page.stations]
 
-        return templates.TemplateResponse(
-            "partials/station_table.html",
-            {
-                "request": request,
-                "stations": stations,
-                "data_type": "meteo",
-                "count": len(stations),
-            },
-        )
-
-    except httpx.HTTPError as e:
-        return templates.TemplateResponse(
-            "partials/error.html",
-            {
-                "request": request,
-                "error": f"Błąd pobierania stacji: {e}",
-            },
-        )
+    return templates.TemplateResponse(
+        "partials/station_table.html",
+        {
+            "request": request,
+            "stations": stations,
+            "data_type": "meteo",
+            "count": len(stations),
+            "total": page.total,
+            "search": search or "",
+            "limit": limit,
+            "offset": offset,
+            "has_more": page.has_more,
+        },
+    )
 
 
 @router.get("/map", response_class=HTMLResponse)
@@ -458,52 +406,108 @@ async def map_page(request: Request):
     )
 
 
+@lru_cache(maxsize=8)
+def _boundary_geojson(level: int) -> bytes:
+    """Serialised GeoJSON outline (memoised per simplification level)."""
+    from imgwtools.boundary import load_boundary
+
+    return json.dumps(
+        load_boundary(level).to_geojson(), separators=(",", ":")
+    ).encode()
+
+
+@router.get("/map/boundary")
+async def map_boundary_data(
+    level: int = Query(2, ge=0, le=3, description="Poziom uproszczenia (0 = pelna geometria)"),
+):
+    """
+    Get Poland outline as GeoJSON for the map.
+
+    Geometry is read from the preprocessed boundary cache
+    (built once from the bundled shapefile, off the event loop).
+    """
+    try:
+        content = await asyncio.to_thread(_boundary_geojson, level)
+    except (ImportError, IMGWError) as e:
+        return {"type": "FeatureCollection", "features": [], "error": str(e)}
+
+    return Response(
+        content=content,
+        media_type="application/geo+json",
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
+
+
+def _payload_response(
+    request: Request,
+    payload: Payload,
+    media_type: str = "application/json",
+    max_age: int = 60,
+) -> Response:
+    """Serve a pre-serialised payload, answering 304 if the ETag matches."""
+    headers = {"ETag": payload.etag, "Cache-Control": f"public, max-age={max_age}"}
+    if request.headers.get("if-none-match") == payload.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type=media_type, headers=headers)
+
+
 @router.get("/map/stations")
 async def map_stations_data(request: Request):
     """
     Get hydro stations data for map (JSON response for Leaflet).
 
-    Fetches data from IMGW hydro-back API (https://hydro-back.imgw.pl).
+    Served from a cache refreshed in the background from the IMGW
+    hydro-back API (https://hydro-back.imgw.pl), with ETag support.
     Returns 900+ stations with coordinates and current water state.
 
     Water states: alarm, warning, high, medium, low, below, normal, unknown, etc.
     """
-    url = "https://hydro-back.imgw.pl/map/stations/hydrologic?onlyMainStations=false"
+    cache = get_map_cache()
+    await cache.ensure_fresh()
+    payload = cache.stations()
+    if payload is None:
+        return {"stations": [], "error": cache.error}
+    return _payload_response(request, payload)
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                timeout=30.0,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (compatible; IMGWTools/1.0)",
-                    "Accept": "application/json",
-                    "Referer": "https://hydro.imgw.pl/",
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
 
-        stations = []
-        for item in data.get("stations", []):
-            if item.get("la") and item.get("lo"):
-                stations.append({
-                    "id": item.get("id", ""),
-                    "name": item.get("n", ""),
-                    "lat": float(item["la"]),
-                    "lon": float(item["lo"]),
-                    "state": item.get("s", "unknown"),
-                })
-
-        return {
-            "stations": stations,
-            "summary": {
-                "total": len(stations),
-                "alarm": data.get("numOfAlarmStates", 0),
-                "warning": data.get("numOfWarningStates", 0),
-                "below": data.get("numOfBelowStates", 0),
-            },
-        }
+@router.get("/map/stations/positions")
+async def map_station_positions(
+    request: Request,
+    format: str = Query("json", pattern="^(json|geojson|compact)$"),
+):
+    """
+    Static station positions (ID, name, coordinates) for the map.
 
-    except httpx.HTTPError as e:
-        return {"stations": [], "error": f"Błąd pobierania danych: {e}"}
+    Formats: json, geojson, compact (parallel arrays, coordinates as
+    integers scaled by 1e5). Positions change rarely, so clients should
+    fetch them once and poll /map/stations/states for updates.
+    """
+    cache = get_map_cache()
+    await cache.ensure_fresh()
+    payload = cache.positions(format)
+    if payload is None:
+        return {"stations": [], "error": cache.error}
+    media_type = "application/geo+json" if format == "geojson" else "application/json"
+    return _payload_response(request, payload, media_type, max_age=3600)
+
+
+@router.get("/map/stations/states")
+async def map_station_states(
+    request: Request,
+    since: int | None = Query(
+        None, ge=0, description="Wersja stanow posiadana przez klienta"
+    ),
+):
+    """
+    Current water states, or only changes since a known version.
+
+    Response contains ``version`` (pass it as ``since`` in the next poll),
+    ``full`` (false for a diff) and ``positions_version`` (refetch positions
+    when it changes).
+    """
+    cache = get_map_cache()
+    await cache.ensure_fresh()
+    payload = cache.states(since)
+    if payload is None:
+        return {"states": {}, "error": cache.error}
+    return _payload_response(request, payload, max_age=30)
@@ -0,0 +1,396 @@
+"""
+Cached, pre-serialised payloads for the station map.
+
+The hydro-back station feed is fetched by one background task instead of
+once per page view. Each refresh produces:
+
+- a static positions payload (ID, name, coordinates) that rarely changes,
+  available as JSON, GeoJSON or a compact form with quantised coordinates,
+- a water-state payload plus diffs against recent versions, so browsers
+  can poll only the stations whose state changed.
+
+All payloads are serialised once per refresh and carry ETags, so
+unchanged responses cost a 304.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import httpx
+
+from imgwtools.core.url_builder import build_hydro_map_url
+from imgwtools.metrics import upstream_call
+from imgwtools.resilience import async_retry_transport
+
+logger = logging.getLogger(__name__)
+
+# Background refresh interval [s] (hydro-back updates roughly every 10 min)
+DEFAULT_REFRESH_SECONDS = 120.0
+
+# Number of past state versions kept for diffs
+DEFAULT_DIFF_HISTORY = 30
+
+# Coordinate quantisation for the compact format (1e-5 deg ~ 1.1 m)
+COORD_SCALE = 100_000
+
+POSITION_FORMATS = ("json", "geojson", "compact")
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; IMGWTools/1.0)",
+    "Accept": "application/json",
+    "Referer": "https://hydro.imgw.pl/",
+}
+
+
+@dataclass(frozen=True)
+class Payload:
+    """Serialised response body with its ETag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_obj(cls, obj: object) -> Payload:
+        body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+        return cls(body=body, etag=f'"{hashlib.sha1(body).hexdigest()[:20]}"')
+
+
+@dataclass
+class _State:
+    """Current cache contents (replaced as a whole on refresh)."""
+
+    positions_version: int = 0
+    states_version: int = 0
+    positions: dict[str, tuple[str, float, float]] = field(default_factory=dict)
+    states: dict[str, str] = field(default_factory=dict)
+    summary: dict[str, int] = field(default_factory=dict)
+    position_payloads: dict[str, Payload] = field(default_factory=dict)
+    states_payload: Payload | None = None
+    legacy_payload: Payload | None = None
+    fetched_at: float | None = None
+    error: str | None = None
+
+
+class MapPayloadCache:
+    """
+    Background-refreshed cache of map payloads.
+
+    Attributes:
+        url: Map feed URL (None = build_hydro_map_url() at fetch time).
+        refresh_seconds: Interval between upstream fetches.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+        diff_history: int = DEFAULT_DIFF_HISTORY,
+        timeout: float = 30.0,
+    ):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.diff_history = diff_history
+        self.timeout = timeout
+        self._state = _State()
+        # states_version -> states dict, oldest first
+        self._history: OrderedDict[int, dict[str, str]] = OrderedDict()
+        self._diffs: dict[tuple[int, int], Payload] = {}
+        self._lock = asyncio.Lock()
+        self._background = False
+
+    # --- Refresh ---
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._state.fetched_at is not None
+
+    @property
+    def is_stale(self) -> bool:
+        fetched_at = self._state.fetched_at
+        if fetched_at is None:
+            return True
+        return time.monotonic() - fetched_at >= self.refresh_seconds
+
+    @property
+    def error(self) -> str | None:
+        """Error of the last failed refresh, if any."""
+        return self._state.error
+
+    async def ensure_fresh(self) -> None:
+        """
+        Make sure payloads exist before serving a request.
+
+        With the background loop running only the very first request may
+        wait for upstream; without it, stale data is refreshed on demand
+        (one request fetches, concurrent ones wait for the same result).
+        """
+        if self.is_loaded and (self._background or not self.is_stale):
+            return
+        async with self._lock:
+            if not self.is_loaded or (not self._background and self.is_stale):
+                await self._refresh_locked()
+
+    async def refresh(self) -> bool:
+        """
+        Fetch the upstream feed and rebuild payloads.
+
+        Returns:
+            True on success; on failure the previous payloads are kept.
+        """
+        async with self._lock:
+            return await self._refresh_locked()
+
+    async def run_refresh_loop(self) -> None:
+        """
+        Refresh every ``refresh_seconds`` until cancelled.
+
+        Unexpected errors are logged and the loop keeps running.
+        """
+        self._background = True
+        try:
+            while True:
+                if self.is_stale:
+                    try:
+                        await self.refresh()
+                    except Exception:
+                        logger.exception("Map payload refresh failed")
+                await asyncio.sleep(self.refresh_seconds)
+        finally:
+            self._background = False
+
+    async def _refresh_locked(self) -> bool:
+        try:
+            async with httpx.AsyncClient(
+                timeout=self.timeout, transport=async_retry_transport()
+            ) as client:
+                with upstream_call("hydro_map"):
+                    response = await client.get(
+                        self.url or build_hydro_map_url(),
+                        params={"onlyMainStations": "false"},
+                        headers=_HEADERS,
+                    )
+                    response.raise_for_status()
+                data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            error = f"Błąd pobierania danych: {e}"
+        else:
+            try:
+                self.update(data)
+                return True
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                error = f"Błędne dane mapy: {e!r}"
+
+        self._state.error = error
+        # Retry on the next cycle, but don't hammer upstream per request
+        self._state.fetched_at = time.monotonic()
+        return False
+
+    def update(self, data: dict) -> None:
+        """
+        Rebuild payloads from a hydro-back response.
+
+        Args:
+            data: Parsed JSON with a ``stations`` list (short keys
+                id, n, la, lo, s) and optional state counters.
+        """
+        positions: dict[str, tuple[str, float, float]] = {}
+        states: dict[str, str] = {}
+        for item in data.get("stations", []):
+            if not (item.get("la") and item.get("lo")):
+                continue
+            station_id = str(item.get("id", ""))
+            positions[station_id] = (
+                item.get("n", ""),
+                float(item["la"]),
+                float(item["lo"]),
+            )
+            states[station_id] = item.get("s") or "unknown"
+
+        summary = {
+            "total": len(positions),
+            "alarm": data.get("numOfAlarmStates", 0),
+            "warning": data.get("numOfWarningStates", 0),
+            "below": data.get("numOfBelowStates", 0),
+        }
+
+        old = self._state
+        new = _State(
+            positions_version=old.positions_version,
+            states_version=old.states_version,
+            positions=positions,
+            states=states,
+            summary=summary,
+            position_payloads=old.position_payloads,
+            states_payload=old.states_payload,
+            fetched_at=time.monotonic(),
+        )
+
+        positions_changed = positions != old.positions or not old.position_payloads
+        if positions_changed:
+            new.positions_version += 1
+            new.position_payloads = self._build_positions(new)
+        states_changed = states != old.states or summary != old.summary
+        if states_changed or positions_changed or old.states_payload is None:
+            new.states_version += 1
+            new.states_payload = Payload.from_obj(
+                {
+                    "version": new.states_version,
+                    "positions_version": new.positions_version,
+                    "full": True,
+                    "states": states,
+                    "summary": summary,
+                }
+            )
+            self._history[new.states_version] = states
+            while len(self._history) > self.diff_history:
+                self._history.popitem(last=False)
+            self._diffs.clear()
+
+        new.legacy_payload = (
+            self._build_legacy(new)
+            if new.states_version != old.states_version
+            else old.legacy_payload
+        )
+        self._state = new
+
+    def _build_positions(self, state: _State) -> dict[str, Payload]:
+        ids = list(state.positions)
+        version = state.positions_version
+        rows = [state.positions[i] for i in ids]
+        return {
+            "json": Payload.from_obj(
+                {
+                    "version": version,
+                    "stations": [
+                        {"id": i, "name": n, "lat": lat, "lon": lon}
+                        for i, (n, lat, lon) in zip(ids, rows, strict=True)
+                    ],
+                }
+            ),
+            "geojson": Payload.from_obj(
+                {
+                    "type": "FeatureCollection",
+                    "version": version,
+                    "features": [
+                        {
+                            "type": "Feature",
+                            "id": i,
+                            "properties": {"name": n},
+                            "geometry": {
+                                "type": "Point",
+                                "coordinates": [round(lon, 5), round(lat, 5)],
+                            },
+                        }
+                        for i, (n, lat, lon) in zip(ids, rows, strict=True)
+                    ],
+                }
+            ),
+            # Parallel arrays; coordinates as integers of 1e-5 degree
+            "compact": Payload.from_obj(
+                {
+                    "version": version,
+                    "scale": COORD_SCALE,
+                    "ids": ids,
+                    "names": [n for n, _, _ in rows],
+                    "lat": [round(lat * COORD_SCALE) for _, lat, _ in rows],
+                    "lon": [round(lon * COORD_SCALE) for _, _, lon in rows],
+                }
+            ),
+        }
+
+    def _build_legacy(self, state: _State) -> Payload:
+        """Combined payload in the original /map/stations format."""
+        return Payload.from_obj(
+            {
+                "stations": [
+                    {
+                        "id": i,
+                        "name": n,
+                        "lat": lat,
+                        "lon": lon,
+                        "state": state.states[i],
+                    }
+                    for i, (n, lat, lon) in state.positions.items()
+                ],
+                "summary": state.summary,
+            }
+        )
+
+    # --- Payload access ---
+
+    def stations(self) -> Payload | None:
+        """Positions and states combined (original /map/stations format)."""
+        return self._state.legacy_payload
+
+    def water_states(self) -> dict[str, str]:
+        """Current water state by station ID (empty before the first refresh)."""
+        return self._state.states
+
+    def positions(self, fmt: str = "json") -> Payload | None:
+        """Static station positions in the given format."""
+        return self._state.position_payloads.get(fmt)
+
+    def states(self, since: int | None = None) -> Payload | None:
+        """
+        Water states, either full or as a diff.
+
+        Args:
+            since: States version the client already has. If it is still
+                in the history, only changed stations are returned
+                (``"full": false``); otherwise the full state map.
+
+        Returns:
+            Serialised payload, or None if nothing is loaded.
+        """
+        state = self._state
+        if state.states_payload is None:
+            return None
+        if since is not None and since in self._history:
+            return self._diff(since, state)
+        return state.states_payload
+
+    def _diff(self, since: int, state: _State) -> Payload:
+        key = (since, state.states_version)
+        payload = self._diffs.get(key)
+        if payload is None:
+            previous = self._history[since]
+            changed = {
+                sid: s for sid, s in state.states.items() if previous.get(sid) != s
+            }
+            removed = [sid for sid in previous if sid not in state.states]
+            payload = Payload.from_obj(
+                {
+                    "version": state.states_version,
+                    "positions_version": state.positions_version,
+                    "since": since,
+                    "full": False,
+                    "states": changed,
+                    "removed": removed,
+                    "summary": state.summary,
+                }
+            )
+            self._diffs[key] = payload
+        return payload
+
+
+# Singleton cache instance
+_map_cache: MapPayloadCache | None = None
+
+
+def get_map_cache() -> MapPayloadCache:
+    """Get singleton map payload cache."""
+    global _map_cache
+    if _map_cache is None:
+        from imgwtools.config import settings
+
+        _map_cache = MapPayloadCache(
+            refresh_seconds=settings.map_refresh_interval or DEFAULT_REFRESH_SECONDS
+        )
+    return _map_cache
@@ -2,8 +2,36 @@
 Shared pytest fixtures for IMGWTools tests.
 """
 
+import contextlib
+
 import pytest
 
+from imgwtools.resilience import (
+    RetryPolicy,
+    configure_resilience,
+    get_retry_policy,
+)
+from imgwtools.throttle import UpstreamThrottle, configure_throttle, get_throttle
+
+with contextlib.suppress(ImportError):
+    # Applies the settings once, so later imports do not reset the policy
+    import imgwtools.config  # noqa: F401
+
+
+@pytest.fixture(autouse=True)
+def fast_upstream():
+    """
+    Retry without backoff delays, start every test with closed circuits and
+    no client-side rate limit.
+    """
+    policy = get_retry_policy()
+    throttle = get_throttle()
+    configure_resilience(RetryPolicy(max_attempts=policy.max_attempts, backoff=0.0))
+    configure_throttle(UpstreamThrottle(rate=0))
+    yield
+    configure_resilience(policy)
+    configure_throttle(throttle)
+
 
 # Sample PMAXTP API response
 @pytest.fixture
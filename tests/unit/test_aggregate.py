@@ -0,0 +1,136 @@
+"""
+Unit tests for imgwtools.db.aggregate module.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from imgwtools.config import settings  # noqa: E402
+from imgwtools.db.aggregate import (  # noqa: E402
+    aggregate_daily,
+    climatology,
+    flow_duration_curve,
+    percentiles,
+)
+from imgwtools.db.models import HydroDailyRecord  # noqa: E402
+from imgwtools.db.repository import HydroRepository  # noqa: E402
+from imgwtools.db.schema import init_db  # noqa: E402
+
+STATION = "150160180"
+
+
+def _record(day: date, level: float | None, flow: float | None = None):
+    return HydroDailyRecord(
+        station_code=STATION,
+        hydro_year=day.year + 1 if day.month >= 11 else day.year,
+        hydro_month=(day.month - 11) % 12 + 1,
+        day=day.day,
+        calendar_month=day.month,
+        water_level_cm=level,
+        flow_m3s=flow,
+        measurement_date=day.isoformat(),
+    )
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Database with 2019-10-30 .. 2019-11-03 and 2020-11-01 .. 2020-11-02."""
+    monkeypatch.setattr(settings, "db_enabled", True)
+    monkeypatch.setattr(settings, "db_path", tmp_path / "test.db")
+    init_db()
+    start = date(2019, 10, 30)
+    records = [
+        _record(start + timedelta(days=i), level, flow)
+        for i, (level, flow) in enumerate(
+            [(100, 1.0), (120, 2.0), (90, 3.0), (90, 4.0), (None, 5.0)]
+        )
+    ]
+    records += [
+        _record(date(2020, 11, 1), 200, 6.0),
+        _record(date(2020, 11, 2), 180, 7.0),
+    ]
+    HydroRepository().insert_daily_batch(records)
+
+
+class TestAggregateDaily:
+    """Tests for period means and extremes."""
+
+    def test_hydro_year(self, db):
+        """Test hydrological years split at November."""
+        result = aggregate_daily(STATION, "H", "hydro_year")
+
+        assert [r.period for r in result] == ["2019", "2020", "2021"]
+        assert result[1].count == 2
+        assert result[1].mean == 90
+        # Ties resolve to the first day
+        assert result[1].min_date == "2019-11-01"
+
+    def test_month_extremes(self, db):
+        """Test monthly mean, min and max with their dates."""
+        result = aggregate_daily(STATION, "H", "month")
+        october = result[0]
+
+        assert october.period == "2019-10"
+        assert october.count == 2
+        assert october.mean == 110
+        assert (october.min, october.min_date) == (100, "2019-10-30")
+        assert (october.max, october.max_date) == (120, "2019-10-31")
+
+    def test_year_filter(self, db):
+        """Test filtering by hydrological years."""
+        result = aggregate_daily(STATION, "Q", "year", start_year=2020, end_year=2020)
+
+        assert len(result) == 1
+        assert result[0].count == 3
+        assert result[0].max == 5.0
+
+    def test_invalid_param(self, db):
+        """Test unknown parameter raises ValueError."""
+        with pytest.raises(ValueError):
+            aggregate_daily(STATION, "X")
+        with pytest.raises(ValueError):
+            aggregate_daily(STATION, "H", "week")
+
+
+class TestClimatology:
+    """Tests for day-of-year statistics."""
+
+    def test_calendar_days(self, db):
+        """Test values from different years are grouped by MM-DD."""
+        result = {r.day: r for r in climatology(STATION, "Q")}
+
+        assert list(result) == ["10-30", "10-31", "11-01", "11-02", "11-03"]
+
+        assert result["11-01"].count == 2
+        assert result["11-01"].mean == 4.5
+        assert result["11-01"].max == 6.0
+
+
+class TestPercentiles:
+    """Tests for quantiles and duration curves."""
+
+    def test_linear_interpolation(self, db):
+        """Test quantiles match linear interpolation between ranks."""
+        result = percentiles(STATION, "Q", [0.0, 0.25, 0.5, 1.0])
+
+        assert result == {0.0: 1.0, 0.25: 2.5, 0.5: 4.0, 1.0: 7.0}
+
+    def test_no_data(self, db):
+        """Test missing station gives empty results."""
+        assert percentiles("000000000", "Q") == {}
+        assert flow_duration_curve("000000000") == []
+
+    def test_invalid_quantile(self, db):
+        """Test quantiles outside [0, 1] are rejected."""
+        with pytest.raises(ValueError):
+            percentiles(STATION, "Q", [1.5])
+
+    def test_flow_duration_curve(self, db):
+        """Test exceedance probabilities map to upper quantiles."""
+        curve = flow_duration_curve(STATION, exceedance=[0, 50, 100])
+
+        assert [p.exceedance_percent for p in curve] == [0, 50, 100]
+        assert [p.value for p in curve] == [7.0, 4.0, 1.0]
@@ -0,0 +1,222 @@
+"""
+Unit tests for imgwtools.api.auth (API keys, sliding-window rate limit)
+and the auth middleware.
+"""
+
+import json
+import os
+
+import pytest
+
+from imgwtools.api import auth
+from imgwtools.api.auth import (
+    ApiKeyStore,
+    SlidingWindowLimiter,
+    UsageStore,
+    key_identity,
+    sliding_count,
+)
+
+
+class FakeClock:
+    """Replacement of the time module used by imgwtools.api.auth."""
+
+    def __init__(self, now: float = 7200.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(auth, "time", fake)
+    return fake
+
+
+def _write_keys(path, *keys):
+    path.write_text(json.dumps({"keys": list(keys)}), encoding="utf-8")
+
+
+class TestSlidingWindowLimiter:
+    """Tests for in-memory request counting."""
+
+    def test_limit(self, clock):
+        """Test requests over the limit are rejected and not counted."""
+        limiter = SlidingWindowLimiter()
+        results = [limiter.hit("ip:1", 3) for _ in range(4)]
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results[:3]] == [2, 1, 0]
+        assert results[3].retry_after == 3600
+        assert limiter.hit("ip:2", 3).allowed  # separate client
+
+    def test_unlimited(self, clock):
+        """Test limit 0 allows everything."""
+        limiter = SlidingWindowLimiter()
+        assert all(limiter.hit("ip:1", 0).allowed for _ in range(1000))
+
+    def test_previous_window_weight(self, clock):
+        """Test the previous window counts by its overlap with the sliding one."""
+        limiter = SlidingWindowLimiter()
+        for _ in range(10):
+            limiter.hit("ip:1", 10)
+
+        clock.now += 3600 + 1800  # half of the previous window still counts
+        assert sliding_count(0, 10, 1800, 3600) == 5
+        results = [limiter.hit("ip:1", 10) for _ in range(6)]
+        assert [r.allowed for r in results] == [True] * 5 + [False]
+        assert 0 < results[-1].retry_after <= 1800
+
+
+class TestUsageStore:
+    """Tests for counts shared between workers."""
+
+    def test_workers_share_counts(self, clock, tmp_path):
+        """Test flushed counts of one worker limit the others."""
+        path = tmp_path / "usage.db"
+        first = SlidingWindowLimiter(UsageStore(path), flush_interval=1)
+        second = SlidingWindowLimiter(UsageStore(path), flush_interval=1)
+
+        for _ in range(4):
+            first.hit("key:abc", 5, "Client")
+        clock.now += 1
+        assert first.needs_flush()
+        first.flush()
+        second.flush()
+
+        assert second.hit("key:abc", 5).allowed
+        assert not second.hit("key:abc", 5).allowed
+
+    def test_totals(self, clock, tmp_path):
+        """Test totals keep names, request counts and last-hour usage."""
+        limiter = SlidingWindowLimiter(UsageStore(tmp_path / "usage.db"))
+        for _ in range(3):
+            limiter.hit("key:abc", 0, "Client")
+        limiter.flush()
+
+        total = UsageStore(tmp_path / "usage.db").totals()["key:abc"]
+        assert (total.name, total.requests, total.last_hour) == ("Client", 3, 3)
+
+
+class TestApiKeyStore:
+    """Tests for key lookup."""
+
+    def test_lookup_and_reload(self, tmp_path):
+        """Test keys are found by value and changes are picked up."""
+        path = tmp_path / "api_keys.json"
+        _write_keys(path, {"id": "secret-1", "name": "A", "rate_limit": 5})
+        store = ApiKeyStore(path, check_interval=0)
+
+        entry = store.lookup("secret-1")
+        assert entry.name == "A"
+        assert entry.rate_limit == 5
+        assert entry.identity == key_identity("secret-1")
+        assert "secret" not in entry.identity
+        assert store.lookup("secret-2") is None
+
+        mtime = path.stat().st_mtime
+        _write_keys(path, {"id": "secret-1", "name": "A", "active": False})
+        os.utime(path, (mtime + 10, mtime + 10))  # coarse file system clocks
+        entry = store.lookup("secret-1")
+        assert not entry.active
+        assert entry.rate_limit == 100  # default limit
+
+    def test_missing_file(self, tmp_path):
+        """Test a missing keys file means no keys."""
+        assert len(ApiKeyStore(tmp_path / "none.json")) == 0
+
+
+class TestAuthMiddleware:
+    """Tests for key checks and limits in the API."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        pytest.importorskip("pydantic_settings")
+        fastapi = pytest.importorskip("fastapi")
+        testclient = pytest.importorskip("fastapi.testclient")
+        from imgwtools.api.middleware import AuthMiddleware
+        from imgwtools.config import settings
+
+        keys = tmp_path / "api_keys.json"
+        _write_keys(
+            keys,
+            {"id": "good", "name": "Good", "rate_limit": 2},
+            {"id": "revoked", "name": "Old", "active": False},
+        )
+        monkeypatch.setattr(settings, "rate_limit", 3)
+        monkeypatch.setattr(settings, "api_auth_required", False)
+
+        app = fastapi.FastAPI()
+        app.add_middleware(
+            AuthMiddleware, keys=ApiKeyStore(keys), limiter=SlidingWindowLimiter()
+        )
+        app.get("/api/v1/data")(lambda: {"ok": True})
+        app.get("/health")(lambda: {"ok": True})
+
+        @app.websocket("/api/v1/ws")
+        async def echo(websocket: fastapi.WebSocket):
+            await websocket.accept()
+            await websocket.send_json({"ok": True})
+            await websocket.close()
+
+        return testclient.TestClient(app), settings
+
+    def test_key_limit(self, client):
+        """Test requests with a key are limited by the key's limit."""
+        client, _ = client
+        headers = {"X-API-Key": "good"}
+        first = client.get("/api/v1/data", headers=headers)
+        assert first.status_code == 200
+        assert first.headers["X-RateLimit-Limit"] == "2"
+        assert first.headers["X-RateLimit-Remaining"] == "1"
+
+        client.get("/api/v1/data", headers=headers)
+        limited = client.get("/api/v1/data", headers=headers)
+        assert limited.status_code == 429
+        assert int(limited.headers["Retry-After"]) > 0
+
+        # Anonymous requests have their own budget
+        assert client.get("/api/v1/data").status_code == 200
+
+    def test_invalid_keys(self, client):
+        """Test unknown and revoked keys are rejected."""
+        client, _ = client
+        for key in ("wrong", "revoked"):
+            response = client.get("/api/v1/data", headers={"X-API-Key": key})
+            assert response.status_code == 401
+
+    def test_anonymous(self, client):
+        """Test anonymous limits, required keys and unprotected paths."""
+        client, settings = client
+        codes = [client.get("/api/v1/data").status_code for _ in range(4)]
+        assert codes == [200, 200, 200, 429]
+        assert client.get("/health").status_code == 200
+
+        settings.api_auth_required = True
+        response = client.get("/api/v1/data")
+        assert response.status_code == 401
+        assert response.json()["detail"].startswith("API key required")
+        assert client.get("/api/v1/data", headers={"X-API-Key": "good"}).is_success
+
+    def test_websocket(self, client):
+        """Test websockets under the prefix need a key when one is required."""
+        from starlette.websockets import WebSocketDisconnect
+
+        client, settings = client
+        settings.api_auth_required = True
+        with (
+            pytest.raises(WebSocketDisconnect) as closed,
+            client.websocket_connect("/api/v1/ws"),
+        ):
+            pass
+        assert closed.value.code == 1008
+        assert closed.value.reason.startswith("API key required")
+
+        with client.websocket_connect(
+            "/api/v1/ws", headers={"X-API-Key": "good"}
+        ) as websocket:
+            assert websocket.receive_json() == {"ok": True}
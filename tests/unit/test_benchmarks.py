@@ -0,0 +1,26 @@
+"""
+Unit tests for the benchmark runner (benchmarks package).
+"""
+
+from benchmarks.__main__ import compare
+
+
+class TestCompare:
+    """Tests for baseline comparison."""
+
+    def test_regressions(self):
+        """Test lower throughput and higher latency beyond tolerance."""
+        baseline = {"a": {"rows_per_sec": 1000, "latency_p50_ms": 10.0}}
+        results = {"a": {"rows_per_sec": 700, "latency_p50_ms": 11.0}}
+        regressions = compare(results, baseline, tolerance=0.25)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("a.rows_per_sec")
+
+    def test_improvements_and_new_benchmarks(self):
+        """Test improvements and benchmarks missing in baseline pass."""
+        baseline = {"a": {"rows_per_sec": 1000, "peak_rss_mb": 100.0}}
+        results = {
+            "a": {"rows_per_sec": 5000, "peak_rss_mb": 50.0},
+            "b": {"rows_per_sec": 1},
+        }
+        assert compare(results, baseline, tolerance=0.1) == []
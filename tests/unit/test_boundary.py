@@ -0,0 +1,143 @@
+"""
+Unit tests for imgwtools.boundary module.
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from imgwtools.boundary import (  # noqa: E402
+    boundary_cache_path,
+    load_boundary,
+    save_boundary_cache,
+    simplify_line,
+)
+from imgwtools.exceptions import IMGWDataError, IMGWValidationError  # noqa: E402
+
+
+@pytest.fixture
+def ring():
+    """Closed square ring with noisy extra vertices on each edge."""
+    edge = np.linspace(0.0, 1.0, 11)
+    noise = 0.001 * np.sin(np.arange(11))
+    noise[[0, -1]] = 0.0
+    return np.concatenate([
+        np.column_stack([edge, noise]),
+        np.column_stack([1.0 + noise, edge])[1:],
+        np.column_stack([edge[::-1], 1.0 + noise])[1:],
+        np.column_stack([noise, edge[::-1]])[1:],
+    ])
+
+
+class TestSimplifyLine:
+    """Tests for Douglas-Peucker simplification."""
+
+    def test_zero_tolerance_keeps_all(self, ring):
+        """Test tolerance 0 returns the input unchanged."""
+        assert len(simplify_line(ring, 0)) == len(ring)
+
+    def test_closed_ring_reduced_to_corners(self, ring):
+        """Test noise is removed but corners survive."""
+        result = simplify_line(ring, 0.01)
+
+        assert len(result) == 5
+        assert np.array_equal(result[0], result[-1])
+
+    def test_straight_line(self):
+        """Test collinear vertices are removed."""
+        line = np.column_stack([np.arange(10.0), np.arange(10.0)])
+
+        assert simplify_line(line, 0.1).tolist() == [[0.0, 0.0], [9.0, 9.0]]
+
+
+class TestBoundaryCache:
+    """Tests for building and loading the boundary archive."""
+
+    def test_cache_path(self, tmp_path):
+        """Test the configured shapefile shares one cache, others get their own."""
+        pytest.importorskip("pydantic_settings")
+        from imgwtools.config import settings
+
+        assert boundary_cache_path() == settings.boundary_cache_path
+        assert boundary_cache_path(settings.shapefile_path) == (
+            settings.boundary_cache_path
+        )
+        assert boundary_cache_path(tmp_path / "gmina.shp") == (
+            tmp_path / "gmina_boundary.npz"
+        )
+
+    def test_levels_round_trip(self, ring, tmp_path):
+        """Test every level is stored and loaded."""
+        cache = tmp_path / "boundary.npz"
+        save_boundary_cache([ring], cache, tolerances=(0, 0.01), source_crs="EPSG:4326")
+
+        full = load_boundary(0, shapefile_path=tmp_path / "missing.shp", cache_path=cache)
+        simple = load_boundary(1, shapefile_path=tmp_path / "missing.shp", cache_path=cache)
+
+        assert full.n_vertices == len(ring)
+        assert simple.n_vertices == 5
+        assert simple.n_parts == 1
+
+    def test_load_is_memoised(self, ring, tmp_path):
+        """Test repeated loads return the same object."""
+        cache = tmp_path / "boundary.npz"
+        save_boundary_cache([ring], cache, source_crs="EPSG:4326")
+
+        first = load_boundary(1, tmp_path / "missing.shp", cache)
+        second = load_boundary(1, tmp_path / "missing.shp", cache)
+
+        assert first is second
+
+    def test_geojson(self, ring, tmp_path):
+        """Test GeoJSON output for the web map."""
+        cache = tmp_path / "boundary.npz"
+        save_boundary_cache([ring], cache, tolerances=(0.01,), source_crs="EPSG:4326")
+
+        geojson = load_boundary(0, tmp_path / "missing.shp", cache).to_geojson()
+
+        geometry = geojson["features"][0]["geometry"]
+        assert geometry["type"] == "MultiLineString"
+        assert len(geometry["coordinates"][0]) == 5
+
+    def test_invalid_level(self, ring, tmp_path):
+        """Test out-of-range level raises."""
+        cache = tmp_path / "boundary.npz"
+        save_boundary_cache([ring], cache, tolerances=(0,), source_crs="EPSG:4326")
+
+        with pytest.raises(IMGWValidationError):
+            load_boundary(3, tmp_path / "missing.shp", cache)
+
+    def test_missing_sources(self, tmp_path):
+        """Test missing cache and shapefile raises data error."""
+        with pytest.raises(IMGWDataError):
+            load_boundary(0, tmp_path / "missing.shp", tmp_path / "missing.npz")
+
+    def test_projected_source_reuses_transformer(self, ring, tmp_path, monkeypatch):
+        """Test every level is reprojected with one cached transformer."""
+        pytest.importorskip("pyproj")
+        from imgwtools.core import projection
+
+        built = []
+
+        def from_crs(*args, **kwargs):
+            built.append(args)
+            return transformer_cls.from_crs(*args, **kwargs)
+
+        transformer_cls = projection.Transformer
+        monkeypatch.setattr(projection, "_local", threading.local())
+        monkeypatch.setattr(
+            projection, "Transformer", SimpleNamespace(from_crs=from_crs)
+        )
+        cache = tmp_path / "boundary.npz"
+        ring_2180 = ring * 1000 + [500_000, 500_000]
+        save_boundary_cache(
+            [ring_2180], cache, tolerances=(0, 10), source_crs="EPSG:2180"
+        )
+
+        assert built == [("EPSG:2180", "EPSG:4326")]
+        outline = load_boundary(1, tmp_path / "missing.shp", cache)
+        lon, lat = outline.parts(wgs84=True)[0].mean(axis=0)
+        assert 14 < lon < 25 and 49 < lat < 55
@@ -0,0 +1,122 @@
+"""
+Unit tests for imgwtools.bulk (concurrent, resumable archive download).
+"""
+
+import hashlib
+import json
+import threading
+
+import pytest
+
+from imgwtools import (
+    HydroInterval,
+    IMGWValidationError,
+    build_hydro_url,
+    bulk,
+    set_base_url,
+)
+from imgwtools.bulk import MANIFEST_NAME, download_archives, download_archives_async
+from imgwtools.testing import FakeIMGWServer
+
+
+@pytest.fixture
+def server():
+    """Fake server with a few stations; imgwtools redirected to it."""
+    with FakeIMGWServer(n_stations=3, seed=1) as fake:
+        set_base_url(fake.base_url)
+        yield fake
+    set_base_url(None)
+
+
+def _plan(*months: int):
+    return [build_hydro_url(HydroInterval.DAILY, 2020, m) for m in months]
+
+
+class TestDownloadArchives:
+    """Tests for download_archives."""
+
+    def test_download_and_manifest(self, server, tmp_path):
+        """Test files are downloaded and recorded in the manifest."""
+        results = download_archives(_plan(1, 2, 3), tmp_path, concurrency=2)
+
+        assert [r.status for r in results] == ["downloaded"] * 3
+        data = server.archive("codz_2020_02.zip")
+        assert (tmp_path / "codz_2020_02.zip").read_bytes() == data
+
+        manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+        entry = {e["filename"]: e for e in manifest["files"]}["codz_2020_02.zip"]
+        assert entry["size"] == len(data)
+        assert entry["sha256"] == hashlib.sha256(data).hexdigest()
+
+    def test_skip_existing(self, server, tmp_path):
+        """Test complete files are not downloaded again."""
+        download_archives(_plan(1), tmp_path)
+        server.requests.clear()
+
+        results = download_archives(_plan(1), tmp_path)
+        assert results[0].status == "skipped"
+        assert results[0].sha256 is not None
+        assert server.requests == []
+
+    @pytest.mark.parametrize("kept", [1000, None])
+    def test_resume_partial(self, server, tmp_path, kept):
+        """Test .part files are completed with a Range request."""
+        data = server.archive("codz_2020_04.zip")
+        (tmp_path / "codz_2020_04.zip.part").write_bytes(data[:kept])
+
+        results = download_archives(_plan(4), tmp_path)
+        assert results[0].status == "resumed"
+        assert (tmp_path / "codz_2020_04.zip").read_bytes() == data
+        assert not (tmp_path / "codz_2020_04.zip.part").exists()
+
+    def test_corrupt_partial(self, server, tmp_path):
+        """Test a .part file of another archive fails the ZIP check."""
+        other = server.archive("codz_2020_01.zip")
+        (tmp_path / "codz_2020_05.zip.part").write_bytes(other[:1000])
+
+        result = download_archives(_plan(5), tmp_path)[0]
+        assert result.status == "failed"
+        assert "Invalid ZIP" in result.error
+        assert not (tmp_path / "codz_2020_05.zip.part").exists()
+
+        # Next run starts from scratch
+        assert download_archives(_plan(5), tmp_path)[0].status == "downloaded"
+
+    async def test_failures_do_not_stop_others(self, server, tmp_path):
+        """Test a missing file is reported while the rest downloads."""
+        plan = [*_plan(1), build_hydro_url(HydroInterval.DAILY, 2020, 13)]
+        events = []
+
+        results = await download_archives_async(
+            plan, tmp_path, manifest=False, on_event=events.append
+        )
+        assert [r.status for r in results] == ["downloaded", "failed"]
+        assert results[1].error == "HTTP 404"
+        assert not (tmp_path / MANIFEST_NAME).exists()
+        assert {e.stage for e in events if e.finished} >= {"download", "done", "error"}
+
+    def test_invalid_concurrency(self, tmp_path):
+        """Test concurrency below 1 is rejected."""
+        with pytest.raises(IMGWValidationError):
+            download_archives(_plan(1), tmp_path, concurrency=0)
+
+    async def test_checks_off_event_loop(self, server, tmp_path, monkeypatch):
+        """Test hashing and ZIP verification run in worker threads."""
+        threads: dict[str, int] = {}
+
+        def record(name):
+            check = getattr(bulk, name)
+
+            def wrapper(path):
+                threads[name] = threading.get_ident()
+                return check(path)
+
+            monkeypatch.setattr(bulk, name, wrapper)
+
+        record("_sha256")
+        record("_verify_zip")
+        results = await download_archives_async(_plan(1), tmp_path, manifest=False)
+
+        assert results[0].status == "downloaded"
+        assert set(threads) == {"_sha256", "_verify_zip"}
+        assert threading.get_ident() not in threads.values()
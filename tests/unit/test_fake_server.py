@@ -0,0 +1,132 @@
+"""
+Unit tests for imgwtools.testing (synthetic data and fake IMGW server).
+"""
+
+import httpx
+import pytest
+
+from imgwtools import (
+    fetch_hydro_current,
+    fetch_pmaxtp,
+    fetch_synop,
+    fetch_warnings,
+    set_base_url,
+)
+from imgwtools.db.parsers import parse_zip_file
+from imgwtools.exceptions import IMGWConnectionError
+from imgwtools.stations import get_hydro_stations_with_coords, list_hydro_stations
+from imgwtools.testing import FakeIMGWServer, archive_for, station_codes
+
+
+@pytest.fixture
+def server():
+    """Fake server with a few stations; imgwtools redirected to it."""
+    with FakeIMGWServer(n_stations=5, seed=1) as fake:
+        set_base_url(fake.base_url)
+        yield fake
+    set_base_url(None)
+
+
+class TestSyntheticArchives:
+    """Tests for synthetic IMGW archives."""
+
+    def test_daily_month_parses(self):
+        """Test monthly codz file has one row per station and day."""
+        data = archive_for("codz_2020_02.zip", 3)
+        records = [record for _, record in parse_zip_file(data, "dobowe")]
+        # hydrological month 2 = December 2019
+        assert len(records) == 3 * 31
+        assert {r.station_code for r in records} == set(station_codes(3))
+        assert records[0].measurement_date == "2019-12-01"
+
+    def test_daily_year_parses(self):
+        """Test yearly codz file covers the whole hydrological year."""
+        data = archive_for("codz_2023.zip", 2)
+        records = [record for _, record in parse_zip_file(data, "dobowe")]
+        assert len(records) == 2 * 365
+        assert any(r.water_level_cm is None for r in records)
+
+    def test_semi_annual_parses(self):
+        """Test polr file has 3 periods x 3 extremes per station."""
+        data = archive_for("polr_Q_2020.zip", 4)
+        records = [record for _, record in parse_zip_file(data, "polroczne")]
+        assert len(records) == 4 * 9
+        assert {r.param for r in records} == {"Q"}
+
+    def test_deterministic(self):
+        """Test same name gives the same archive content."""
+        assert archive_for("mies_2020.zip", 2) == archive_for("mies_2020.zip", 2)
+
+    def test_unknown_name(self):
+        """Test unknown file names are not generated."""
+        assert archive_for("zjaw_2020.zip") is None
+
+
+class TestFakeServer:
+    """Tests for FakeIMGWServer endpoints."""
+
+    def test_archive_and_404(self, server):
+        """Test archives are served under IMGW paths."""
+        base = f"{server.base_url}/data/dane_pomiarowo_obserwacyjne"
+        url = f"{base}/dane_hydrologiczne/dobowe/2020/codz_2020_01.zip"
+        assert httpx.get(url).content == server.archive("codz_2020_01.zip")
+        assert httpx.get(f"{base}/missing.zip").status_code == 404
+
+    def test_realtime_feeds(self, server):
+        """Test library fetch functions parse the fake feeds."""
+        hydro = fetch_hydro_current()
+        assert [s.station_id for s in hydro] == station_codes(5)
+        assert hydro[0].water_level_cm is not None
+
+        one = fetch_hydro_current(station_id=station_codes(5)[2])
+        assert len(one) == 1
+
+        assert len(fetch_synop()) > 0
+        assert isinstance(fetch_warnings("hydro"), list)
+
+    def test_pmaxtp(self, server):
+        """Test PMAXTP responses grow with duration."""
+        result = fetch_pmaxtp(52.23, 21.01)
+        assert result.data.get_precipitation(60, 1) > result.data.get_precipitation(
+            15, 1
+        )
+
+    def test_stations(self, server):
+        """Test station list CSV and hydro-back map feed."""
+        assert len(list_hydro_stations()) == 5
+        with_coords = get_hydro_stations_with_coords()
+        assert len(with_coords) == 5
+        assert all(49 < s.latitude < 55 for s in with_coords)
+
+    def test_injected_failures(self, server):
+        """Test failure_rate makes requests fail with failure_status."""
+        server.failure_rate = 1.0
+        with pytest.raises(IMGWConnectionError):
+            fetch_hydro_current()
+        response = httpx.get(f"{server.base_url}/api/data/synop")
+        assert response.status_code == 503
+
+    def test_latency(self, server):
+        """Test latency delays responses."""
+        server.latency = 0.05
+        response = httpx.get(f"{server.base_url}/api/data/synop")
+        assert response.elapsed.total_seconds() >= 0.05
+
+    async def test_cache_import(self, server, tmp_path, monkeypatch):
+        """Test cache manager downloads archives from the fake server."""
+        pytest.importorskip("pydantic_settings")
+        from imgwtools.config import settings
+        from imgwtools.db.cache_manager import HydroCacheManager
+        from imgwtools.db.schema import get_table_counts, init_db
+
+        monkeypatch.setattr(settings, "db_enabled", True)
+        monkeypatch.setattr(settings, "db_path", tmp_path / "test.db")
+        init_db()
+
+        assert await HydroCacheManager().ensure_data_cached("dobowe", 2020, 1)
+
+        assert server.requests == [
+            "/data/dane_pomiarowo_obserwacyjne/dane_hydrologiczne"
+            "/dobowe/2020/codz_2020_01.zip"
+        ]
+        assert get_table_counts(exact=True)["hydro_daily"] == 5 * 30
@@ -0,0 +1,234 @@
+"""
+Unit tests for imgwtools.feed module.
+"""
+
+import asyncio
+
+import pytest
+
+from imgwtools.exceptions import IMGWConnectionError
+from imgwtools.feed import ChangeFeed, ChangeFilter
+
+
+def _hydro(station_id, level, river="Wisła", state="normal"):
+    return {
+        "station_id": station_id,
+        "river": river,
+        "water_level_cm": level,
+        "state": state,
+    }
+
+
+class FakeSource:
+    """Async source returning queued responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def feed():
+    return ChangeFeed(sources={}, interval=60)
+
+
+def _drain(sub):
+    batches = []
+    while not sub._queue.empty():
+        batches.append(sub._queue.get_nowait())
+    return batches
+
+
+class TestPublish:
+    """Tests for snapshot diffing."""
+
+    def test_first_publish_adds_all(self, feed):
+        """Test first snapshot is published as additions."""
+        batch = feed.publish("hydro", {"1": _hydro("1", 100), "2": _hydro("2", 200)})
+
+        assert batch.version == 1
+        assert {c.key for c in batch.changes} == {"1", "2"}
+        assert all(c.kind == "added" for c in batch.changes)
+
+    def test_only_changes_published(self, feed):
+        """Test diff contains changed, added and removed records only."""
+        feed.publish("hydro", {"1": _hydro("1", 100), "2": _hydro("2", 200)})
+
+        batch = feed.publish("hydro", {"1": _hydro("1", 105), "3": _hydro("3", 50)})
+
+        kinds = {c.key: c.kind for c in batch.changes}
+        assert kinds == {"1": "changed", "3": "added", "2": "removed"}
+        assert batch.version == 2
+
+    def test_unchanged_snapshot_is_silent(self, feed):
+        """Test identical data produces no batch and keeps the version."""
+        feed.publish("hydro", {"1": _hydro("1", 100)})
+
+        assert feed.publish("hydro", {"1": _hydro("1", 100)}) is None
+        assert feed.version("hydro") == 1
+
+
+class TestSubscriptions:
+    """Tests for fan-out and filters."""
+
+    def test_subscriber_gets_snapshot_then_diffs(self, feed):
+        """Test new subscriber starts from a full batch."""
+        feed.publish("hydro", {"1": _hydro("1", 100)})
+        sub = feed.subscribe()
+        feed.publish("hydro", {"1": _hydro("1", 110)})
+
+        first, second = _drain(sub)
+
+        assert first.full and [c.key for c in first.changes] == ["1"]
+        assert not second.full and second.changes[0].data["water_level_cm"] == 110
+
+    def test_filters(self, feed):
+        """Test station, river, state and topic filters."""
+        by_river = feed.subscribe(ChangeFilter.create(rivers=["wisla"]))
+        by_state = feed.subscribe(ChangeFilter.create(states=["ALARM"]))
+        by_topic = feed.subscribe(ChangeFilter.create(topics=["synop"]))
+
+        feed.publish(
+            "hydro",
+            {
+                "1": _hydro("1", 100),
+                "2": _hydro("2", 300, river="Odra", state="alarm"),
+            },
+        )
+
+        assert [c.key for b in _drain(by_river) for c in b.changes] == ["1"]
+        assert [c.key for b in _drain(by_state) for c in b.changes] == ["2"]
+        assert _drain(by_topic) == []
+
+    def test_filtered_out_change_not_sent(self, feed):
+        """Test diff batches without matching records are skipped."""
+        feed.publish("hydro", {"1": _hydro("1", 100), "2": _hydro("2", 200)})
+        sub = feed.subscribe(ChangeFilter.create(station_ids=["1"]), snapshot=False)
+
+        feed.publish("hydro", {"1": _hydro("1", 100), "2": _hydro("2", 250)})
+
+        assert _drain(sub) == []
+
+    def test_slow_subscriber_resynchronised(self):
+        """Test overflow replaces backlog with full snapshots."""
+        feed = ChangeFeed(sources={}, queue_size=2)
+        sub = feed.subscribe(snapshot=False)
+        for level in range(5):
+            feed.publish("hydro", {"1": _hydro("1", level)})
+
+        batches = _drain(sub)
+
+        assert len(batches) == 1
+        assert batches[0].full
+        assert batches[0].changes[0].data["water_level_cm"] == 4
+
+    def test_close_unsubscribes(self, feed):
+        """Test leaving the context manager removes the subscriber."""
+        with feed.subscribe():
+            assert feed.subscriber_count == 1
+
+        assert feed.subscriber_count == 0
+
+    async def test_async_iteration(self, feed):
+        """Test async iteration ends when the subscription is closed."""
+        sub = feed.subscribe(snapshot=False)
+        feed.publish("synop", {"1": {"station_id": "1", "temperature_c": 5.0}})
+        sub.close()
+
+        batches = [batch async for batch in sub]
+
+        assert [b.topic for b in batches] == ["synop"]
+
+    async def test_get_timeout(self, feed):
+        """Test get returns None when nothing arrives in time."""
+        with feed.subscribe() as sub:
+            assert await sub.get(timeout=0.01) is None
+
+
+class TestPolling:
+    """Tests for polling sources."""
+
+    async def test_poll_publishes_all_topics(self):
+        """Test one poll fetches every source once."""
+        hydro = FakeSource({"1": _hydro("1", 100)})
+        synop = FakeSource({"2": {"station_id": "2"}})
+        feed = ChangeFeed(sources={"hydro": hydro, "synop": synop})
+
+        batches = await feed.poll()
+
+        assert {b.topic for b in batches} == {"hydro", "synop"}
+        assert hydro.calls == synop.calls == 1
+
+    async def test_failed_source_keeps_snapshot(self):
+        """Test IMGW errors keep the last snapshot and are reported."""
+        hydro = FakeSource({"1": _hydro("1", 100)}, IMGWConnectionError("offline"))
+        feed = ChangeFeed(sources={"hydro": hydro})
+        await feed.poll()
+
+        assert await feed.poll() == []
+        assert "offline" in feed.last_errors["hydro"]
+        assert "1" in feed.snapshot("hydro")
+
+    async def test_unexpected_error_keeps_snapshot(self):
+        """Test other exceptions (e.g. parsing bugs) are handled like IMGW errors."""
+        hydro = FakeSource({"1": _hydro("1", 100)}, KeyError("stan_wody"))
+        feed = ChangeFeed(sources={"hydro": hydro})
+        await feed.poll()
+
+        assert await feed.poll() == []
+        assert "stan_wody" in feed.last_errors["hydro"]
+        assert "1" in feed.snapshot("hydro")
+
+    async def test_loop_survives_errors(self, monkeypatch):
+        """Test an exception in one iteration does not stop the poll loop."""
+        feed = ChangeFeed(sources={}, interval=0.01)
+        calls = 0
+
+        async def poll():
+            nonlocal calls
+            calls += 1
+            feed._polled_at = None
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(feed, "poll", poll)
+        feed.subscribe()
+        task = asyncio.create_task(feed.run_poll_loop())
+        try:
+            await asyncio.sleep(0.1)
+            assert calls > 1
+            assert not task.done()
+        finally:
+            task.cancel()
+
+    async def test_ensure_fresh_polls_once_per_interval(self):
+        """Test concurrent readers share one upstream request."""
+        hydro = FakeSource({"1": _hydro("1", 100)})
+        feed = ChangeFeed(sources={"hydro": hydro}, interval=60)
+
+        await asyncio.gather(*(feed.ensure_fresh() for _ in range(5)))
+
+        assert hydro.calls == 1
+
+    async def test_loop_waits_for_subscribers(self):
+        """Test upstream is not polled without subscribers."""
+        hydro = FakeSource({"1": _hydro("1", 100)})
+        feed = ChangeFeed(sources={"hydro": hydro}, interval=60)
+        task = asyncio.create_task(feed.run_poll_loop())
+        try:
+            await asyncio.sleep(0.01)
+            assert hydro.calls == 0
+
+            sub = feed.subscribe()
+            batch = await sub.get(timeout=1)
+
+            assert batch.topic == "hydro"
+            assert hydro.calls == 1
+        finally:
+            task.cancel()
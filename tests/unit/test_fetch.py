@@ -2,7 +2,9 @@
 Unit tests for imgwtools.fetch module.
 """
 
+import httpx
 import pytest
+import respx
 from unittest.mock import patch, MagicMock, AsyncMock
 
 from imgwtools.fetch import (
@@ -10,12 +12,16 @@ from imgwtools.fetch import (
     fetch_pmaxtp_async,
     fetch_hydro_current,
     fetch_hydro_current_async,
+    fetch_hydro_current_many,
+    fetch_hydro_current_many_async,
     fetch_synop,
     fetch_synop_async,
+    fetch_synop_many,
     fetch_warnings,
     download_hydro_data,
     download_meteo_data,
 )
+from imgwtools.core.url_builder import IMGW_API_URL
 from imgwtools.models import PMaXTPResult, HydroCurrentData, SynopData, WarningData
 from imgwtools.exceptions import (
     IMGWConnectionError,
@@ -258,6 +264,76 @@ class TestFetchSynop:
         assert "Białystok" in result[0].station_name
 
 
+class TestFetchCurrentMany:
+    """Tests for fetch_hydro_current_many and fetch_synop_many."""
+
+    @respx.mock
+    def test_fan_out(self, hydro_current_api_response):
+        """Test few stations are requested one by one, unknown ones skipped."""
+        by_id = {item["id_stacji"]: item for item in hydro_current_api_response}
+        route = respx.get(url__startswith=f"{IMGW_API_URL}/hydro/id/").mock(
+            side_effect=lambda request: (
+                httpx.Response(200, json=by_id[sid])
+                if (sid := request.url.path.rsplit("/", 1)[-1]) in by_id
+                else httpx.Response(404)
+            )
+        )
+
+        result = fetch_hydro_current_many(["151140030", "150160180", "1", "151140030"])
+
+        assert route.call_count == 3  # duplicates requested once
+        assert list(result) == ["151140030", "150160180"]
+        assert result["150160180"].station_name == "Kłodzko"
+
+    @respx.mock
+    def test_whole_feed(self, synop_api_response):
+        """Test more stations than max_fanout are filtered from one download."""
+        route = respx.get(f"{IMGW_API_URL}/synop").mock(
+            return_value=httpx.Response(200, json=synop_api_response)
+        )
+        ids = [item["id_stacji"] for item in synop_api_response]
+
+        result = fetch_synop_many([*reversed(ids), "missing"], max_fanout=1)
+
+        assert route.call_count == 1
+        assert list(result) == [*reversed(ids)]
+        assert all(isinstance(s, SynopData) for s in result.values())
+
+    @respx.mock
+    async def test_shared_client_and_errors(self, hydro_current_api_response):
+        """Test a passed client is reused and failures raise IMGWConnectionError."""
+        respx.get(f"{IMGW_API_URL}/hydro").mock(
+            return_value=httpx.Response(200, json=hydro_current_api_response)
+        )
+        respx.get(url__startswith=f"{IMGW_API_URL}/hydro/id/").mock(
+            return_value=httpx.Response(500)
+        )
+
+        async with httpx.AsyncClient() as client:
+            result = await fetch_hydro_current_many_async(
+                ["150160180"], max_fanout=0, client=client
+            )
+            assert list(result) == ["150160180"]
+            assert not client.is_closed
+
+            with pytest.raises(IMGWConnectionError):
+                await fetch_hydro_current_many_async(["150160180"], client=client)
+
+        assert await fetch_hydro_current_many_async([]) == {}
+
+    @respx.mock
+    def test_invalid_input(self):
+        """Test bad concurrency and non-JSON responses raise IMGW errors."""
+        with pytest.raises(IMGWValidationError):
+            fetch_synop_many(["12375"], concurrency=0)
+
+        respx.get(url__startswith=f"{IMGW_API_URL}/synop/id/").mock(
+            return_value=httpx.Response(200, text="<html>maintenance</html>")
+        )
+        with pytest.raises(IMGWDataError):
+            fetch_synop_many(["12375"])
+
+
 class TestFetchWarnings:
     """Tests for fetch_warnings function."""
 
@@ -0,0 +1,173 @@
+"""
+Unit tests for imgwtools.idf module.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from imgwtools.exceptions import IMGWDataError, IMGWValidationError  # noqa: E402
+from imgwtools.idf import IDFCurves, probability_from_return_period  # noqa: E402
+from imgwtools.models import PMaXTPData, PMaXTPResult  # noqa: E402
+
+
+@pytest.fixture
+def pmaxtp_data(pmaxtp_api_response):
+    return PMaXTPData.from_api_response(pmaxtp_api_response)
+
+
+class TestIDFCurvesFromPmaxtp:
+    """Tests for building IDF curves from PMAXTP data."""
+
+    def test_single_site(self, pmaxtp_data):
+        """Test tabulated values are reproduced exactly."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        assert idf.n_sites == 1
+        assert list(idf.durations) == [5, 10, 15, 30, 60]
+        assert list(idf.probabilities) == [50, 20, 10, 5, 2, 1]
+        assert idf.depth(15, probability_percent=50)[0] == pytest.approx(5.1)
+        assert idf.depth(60, probability_percent=10)[0] == pytest.approx(16.5)
+
+    def test_multiple_sites_keep_coordinates(self, pmaxtp_data):
+        """Test building curves for several PMaXTPResult objects."""
+        results = [
+            PMaXTPResult(method="POT", latitude=52.2, longitude=21.0, data=pmaxtp_data),
+            PMaXTPResult(method="POT", latitude=50.1, longitude=19.9, data=pmaxtp_data),
+        ]
+
+        idf = IDFCurves.from_pmaxtp(results)
+
+        assert idf.n_sites == 2
+        assert idf.sites == [(52.2, 21.0), (50.1, 19.9)]
+        assert idf.depth(30, probability_percent=1).shape == (2,)
+
+    def test_prefixed_keys(self):
+        """Test keys in 't15'/'p50' format are accepted."""
+        data = PMaXTPData(
+            ks={
+                "t15": {"p50": 5.0, "p10": 9.0},
+                "t60": {"p50": 10.0, "p10": 18.0},
+            }
+        )
+
+        idf = IDFCurves.from_pmaxtp(data)
+
+        assert idf.depth(60, probability_percent=10)[0] == pytest.approx(18.0)
+
+    def test_insufficient_data_raises(self):
+        """Test that a single duration cannot form a curve."""
+        data = PMaXTPData(ks={"15": {"50": 5.0, "10": 9.0}})
+
+        with pytest.raises(IMGWDataError):
+            IDFCurves.from_pmaxtp(data)
+
+    def test_to_idf_curves(self, pmaxtp_data):
+        """Test convenience method on PMaXTPData."""
+        idf = pmaxtp_data.to_idf_curves()
+
+        assert isinstance(idf, IDFCurves)
+
+
+class TestIDFCurvesDepth:
+    """Tests for depth and intensity interpolation."""
+
+    def test_log_log_interpolation_between_durations(self, pmaxtp_data):
+        """Test interpolation is linear in log-log space."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        result = idf.depth(20, probability_percent=50)[0]
+
+        expected = np.exp(
+            np.interp(np.log(20), np.log([15, 30]), np.log([5.1, 7.0]))
+        )
+        assert result == pytest.approx(expected)
+
+    def test_return_period_matches_probability(self, pmaxtp_data):
+        """Test return period is converted to probability."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        by_t = idf.depth(30, return_period_years=10)
+        by_p = idf.depth(30, probability_percent=10)
+
+        assert by_t[0] == pytest.approx(by_p[0])
+
+    def test_array_input_shape(self, pmaxtp_data):
+        """Test array of durations broadcasts over sites."""
+        idf = IDFCurves.from_pmaxtp([pmaxtp_data, pmaxtp_data])
+
+        result = idf.depth([10, 20, 45], probability_percent=5)
+
+        assert result.shape == (2, 3)
+        assert np.all(np.diff(result, axis=1) > 0)
+
+    def test_intermediate_probability_monotonic(self, pmaxtp_data):
+        """Test depth grows with return period between tabulated points."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        depths = idf.depth(30, probability_percent=[20, 15, 10])[0]
+
+        assert depths[0] < depths[1] < depths[2]
+
+    def test_intensity(self, pmaxtp_data):
+        """Test intensity is depth divided by duration in hours."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        assert idf.intensity(30, probability_percent=50)[0] == pytest.approx(14.0)
+
+    def test_requires_exactly_one_probability_argument(self, pmaxtp_data):
+        """Test probability and return period are mutually exclusive."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        with pytest.raises(IMGWValidationError):
+            idf.depth(30)
+        with pytest.raises(IMGWValidationError):
+            idf.depth(30, probability_percent=10, return_period_years=10)
+
+    def test_probability_from_return_period(self):
+        """Test return period conversion."""
+        assert probability_from_return_period(100) == 1.0
+
+        with pytest.raises(IMGWValidationError):
+            probability_from_return_period(1)
+
+
+class TestIDFCurvesHyetograph:
+    """Tests for design hyetograph generation."""
+
+    @pytest.mark.parametrize("method", ["block", "alternating_block", "euler_ii"])
+    def test_total_depth_preserved(self, pmaxtp_data, method):
+        """Test hyetograph sums to the design depth."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        hyeto = idf.hyetograph(60, 5, probability_percent=10, method=method)
+
+        assert hyeto.shape == (1, 12)
+        assert hyeto.sum() == pytest.approx(16.5)
+
+    def test_euler_ii_peak_at_one_third(self, pmaxtp_data):
+        """Test Euler type II places the peak at 1/3 of the duration."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        hyeto = idf.hyetograph(60, 5, probability_percent=10, method="euler_ii")[0]
+
+        assert int(np.argmax(hyeto)) == 4
+        assert np.all(np.diff(hyeto[:5]) >= 0)
+        assert np.all(np.diff(hyeto[4:]) <= 0)
+
+    def test_alternating_block_peak_in_middle(self, pmaxtp_data):
+        """Test alternating block method places the peak at the centre."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        hyeto = idf.hyetograph(
+            60, 5, probability_percent=10, method="alternating_block"
+        )[0]
+
+        assert int(np.argmax(hyeto)) == 6
+
+    def test_invalid_time_step(self, pmaxtp_data):
+        """Test that a non-dividing time step raises."""
+        idf = IDFCurves.from_pmaxtp(pmaxtp_data)
+
+        with pytest.raises(IMGWValidationError):
+            idf.hyetograph(60, 7, probability_percent=10)
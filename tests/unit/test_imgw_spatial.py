@@ -0,0 +1,93 @@
+"""
+Unit tests for imgwtools.core.imgw_spatial (reprojection helpers).
+"""
+
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyproj")
+pytest.importorskip("matplotlib")
+pytest.importorskip("requests")
+
+from imgwtools.core.imgw_spatial import (  # noqa: E402
+    PUWG1992,
+    WGS84,
+    epsg2180_to_wgs84,
+    get_transformer,
+    load_station_locations_epsg2180,
+    wgs84_to_epsg2180,
+)
+
+# (lat, lon) of Warszawa, Kraków, Gdańsk and Chałupki
+POINTS = [(52.23, 21.01), (50.06, 19.94), (54.35, 18.65), (49.92, 18.33)]
+
+
+class TestTransformerCache:
+    """Tests for per-thread transformer reuse."""
+
+    def test_reused_across_calls(self):
+        """Test the same CRS pair returns the cached transformer."""
+        first = get_transformer(WGS84, PUWG1992)
+
+        assert get_transformer(WGS84, PUWG1992) is first
+        assert get_transformer(PUWG1992, WGS84) is not first
+
+    def test_separate_per_thread(self):
+        """Test other threads build their own transformer."""
+        main = get_transformer(WGS84, PUWG1992)
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(get_transformer(WGS84, PUWG1992))
+        )
+        thread.start()
+        thread.join()
+
+        assert other[0] is not main
+
+
+class TestReprojection:
+    """Tests for WGS84 <-> EPSG:2180 reprojection."""
+
+    def test_batch_matches_single_points(self):
+        """Test one array call gives the same result as per-point calls."""
+        lat, lon = np.array(POINTS).T
+        x, y = wgs84_to_epsg2180(lat, lon)
+
+        assert x.shape == y.shape == (len(POINTS),)
+        for i, (point_lat, point_lon) in enumerate(POINTS):
+            single_x, single_y = wgs84_to_epsg2180(point_lat, point_lon)
+            assert float(single_x) == pytest.approx(x[i])
+            assert float(single_y) == pytest.approx(y[i])
+
+    def test_known_point_and_round_trip(self):
+        """Test Warszawa lands at the expected PUWG 1992 position and back."""
+        x, y = wgs84_to_epsg2180(52.23, 21.01)
+        assert float(x) == pytest.approx(637_000, abs=5_000)  # easting
+        assert float(y) == pytest.approx(486_000, abs=5_000)  # northing
+
+        lat, lon = epsg2180_to_wgs84(x, y)
+        assert float(lat) == pytest.approx(52.23)
+        assert float(lon) == pytest.approx(21.01)
+
+    def test_load_station_locations(self, tmp_path):
+        """Test the locations CSV is reprojected in one batch, skipping NA."""
+        path = tmp_path / "locations.csv"
+        path.write_text("id,X,Y\n1,21.01,52.23\n2,NA,NA\n3,19.94,50.06\n")
+
+        ids, x, y = load_station_locations_epsg2180(path)
+
+        assert ids == ["1", "3"]
+        expected_x, expected_y = wgs84_to_epsg2180([52.23, 50.06], [21.01, 19.94])
+        assert x == pytest.approx(expected_x)
+        assert y == pytest.approx(expected_y)
+
+    def test_load_empty_locations(self, tmp_path):
+        """Test a file without coordinates gives empty arrays."""
+        path = tmp_path / "locations.csv"
+        path.write_text("id,X,Y\n1,NA,NA\n")
+
+        ids, x, y = load_station_locations_epsg2180(path)
+
+        assert ids == [] and x.size == 0 and y.size == 0
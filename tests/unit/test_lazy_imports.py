@@ -0,0 +1,99 @@
+"""
+Unit tests for lazy imports (top-level package and CLI subcommands).
+"""
+
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import imgwtools
+
+SRC = str(Path(__file__).resolve().parents[2] / "src")
+
+
+def _loaded_modules(code: str) -> set[str]:
+    """Modules in sys.modules after running code in a fresh interpreter."""
+    script = f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env={"PYTHONPATH": SRC},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+class TestPackage:
+    """Tests for the lazy top-level package."""
+
+    def test_all_names_resolve(self):
+        """Test every name in __all__ is importable."""
+        for name in imgwtools.__all__:
+            assert getattr(imgwtools, name) is not None
+        assert set(imgwtools.__all__) <= set(dir(imgwtools))
+
+    def test_unknown_name(self):
+        """Test unknown attributes raise AttributeError."""
+        with pytest.raises(AttributeError):
+            imgwtools.no_such_function  # noqa: B018
+
+    def test_import_is_light(self):
+        """Test import imgwtools does not load httpx or pydantic."""
+        modules = _loaded_modules("import imgwtools")
+        assert "httpx" not in modules
+        assert "pydantic" not in modules
+
+
+class TestCli:
+    """Tests for lazily loaded CLI subcommands."""
+
+    def test_startup_is_light(self):
+        """Test the CLI module does not import subcommands or rich."""
+        modules = _loaded_modules("import imgwtools.cli.main")
+        assert "imgwtools.cli.db" not in modules
+        assert "imgwtools.config" not in modules
+        assert "httpx" not in modules
+        assert "rich" not in modules
+
+    def test_help_and_subcommands(self):
+        """Test help lists lazy groups and groups load on invocation."""
+        testing = pytest.importorskip("typer.testing")
+        from imgwtools.cli.main import app
+
+        runner = testing.CliRunner()
+        result = runner.invoke(app, ["--help"])
+        assert result.exit_code == 0
+        assert "Zarzadzanie baza danych cache" in result.output
+
+        result = runner.invoke(app, ["db", "--help"])
+        assert result.exit_code == 0
+        assert "cache" in result.output
+
+        result = runner.invoke(app, ["version"])
+        assert imgwtools.__version__ in result.output
+
+    @pytest.mark.parametrize("group", ["db", "fetch", "list", "admin"])
+    def test_group_help_matches_eager(self, group):
+        """Test lazy groups render help like groups added with add_typer."""
+        typer = pytest.importorskip("typer")
+        testing = pytest.importorskip("typer.testing")
+        from imgwtools.cli.main import _MainGroup, app
+
+        module_name, help_text = _MainGroup.lazy_commands[group]
+        eager = typer.Typer(
+            name="imgw", help=app.info.help, add_completion=False, rich_markup_mode=None
+        )
+        eager.add_typer(
+            importlib.import_module(module_name).app, name=group, help=help_text
+        )
+
+        runner = testing.CliRunner()
+        lazy_help = runner.invoke(app, [group, "--help"], prog_name="imgw")
+        eager_help = runner.invoke(eager, [group, "--help"], prog_name="imgw")
+        assert lazy_help.exit_code == 0
+        assert lazy_help.output == eager_help.output
+        assert "--install-completion" not in lazy_help.output
@@ -0,0 +1,181 @@
+"""
+Unit tests for imgwtools.web.map_payload module.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+import respx
+
+from imgwtools.web.map_payload import COORD_SCALE, MapPayloadCache
+
+
+def _feed(states=None):
+    states = states or {"1": "normal", "2": "alarm"}
+    return {
+        "stations": [
+            {"id": "1", "n": "KŁODZKO", "la": 50.44, "lo": 16.65, "s": states.get("1")},
+            {"id": "2", "n": "CHAŁUPKI", "la": 49.9213, "lo": 18.3275, "s": states.get("2")},
+            {"id": "3", "n": "BEZ WSPÓŁRZĘDNYCH", "la": None, "lo": None, "s": "normal"},
+        ],
+        "numOfAlarmStates": 1,
+    }
+
+
+def _load(payload):
+    return json.loads(payload.body)
+
+
+@pytest.fixture
+def cache():
+    cache = MapPayloadCache(url="https://hydro.test/map")
+    cache.update(_feed())
+    return cache
+
+
+class TestMapPayloadCache:
+    """Tests for building and serving map payloads."""
+
+    def test_empty_cache(self):
+        """Test nothing is served before the first refresh."""
+        cache = MapPayloadCache()
+
+        assert not cache.is_loaded
+        assert cache.stations() is None
+        assert cache.positions() is None
+        assert cache.states() is None
+
+    def test_legacy_payload(self, cache):
+        """Test combined payload keeps the original /map/stations format."""
+        data = _load(cache.stations())
+
+        assert [s["id"] for s in data["stations"]] == ["1", "2"]
+        assert data["stations"][1]["state"] == "alarm"
+        assert data["summary"]["total"] == 2
+        assert data["summary"]["alarm"] == 1
+
+    def test_position_formats(self, cache):
+        """Test JSON, GeoJSON and compact positions."""
+        plain = _load(cache.positions("json"))
+        geojson = _load(cache.positions("geojson"))
+        compact = _load(cache.positions("compact"))
+
+        assert plain["stations"][0] == {
+            "id": "1", "name": "KŁODZKO", "lat": 50.44, "lon": 16.65
+        }
+        assert geojson["type"] == "FeatureCollection"
+        assert geojson["features"][1]["geometry"]["coordinates"] == [18.3275, 49.9213]
+        assert compact["ids"] == ["1", "2"]
+        assert compact["lat"][1] == round(49.9213 * COORD_SCALE)
+        assert cache.positions("xml") is None
+
+    def test_unchanged_refresh_keeps_versions(self, cache):
+        """Test identical data keeps versions and ETags."""
+        etag = cache.states().etag
+
+        cache.update(_feed())
+
+        assert _load(cache.states())["version"] == 1
+        assert _load(cache.positions())["version"] == 1
+        assert cache.states().etag == etag
+
+    def test_state_change_bumps_states_only(self, cache):
+        """Test state change keeps positions payload untouched."""
+        positions = cache.positions()
+
+        cache.update(_feed({"1": "warning", "2": "alarm"}))
+
+        assert cache.positions() is positions
+        assert _load(cache.states())["version"] == 2
+        assert _load(cache.stations())["stations"][0]["state"] == "warning"
+
+    def test_states_diff(self, cache):
+        """Test 'since' returns only stations whose state changed."""
+        cache.update(_feed({"1": "warning", "2": "alarm"}))
+
+        diff = _load(cache.states(since=1))
+
+        assert diff["full"] is False
+        assert diff["since"] == 1
+        assert diff["states"] == {"1": "warning"}
+        assert diff["removed"] == []
+        assert cache.states(since=1) is cache.states(since=1)
+
+    def test_unknown_since_returns_full(self, cache):
+        """Test versions outside the history fall back to a full payload."""
+        full = _load(cache.states(since=99))
+
+        assert full["full"] is True
+        assert full["states"] == {"1": "normal", "2": "alarm"}
+
+    def test_history_is_bounded(self):
+        """Test only diff_history versions are kept for diffs."""
+        cache = MapPayloadCache(diff_history=2)
+        for state in ("normal", "warning", "alarm"):
+            cache.update(_feed({"1": state, "2": state}))
+
+        assert _load(cache.states(since=1))["full"] is True
+        assert _load(cache.states(since=2))["full"] is False
+
+
+class TestMapPayloadRefresh:
+    """Tests for fetching the upstream feed."""
+
+    @respx.mock
+    async def test_refresh(self):
+        """Test successful refresh loads payloads."""
+        respx.get("https://hydro.test/map").mock(
+            return_value=httpx.Response(200, json=_feed())
+        )
+        cache = MapPayloadCache(url="https://hydro.test/map")
+
+        await cache.ensure_fresh()
+
+        assert cache.is_loaded
+        assert cache.error is None
+        assert len(_load(cache.stations())["stations"]) == 2
+
+    @respx.mock
+    async def test_failed_refresh_keeps_payloads(self, cache):
+        """Test upstream failure keeps the previous data and records the error."""
+        respx.get("https://hydro.test/map").mock(return_value=httpx.Response(503))
+        before = cache.stations()
+
+        assert await cache.refresh() is False
+        assert cache.stations() is before
+        assert cache.error is not None
+
+    @respx.mock
+    async def test_malformed_feed_keeps_payloads(self, cache):
+        """Test records that fail to parse keep the previous data."""
+        feed = _feed()
+        feed["stations"][0]["la"] = "n/a"
+        respx.get("https://hydro.test/map").mock(
+            return_value=httpx.Response(200, json=feed)
+        )
+        before = cache.stations()
+
+        assert await cache.refresh() is False
+        assert cache.stations() is before
+        assert cache.error is not None
+
+    async def test_loop_survives_errors(self, monkeypatch):
+        """Test an unexpected exception does not stop the refresh loop."""
+        cache = MapPayloadCache(url="https://hydro.test/map", refresh_seconds=0.01)
+        calls = 0
+
+        async def refresh():
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(cache, "refresh", refresh)
+        task = asyncio.create_task(cache.run_refresh_loop())
+        try:
+            await asyncio.sleep(0.1)
+            assert calls > 1
+            assert not task.done()
+        finally:
+            task.cancel()
@@ -0,0 +1,108 @@
+"""
+Unit tests for imgwtools.db.matrix module.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydantic_settings")
+
+from imgwtools.config import settings  # noqa: E402
+from imgwtools.db.matrix import build_daily_matrix  # noqa: E402
+from imgwtools.db.models import HydroDailyRecord  # noqa: E402
+from imgwtools.db.repository import HydroRepository  # noqa: E402
+from imgwtools.db.schema import init_db  # noqa: E402
+
+
+def _daily(code, day, level=None, flow=None):
+    """Daily record in January 2020 (hydrological year 2020, month 3)."""
+    return HydroDailyRecord(
+        station_code=code,
+        hydro_year=2020,
+        hydro_month=3,
+        day=day,
+        calendar_month=1,
+        water_level_cm=level,
+        flow_m3s=flow,
+        measurement_date=f"2020-01-{day:02d}",
+    )
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_enabled", True)
+    monkeypatch.setattr(settings, "db_path", tmp_path / "test.db")
+    init_db()
+    repo = HydroRepository()
+    repo.insert_daily_batch(
+        [
+            _daily("A", 1, level=100, flow=1.0),
+            _daily("A", 3, level=120, flow=3.0),
+            _daily("B", 2, level=200, flow=None),
+            _daily("B", 3, level=210, flow=30.0),
+        ]
+    )
+    return repo
+
+
+class TestBuildDailyMatrix:
+    """Tests for dates x stations matrices."""
+
+    def test_dense_matrix_with_mask(self, repo):
+        """Test values land at (date, station) with gaps masked."""
+        m = build_daily_matrix(["A", "B"], "Q")
+
+        assert m.shape == (3, 2)
+        assert str(m.dates[0]) == "2020-01-01"
+        assert str(m.dates[-1]) == "2020-01-03"
+        np.testing.assert_array_equal(
+            m.values, [[1.0, np.nan], [np.nan, np.nan], [3.0, 30.0]]
+        )
+        assert m.mask.tolist() == [[False, True], [True, True], [False, False]]
+        assert m.masked().sum() == 34.0
+
+    def test_column_order_and_range(self, repo):
+        """Test explicit column order, date range and missing stations."""
+        m = build_daily_matrix(
+            ["B", "X", "A"], "H", start_date="2019-12-31", end_date="2020-01-02"
+        )
+
+        assert m.station_codes == ["B", "X", "A"]
+        assert m.shape == (3, 3)
+        np.testing.assert_array_equal(m.column("A"), [np.nan, 100.0, np.nan])
+        np.testing.assert_array_equal(m.column("B"), [np.nan, np.nan, 200.0])
+        assert m.mask[:, 1].all()
+
+    def test_small_batches(self, repo):
+        """Test batched fetching gives the same matrix."""
+        full = build_daily_matrix(["A", "B"], "H")
+        batched = build_daily_matrix(["A", "B"], "H", batch_size=1)
+
+        np.testing.assert_array_equal(full.values, batched.values)
+
+    def test_no_data(self, repo):
+        """Test stations without data give an empty matrix."""
+        m = build_daily_matrix(["X"], "Q")
+
+        assert m.shape == (0, 1)
+        assert build_daily_matrix([], "Q").shape == (0, 0)
+
+    def test_invalid_range(self, repo):
+        """Test reversed date range is rejected."""
+        with pytest.raises(ValueError):
+            build_daily_matrix(
+                ["A"], "Q", start_date="2020-02-01", end_date="2020-01-01"
+            )
+
+
+class TestRepositoryMatrix:
+    """Tests for the repository entry point."""
+
+    def test_hydro_year_range(self, repo):
+        """Test hydrological years map to November-October rows."""
+        m = repo.get_daily_matrix(["A"], "H", start_year=2020, end_year=2020)
+
+        assert str(m.dates[0]) == "2019-11-01"
+        assert str(m.dates[-1]) == "2020-10-31"
+        assert m.shape == (366, 1)
+        assert np.nansum(m.values) == 220.0
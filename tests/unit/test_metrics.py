@@ -0,0 +1,131 @@
+"""
+Unit tests for imgwtools.metrics (runtime metrics and timing helpers).
+"""
+
+import pytest
+
+from imgwtools.exceptions import IMGWConnectionError, IMGWValidationError
+from imgwtools.metrics import (
+    DB_QUERY_SECONDS,
+    UPSTREAM_ERRORS,
+    UPSTREAM_SECONDS,
+    MetricsRegistry,
+    instrument_query,
+    instrument_upstream,
+)
+
+
+class TestRegistry:
+    """Tests for metric types and Prometheus text rendering."""
+
+    def test_counter_and_gauge(self):
+        """Test counter/gauge values and label escaping."""
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests", ["path"])
+        counter.inc(path='a"b')
+        counter.inc(2, path='a"b')
+        gauge = registry.gauge("in_flight", "In flight")
+        gauge.inc()
+        gauge.dec()
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{path="a\\"b"} 3' in text
+        assert "in_flight 0" in text
+
+    def test_histogram_buckets_cumulative(self):
+        """Test histogram buckets are cumulative with +Inf, sum and count."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("duration", "Duration", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+        assert 'duration_bucket{le="0.1"} 1' in lines
+        assert 'duration_bucket{le="1"} 3' in lines
+        assert 'duration_bucket{le="+Inf"} 4' in lines
+        assert "duration_sum 6.25" in lines
+        assert "duration_count 4" in lines
+
+    def test_get_or_create(self):
+        """Test metrics are shared by name and label names are enforced."""
+        registry = MetricsRegistry()
+        counter = registry.counter("x_total", "X", ["a"])
+        assert registry.counter("x_total", "X", ["a"]) is counter
+        with pytest.raises(ValueError):
+            registry.gauge("x_total", "X")
+        with pytest.raises(ValueError):
+            counter.inc(b="1")
+
+
+class TestInstrumentation:
+    """Tests for upstream and query decorators."""
+
+    def test_upstream_sync(self):
+        """Test durations and failures are recorded per endpoint."""
+
+        @instrument_upstream("test_sync")
+        def fetch(fail: bool):
+            if fail:
+                raise IMGWConnectionError("down")
+            return 1
+
+        count = UPSTREAM_SECONDS.count(endpoint="test_sync")
+        errors = UPSTREAM_ERRORS.value(endpoint="test_sync")
+        assert fetch(False) == 1
+        with pytest.raises(IMGWConnectionError):
+            fetch(True)
+        assert UPSTREAM_SECONDS.count(endpoint="test_sync") == count + 2
+        assert UPSTREAM_ERRORS.value(endpoint="test_sync") == errors + 1
+
+    async def test_upstream_async_validation(self):
+        """Test invalid arguments are not counted as upstream errors."""
+
+        @instrument_upstream("test_async")
+        async def fetch():
+            raise IMGWValidationError("bad station")
+
+        errors = UPSTREAM_ERRORS.value(endpoint="test_async")
+        with pytest.raises(IMGWValidationError):
+            await fetch()
+        assert UPSTREAM_ERRORS.value(endpoint="test_async") == errors
+
+    def test_query(self):
+        """Test query decorator labels by function name."""
+
+        @instrument_query
+        def lookup_test_query():
+            return []
+
+        assert lookup_test_query() == []
+        assert lookup_test_query.__name__ == "lookup_test_query"
+        assert DB_QUERY_SECONDS.count(query="lookup_test_query") == 1
+
+
+class TestMetricsEndpoint:
+    """Tests for GET /metrics and the API middleware."""
+
+    def test_route_template_label(self, monkeypatch):
+        """Test API requests are labelled with route templates."""
+        pytest.importorskip("pydantic_settings")
+        testclient = pytest.importorskip("fastapi.testclient")
+        from imgwtools.api.main import app
+        from imgwtools.config import settings
+
+        client = testclient.TestClient(app)
+        assert client.get("/health").status_code == 200
+        assert client.get("/no/such/path").status_code == 404
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert (
+            'imgw_http_requests_total{method="GET",route="/health",status="200"}'
+            in text
+        )
+        assert 'route="unmatched",status="404"' in text
+        assert "/no/such/path" not in text
+
+        monkeypatch.setattr(settings, "metrics_enabled", False)
+        assert client.get("/metrics").status_code == 404
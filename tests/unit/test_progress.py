@@ -0,0 +1,99 @@
+"""
+Unit tests for imgwtools.db.progress (cache import progress events).
+"""
+
+import io
+import json
+
+import httpx
+import pytest
+
+from imgwtools import set_base_url
+from imgwtools.db.progress import CacheEvent, JsonEventLogger
+from imgwtools.testing import FakeIMGWServer
+
+
+class TestCacheEvent:
+    """Tests for event throughput and serialisation."""
+
+    def test_rate_and_eta(self):
+        """Test rate and ETA from completed/total/elapsed."""
+        event = CacheEvent("download", completed=500, total=2000, elapsed=2.0)
+        assert event.rate == 250.0
+        assert event.eta == 6.0
+
+    def test_unknown_total(self):
+        """Test ETA is None without a total and rate None at elapsed 0."""
+        assert CacheEvent("download", completed=10, elapsed=1.0).eta is None
+        assert CacheEvent("parse").rate is None
+
+    def test_json_logger(self):
+        """Test logger writes finished stages only unless progress=True."""
+        stream = io.StringIO()
+        logger = JsonEventLogger(stream)
+        logger(CacheEvent("download", source_file="a.zip", completed=1))
+        logger(CacheEvent("done", source_file="a.zip", completed=5, finished=True))
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["stage"] == "done"
+
+
+class TestCacheManagerEvents:
+    """Tests for events emitted by HydroCacheManager."""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        pytest.importorskip("pydantic_settings")
+        from imgwtools.config import settings
+        from imgwtools.db.cache_manager import HydroCacheManager
+        from imgwtools.db.schema import init_db
+
+        monkeypatch.setattr(settings, "db_enabled", True)
+        monkeypatch.setattr(settings, "db_path", tmp_path / "test.db")
+        init_db()
+        with FakeIMGWServer(n_stations=5, seed=1) as fake:
+            set_base_url(fake.base_url)
+            yield HydroCacheManager(), fake
+        set_base_url(None)
+
+    async def test_file_events(self, manager):
+        """Test download/parse/insert/done sequence, then skipped."""
+        manager, _ = manager
+        events: list[CacheEvent] = []
+
+        await manager.ensure_data_cached("dobowe", 2020, 1, on_event=events.append)
+        finished = [e for e in events if e.finished]
+        assert [e.stage for e in finished] == ["download", "parse", "insert", "done"]
+
+        download = finished[0]
+        assert download.source_file == "codz_2020_01.zip"
+        assert download.completed == download.total > 0
+        assert finished[1].completed == 5 * 30
+        assert set(finished[-1].stage_seconds) == {"download", "parse", "insert"}
+
+        events.clear()
+        await manager.ensure_data_cached("dobowe", 2020, 1, on_event=events.append)
+        assert [e.stage for e in events] == ["skipped"]
+
+    async def test_error_event(self, manager):
+        """Test failed downloads emit an error event."""
+        manager, fake = manager
+        fake.failure_rate = 1.0
+        events: list[CacheEvent] = []
+
+        with pytest.raises(httpx.HTTPError):
+            await manager.ensure_data_cached("dobowe", 2020, 2, on_event=events.append)
+        assert events[-1].stage == "error"
+        assert events[-1].source_file == "codz_2020_02.zip"
+
+    async def test_year_events(self, manager):
+        """Test cache_year_range reports years processed."""
+        manager, _ = manager
+        events: list[CacheEvent] = []
+
+        await manager.cache_year_range("miesieczne", 2020, 2021, on_event=events.append)
+        years = [e for e in events if e.stage == "year"]
+        assert [(e.completed, e.total) for e in years] == [(1, 2), (2, 2)]
+        assert years[-1].finished
+        assert sum(e.stage == "done" for e in events) == 2
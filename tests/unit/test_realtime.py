@@ -0,0 +1,169 @@
+"""
+Unit tests for imgwtools.db.realtime module.
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from imgwtools.config import settings  # noqa: E402
+from imgwtools.db import realtime  # noqa: E402
+from imgwtools.db.realtime import (  # noqa: E402
+    RealtimeRecorder,
+    get_hydro_history,
+    get_synop_history,
+    parse_local_time,
+    synop_time,
+)
+from imgwtools.db.schema import get_table_counts, init_db  # noqa: E402
+from imgwtools.models import HydroCurrentData, SynopData  # noqa: E402
+
+
+def _hydro(level, date, flow=None, flow_date=None):
+    return HydroCurrentData(
+        station_id="150160180",
+        station_name="KŁODZKO",
+        water_level_cm=level,
+        water_level_date=date,
+        flow_m3s=flow,
+        flow_date=flow_date,
+    )
+
+
+def _synop(temperature, date, hour):
+    return SynopData(
+        station_id="12375",
+        station_name="WARSZAWA",
+        measurement_date=date,
+        measurement_hour=hour,
+        temperature_c=temperature,
+    )
+
+
+@pytest.fixture
+def recorder(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_enabled", True)
+    monkeypatch.setattr(settings, "db_path", tmp_path / "test.db")
+    init_db()
+    return RealtimeRecorder(retention_days=30)
+
+
+class TestTimestamps:
+    """Tests for IMGW timestamp parsing."""
+
+    def test_local_time(self):
+        """Test hydro times are Polish local time (CET/CEST)."""
+        winter = parse_local_time("2024-01-15 10:00:00")
+        summer = parse_local_time("2024-07-15 10:00:00")
+
+        assert winter == int(datetime(2024, 1, 15, 9, tzinfo=UTC).timestamp())
+        assert summer == int(datetime(2024, 7, 15, 8, tzinfo=UTC).timestamp())
+
+    def test_invalid_time(self):
+        """Test empty or malformed timestamps are skipped."""
+        assert parse_local_time(None) is None
+        assert parse_local_time("brak") is None
+
+    def test_synop_time(self):
+        """Test synop date plus UTC hour."""
+        ts = synop_time(_synop(1.0, "2024-01-15", 6))
+
+        assert ts == int(datetime(2024, 1, 15, 6, tzinfo=UTC).timestamp())
+        assert synop_time(_synop(1.0, None, 6)) is None
+
+
+class TestRealtimeRecorder:
+    """Tests for recording and querying real-time history."""
+
+    def test_deduplicates_by_measurement_time(self, recorder):
+        """Test polling unchanged data stores nothing new."""
+        data = [_hydro(120, "2024-01-15 10:00:00", 5.5, "2024-01-15 09:00:00")]
+
+        assert recorder.record_hydro(data) == 2
+        assert recorder.record_hydro(data) == 0
+        assert recorder.record_hydro([_hydro(121, "2024-01-15 10:10:00")]) == 1
+
+    def test_missing_values_skipped(self, recorder):
+        """Test parameters without value or time are not stored."""
+        assert recorder.record_hydro([_hydro(None, "2024-01-15 10:00:00")]) == 0
+        assert recorder.record_hydro([_hydro(100, None)]) == 0
+
+    def test_hydro_history(self, recorder):
+        """Test history is ordered and limited to the requested range."""
+        recorder.record_hydro([
+            _hydro(122, "2024-01-15 10:20:00"),
+            _hydro(120, "2024-01-15 10:00:00"),
+            _hydro(121, "2024-01-15 10:10:00"),
+        ])
+
+        values = get_hydro_history(
+            "150160180",
+            start=datetime(2024, 1, 15, 9, 5, tzinfo=UTC),
+            end=datetime(2024, 1, 15, 12, tzinfo=UTC),
+        )
+
+        assert [v.value for v in values] == [121, 122]
+        assert values[0].measured_at == datetime(2024, 1, 15, 9, 10, tzinfo=UTC)
+        assert get_hydro_history("150160180", "Q", days=36500) == []
+
+    def test_synop_history(self, recorder):
+        """Test synop records are stored once per station and hour."""
+        data = [_synop(-2.5, "2024-01-15", 6), _synop(-1.0, "2024-01-15", 7)]
+
+        assert recorder.record_synop(data) == 2
+        assert recorder.record_synop(data) == 0
+
+        records = get_synop_history(
+            "12375", start=datetime(2024, 1, 15, tzinfo=UTC), days=None
+        )
+        assert [r.temperature_c for r in records] == [-2.5, -1.0]
+
+    def test_prune(self, recorder):
+        """Test rows older than the retention period are deleted."""
+        recorder.record_hydro([
+            _hydro(100, "2024-01-01 12:00:00"),
+            _hydro(110, "2024-02-10 12:00:00"),
+        ])
+        now = datetime(2024, 2, 15, tzinfo=UTC).timestamp()
+
+        assert recorder.prune(now=now) == 1
+        assert get_table_counts()["hydro_realtime"] == 1
+
+    def test_no_retention_keeps_everything(self, recorder):
+        """Test retention_days=0 disables pruning."""
+        recorder.retention_days = 0
+        recorder.record_hydro([_hydro(100, "2000-01-01 12:00:00")])
+
+        assert recorder.prune() == 0
+
+    async def test_poll_errors_reported(self, recorder, monkeypatch):
+        """Test a failing feed is reported while the other one is recorded."""
+
+        async def hydro(timeout):
+            raise KeyError("stan_wody")
+
+        async def synop(timeout):
+            return [_synop(-2.5, "2024-01-15", "12")]
+
+        monkeypatch.setattr(realtime, "fetch_hydro_current_async", hydro)
+        monkeypatch.setattr(realtime, "fetch_synop_async", synop)
+
+        result = await recorder.poll_once()
+
+        assert result.synop == 1
+        assert result.errors == ["hydro: 'stan_wody'"]
+
+    async def test_run_survives_failed_poll(self, recorder, monkeypatch):
+        """Test an exception of one poll is reported and polling continues."""
+
+        async def poll_once():
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(recorder, "poll_once", poll_once)
+        results = []
+
+        await recorder.run(0, iterations=2, on_poll=results.append)
+
+        assert [r.errors for r in results] == [["RuntimeError: database is locked"]] * 2
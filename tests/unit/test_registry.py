@@ -0,0 +1,163 @@
+"""
+Unit tests for imgwtools.registry module.
+"""
+
+import asyncio
+
+import pytest
+
+from imgwtools.exceptions import IMGWConnectionError
+from imgwtools.registry import StationRegistry
+from imgwtools.stations import HydroStation, MeteoStation
+
+
+@pytest.fixture
+def registry(tmp_path):
+    names = tmp_path / "hydro.csv"
+    names.write_bytes(
+        "id,name,river,\n"
+        "149180020,CHAŁUPKI,Odra (1)\n"
+        "150160180,KŁODZKO,Nysa Kłodzka (1212)\n"
+        "152210170,WARSZAWA-BULWARY,Wisła (2)\n".encode("cp1250")
+    )
+    locations = tmp_path / "locations.csv"
+    locations.write_text(
+        "id,X,Y\n"
+        "149180020,18.3275,49.9213\n"
+        "150160180,16.6500,50.4400\n"
+        "152210170,NA,NA\n"
+    )
+    meteo = tmp_path / "meteo.csv"
+    meteo.write_bytes('"249180010","BIELSKO-BIAŁA"\n'.encode("cp1250"))
+    return StationRegistry(names, meteo, locations, ttl_seconds=0)
+
+
+class TestStationRegistry:
+    """Tests for loading and querying the registry."""
+
+    def test_lazy_load(self, registry):
+        """Test bundled files are loaded on first access."""
+        assert len(registry.hydro_stations) == 3
+        assert len(registry.meteo_stations) == 1
+        assert registry.version == 1
+
+    def test_lookup_by_id(self, registry):
+        """Test lookup by station ID includes coordinates and river code."""
+        station = registry.get_hydro_station("150160180")
+
+        assert station.name == "KŁODZKO"
+        assert station.river_id == "1212"
+        assert station.latitude == pytest.approx(50.44)
+        assert registry.get_meteo_station("249180010").name == "BIELSKO-BIAŁA"
+
+    def test_find_by_name_and_river(self, registry):
+        """Test name/river lookups ignore case and diacritics."""
+        assert registry.find_hydro_by_name("klodzko")[0].station_id == "150160180"
+        assert [s.station_id for s in registry.find_hydro_by_river("wisla")] == [
+            "152210170"
+        ]
+        assert registry.find_meteo_by_name("Bielsko-Biala")
+
+    def test_search(self, registry):
+        """Test substring search on names and rivers."""
+        assert {s.station_id for s in registry.search_hydro("kłodz")} == {"150160180"}
+        assert len(registry.search_hydro(None)) == 3
+
+    def test_spatial_index(self, registry):
+        """Test stations without coordinates are not indexed."""
+        assert len(registry.hydro_index) == 2
+
+    def test_missing_files(self, tmp_path):
+        """Test missing bundled files give an empty registry with an error."""
+        registry = StationRegistry(tmp_path / "none.csv", tmp_path / "none2.csv")
+
+        assert registry.hydro_stations == []
+        assert registry.last_error is not None
+
+    def test_disabled_refresh_is_never_stale(self, registry):
+        """Test ttl_seconds=0 disables remote refresh."""
+        assert registry.is_stale is False
+
+
+class TestStationRegistryMerge:
+    """Tests for merging remote data into the registry."""
+
+    def test_merge_coordinates_and_state(self, registry):
+        """Test map API data fills coordinates and water state."""
+        coords = [
+            HydroStation(
+                station_code="152210170",
+                station_name="WARSZAWA-BULWARY",
+                latitude=52.25,
+                longitude=21.03,
+                water_state="high",
+            )
+        ]
+        error = IMGWConnectionError("offline")
+
+        assert registry._merge(error, coords, error) is True
+
+        station = registry.get_hydro_station("152210170")
+        assert station.latitude == 52.25
+        assert station.water_state == "high"
+        assert station.river == "Wisła"
+        assert len(registry.hydro_index) == 3
+        assert registry.version == 2
+        assert "offline" in registry.last_error
+
+    def test_merge_new_stations(self, registry):
+        """Test stations missing from bundled files are added."""
+        names = [HydroStation(station_code="999999999", station_name="NOWA", river_name="Test")]
+        meteo = [MeteoStation(station_id="123456789", name="NOWA METEO")]
+
+        registry._merge(names, IMGWConnectionError("offline"), meteo)
+
+        assert registry.get_hydro_station("999999999").name == "NOWA"
+        assert registry.get_meteo_station("123456789") is not None
+        assert registry.get_meteo_station("249180010") is not None
+
+    def test_all_sources_failed_keeps_data(self, registry):
+        """Test failed refresh keeps the current snapshot."""
+        error = IMGWConnectionError("offline")
+
+        assert registry._merge(error, error, error) is False
+        assert len(registry.hydro_stations) == 3
+        assert registry.version == 1
+
+    def test_snapshot_objects_not_mutated(self, registry):
+        """Test refresh does not modify stations held by earlier readers."""
+        before = registry.get_hydro_station("152210170")
+        coords = [
+            HydroStation(
+                station_code="152210170", station_name="X", latitude=52.0, longitude=21.0
+            )
+        ]
+
+        registry._merge(IMGWConnectionError("offline"), coords, IMGWConnectionError("x"))
+
+        assert before.latitude is None
+
+
+class TestRefreshLoop:
+    """Tests for the background refresh loop."""
+
+    async def test_unexpected_error_keeps_loop(self, registry, monkeypatch):
+        """Test a non-IMGW error is recorded and the loop keeps running."""
+        registry.ttl_seconds = 60
+        calls = 0
+
+        async def refresh_async():
+            nonlocal calls
+            calls += 1
+            raise KeyError("stacja")
+
+        monkeypatch.setattr(registry, "refresh_async", refresh_async)
+        task = asyncio.create_task(registry.run_refresh_loop())
+        try:
+            await asyncio.sleep(0.01)
+            assert calls == 1
+            assert not task.done()
+            assert "stacja" in registry.last_error
+            assert len(registry.hydro_stations) == 3
+        finally:
+            task.cancel()
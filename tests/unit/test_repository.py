@@ -0,0 +1,272 @@
+"""
+Unit tests for imgwtools.db repository (station search and summaries).
+"""
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from imgwtools.config import settings  # noqa: E402
+from imgwtools.db.cache_manager import HydroCacheManager  # noqa: E402
+from imgwtools.db.connection import get_db_connection, get_transaction  # noqa: E402
+from imgwtools.db.models import HydroDailyRecord, HydroStation  # noqa: E402
+from imgwtools.db.repository import HydroRepository  # noqa: E402
+from imgwtools.db.schema import (  # noqa: E402
+    CURRENT_VERSION,
+    get_schema_version,
+    get_station_search_tables,
+    get_table_counts,
+    init_db,
+    rebuild_daily_summary,
+)
+from imgwtools.text import fold_text, tokenize  # noqa: E402
+
+
+def _daily(code, hydro_year, hydro_month, day, level=None, flow=None):
+    calendar_month = (hydro_month + 9) % 12 + 1
+    year = hydro_year - 1 if hydro_month <= 2 else hydro_year
+    return HydroDailyRecord(
+        station_code=code,
+        hydro_year=hydro_year,
+        hydro_month=hydro_month,
+        day=day,
+        calendar_month=calendar_month,
+        water_level_cm=level,
+        flow_m3s=flow,
+        measurement_date=f"{year}-{calendar_month:02d}-{day:02d}",
+    )
+
+
+def _station(code, name, river, lat=None, lon=None):
+    return HydroStation(
+        station_code=code, station_name=name, river_name=river, latitude=lat, longitude=lon
+    )
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_enabled", True)
+    monkeypatch.setattr(settings, "db_path", tmp_path / "test.db")
+    init_db()
+
+    repo = HydroRepository()
+    repo.upsert_station(_station("149180020", "KŁODZKO", "Nysa Kłodzka", 50.43, 16.65))
+    repo.upsert_station(_station("152210170", "WARSZAWA-BULWARY", "Wisła", 52.25, 21.03))
+    repo.upsert_station(_station("150190340", "KRAKÓW-BIELANY", "Wisła"))
+    return repo
+
+
+class TestFoldText:
+    """Tests for diacritic folding."""
+
+    def test_polish_letters(self):
+        """Test that all Polish diacritics are folded, including 'ł'."""
+        assert fold_text("ŁÓDŹ Żółć ĄĘŚŃ") == "lodz zolc aesn"
+
+    def test_tokenize(self):
+        """Test splitting on punctuation."""
+        assert tokenize("Warszawa-Bulwary (Wisła)") == ["warszawa", "bulwary", "wisla"]
+
+
+class TestStationSearch:
+    """Tests for FTS5/R-tree backed station search."""
+
+    def test_schema_has_search_tables(self, repo):
+        """Test that migrations create the search indexes."""
+        with get_db_connection(readonly=True) as conn:
+            assert get_schema_version(conn) == CURRENT_VERSION
+            tables = get_station_search_tables(conn)
+
+        if not tables:
+            pytest.skip("SQLite built without FTS5/R-tree")
+        assert tables == {"hydro_stations_fts", "hydro_stations_rtree"}
+
+    def test_diacritic_insensitive_prefix(self, repo):
+        """Test that 'klodz' finds 'KŁODZKO'."""
+        result = repo.get_stations(search="klodz")
+
+        assert [s.station_code for s in result] == ["149180020"]
+
+    def test_search_by_river(self, repo):
+        """Test search matches river names."""
+        result = repo.get_stations(search="wis")
+
+        assert {s.station_code for s in result} == {"152210170", "150190340"}
+
+    def test_all_tokens_required(self, repo):
+        """Test multi-word query narrows results."""
+        result = repo.get_stations(search="krak wis")
+
+        assert [s.station_code for s in result] == ["150190340"]
+
+    def test_upsert_keeps_index_in_sync(self, repo):
+        """Test renamed station is found by its new name only."""
+        repo.upsert_station(_station("149180020", "GŁUCHOŁAZY", "Biała Głuchołaska"))
+
+        assert repo.get_stations(search="klodzko") == []
+        assert repo.get_stations(search="gluch")[0].station_code == "149180020"
+
+    def test_upsert_with_known_search_tables(self, repo):
+        """Test passing search_tables skips the sqlite_master lookup."""
+        statements = []
+        with get_transaction() as conn:
+            tables = get_station_search_tables(conn)
+            conn.set_trace_callback(statements.append)
+            for code in ("149180020", "152210170"):
+                station = _station(code, "GŁUCHOŁAZY", "Biała")
+                repo.upsert_station(station, conn, tables)
+            conn.set_trace_callback(None)
+
+        assert not any("sqlite_master" in statement for statement in statements)
+        if tables:
+            assert len(repo.get_stations(search="gluch")) == 2
+
+    def test_bbox(self, repo):
+        """Test bounding box query skips stations without coordinates."""
+        result = repo.get_stations_in_bbox(50.0, 16.0, 53.0, 22.0)
+
+        assert {s.station_code for s in result} == {"149180020", "152210170"}
+
+    def test_force_reinit_clears_index(self, repo):
+        """Test init_db(force=True) recreates empty search tables."""
+        init_db(force=True)
+
+        assert repo.get_stations(search="klodz") == []
+
+
+class TestDailySummary:
+    """Tests for the per-station hydro_daily summary."""
+
+    def _import(self, monkeypatch, records):
+        """Import records through the cache manager without a ZIP file."""
+        monkeypatch.setattr(
+            "imgwtools.db.cache_manager.parse_zip_file",
+            lambda data, interval: [
+                (_station(r.station_code, "STACJA", None), r) for r in records
+            ],
+        )
+        HydroCacheManager()._import_zip_data(b"", "dobowe", 2020, "test.zip", month=1)
+
+    def test_import_updates_summary(self, repo, monkeypatch):
+        """Test imports keep coverage and counts without scanning hydro_daily."""
+        self._import(
+            monkeypatch,
+            [
+                _daily("149180020", 2020, 1, 1, level=120, flow=3.5),
+                _daily("149180020", 2020, 1, 2, level=110),
+                _daily("149180020", 2020, 1, 4),
+                _daily("152210170", 2020, 1, 1, level=300),
+            ],
+        )
+        self._import(monkeypatch, [_daily("149180020", 2021, 1, 1, level=90)])
+
+        coverage = {c.station_code: c for c in repo.get_station_coverage()}
+
+        klodzko = coverage["149180020"]
+        assert klodzko.station_name == "STACJA"
+        assert (klodzko.first_year, klodzko.last_year) == (2020, 2021)
+        assert (klodzko.first_date, klodzko.last_date) == ("2019-11-01", "2020-11-01")
+        assert klodzko.day_count == 3
+        assert (klodzko.level_min, klodzko.level_max) == (90, 120)
+        assert klodzko.flow_max == 3.5
+        assert get_table_counts()["hydro_daily"] == 5
+        assert get_table_counts(exact=True)["hydro_daily"] == 5
+
+    def test_year_filter(self, repo):
+        """Test coverage limited to a range of hydrological years."""
+        repo.insert_daily_batch(
+            [_daily("149180020", 2020, 1, 1, level=1), _daily("149180020", 2021, 1, 1)]
+        )
+        repo.refresh_daily_summary({("149180020", 2020), ("149180020", 2021)})
+
+        (coverage,) = repo.get_station_coverage("149180020", start_year=2021)
+
+        assert coverage.first_year == 2021
+        assert coverage.day_count == 0
+
+    def test_rebuild_and_clear(self, repo):
+        """Test full rebuild after migration and clearing with the data."""
+        repo.insert_daily_batch(
+            [_daily("149180020", 2020, 1, day, level=day) for day in (1, 2)]
+        )
+        assert repo.get_station_coverage() == []
+
+        with get_db_connection() as conn:
+            rebuild_daily_summary(conn)
+            conn.commit()
+        assert repo.get_station_coverage()[0].completeness == 1.0
+
+        repo.clear_cache("dobowe")
+        assert repo.get_station_coverage() == []
+
+
+class TestBulkQuery:
+    """Tests for multi-station daily data retrieval."""
+
+    @pytest.fixture
+    def bulk_repo(self, repo):
+        repo.insert_daily_batch(
+            [
+                _daily("149180020", 2020, 1, 2, level=120),
+                _daily("149180020", 2020, 1, 1, level=110, flow=3.5),
+                _daily("152210170", 2020, 1, 1, level=300),
+                _daily("150190340", 2020, 1, 1, level=250),
+                _daily("150190340", 2021, 1, 1, level=260),
+            ]
+        )
+        return repo
+
+    def test_select_by_river(self, bulk_repo):
+        """Test river names match without diacritics."""
+        assert bulk_repo.find_station_codes(river="wisla") == ["150190340", "152210170"]
+
+    def test_filters_intersect(self, bulk_repo):
+        """Test code list, river and bbox filters are combined."""
+        codes = bulk_repo.find_station_codes(
+            ["149180020", "152210170"], bbox=(50.0, 16.0, 53.0, 22.0)
+        )
+        assert codes == ["149180020", "152210170"]
+        assert bulk_repo.find_station_codes(["149180020"], river="Wisła") == []
+
+    def test_columnar_result(self, bulk_repo):
+        """Test aligned columns ordered by station and date."""
+        data = bulk_repo.get_daily_data_bulk(
+            ["149180020", "150190340"], start_year=2020, end_year=2020
+        )
+
+        assert len(data) == 3
+        assert data.station_code == ["149180020", "149180020", "150190340"]
+        assert data.measurement_date == ["2019-11-01", "2019-11-02", "2019-11-01"]
+        assert data.water_level_cm == [110, 120, 250]
+        assert data.flow_m3s == [3.5, None, None]
+        assert set(data.stations) == {"149180020", "150190340"}
+        assert data.stations["149180020"].river_name == "Nysa Kłodzka"
+
+    def test_streamed_rows(self, bulk_repo):
+        """Test streaming in small batches returns every row."""
+        rows = list(bulk_repo.iter_daily_rows(["150190340"], batch_size=1))
+
+        assert rows == [
+            ("150190340", "2019-11-01", 250, None, None),
+            ("150190340", "2020-11-01", 260, None, None),
+        ]
+
+    async def test_csv_stream_closes_rows(self, bulk_repo):
+        """Test an abandoned CSV response releases the row stream."""
+        pytest.importorskip("fastapi")
+        from imgwtools.api.routes.hydro import _csv_stream
+
+        rows = bulk_repo.iter_daily_rows(["149180020", "150190340"])
+        stream = _csv_stream(rows, {}, batch_size=1)
+
+        assert (await anext(stream)).startswith("station_id,")
+        await stream.aclose()  # client disconnected
+
+        assert rows.gi_frame is None
+
+    def test_empty_selection(self, bulk_repo):
+        """Test no stations gives an empty result."""
+        data = bulk_repo.get_daily_data_bulk([])
+
+        assert len(data) == 0
+        assert data.stations == {}
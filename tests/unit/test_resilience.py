@@ -0,0 +1,280 @@
+"""
+Unit tests for imgwtools.resilience (retries, backoff, circuit breaker)
+and the failure ledger of the cache.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+import httpx
+import pytest
+import respx
+
+from imgwtools import set_base_url
+from imgwtools.metrics import UPSTREAM_RETRIES
+from imgwtools.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    async_retry_transport,
+    configure_resilience,
+    get_circuit_breaker,
+    reset_circuit_breakers,
+    retry_transport,
+)
+from imgwtools.testing import FakeIMGWServer
+
+URL = "https://imgw.test/data"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping."""
+    delays: list[float] = []
+    monkeypatch.setattr("imgwtools.resilience.time.sleep", delays.append)
+    return delays
+
+
+def _client() -> httpx.Client:
+    return httpx.Client(transport=retry_transport())
+
+
+class TestRetryPolicy:
+    """Tests for backoff delays."""
+
+    def test_exponential_backoff_with_jitter(self):
+        """Test delays stay within the exponential bound and the cap."""
+        policy = RetryPolicy(backoff=1.0, max_delay=5.0)
+        for attempt in range(6):
+            assert 0 <= policy.delay(attempt) <= min(5.0, 2**attempt)
+
+    def test_retry_after_seconds(self):
+        """Test Retry-After seconds are used as is, capped."""
+        policy = RetryPolicy(max_retry_after=60.0)
+        assert policy.delay(0, "7") == 7.0
+        assert policy.delay(0, "3600") == 60.0
+
+    def test_retry_after_date(self):
+        """Test Retry-After HTTP dates are converted to seconds."""
+        when = datetime.now(UTC) + timedelta(seconds=30)
+        assert 25 <= RetryPolicy().delay(0, format_datetime(when, usegmt=True)) <= 30
+
+    def test_invalid_retry_after(self):
+        """Test an unparsable Retry-After falls back to backoff."""
+        assert RetryPolicy(backoff=0.0).delay(3, "soon") == 0.0
+
+
+class TestCircuitBreaker:
+    """Tests for circuit breaker states."""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the circuit; success resets."""
+        breaker = CircuitBreaker("h", failure_threshold=3, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+    def test_half_open_trial(self):
+        """Test one trial request after the timeout; failure reopens."""
+        breaker = CircuitBreaker("h", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()  # trial already in flight
+
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_release_trial(self):
+        """Test only the owner can give back the trial without an outcome."""
+        breaker = CircuitBreaker("h", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        owner = object()
+        assert breaker.allow(owner)
+
+        breaker.release_trial(object())
+        assert not breaker.allow()
+        breaker.release_trial(owner)
+        assert breaker.allow()
+
+
+class TestRetryTransport:
+    """Tests for retrying transports."""
+
+    @respx.mock
+    def test_retries_server_errors(self, sleeps):
+        """Test 503 responses are retried until success."""
+        route = respx.get(URL).mock(
+            side_effect=[httpx.Response(503), httpx.Response(503), httpx.Response(200)]
+        )
+        before = UPSTREAM_RETRIES.value(host="imgw.test:https")
+
+        with _client() as client:
+            assert client.get(URL).status_code == 200
+        assert route.call_count == 3
+        assert len(sleeps) == 2
+        assert UPSTREAM_RETRIES.value(host="imgw.test:https") == before + 2
+
+    @respx.mock
+    def test_honours_retry_after(self, sleeps):
+        """Test the Retry-After of a 429 response sets the delay."""
+        respx.get(URL).mock(
+            side_effect=[
+                httpx.Response(429, headers={"Retry-After": "2"}),
+                httpx.Response(200),
+            ]
+        )
+        with _client() as client:
+            assert client.get(URL).status_code == 200
+        assert sleeps == [2.0]
+
+    @respx.mock
+    def test_gives_up(self, sleeps):
+        """Test the last response is returned after max_attempts."""
+        route = respx.get(URL).mock(return_value=httpx.Response(502))
+        with _client() as client:
+            assert client.get(URL).status_code == 502
+        assert route.call_count == 4
+
+    @respx.mock
+    def test_client_errors_and_posts_not_retried(self, sleeps):
+        """Test 404 responses and non-idempotent requests are not retried."""
+        missing = respx.get(URL).mock(return_value=httpx.Response(404))
+        post = respx.post(URL).mock(return_value=httpx.Response(503))
+        with _client() as client:
+            assert client.get(URL).status_code == 404
+            assert client.post(URL).status_code == 503
+        assert missing.call_count == post.call_count == 1
+        assert sleeps == []
+
+    @respx.mock
+    def test_connection_errors(self, sleeps):
+        """Test transport errors are retried, then raised."""
+        route = respx.get(URL).mock(side_effect=httpx.ConnectError("refused"))
+        with _client() as client, pytest.raises(httpx.ConnectError):
+            client.get(URL)
+        assert route.call_count == 4
+
+    @respx.mock
+    def test_circuit_opens(self, sleeps):
+        """Test an open circuit rejects requests without sending them."""
+        configure_resilience(
+            RetryPolicy(max_attempts=1), failure_threshold=2, reset_timeout=60
+        )
+        route = respx.get(URL).mock(return_value=httpx.Response(503))
+        with _client() as client:
+            client.get(URL)
+            client.get(URL)
+            with pytest.raises(CircuitOpenError):
+                client.get(URL)
+        assert route.call_count == 2
+        assert get_circuit_breaker("imgw.test:https").state == "open"
+
+        reset_circuit_breakers()
+        assert get_circuit_breaker("imgw.test:https").state == "closed"
+
+    @respx.mock
+    async def test_async_transport(self):
+        """Test the async transport retries too."""
+        route = respx.get(URL).mock(
+            side_effect=[httpx.ConnectTimeout("slow"), httpx.Response(200)]
+        )
+        async with httpx.AsyncClient(transport=async_retry_transport()) as client:
+            assert (await client.get(URL)).status_code == 200
+        assert route.call_count == 2
+
+    @respx.mock
+    async def test_cancelled_trial_is_released(self):
+        """Test a cancelled half-open trial does not block the circuit."""
+        configure_resilience(
+            RetryPolicy(max_attempts=1), failure_threshold=1, reset_timeout=0
+        )
+        started = asyncio.Event()
+
+        async def hang(request):
+            started.set()
+            await asyncio.Event().wait()
+
+        respx.get(URL).mock(side_effect=[httpx.Response(503), hang])
+        async with httpx.AsyncClient(transport=async_retry_transport()) as client:
+            await client.get(URL)
+            task = asyncio.create_task(client.get(URL))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert get_circuit_breaker("imgw.test:https").allow()
+
+
+class TestFailureLedger:
+    """Tests for failed ranges recorded by the cache manager."""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        pytest.importorskip("pydantic_settings")
+        from imgwtools.config import settings
+        from imgwtools.db.cache_manager import HydroCacheManager
+        from imgwtools.db.schema import init_db
+
+        monkeypatch.setattr(settings, "db_enabled", True)
+        monkeypatch.setattr(settings, "db_path", tmp_path / "test.db")
+        init_db()
+        with FakeIMGWServer(n_stations=3, seed=1) as fake:
+            set_base_url(fake.base_url)
+            yield HydroCacheManager(), fake
+        set_base_url(None)
+
+    def test_record_and_clear(self, manager):
+        """Test repeated failures of a range update one ledger entry."""
+        manager, _ = manager
+        repo = manager.repo
+        repo.record_failed_range("dobowe", 2020, "HTTP 503", month=3)
+        repo.record_failed_range("dobowe", 2020, "timeout", month=3)
+        repo.record_failed_range("polroczne", 2020, "HTTP 503", param="Q")
+
+        failures = repo.get_failed_ranges("dobowe")
+        assert len(failures) == 1
+        assert failures[0].attempts == 2
+        assert failures[0].error == "timeout"
+
+        repo.clear_failed_range("dobowe", 2020, month=3)
+        assert [f.interval for f in repo.get_failed_ranges()] == ["polroczne"]
+
+    async def test_backfill_failures_are_retried(self, manager):
+        """Test failed years are recorded, then cached by retry_failed."""
+        manager, fake = manager
+        fake.failure_rate = 1.0
+
+        results = await manager.cache_year_range("miesieczne", 2019, 2020)
+        assert results == {2019: 0, 2020: 0}
+        failures = manager.repo.get_failed_ranges()
+        assert [(f.year, f.source_file) for f in failures] == [
+            (2019, "mies_2019.zip"),
+            (2020, "mies_2020.zip"),
+        ]
+
+        fake.failure_rate = 0.0
+        reset_circuit_breakers()
+        summary = await manager.retry_failed()
+        assert summary == {"retried": 2, "cached": 2, "failed": 0}
+        assert manager.repo.get_failed_ranges() == []
+        assert manager.repo.is_range_cached("miesieczne", 2020)
+
+    @pytest.mark.parametrize("param", [None, "X"])
+    async def test_backfill_rejects_invalid_param(self, manager, param):
+        """Test invalid arguments raise before any year is attempted."""
+        manager, _ = manager
+        with pytest.raises(ValueError):
+            await manager.cache_year_range("polroczne", 2019, 2020, param=param)
+        assert manager.repo.get_failed_ranges() == []
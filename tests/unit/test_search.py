@@ -0,0 +1,89 @@
+"""
+Unit tests for imgwtools.search module.
+"""
+
+import pytest
+
+from imgwtools.search import StationSearchIndex
+from imgwtools.stations import HydroStation, MeteoStation
+
+
+def _hydro(station_id, name, river=None):
+    return HydroStation(station_code=station_id, station_name=name, river_name=river)
+
+
+@pytest.fixture
+def index():
+    return StationSearchIndex([
+        _hydro("1", "WARSZAWA", "Wisła"),
+        _hydro("2", "WARSZAWA-BULWARY", "Wisła"),
+        _hydro("3", "KŁODZKO", "Nysa Kłodzka"),
+        _hydro("4", "BYSTRZYCA KŁODZKA", "Bystrzyca"),
+        _hydro("5", "NOWA WARSZAWKA", "Odra"),
+        _hydro("6", "ŁÓDŹ", None),
+    ])
+
+
+def _ids(page):
+    return [s.station_id for s in page.stations]
+
+
+class TestStationSearchIndex:
+    """Tests for ranked prefix/trigram search."""
+
+    def test_exact_name_ranks_first(self, index):
+        """Test exact name beats name prefix and substring matches."""
+        page = index.search("warszawa")
+
+        assert _ids(page) == ["1", "2"]
+
+    def test_diacritics_folded(self, index):
+        """Test 'lodz' finds 'ŁÓDŹ' and 'klodz' finds 'KŁODZKO'."""
+        assert _ids(index.search("lodz"))[0] == "6"
+        assert _ids(index.search("klodz"))[0] == "3"
+
+    def test_all_words_must_match(self, index):
+        """Test multi-word query narrows results across fields."""
+        assert _ids(index.search("warszawa bul")) == ["2"]
+        assert _ids(index.search("nysa klodzko")) == ["3"]
+
+    def test_river_match(self, index):
+        """Test river-only matches are returned after name matches."""
+        page = index.search("wis")
+
+        assert set(_ids(page)) == {"1", "2"}
+
+    def test_substring_match(self, index):
+        """Test infix match via trigram index."""
+        assert _ids(index.search("szawk")) == ["5"]
+
+    def test_pagination(self, index):
+        """Test limit/offset with total count."""
+        first = index.search("warsz", limit=2)
+        second = index.search("warsz", limit=2, offset=2)
+
+        assert first.total == 3
+        assert first.has_more
+        assert len(second.hits) == 1
+        assert not second.has_more
+        assert set(_ids(first)) | set(_ids(second)) == {"1", "2", "5"}
+
+    def test_empty_query_returns_all(self, index):
+        """Test empty query lists stations in input order."""
+        page = index.search("", limit=3)
+
+        assert _ids(page) == ["1", "2", "3"]
+        assert page.total == 6
+
+    def test_no_match(self, index):
+        """Test unknown text returns empty page."""
+        page = index.search("xyz")
+
+        assert page.total == 0
+        assert page.hits == []
+
+    def test_meteo_stations_without_river(self):
+        """Test stations without a river attribute are supported."""
+        index = StationSearchIndex([MeteoStation(station_id="1", name="ŁÓDŹ-LUBLINEK")])
+
+        assert index.search("lublin").total == 1
@@ -0,0 +1,112 @@
+"""
+Unit tests for imgwtools.spatial_index module.
+"""
+
+import pytest
+
+from imgwtools.exceptions import IMGWValidationError
+from imgwtools.spatial_index import StationIndex, build_station_index, haversine_km
+from imgwtools.stations import HydroStation
+
+
+@pytest.fixture
+def stations():
+    """Stations around Poland plus one without coordinates."""
+    return [
+        HydroStation(station_code="1", station_name="Warszawa", latitude=52.23, longitude=21.01),
+        HydroStation(station_code="2", station_name="Krakow", latitude=50.06, longitude=19.94),
+        HydroStation(station_code="3", station_name="Gdansk", latitude=54.35, longitude=18.65),
+        HydroStation(station_code="4", station_name="Modlin", latitude=52.44, longitude=20.72),
+        HydroStation(station_code="5", station_name="Nieznana"),
+    ]
+
+
+class TestHaversine:
+    """Tests for haversine_km function."""
+
+    def test_zero_distance(self):
+        """Test distance from a point to itself."""
+        assert haversine_km(52.0, 21.0, 52.0, 21.0) == 0.0
+
+    def test_warsaw_krakow(self):
+        """Test known distance Warsaw - Krakow (~252 km)."""
+        assert haversine_km(52.23, 21.01, 50.06, 19.94) == pytest.approx(252, abs=2)
+
+
+class TestStationIndex:
+    """Tests for StationIndex queries."""
+
+    def test_skips_stations_without_coordinates(self, stations):
+        """Test that stations without coordinates are not indexed."""
+        index = StationIndex(stations)
+
+        assert len(index) == 4
+
+    def test_nearest(self, stations):
+        """Test nearest returns stations ordered by distance."""
+        index = build_station_index(stations)
+
+        result = index.nearest(52.3, 21.0, k=2)
+
+        assert [s.station_id for s, _ in result] == ["1", "4"]
+        assert result[0][1] < result[1][1]
+
+    def test_nearest_far_point_searches_all_rings(self, stations):
+        """Test nearest finds a station many grid cells away."""
+        index = StationIndex(stations, cell_size_deg=0.1)
+
+        result = index.nearest(54.9, 14.5, k=1)
+
+        assert result[0][0].station_id == "3"
+
+    def test_nearest_k_larger_than_index(self, stations):
+        """Test k greater than station count returns all stations."""
+        index = StationIndex(stations)
+
+        assert len(index.nearest(52.0, 20.0, k=10)) == 4
+
+    def test_nearest_max_distance(self, stations):
+        """Test max_distance_km limits results."""
+        index = StationIndex(stations)
+
+        result = index.nearest(52.23, 21.01, k=3, max_distance_km=50)
+
+        assert [s.station_id for s, _ in result] == ["1", "4"]
+
+    def test_nearest_many(self, stations):
+        """Test batch nearest preserves input order."""
+        index = StationIndex(stations)
+
+        results = index.nearest_many([(54.3, 18.6), (50.1, 19.9)])
+
+        assert [r[0][0].station_id for r in results] == ["3", "2"]
+
+    def test_within_radius(self, stations):
+        """Test radius query."""
+        index = StationIndex(stations)
+
+        result = index.within_radius(52.23, 21.01, 40)
+
+        assert [s.station_id for s, _ in result] == ["1", "4"]
+
+    def test_within_bbox(self, stations):
+        """Test bounding box query."""
+        index = StationIndex(stations)
+
+        result = index.within_bbox(49.0, 18.0, 52.3, 21.5)
+
+        assert {s.station_id for s in result} == {"1", "2"}
+
+    def test_invalid_bbox_raises(self, stations):
+        """Test that inverted bounding box raises."""
+        index = StationIndex(stations)
+
+        with pytest.raises(IMGWValidationError):
+            index.within_bbox(53.0, 18.0, 52.0, 21.0)
+
+    def test_empty_index(self):
+        """Test queries on an empty index."""
+        index = StationIndex([])
+
+        assert index.nearest(52.0, 21.0) == []
+        assert index.within_radius(52.0, 21.0, 100) == []
@@ -12,6 +12,9 @@ from imgwtools.stations import (
     get_hydro_stations_with_coords_async,
     list_meteo_stations,
     list_meteo_stations_async,
+    load_hydro_stations_from_csv,
+    load_meteo_stations_from_csv,
+    load_station_locations_from_csv,
     HydroStation,
     MeteoStation,
     _parse_hydro_stations_csv,
@@ -204,6 +207,47 @@ class TestGetHydroStationsWithCoords:
         assert call_args[1]["params"]["onlyMainStations"] == "true"
 
 
+class TestLoadStationsFromCsv:
+    """Tests for loading stations from local CSV files."""
+
+    def test_load_hydro_with_locations(self, tmp_path):
+        """Test joining station names with coordinates."""
+        names = tmp_path / "names.csv"
+        names.write_bytes(
+            "id,name,river,\n149180020,CHAŁUPKI,Odra (1),10\n152170190,WYSZKÓW,Bug (26),20\n".encode("cp1250")
+        )
+        locations = tmp_path / "locations.csv"
+        locations.write_text("id,X,Y\n149180020,18.3275,49.9213\n152170190,NA,NA\n")
+
+        stations = load_hydro_stations_from_csv(names, locations)
+
+        assert [s.station_id for s in stations] == ["149180020", "152170190"]
+        assert stations[0].name == "CHAŁUPKI"
+        assert stations[0].river == "Odra"
+        assert stations[0].latitude == 49.9213
+        assert stations[0].longitude == 18.3275
+        assert stations[1].latitude is None
+
+    def test_load_locations(self, tmp_path):
+        """Test reading coordinates, skipping unknown positions."""
+        locations = tmp_path / "locations.csv"
+        locations.write_text("id,X,Y\n149180020,18.3275,49.9213\n152170190,NA,NA\n")
+
+        assert load_station_locations_from_csv(locations) == {
+            "149180020": (49.9213, 18.3275)
+        }
+
+    def test_load_meteo(self, tmp_path):
+        """Test loading meteo station list."""
+        names = tmp_path / "meteo.csv"
+        names.write_bytes('"250180460","ADAMOWICE","95414"\n'.encode("cp1250"))
+
+        stations = load_meteo_stations_from_csv(names)
+
+        assert stations[0].station_id == "250180460"
+        assert stations[0].name == "ADAMOWICE"
+
+
 class TestHydroStationModel:
     """Tests for HydroStation model."""
 
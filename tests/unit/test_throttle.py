@@ -0,0 +1,166 @@
+"""
+Unit tests for imgwtools.throttle (client-side upstream rate limit).
+"""
+
+import threading
+
+import httpx
+import pytest
+import respx
+
+from imgwtools import throttle
+from imgwtools.metrics import UPSTREAM_THROTTLE_SECONDS
+from imgwtools.resilience import retry_transport
+from imgwtools.throttle import (
+    UpstreamThrottle,
+    configure_throttle,
+    current_lane,
+    in_lane,
+    request_lane,
+)
+
+HOST = "imgw.test:https"
+
+
+class FakeClock:
+    """Replacement of the time module used by the throttle."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(throttle, "time", fake)
+    return fake
+
+
+class TestTokenBucket:
+    """Tests for token accounting."""
+
+    def test_burst_then_rate(self, clock):
+        """Test a full bucket allows a burst, then refills at rate."""
+        limiter = UpstreamThrottle(rate=2.0, burst=3, reserve=0)
+        assert [limiter.try_acquire(HOST) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.try_acquire(HOST) == pytest.approx(0.5)
+
+        clock.now += 0.5
+        assert limiter.try_acquire(HOST) == 0.0
+        assert limiter.try_acquire("other:https") == 0.0  # separate bucket
+
+    def test_background_leaves_reserve(self, clock):
+        """Test background requests keep reserve tokens for interactive ones."""
+        limiter = UpstreamThrottle(rate=1.0, burst=5, reserve=2)
+        granted = 0
+        while limiter.try_acquire(HOST, "background") == 0:
+            granted += 1
+        assert granted == 3
+        assert limiter.try_acquire(HOST, "interactive") == 0.0
+        assert limiter.try_acquire(HOST, "interactive") == 0.0
+        assert limiter.try_acquire(HOST, "interactive") > 0
+
+    def test_wait(self, clock):
+        """Test wait sleeps until a token is available and counts the time."""
+        limiter = UpstreamThrottle(rate=4.0, burst=1, reserve=0)
+        before = UPSTREAM_THROTTLE_SECONDS.value(lane="interactive")
+        limiter.wait(HOST)
+        limiter.wait(HOST)
+        assert clock.slept == [pytest.approx(0.25)]
+        assert UPSTREAM_THROTTLE_SECONDS.value(lane="interactive") == pytest.approx(
+            before + 0.25
+        )
+
+    def test_disabled(self):
+        """Test rate 0 never waits."""
+        limiter = UpstreamThrottle(rate=0, burst=1)
+        assert all(limiter.try_acquire(HOST) == 0 for _ in range(100))
+
+    def test_reserve_limited_to_bucket(self):
+        """Test the reserve leaves room for one background request."""
+        assert UpstreamThrottle(burst=2, reserve=5).reserve == 1
+        with pytest.raises(ValueError):
+            UpstreamThrottle(burst=0)
+
+    def test_shared_store(self, clock, tmp_path):
+        """Test throttles with one store file share the bucket."""
+        path = tmp_path / "throttle.db"
+        first = UpstreamThrottle(rate=1.0, burst=2, reserve=0, store_path=path)
+        second = UpstreamThrottle(rate=1.0, burst=2, reserve=0, store_path=path)
+
+        assert first.try_acquire(HOST) == 0.0
+        assert second.try_acquire(HOST) == 0.0
+        assert first.try_acquire(HOST) == pytest.approx(1.0)
+
+    async def test_shared_store_off_event_loop(self, tmp_path, monkeypatch):
+        """Test wait_async queries the shared store in a worker thread."""
+        limiter = UpstreamThrottle(
+            rate=1.0, burst=2, reserve=0, store_path=tmp_path / "throttle.db"
+        )
+        acquire = limiter._acquire_shared
+        threads: list[int] = []
+
+        def record(host, need):
+            threads.append(threading.get_ident())
+            return acquire(host, need)
+
+        monkeypatch.setattr(limiter, "_acquire_shared", record)
+        await limiter.wait_async(HOST)
+
+        assert threads and threading.get_ident() not in threads
+
+
+class TestLanes:
+    """Tests for request lanes."""
+
+    def test_request_lane(self):
+        """Test the lane is set inside the block only."""
+        assert current_lane() == "interactive"
+        with request_lane("background"):
+            assert current_lane() == "background"
+        assert current_lane() == "interactive"
+
+        with pytest.raises(ValueError):
+            with request_lane("urgent"):
+                pass
+
+    async def test_in_lane(self):
+        """Test the decorator sets the lane of sync and async functions."""
+
+        @in_lane("background")
+        async def backfill():
+            return current_lane()
+
+        @in_lane("background")
+        def refresh():
+            return current_lane()
+
+        assert await backfill() == "background"
+        assert refresh() == "background"
+        assert current_lane() == "interactive"
+
+
+class TestTransport:
+    """Tests for the throttle in the IMGW transports."""
+
+    @respx.mock
+    def test_requests_wait_for_tokens(self, clock):
+        """Test requests beyond the burst wait for the rate limit."""
+        configure_throttle(UpstreamThrottle(rate=10.0, burst=2, reserve=0))
+        route = respx.get("https://imgw.test/data").mock(
+            return_value=httpx.Response(200)
+        )
+        with httpx.Client(transport=retry_transport()) as client:
+            for _ in range(4):
+                client.get("https://imgw.test/data")
+
+        assert route.call_count == 4
+        assert clock.slept == [pytest.approx(0.1), pytest.approx(0.1)]
@@ -4,12 +4,21 @@ Unit tests for imgwtools.urls module (URL builders).
 
 import pytest
 
+import imgwtools
+from imgwtools import urls
+from imgwtools.core import url_builder
 from imgwtools.urls import (
     build_hydro_url,
     build_meteo_url,
     build_pmaxtp_url,
     build_api_url,
+    build_hydro_map_url,
+    build_station_list_url,
+    get_api_url,
     get_available_years,
+    get_public_data_url,
+    set_base_url,
+    DataType,
     HydroInterval,
     MeteoInterval,
     MeteoSubtype,
@@ -209,3 +218,70 @@ class TestGetAvailableYears:
 
         assert isinstance(years, tuple)
         assert years[0] == 1951
+
+
+class TestSetBaseUrl:
+    """Tests for set_base_url (upstream override)."""
+
+    @pytest.fixture(autouse=True)
+    def restore(self):
+        yield
+        set_base_url(None)
+
+    def test_all_services_redirected(self):
+        """Test every builder uses the overridden host with IMGW paths."""
+        set_base_url("http://127.0.0.1:8090/")
+
+        hydro = build_hydro_url(HydroInterval.MONTHLY, 2020)
+        assert hydro.url == (
+            "http://127.0.0.1:8090/data/dane_pomiarowo_obserwacyjne"
+            "/dane_hydrologiczne/miesieczne/2020/mies_2020.zip"
+        )
+        assert build_api_url("hydro") == "http://127.0.0.1:8090/api/data/hydro"
+        assert build_pmaxtp_url(PMaXTPMethod.POT, 52.0, 21.0).startswith(
+            "http://127.0.0.1:8090/tpmax-api/point/P/KS/"
+        )
+        assert build_hydro_map_url() == (
+            "http://127.0.0.1:8090/map/stations/hydrologic"
+        )
+        assert build_station_list_url(DataType.METEO).endswith(
+            "8090/data/dane_pomiarowo_obserwacyjne"
+            "/dane_meteorologiczne/wykaz_stacji.csv"
+        )
+
+    def test_reset(self):
+        """Test None restores the public IMGW servers."""
+        set_base_url("http://localhost:1")
+        set_base_url(None)
+
+        assert build_api_url("synop") == f"{IMGW_API_URL}/synop"
+        assert build_hydro_map_url() == (
+            "https://hydro-back.imgw.pl/map/stations/hydrologic"
+        )
+
+    def test_constants_follow_override(self):
+        """Test re-exported constants and accessors see the current host."""
+        set_base_url("http://127.0.0.1:8090")
+
+        for module in (url_builder, urls, imgwtools):
+            assert module.IMGW_API_URL == "http://127.0.0.1:8090/api/data"
+        assert urls.IMGW_HYDRO_BACK_URL == "http://127.0.0.1:8090"
+        assert get_api_url() == "http://127.0.0.1:8090/api/data"
+
+        set_base_url(None)
+        assert imgwtools.IMGW_API_URL == IMGW_API_URL
+        assert urls.IMGW_PUBLIC_DATA_URL == get_public_data_url()
+
+    def test_legacy_clients_follow_override(self):
+        """Test the deprecated core API classes use the overridden host."""
+        pytest.importorskip("requests")
+        from imgwtools.core.imgw_api import IMGWAPI, PMAXTPAPI
+
+        set_base_url("http://127.0.0.1:8090")
+        with pytest.warns(DeprecationWarning):
+            api = IMGWAPI()
+        with pytest.warns(DeprecationWarning):
+            pmaxtp = PMAXTPAPI("POT", 21.0, 52.0)
+
+        assert api.base_url == "http://127.0.0.1:8090/api/data/"
+        assert pmaxtp.base_url == "http://127.0.0.1:8090/tpmax-api/point/"
@@ -0,0 +1,207 @@
+"""
+Unit tests for imgwtools.warnings_store module.
+"""
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+
+from imgwtools import warnings_store
+from imgwtools.exceptions import IMGWDataError
+from imgwtools.models import WarningData
+from imgwtools.warnings_store import (
+    PolygonRegionLocator,
+    WarningsStore,
+    region_codes,
+)
+
+NOON = datetime(2024, 1, 15, 12, tzinfo=UTC)
+
+
+def _warning(warning_id, teryt=None, region=None, valid_from=None, valid_to=None):
+    return WarningData(
+        id=warning_id,
+        warning_type="meteo",
+        level=1,
+        region=region,
+        teryt=teryt or [],
+        valid_from=valid_from or "2024-01-15 08:00:00",
+        valid_to=valid_to or "2024-01-16 08:00:00",
+    )
+
+
+@pytest.fixture
+def store():
+    store = WarningsStore()
+    store.update(
+        [
+            _warning("1", teryt=["0201", "0202"]),
+            _warning("2", teryt=["1465"]),
+            _warning("3", teryt=["0201"], valid_from="2024-01-20 08:00:00",
+                     valid_to="2024-01-21 08:00:00"),
+        ],
+        "meteo",
+    )
+    store.update([_warning("10", region="województwo dolnośląskie")], "hydro")
+    return store
+
+
+def _ids(warnings):
+    return sorted(w.id for w in warnings)
+
+
+class TestRegionCodes:
+    """Tests for deriving TERYT codes of a warning."""
+
+    def test_teryt_list(self):
+        """Test explicit TERYT codes are used as given."""
+        assert region_codes(_warning("1", teryt=["0201", "0201"])) == ("0201",)
+
+    def test_voivodeship_names(self):
+        """Test hydro warnings are mapped by voivodeship name."""
+        warning = _warning("1", region="kujawsko-pomorskie, pomorskie, Łódzkie")
+
+        assert region_codes(warning) == ("04", "22", "10")
+
+    def test_teryt_parsed_from_api(self):
+        """Test TERYT list and 'obowiazuje_od' keys in API responses."""
+        warning = WarningData.from_api_response(
+            {"id": 5, "teryt": ["0201", "0202"], "obowiazuje_od": "2024-01-15 08:00"}
+        )
+
+        assert warning.teryt == ["0201", "0202"]
+        assert warning.valid_from == "2024-01-15 08:00"
+
+
+class TestWarningsStore:
+    """Tests for region and time queries."""
+
+    def test_active_at_time(self, store):
+        """Test validity intervals are respected."""
+        assert _ids(store.active(NOON)) == ["1", "10", "2"]
+        assert _ids(store.active(datetime(2024, 1, 20, 12, tzinfo=UTC))) == ["3"]
+
+    def test_region_hierarchy(self, store):
+        """Test gmina, powiat and voivodeship queries match enclosing units."""
+        assert _ids(store.active_for_region("0201011", NOON)) == ["1", "10"]
+        assert _ids(store.active_for_region("0202", NOON)) == ["1", "10"]
+        assert _ids(store.active_for_region("02", NOON)) == ["1", "10"]
+        assert _ids(store.active_for_region("14", NOON)) == ["2"]
+        assert store.active_for_region("06", NOON) == []
+
+    def test_batch_regions(self, store):
+        """Test batch query only returns regions with warnings."""
+        result = store.active_for_regions(["0201011", "1465011", "0601011"], NOON)
+
+        assert set(result) == {"0201011", "1465011"}
+
+    def test_point_query_needs_locator(self, store):
+        """Test point queries without boundaries raise an error."""
+        with pytest.raises(IMGWDataError):
+            store.active_at_point(51.1, 17.0, NOON)
+
+    def test_point_query(self, store):
+        """Test point lookup through a polygon locator."""
+        store.locator = PolygonRegionLocator(
+            {"0201": [[(16.0, 51.0), (17.0, 51.0), (17.0, 52.0), (16.0, 52.0)]]}
+        )
+
+        assert _ids(store.active_at_point(51.5, 16.5, NOON)) == ["1", "10"]
+        assert store.active_at_point(53.0, 16.5, NOON) == []
+
+
+class TestChangeTokens:
+    """Tests for only-changed-since tokens."""
+
+    def test_unknown_token_returns_full(self, store):
+        """Test missing or foreign token returns all warnings."""
+        changes = store.changes_since(None)
+
+        assert changes.full
+        assert len(changes.added) == 4
+        assert store.changes_since("other.1").full
+
+    def test_changes_since(self, store):
+        """Test diff contains only new and removed warnings."""
+        token = store.token
+        store.update([_warning("2", teryt=["1465"]), _warning("4", teryt=["1201"])], "meteo")
+
+        changes = store.changes_since(token)
+
+        assert not changes.full
+        assert _ids(changes.added) == ["4"]
+        assert sorted(changes.removed) == ["meteo:1", "meteo:3"]
+        assert store.changes_since(changes.token).added == []
+
+    def test_unchanged_update_keeps_token(self, store):
+        """Test identical data does not create a new version."""
+        token = store.token
+
+        assert store.update([_warning("10", region="województwo dolnośląskie")], "hydro") is False
+        assert store.token == token
+
+
+class TestPolygonRegionLocator:
+    """Tests for GeoJSON region boundaries."""
+
+    def test_from_geojson_with_hole(self):
+        """Test polygons with holes and multipolygons."""
+        square = [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+        hole = [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]]
+        geojson = {
+            "features": [
+                {
+                    "properties": {"JPT_KOD_JE": "0201"},
+                    "geometry": {"type": "Polygon", "coordinates": [square, hole]},
+                },
+                {
+                    "properties": {"JPT_KOD_JE": "0202"},
+                    "geometry": {"type": "MultiPolygon", "coordinates": [[hole]]},
+                },
+            ]
+        }
+        locator = PolygonRegionLocator.from_geojson(geojson)
+
+        assert locator(1.0, 1.0) == ["0201"]
+        assert locator(5.0, 5.0) == ["0202"]
+        assert locator(20.0, 20.0) == []
+
+
+class TestRefresh:
+    """Tests for refreshing from IMGW."""
+
+    async def test_unexpected_error_keeps_warnings(self, store, monkeypatch):
+        """Test a non-IMGW error of one source keeps its previous warnings."""
+
+        async def fetch(source, timeout):
+            if source == "meteo":
+                raise KeyError("teryt")
+            return [_warning("10", region="województwo dolnośląskie")]
+
+        monkeypatch.setattr(warnings_store, "fetch_warnings_async", fetch)
+
+        await store.refresh_async()
+
+        assert "teryt" in store.last_error
+        assert len(store.changes_since(None).added) == 4
+
+    async def test_loop_survives_errors(self, store, monkeypatch):
+        """Test the refresh loop records errors and keeps running."""
+        store.ttl_seconds = 0.01
+        calls = 0
+
+        async def refresh_async():
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(store, "refresh_async", refresh_async)
+        task = asyncio.create_task(store.run_refresh_loop())
+        try:
+            await asyncio.sleep(0.1)
+            assert calls > 1
+            assert not task.done()
+            assert store.last_error == "boom"
+        finally:
+            task.cancel()